@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""QoS 조합 atlas: 단일-프로파일 정책 공간 전체를 미리 평가해 둔 lookup 테이블.
+
+    ros2 run check_qos check_qos_cli atlas build publish_period=<Nms> rtt=<Nms> [out=<atlas.npz>]
+    ros2 run check_qos check_qos_cli atlas lookup <atlas.npz> <xml|dir>...
+    ros2 run check_qos check_qos_cli atlas presets <atlas.npz> [<field>=<VALUE>...] [limit=<N>]
+                                                   [out=<presets.xml>]
+    ros2 run check_qos check_qos_cli atlas check <atlas.npz> [verify=<N>]
+
+kind 는 전부 열거하고, 개수 / duration 은 규칙의 임계값(⌈RTT/PP⌉+2, 2×PP, RTT 등)을
+경계로 하는 구간으로 나눈다. 구간마다 대표값 하나로 columnar.VECTOR_RULES 를 평가하고,
+조합마다 발동한 규칙의 bitmask 를 저장한다. 규칙마다 그 규칙이 읽는 축들의 곱 공간에서만
+평가하고 나머지 축으로는 broadcast 하므로 전체 조합 행을 만들지 않는다. 상수 임계값과 비교하는 규칙은
+구간 안에서 결과가 같고, 두 값을 서로 비교하는 규칙(lease < deadline, lifespan > depth×PP
+등)은 대표값 기준이다.
+
+조합 번호는 축별 구간 번호의 mixed-radix 값이므로 profile 하나의 판정은 O(1) 이다.
+`check` 는 현재 규칙으로 전체 공간을 다시 평가해 저장된 결과와 비교하고, verify=N 이면
+무작위 조합 N 개를 XML 로 만들어 스칼라 RULES 로도 확인한다 (규칙 변경 회귀 테스트).
+"""
+import bisect
+import json
+import pathlib
+import sys
+import time
+
+import numpy as np
+
+from . import qos_checker as qc
+from .bulkload import iter_profile_blocks
+from .columnar import (INF_TEXT, KIND_CODES, PROFILE_DTYPE, UNSET, VECTOR_RULES, _req,
+                       profile_row)
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli atlas build publish_period=<Nms> rtt=<Nms> "
+         "[out=<atlas.npz>]\n"
+         "       ros2 run check_qos check_qos_cli atlas lookup <atlas.npz> <xml|dir>... "
+         "[--fail-fast]\n"
+         "       ros2 run check_qos check_qos_cli atlas presets <atlas.npz> [<field>=<VALUE>...] "
+         "[limit=<N>] [out=<presets.xml>]\n"
+         "       ros2 run check_qos check_qos_cli atlas check <atlas.npz> [verify=<N>]")
+
+ATLAS_VERSION = 1
+INF_NS = int(INF_TEXT) * 1_000_000_000
+MAX_INSTANCES = 10                  # 어떤 규칙도 읽지 않으므로 Fast DDS 기본값 고정
+
+
+# ────────── 축 ──────────
+class Axis:
+    """정책 하나의 구간들. columns[col][i] = i 번째 구간 대표값, locate(row) → 구간 번호."""
+
+    def __init__(self, name: str, labels: list[str], columns: dict, locate):
+        self.name, self.labels, self.locate = name, labels, locate
+        self.columns = {c: np.asarray(v) for c, v in columns.items()}
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+def _kind_axis(field: str) -> Axis:
+    kinds = KIND_CODES[field]
+    return Axis(field, list(kinds), {field: np.arange(len(kinds))},
+                lambda r: int(r[field]) if 0 <= r[field] < len(kinds) else None)
+
+
+def _bool_axis(field: str, side_only: bool = False) -> Axis:
+    """side_only: 한쪽 (writer / reader) 에만 있는 정책. 다른 쪽 행은 UNSET 인 "N/A" 구간."""
+    if not side_only:
+        return Axis(field, ["FALSE", "TRUE"], {field: [0, 1]},
+                    lambda r: int(r[field]) if r[field] in (0, 1) else None)
+    return Axis(field, ["FALSE", "TRUE", "N/A"], {field: [0, 1, UNSET]},
+                lambda r: {0: 0, 1: 1, UNSET: 2}.get(int(r[field])))
+
+
+def _interval_labels(edges: list, fmt) -> list[str]:
+    """[edges[i], edges[i+1]) 구간 이름. 폭이 1 인 정수 구간은 값 하나로."""
+    out = []
+    for i, lo in enumerate(edges):
+        hi = edges[i + 1] if i + 1 < len(edges) else None
+        if hi is None:
+            out.append(f"≥{fmt(lo)}")
+        elif fmt is str and hi == lo + 1:
+            out.append(str(lo))
+        else:
+            out.append(f"[{fmt(lo)}, {fmt(hi)})")
+    return out
+
+
+def _count_axis(field: str, edges: list[int]) -> Axis:
+    """edges = 구간 왼쪽 끝 (= 대표값)."""
+    edges = sorted(set(edges))
+
+    def locate(r):
+        v = int(r[field])
+        return None if v < edges[0] else bisect.bisect_right(edges, v) - 1
+    return Axis(field, _interval_labels(edges, str), {field: edges}, locate)
+
+
+def _ms(ns: int) -> str:
+    return f"{ns / 1e6:g}ms"
+
+
+def _duration_axis(prefix: str, edges: list[int], reps: list[int],
+                   with_zero: bool = False) -> Axis:
+    """unset / (0) / [edges[i], edges[i+1]) 구간들 / INFINITY. has_/_ns/_inf 세 column."""
+    zero = ["0"] if with_zero else []
+    labels = ["unset", *zero, *_interval_labels(edges, _ms), "INFINITY"]
+    has = [False] + [True] * (len(labels) - 1)
+    ns = [0, *(0 for _ in zero), *reps, INF_NS]
+    inf = [False] * (len(labels) - 1) + [True]
+    first = 1 + len(zero)
+
+    def locate(r):
+        if not r[f"has_{prefix}"]:
+            return 0
+        if r[f"{prefix}_inf"]:
+            return len(labels) - 1
+        v = int(r[f"{prefix}_ns"])
+        if with_zero and v == 0:
+            return 1
+        return first + max(0, bisect.bisect_right(edges, v) - 1)
+    return Axis(prefix, labels, {f"has_{prefix}": has, f"{prefix}_ns": ns, f"{prefix}_inf": inf},
+                locate)
+
+
+def build_axes(pp_ns: int, rtt_ns: int) -> list[Axis]:
+    req = _req(pp_ns, rtt_ns)
+    axes = [_kind_axis(f) for f in KIND_CODES] + [_bool_axis("autodispose", True),
+                                                  _bool_axis("autoenable")]
+    axes += [
+        _count_axis("history_depth", [1, 2, req, req + 1]),
+        _count_axis("max_samples_per_instance", [0, 1, 2, req, req + 1]),
+        _count_axis("max_samples", [0, req, 4 * (req + 1)]),
+        Axis("autopurge_disposed_samples_delay", ["0", ">0 / INFINITY"],
+             {"autopurge_disposed_samples_delay": [0, UNSET]},
+             lambda r: 0 if r["autopurge_disposed_samples_delay"] == 0 else 1),
+        Axis("nowriter_purge", ["0 / INFINITY", ">0"], {"nowriter_purge_ns": [0, 1_000_000_000]},
+             lambda r: int(r["nowriter_purge_ns"] != 0)),
+        Axis("partition", ["default", "named"], {"partition_set": [False, True]},
+             lambda r: int(bool(r["partition_set"]))),
+        _duration_axis("deadline", [1, 2 * pp_ns], [pp_ns, 4 * pp_ns], with_zero=True),
+        _duration_axis("lease", [0, 2 * pp_ns], [pp_ns, 4 * pp_ns]),
+    ]
+    # lifespan 은 has_ column 없이 UNSET, 무한 값 없음
+    ls_edges = [0, rtt_ns, (req + 1) * pp_ns]
+    axes.append(Axis("lifespan", ["unset", *_interval_labels(ls_edges, _ms)],
+                     {"lifespan_ns": [UNSET, rtt_ns // 2, rtt_ns, 4 * (req + 1) * pp_ns]},
+                     lambda r: 0 if r["lifespan_ns"] == UNSET
+                     else bisect.bisect_right(ls_edges, int(r["lifespan_ns"]))))
+    return axes
+
+
+# ────────── atlas ──────────
+class _FieldTrace:
+    """규칙이 읽는 column 이름을 기록하는 PROFILE_DTYPE 배열 대리."""
+
+    def __init__(self, data: np.ndarray):
+        self.data, self.fields = data, set()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        self.fields.add(field)
+        return self.data[field]
+
+
+class Atlas:
+    def __init__(self, fired: np.ndarray, pp_ms: float, rtt_ms: float,
+                 rules: list[str], severities: list[str]):
+        self.pp_ms, self.rtt_ms = pp_ms, rtt_ms
+        self.axes = build_axes(int(pp_ms * 1_000_000), int(rtt_ms * 1_000_000))
+        self.shape = tuple(len(a) for a in self.axes)
+        self.fired = fired
+        self.rules, self.severities = rules, severities
+
+    @staticmethod
+    def _rule_fns() -> list:
+        return [fn for fn, *_ in qc.RULES]
+
+    # ── 생성 ───────────────────────────────────────
+    def columns(self, index: np.ndarray, shape: tuple | None = None) -> np.ndarray:
+        """
+        조합 번호 → PROFILE_DTYPE 행 (대표값). shape 를 주면 그 (축별 크기 ≤ 원래 크기) 공간의
+        번호로 본다. 크기 1 인 축은 첫 구간 값.
+        """
+        data = np.zeros(len(index), dtype=PROFILE_DTYPE)
+        data["side"] = UNSET
+        data["max_instances"] = MAX_INSTANCES
+        for axis, pos in zip(self.axes, np.unravel_index(index, shape or self.shape)):
+            for col, values in axis.columns.items():
+                data[col] = values[pos]
+        return data
+
+    def rule_shape(self, rule, pp_ns: int, rtt_ns: int) -> tuple:
+        """rule 이 읽는 축만 원래 크기, 나머지는 1 인 shape."""
+        probe = _FieldTrace(self.columns(np.zeros(1, dtype=np.intp)))
+        rule(probe, pp_ns, rtt_ns)
+        return tuple(len(a) if probe.fields & a.columns.keys() else 1 for a in self.axes)
+
+    def evaluate(self, rule_fns: list) -> np.ndarray:
+        """전체 공간에 rule_fns 를 적용 → 조합별 발동 규칙 bitmask."""
+        pp_ns, rtt_ns = int(self.pp_ms * 1_000_000), int(self.rtt_ms * 1_000_000)
+        dtype = np.uint32 if len(rule_fns) <= 32 else np.uint64
+        fired = np.zeros(self.shape, dtype=dtype)
+        for bit, fn in enumerate(rule_fns):
+            rule = VECTOR_RULES[fn]
+            shape = self.rule_shape(rule, pp_ns, rtt_ns)
+            data = self.columns(np.arange(int(np.prod(shape))), shape)
+            fired |= rule(data, pp_ns, rtt_ns).reshape(shape).astype(dtype) << dtype(bit)
+        return fired.reshape(-1)
+
+    @classmethod
+    def build(cls, pp_ms: float, rtt_ms: float) -> "Atlas":
+        fns = cls._rule_fns()
+        atlas = cls(None, pp_ms, rtt_ms, [fn.__name__ for fn in fns],
+                    [sev for _, sev, _ in qc.RULES])
+        atlas.fired = atlas.evaluate(fns)
+        return atlas
+
+    def save(self, path) -> None:
+        meta = {"version": ATLAS_VERSION, "publish_period_ms": self.pp_ms,
+                "rtt_ms": self.rtt_ms, "rules": self.rules, "severities": self.severities,
+                "axes": [[a.name, a.labels] for a in self.axes]}
+        np.savez_compressed(path, fired=self.fired, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path) -> "Atlas":
+        with np.load(path) as z:
+            meta = json.loads(str(z["meta"]))
+            fired = z["fired"]
+        if meta["version"] != ATLAS_VERSION:
+            sys.exit(f"[ERROR] {path}: atlas version {meta['version']} != {ATLAS_VERSION}")
+        atlas = cls(fired, meta["publish_period_ms"], meta["rtt_ms"],
+                    meta["rules"], meta["severities"])
+        if [[a.name, a.labels] for a in atlas.axes] != meta["axes"]:
+            sys.exit(f"[ERROR] {path}: atlas buckets differ from this checker version; rebuild it")
+        return atlas
+
+    # ── 조회 ───────────────────────────────────────
+    def locate(self, row) -> int | None:
+        """PROFILE_DTYPE 행 → 조합 번호 (공간 밖 값이면 None)."""
+        pos = []
+        for axis in self.axes:
+            i = axis.locate(row)
+            if i is None:
+                return None
+            pos.append(i)
+        return int(np.ravel_multi_index(pos, self.shape))
+
+    def rules_fired(self, index: int, fail_fast: bool = False) -> list[tuple[str, str]]:
+        """발동 규칙 [(이름, severity)] 를 stage 순서로. stage 는 현재 qos_checker.RULES 기준."""
+        bits = int(self.fired[index])
+        stages = {fn.__name__: stage for fn, _, stage in qc.RULES}
+        fired = sorted(((self.rules[i], self.severities[i]) for i in range(len(self.rules))
+                        if bits >> i & 1), key=lambda r: stages.get(r[0], qc.STAGES[-1]))
+        if fail_fast:
+            critical = [stages.get(r, qc.STAGES[-1]) for r, sev in fired if sev == "Critical"]
+            if critical:
+                fired = [f for f in fired if stages.get(f[0], qc.STAGES[-1]) <= min(critical)]
+        return fired
+
+    def describe(self, index: int) -> dict:
+        pos = np.unravel_index(index, self.shape)
+        return {a.name: a.labels[int(p)] for a, p in zip(self.axes, pos)}
+
+    def valid_mask(self, fixed: dict | None = None) -> np.ndarray:
+        """fixed = {축 이름: label}. 해당 부분 공간의 '모든 규칙 통과' mask (shape 형태)."""
+        view = (self.fired == 0).reshape(self.shape)
+        key = []
+        for axis in self.axes:
+            label = (fixed or {}).get(axis.name)
+            if label is None:
+                key.append(slice(None))
+            elif label in axis.labels:
+                key.append(slice(axis.labels.index(label), axis.labels.index(label) + 1))
+            else:
+                sys.exit(f"[ERROR] {axis.name} must be one of {axis.labels}, got {label!r}")
+        return view[tuple(key)]
+
+    def ever_valid(self, **fixed) -> bool:
+        return bool(self.valid_mask(fixed).any())
+
+    # ── XML ────────────────────────────────────────
+    def side(self, index: int) -> str:
+        """writer 전용 정책 (autodispose) 이 N/A 인 조합은 reader."""
+        return "SUB" if self.columns(np.array([index]))[0]["autodispose"] == UNSET else "PUB"
+
+    def profile_xml(self, index: int, name: str = "") -> str:
+        """조합의 대표값으로 만든 data_writer (autodispose 가 N/A 면 data_reader) profile."""
+        r = self.columns(np.array([index]))[0]
+        kind = {f: KIND_CODES[f][r[f]] for f in KIND_CODES}
+
+        def dur(ns):
+            if ns >= INF_NS:
+                return f"<sec>{INF_TEXT}</sec>"
+            return f"<sec>{ns // 1_000_000_000}</sec><nanosec>{ns % 1_000_000_000}</nanosec>"
+
+        qos = [f"<reliability><kind>{kind['reliability']}</kind></reliability>",
+               f"<durability><kind>{kind['durability']}</kind></durability>",
+               f"<ownership><kind>{kind['ownership']}</kind></ownership>",
+               f"<destinationOrder><kind>{kind['dest_order']}</kind></destinationOrder>",
+               "<liveliness><kind>{}</kind>{}</liveliness>".format(
+                   kind["liveliness"],
+                   f"<lease_duration>{dur(int(r['lease_ns']))}</lease_duration>"
+                   if r["has_lease"] else "")]
+        if r["has_deadline"]:
+            qos.append(f"<deadline><period>{dur(int(r['deadline_ns']))}</period></deadline>")
+        if r["lifespan_ns"] != UNSET:
+            qos.append(f"<lifespan><duration>{dur(int(r['lifespan_ns']))}</duration></lifespan>")
+        if r["partition_set"]:
+            qos.append("<partition><names><name>preset</name></names></partition>")
+        if r["autodispose"] != UNSET:
+            qos.append("<writerDataLifecycle><autodispose_unregistered_instances>"
+                       f"{'true' if r['autodispose'] else 'false'}"
+                       "</autodispose_unregistered_instances></writerDataLifecycle>")
+        reader = ""
+        if r["nowriter_purge_ns"]:
+            reader += (f"<autopurge_nowriter_samples_delay>{dur(int(r['nowriter_purge_ns']))}"
+                       "</autopurge_nowriter_samples_delay>")
+        if r["autopurge_disposed_samples_delay"] == 0:
+            reader += ("<autopurge_disposed_samples_delay><sec>0</sec>"
+                       "</autopurge_disposed_samples_delay>")
+        if reader:
+            qos.append(f"<readerDataLifecycle>{reader}</readerDataLifecycle>")
+        qos.append(f"<autoenable_created_entities>{'true' if r['autoenable'] else 'false'}"
+                   "</autoenable_created_entities>")
+        topic = (f"<historyQos><kind>{kind['history']}</kind>"
+                 f"<depth>{r['history_depth']}</depth></historyQos>"
+                 f"<resourceLimitsQos><max_samples>{r['max_samples']}</max_samples>"
+                 f"<max_instances>{r['max_instances']}</max_instances>"
+                 f"<max_samples_per_instance>{r['max_samples_per_instance']}"
+                 "</max_samples_per_instance></resourceLimitsQos>")
+        attrs = f' profile_name="{name}"' if name else ""
+        tag = "data_reader" if r["autodispose"] == UNSET else "data_writer"
+        return (f"<{tag}{attrs}>\n  <topic>{topic}</topic>\n"
+                f"  <qos>{''.join(qos)}</qos>\n</{tag}>")
+
+
+# ────────── CLI ──────────
+def _options(argv: list[str], allowed: tuple) -> tuple[dict, list[str]]:
+    opts, rest = {}, []
+    for arg in argv:
+        key, sep, val = arg.partition("=")
+        if sep and key in allowed:
+            opts[key] = val
+        else:
+            rest.append(arg)
+    return opts, rest
+
+
+def _build(argv: list[str]) -> None:
+    opts, rest = _options(argv, ("publish_period", "rtt", "out"))
+    if rest or "publish_period" not in opts or "rtt" not in opts:
+        sys.exit(USAGE)
+    pp_ms = qc.parse_period(f"publish_period={opts['publish_period']}")
+    rtt_ms = qc.parse_rtt(f"rtt={opts['rtt']}")
+    t0 = time.perf_counter()
+    atlas = Atlas.build(pp_ms, rtt_ms)
+    t1 = time.perf_counter()
+    out = opts.get("out", "qos_atlas.npz")
+    atlas.save(out)
+    valid = int((atlas.fired == 0).sum())
+    print(f"{atlas.fired.size:,} combination(s) × {len(atlas.rules)} rule(s) "
+          f"in {t1 - t0:.1f} s; {valid:,} valid ({100 * valid / atlas.fired.size:.2f}%)")
+    print("axes: " + ", ".join(f"{a.name}={len(a)}" for a in atlas.axes))
+    print(f"saved {out} ({pathlib.Path(out).stat().st_size / 1e6:.1f} MB)")
+
+
+def _lookup(argv: list[str]) -> None:
+    fail_fast = "--fail-fast" in argv
+    argv = [a for a in argv if a != "--fail-fast"]
+    if len(argv) < 2:
+        sys.exit(USAGE)
+    atlas = Atlas.load(argv[0])
+    for path, side, name, block, doc in iter_profile_blocks(qc.collect_xml(argv[1:])):
+        row = np.array([profile_row(side, block, doc=doc)], dtype=PROFILE_DTYPE)[0]
+        index = atlas.locate(row)
+        tag = qc.color(f"[{path}:{name}]" if name else f"[{path}]", qc.BLUE)
+        if index is None:
+            print(f"{tag} outside the atlas (unknown kind or out-of-range value)")
+            continue
+        fired = atlas.rules_fired(index, fail_fast)
+        if not fired:
+            print(f"{tag} ✅ valid combination #{index}")
+        for rule, sev in fired:
+            print(f"{tag} {qc.color(f'[{sev.upper()}]', qc.SEVERITY_COLOR.get(sev, qc.RED))} "
+                  f"{rule}")
+
+
+def _presets(argv: list[str]) -> None:
+    if not argv:
+        sys.exit(USAGE)
+    atlas = Atlas.load(argv[0])
+    opts, rest = _options(argv[1:], ("limit", "out") + tuple(a.name for a in atlas.axes))
+    if rest:
+        sys.exit(f"[ERROR] unknown argument: {rest[0]}\n{USAGE}")
+    limit = int(opts.pop("limit", "20"))
+    out = opts.pop("out", None)
+    fixed = {k: v.upper() if v.upper() in next(a.labels for a in atlas.axes if a.name == k)
+             else v for k, v in opts.items()}
+
+    mask = atlas.valid_mask(fixed)
+    total = int(mask.sum())
+    if not total:
+        print(f"{qc.color('[NEVER VALID]', qc.RED)} no combination with "
+              f"{', '.join(f'{k}={v}' for k, v in fixed.items()) or 'these values'} "
+              "passes every rule")
+        return
+    # 부분 공간 좌표 → 전체 조합 번호
+    offsets = [atlas.axes[i].labels.index(fixed[a.name]) if a.name in fixed else 0
+               for i, a in enumerate(atlas.axes)]
+    local = np.argwhere(mask)[:limit] + offsets
+    picks = [int(np.ravel_multi_index(tuple(p), atlas.shape)) for p in local]
+    print(f"{total:,} valid combination(s); showing {len(picks)}")
+    free = [a.name for a in atlas.axes if a.name not in fixed]
+    for index in picks:
+        d = atlas.describe(index)
+        print(f"  #{index}: " + ", ".join(f"{k}={d[k]}" for k in free))
+    if out:
+        body = "\n".join(atlas.profile_xml(i, f"preset_{i}") for i in picks)
+        pathlib.Path(out).write_text(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<profiles xmlns="http://www.eprosima.com/XMLSchemas/fastRTPS_Profiles">\n'
+            f"{body}\n</profiles>\n", encoding="utf-8")
+        print(f"wrote {len(picks)} preset profile(s) to {out}")
+
+
+def _check(argv: list[str]) -> None:
+    if not argv:
+        sys.exit(USAGE)
+    atlas = Atlas.load(argv[0])
+    opts, rest = _options(argv[1:], ("verify",))
+    if rest:
+        sys.exit(f"[ERROR] unknown argument: {rest[0]}\n{USAGE}")
+    t0 = time.perf_counter()
+    fns = Atlas._rule_fns()
+    names = [fn.__name__ for fn in fns]
+    current = atlas.evaluate(fns)
+    failures = 0
+
+    # 규칙별: 저장된 결과 대비 새로 발동 / 더 이상 발동하지 않는 조합 수.
+    # 저장된 bit 를 현재 규칙 순서로 맞춘 뒤 값이 다른 조합만 bit 별로 센다.
+    if atlas.rules == names:
+        stored = atlas.fired.astype(current.dtype, copy=False)
+    else:
+        stored = np.zeros_like(current)
+        for bit, name in enumerate(names):
+            if name in atlas.rules:
+                old_bit = atlas.rules.index(name)
+                stored |= ((atlas.fired >> old_bit) & 1).astype(current.dtype) << bit
+    differs = np.flatnonzero(current != stored)
+    now_rows, old_rows = current[differs], stored[differs]
+    for bit, name in enumerate(names):
+        now, old = (now_rows >> bit) & 1, (old_rows >> bit) & 1
+        added, removed = int((now > old).sum()), int((now < old).sum())
+        if added or removed:
+            failures += 1
+            print(f"{qc.color('[CHANGED]', qc.RED)} {name}: +{added:,} / -{removed:,} "
+                  "combination(s)")
+    for name in set(atlas.rules) - set(names):
+        failures += 1
+        print(f"{qc.color('[REMOVED]', qc.RED)} {name} is no longer in RULES")
+
+    # 스칼라 RULES 로 표본 확인 (VECTOR_RULES 와 qos_checker 규칙의 일치)
+    n = int(opts.get("verify", "0"))
+    rng = np.random.default_rng(0)
+    qc.set_timing(atlas.pp_ms, atlas.rtt_ms)
+    for index in rng.integers(0, current.size, n) if n else ():
+        xml, q = qc.resolve_qos(atlas.profile_xml(int(index)), atlas.side(int(index)))
+        scalar = sum(1 << bit for bit, fn in enumerate(fns) if fn(xml, q))
+        if scalar != int(current[index]):
+            failures += 1
+            diff = [names[b] for b in range(len(names)) if (scalar ^ int(current[index])) >> b & 1]
+            print(f"{qc.color('[MISMATCH]', qc.RED)} combination #{index}: "
+                  f"vector and scalar rules disagree on {', '.join(diff)}")
+
+    print(f"{current.size:,} combination(s) re-evaluated in {time.perf_counter() - t0:.1f} s"
+          + (f", {n} verified against the scalar rules" if n else ""))
+    if failures:
+        sys.exit(f"[ERROR] {failures} difference(s) against {argv[0]}")
+    print("✅  Atlas matches the current rule set.")
+
+
+SUBCOMMANDS = {"build": _build, "lookup": _lookup, "presets": _presets, "check": _check}
+
+
+def main(argv: list[str]) -> None:
+    if not argv or argv[0] not in SUBCOMMANDS:
+        sys.exit(USAGE)
+    SUBCOMMANDS[argv[0]](argv[1:])
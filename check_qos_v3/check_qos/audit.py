@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""전체 XML profile 감사 (여러 CI 머신에 shard 로 분산) + shard 결과 병합.
+
+    ros2 run check_qos check_qos_cli audit <xml|dir>... [publish_period=<Nms>] [rtt=<Nms>]
+                                           [manifest=<deploy.yaml>] [--shard i/N] [root=<dir>]
+                                           [out=<shard.json>] [metrics=<audit.prom>]
+                                           [--fail-fast] [--summary [top=<K>] [sample_size=<N>]
+                                           [detail=<findings.jsonl>]]
+    ros2 run check_qos check_qos_cli merge <shard.json>... [out=<report.json>]
+
+shard 는 root= (기본: 현재 디렉터리, 보통 checkout 루트) 기준 상대 경로의 jump consistent
+hash 로 정해진다. 상대 / 절대 경로로 주든 checkout 위치가 머신마다 다르든 key 가 같으므로
+머신끼리 상태를 공유하지 않아도 같은 입력이면 항상 같은 분할이 나오고, N 을 바꿔도 이동하는
+파일이 최소화된다. 다른 shard 의 파일은 열지도 않는다. i 는 CI_NODE_INDEX
+처럼 1 부터 센다.
+
+실효 QoS 가 같은 profile 은 intern.Interner 로 묶어 RULES 를 signature 당 한 번만 돌리고,
+manifest 를 주면 topic 의 writer × reader 쌍에 CROSS_RULES 를 signature 쌍 당 한 번 돌린다
+(topic 이름으로 shard). metrics= 를 주면 결과와 지연시간 histogram 을 Prometheus textfile 로
+쓴다 (metrics.py). --fail-fast 면 profile / 쌍마다 Critical 이 나온 Validation Stage 이후
+규칙은 평가하지 않는다.
+
+--summary 면 finding 을 목록으로 들고 있지 않고 summary.FleetSummary 로 흘려 보내 (규칙,
+severity, 파라미터 signature) 별 개수, Critical top-K profile / topic, 낭비 메모리 추정만
+출력 / 저장한다. 쌍별 전체 내용은 detail= 을 줄 때만 JSON Lines 로 쓴다.
+"""
+import hashlib
+import json
+import pathlib
+import sys
+import time
+from collections import Counter
+
+from .bulkload import iter_profile_blocks
+from .intern import Interner
+from .manifest import fmt_bytes, load_manifest, parse_size_bytes
+from .metrics import AuditMetrics
+from .qos_checker import (BLUE, SEVERITY_COLOR, collect_xml, color, load_text, parse_period,
+                          parse_rtt, resolve_qos, set_timing)
+from .summary import DEFAULT_TOP, FleetSummary
+
+AUDIT_USAGE = ("Usage: ros2 run check_qos check_qos_cli audit <xml|dir>... "
+               "[publish_period=<Nms>] [rtt=<Nms>] [manifest=<deploy.yaml>] [--shard i/N] "
+               "[root=<dir>] [out=<shard.json>] [metrics=<audit.prom>] [--fail-fast] "
+               "[--summary [top=<K>] [sample_size=<N>] [detail=<findings.jsonl>]]")
+MERGE_USAGE = ("Usage: ros2 run check_qos check_qos_cli merge <shard.json>... "
+               "[out=<report.json>]")
+
+REPORT_VERSION = 1
+SEVERITY_ORDER = ("Critical", "Conditional", "Incidental", "Warn")
+
+
+# ────────── shard 분할 ──────────
+def jump_hash(key: int, buckets: int) -> int:
+    """Lamping & Veach jump consistent hash: 64-bit key → [0, buckets)."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
+def shard_of(name: str, shards: int) -> int:
+    """프로세스 / 머신에 무관한 안정적 shard 번호 (0-based)."""
+    key = int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little")
+    return jump_hash(key, shards)
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    i, sep, n = spec.partition("/")
+    if not sep or not i.strip().isdigit() or not n.strip().isdigit() \
+            or not 1 <= int(i) <= int(n):
+        sys.exit(f"[ERROR] --shard must look like 'i/N' with 1 ≤ i ≤ N, got {spec!r}")
+    return int(i), int(n)
+
+
+# ────────── 감사 ──────────
+def shard_key(path, root: pathlib.Path) -> str:
+    """root 기준 상대 경로 (POSIX). 입력 표기나 checkout 위치와 무관하게 같은 파일은 같은 key."""
+    try:
+        return pathlib.Path(path).resolve().relative_to(root).as_posix()
+    except ValueError:
+        sys.exit(f"[ERROR] {path} is outside the shard root {root}; pass root=<dir>")
+
+
+def shard_paths(paths, shard: tuple[int, int], root=None) -> list:
+    """
+    shard 에 속한 파일만 (입력 순서 유지). 읽기 전에 거르므로 다른 shard 의 파일은 열지 않는다.
+    key 는 root (기본: 현재 디렉터리) 기준 상대 경로.
+    """
+    index, total = shard
+    if total == 1:
+        return list(paths)
+    root = pathlib.Path(root or ".").resolve()
+    return [p for p in paths if shard_of(shard_key(p, root), total) == index - 1]
+
+
+def iter_work(paths):
+    """(file, profile_name, side, doc, block) 를 파일 / 문서 순서대로."""
+    for path, side, name, block, doc in iter_profile_blocks(paths):
+        yield str(path), name, side, doc, block
+
+
+def audit(paths, shard: tuple[int, int] = (1, 1), manifest: dict | None = None,
+          metrics: AuditMetrics | None = None, fail_fast: bool = False,
+          summary: FleetSummary | None = None, detail=None, root=None) -> dict:
+    """
+    RULES 를 shard 에 속한 파일의 profile 에 적용 (현재 전역 PP / RTT 기준). manifest 가 있으면
+    shard 에 속한 topic 의 writer × reader 쌍에 CROSS_RULES 도 적용 (topic 의 PP / RTT 기준,
+    전역 값을 바꾼다). metrics 가 있으면 profile 별 해석 / 평가 지연시간을 기록.
+    fail_fast 는 Interner.rule_findings / cross_findings 에 그대로 넘긴다.
+    summary 가 있으면 finding 은 report 에 담지 않고 summary 로만 집계하며, detail (쓰기용
+    text 파일) 이 있으면 finding 마다 JSON 한 줄씩 쓴다. root 는 shard_paths 의 key 기준.
+    """
+    index, total = shard
+    interner = Interner(metrics.observe if metrics else None)
+    findings, profiles, pairs = [], 0, 0
+
+    def record(batch: list[dict], q: dict | None = None) -> None:
+        if metrics:
+            for f in batch:
+                metrics.finding(f, manifest)
+        if detail is not None:
+            for f in batch:
+                detail.write(json.dumps(f, ensure_ascii=False) + "\n")
+        if summary is None:
+            findings.extend(batch)
+        elif q is not None:
+            summary.add_profile(batch, q)
+        else:
+            for f in batch:
+                summary.add(f)
+
+    t0 = time.perf_counter()
+    for file, name, side, doc, block in iter_work(shard_paths(paths, shard, root)):
+        profiles += 1
+        sid = interner.intern(*resolve_qos(block, side, doc))
+        if metrics:                             # 파일 읽기 / 분리 (generator) + 상속 해석
+            metrics.observe("parse", time.perf_counter() - t0)
+        batch = [{"file": file, "profile": name, "side": side,
+                  "rule": rule.__name__, "severity": severity, "message": msg}
+                 for rule, severity, msg in interner.rule_findings(sid, fail_fast)]
+        if batch:
+            record(batch, interner.reps[sid][1])
+        t0 = time.perf_counter()
+
+    for topic in (manifest or {}).get("topics", []):
+        if shard_of(topic["name"], total) != index - 1:
+            continue
+        set_timing(topic["publish_period_ms"], topic["rtt_ms"])
+        w = topic["writer"]
+        wid = interner.intern(w["xml"], w["q"])
+        for r in topic["readers"]:
+            pairs += 1
+            record([{"file": manifest["path"],
+                     "profile": f"{topic['name']}: {w['profile']} → {r['profile']}",
+                     "side": "PAIR", "rule": rule.__name__,
+                     "severity": severity, "message": msg,
+                     # writer 는 topic 당 하나이므로 쌍은 reader host 로 구분
+                     "topic": topic["name"], "host": r["host"]}
+                    for rule, severity, msg in interner.cross_findings(
+                        wid, interner.intern(r["xml"], r["q"]), fail_fast)])
+
+    single, cross = interner.evaluations()
+    report = {"version": REPORT_VERSION, "shard": [index, total],
+              "profiles": profiles, "pairs": pairs, "signatures": len(interner),
+              "evaluations": {"rules": single, "cross_rules": cross}}
+    if summary is None:
+        report["findings"] = findings
+    else:
+        report["summary"] = summary.to_json()
+    return report
+
+
+# ────────── 병합 ──────────
+def merge_reports(reports: list[dict]) -> dict:
+    """
+    shard 결과를 합치고 전역 중복 제거: 같은 (rule, severity, side, message) 는 하나로 묶고
+    발생 위치(file:profile)만 모은다. 같은 shard 를 두 번 돌린 결과도 한 번만 센다.
+    """
+    totals = {r["shard"][1] for r in reports}
+    settings = {(r.get("publish_period_ms"), r.get("rtt_ms"), r.get("fail_fast", False))
+                for r in reports}
+    if len(totals) > 1:
+        sys.exit(f"[ERROR] shard reports use different N: {sorted(totals)}")
+    if len(settings) > 1:
+        sys.exit("[ERROR] shard reports were produced with different publish_period / rtt / "
+                 "--fail-fast")
+    total = totals.pop() if totals else 1
+    pp_ms, rtt_ms, fail_fast = settings.pop() if settings else (None, None, False)
+
+    seen_shards, profiles, pairs = {}, 0, 0
+    groups, summary = {}, None
+    for r in reports:
+        index = r["shard"][0]
+        if index in seen_shards:                 # 재시도 등으로 중복된 shard
+            continue
+        seen_shards[index] = True
+        profiles += r["profiles"]
+        pairs += r.get("pairs", 0)
+        if "summary" in r:                       # --summary shard: 집계끼리 합친다
+            part = FleetSummary.from_json(r["summary"])
+            if summary is None:
+                summary = part
+            else:
+                summary.merge(part)
+        for f in r.get("findings", []):
+            key = (f["rule"], f["severity"], f["side"], f["message"])
+            groups.setdefault(key, set()).add(f"{f['file']}:{f['profile']}")
+
+    findings = [{"rule": rule, "severity": sev, "side": side, "message": msg,
+                 "locations": sorted(locs)}
+                for (rule, sev, side, msg), locs in groups.items()]
+    findings.sort(key=lambda f: (SEVERITY_ORDER.index(f["severity"])
+                                 if f["severity"] in SEVERITY_ORDER else len(SEVERITY_ORDER),
+                                 f["rule"], -len(f["locations"]), f["side"], f["message"]))
+    merged = {"version": REPORT_VERSION, "shards": total,
+              "missing_shards": [i for i in range(1, total + 1) if i not in seen_shards],
+              "publish_period_ms": pp_ms, "rtt_ms": rtt_ms, "fail_fast": fail_fast,
+              "profiles": profiles, "pairs": pairs, "findings": findings}
+    if summary is not None:
+        merged["summary"] = summary.to_json()
+    return merged
+
+
+def _write(report: dict, out: str | None) -> None:
+    if out:
+        pathlib.Path(out).write_text(json.dumps(report, indent=1, ensure_ascii=False),
+                                     encoding="utf-8")
+
+
+# ────────── 요약 출력 ──────────
+def print_summary(summary: FleetSummary) -> None:
+    """(규칙, severity) 묶음을 severity → 개수 순으로, 그 아래 상위 파라미터 signature."""
+    def rank(item):
+        (rule, sev), (count, _) = item
+        return (SEVERITY_ORDER.index(sev) if sev in SEVERITY_ORDER else len(SEVERITY_ORDER),
+                -count, rule)
+
+    for (rule, sev), (count, sigs) in sorted(summary.groups.items(), key=rank):
+        tag = color(f"[{sev.upper()}]", SEVERITY_COLOR.get(sev, BLUE))
+        print(f"{tag} {rule} × {count}")
+        for (side, msg), n, err in sigs.top(3):
+            print(f"    {f'≤{n}' if err else n:>8}  {side}: {msg.splitlines()[0]}")
+        if len(sigs) > 3:
+            more = f"{len(sigs) - 3}{'+' if sigs.floor() else ''}"
+            print(f"    {'…':>8}  {more} more signature(s)")
+
+    for title, top in (("profiles", summary.profiles), ("topics", summary.topic_critical)):
+        rows = top.top(summary.top)
+        if rows:
+            print(f"{color(f'Top {len(rows)} {title} by Critical findings:', BLUE)}")
+            for key, n, err in rows:
+                print(f"    {n:>8}  {key}" + (f" (≥ {n - err})" if err else ""))
+    w = summary.waste
+    if w["profiles"]:
+        size = fmt_bytes(w["bytes"])
+        print(f"{color('Wasted history memory (estimate):', BLUE)} {size} "
+              f"({w['samples']} sample slot(s) beyond what the rules require, "
+              f"{w['profiles']} profile(s))")
+
+
+# ────────── CLI ──────────
+def main(argv: list[str]) -> None:
+    inputs, shard, out, pp_ms, rtt_ms, manifest_path = [], (1, 1), None, None, None, None
+    metrics_path, fail_fast, root = None, False, None
+    summarize, top, sample_size, detail_path = False, DEFAULT_TOP, None, None
+    args = iter(argv)
+    for arg in args:
+        if arg == "--fail-fast":
+            fail_fast = True
+        elif arg == "--summary":
+            summarize = True
+        elif arg.startswith("top="):
+            val = arg.split("=", 1)[1]
+            if not val.isdigit() or int(val) < 1:
+                sys.exit(f"[ERROR] top must be a positive integer, got {val!r}")
+            top = int(val)
+        elif arg.startswith("sample_size="):
+            sample_size = parse_size_bytes(arg.split("=", 1)[1])
+        elif arg.startswith("detail="):
+            detail_path = arg.split("=", 1)[1]
+        elif arg == "--shard":
+            shard = parse_shard(next(args, ""))
+        elif arg.startswith("--shard="):
+            shard = parse_shard(arg.split("=", 1)[1])
+        elif arg.startswith("publish_period="):
+            pp_ms = parse_period(arg)
+        elif arg.startswith("rtt="):
+            rtt_ms = parse_rtt(arg)
+        elif arg.startswith("out="):
+            out = arg.split("=", 1)[1]
+        elif arg.startswith("root="):
+            root = pathlib.Path(arg.split("=", 1)[1])
+            if not root.is_dir():
+                sys.exit(f"[ERROR] root must be a directory, got {str(root)!r}")
+        elif arg.startswith("manifest="):
+            manifest_path = pathlib.Path(arg.split("=", 1)[1])
+        elif arg.startswith("metrics="):
+            metrics_path = arg.split("=", 1)[1]
+        else:
+            inputs.append(arg)
+    if not inputs and manifest_path is None:
+        sys.exit(AUDIT_USAGE)
+
+    manifest = None
+    if manifest_path is not None:              # CLI PP / RTT 는 topic 에 값이 없을 때의 기본값
+        manifest = load_manifest(manifest_path, {k: v for k, v in
+                                                 (("publish_period", pp_ms), ("rtt", rtt_ms))
+                                                 if v is not None})
+    metrics = AuditMetrics() if metrics_path else None
+    summary = None
+    if summarize:
+        summary = FleetSummary(top, **({"sample_size": sample_size} if sample_size else {}),
+                               manifest=manifest)
+    elif (top, sample_size, detail_path) != (DEFAULT_TOP, None, None):
+        sys.exit(f"[ERROR] top= / sample_size= / detail= need --summary\n{AUDIT_USAGE}")
+    set_timing(pp_ms, rtt_ms)
+    detail = open(detail_path, "w", encoding="utf-8") if detail_path else None
+    try:
+        report = audit(collect_xml(inputs) if inputs else [], shard, manifest, metrics,
+                       fail_fast, summary, detail, root)
+    finally:
+        if detail is not None:
+            detail.close()
+    report.update(publish_period_ms=pp_ms, rtt_ms=rtt_ms, fail_fast=fail_fast)
+    _write(report, out)
+    if metrics:
+        metrics.write(metrics_path, report, manifest)
+
+    if summary is not None:
+        print_summary(summary)
+        by_sev, n_found = Counter(summary.by_severity()), summary.total
+    else:
+        by_sev = Counter(f["severity"] for f in report["findings"])
+        n_found = len(report["findings"])
+    counts = ", ".join(color(f"{by_sev[s]} {s.lower()}", SEVERITY_COLOR[s])
+                       for s in SEVERITY_ORDER if by_sev[s])
+    pairs = f", {report['pairs']} pair(s)" if manifest is not None else ""
+    print(f"{color(f'[shard {shard[0]}/{shard[1]}]', BLUE)} {report['profiles']} profile(s){pairs}"
+          f" → {report['signatures']} unique QoS signature(s), "
+          f"{n_found} finding(s)" + (f": {counts}" if counts else ""))
+
+
+def merge_main(argv: list[str]) -> None:
+    inputs, out = [], None
+    for arg in argv:
+        if arg.startswith("out="):
+            out = arg.split("=", 1)[1]
+        else:
+            inputs.append(arg)
+    if not inputs:
+        sys.exit(MERGE_USAGE)
+
+    reports = []
+    for p in inputs:
+        try:
+            reports.append(json.loads(load_text(pathlib.Path(p))))
+        except ValueError as e:
+            sys.exit(f"[ERROR] {p} is not a shard report: {e}")
+    merged = merge_reports(reports)
+    _write(merged, out)
+
+    if merged["missing_shards"]:
+        print(f"{color('[WARN]', SEVERITY_COLOR['Warn'])} missing shard(s): "
+              f"{', '.join(map(str, merged['missing_shards']))} of {merged['shards']}")
+    for f in merged["findings"]:
+        tag = color(f"[{f['severity'].upper()}]", SEVERITY_COLOR.get(f["severity"], BLUE))
+        first = f["message"].splitlines()[0]
+        print(f"{tag} {f['rule']} × {len(f['locations'])}: {first}")
+    if "summary" in merged:
+        summary = FleetSummary.from_json(merged["summary"])
+        print_summary(summary)
+        print(f"{merged['profiles']} profile(s), {summary.total} finding(s) in "
+              f"{len(summary.groups)} group(s)" + (f" + {len(merged['findings'])} distinct "
+                                                   "finding(s) from detailed shards"
+                                                   if merged["findings"] else ""))
+        return
+    print(f"{merged['profiles']} profile(s), {len(merged['findings'])} distinct finding(s)")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Writer 별 정상상태 네트워크 대역폭 / 재전송 비용 추정기.
+
+    ros2 run check_qos check_qos_cli bandwidth <manifest.yaml> [rtt=<Nms>] [loss_rate=<p>]
+"""
+import math
+import pathlib
+import sys
+from collections import defaultdict
+
+from .manifest import (fmt_bps, link_capacity_bps, load_manifest, parse_duration_ms,
+                       parse_loss_rate)
+from .qos_checker import BLUE, SEVERITY_COLOR, color, heartbeat_period_ns
+from .transport import participant_transports, udp_path
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli bandwidth "
+         "<manifest.yaml> [rtt=<Nms>] [loss_rate=<p>]")
+
+# ────────── RTPS / UDP 오버헤드 (bytes) ──────────
+UDP_IP_OVERHEAD   = 28        # IPv4 20 + UDP 8
+RTPS_HEADER       = 20
+INFO_TS           = 12
+INFO_DST          = 16
+DATA_SUBMSG       = 24 + 4    # DATA 헤더 + encapsulation
+DATA_FRAG_SUBMSG  = 36 + 4    # DATA_FRAG 헤더 + encapsulation
+HEARTBEAT_SUBMSG  = 32
+ACKNACK_SUBMSG    = 32        # bitmap 1 word 기준
+DEFAULT_MAX_MESSAGE_SIZE = 65500   # Fast DDS UDPv4 maxMessageSize 기본값
+
+# 링크 사용률 경고 임계값
+UTIL_CONDITIONAL = 0.7
+UTIL_CRITICAL    = 1.0
+
+
+def sample_wire_bytes(sample_size: int,
+                      max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE) -> tuple[int, int]:
+    """(샘플 1개를 보내는 데 필요한 datagram 수, 총 wire bytes)"""
+    single = UDP_IP_OVERHEAD + RTPS_HEADER + INFO_TS + DATA_SUBMSG + sample_size
+    if single - UDP_IP_OVERHEAD <= max_message_size:
+        return 1, single
+    frag_payload = max_message_size - (RTPS_HEADER + INFO_TS + DATA_FRAG_SUBMSG)
+    frags = math.ceil(sample_size / frag_payload)
+    header = UDP_IP_OVERHEAD + RTPS_HEADER + INFO_TS + DATA_FRAG_SUBMSG
+    return frags, frags * header + sample_size
+
+
+def estimate_writer_bandwidth(xml: str, q: dict, publish_period_ms: float,
+                              rtt_ms: float, loss_rate: float, sample_size: int,
+                              readers: int = 1,
+                              max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE) -> dict:
+    """
+    Writer 1개의 정상상태 트래픽 (bytes/s).
+    Reader 마다 unicast 로 전송하고, 손실은 datagram 단위 독립 Bernoulli 로 가정한다.
+    """
+    reliable = q.get("reliability", "").strip().upper() == "RELIABLE"
+    rate = 1000.0 / publish_period_ms                      # samples/s
+    frags, wire = sample_wire_bytes(sample_size, max_message_size)
+
+    data_bps = wire * rate * readers
+    out = {"reliable": reliable, "fragments": frags, "rate_hz": rate,
+           "data": data_bps, "heartbeat": 0.0, "acknack": 0.0, "retransmit": 0.0,
+           "delivered_ratio": (1 - loss_rate) ** frags, "recoverable": 0.0}
+    if not reliable:
+        return out
+
+    hb_s = heartbeat_period_ns(xml) / 1e9
+    hb_rate = 1 / hb_s if hb_s > 0 else rate               # 0 이면 샘플마다 piggyback
+    hb_bytes = UDP_IP_OVERHEAD + RTPS_HEADER + INFO_DST + HEARTBEAT_SUBMSG
+    ack_bytes = UDP_IP_OVERHEAD + RTPS_HEADER + INFO_DST + ACKNACK_SUBMSG
+    out["heartbeat"] = hb_bytes * hb_rate * readers
+    # Reader 는 heartbeat 마다 ACKNACK, 손실 시 NACK 을 추가로 보냄
+    nack_rate = rate * (1 - (1 - loss_rate) ** frags)
+    out["acknack"] = ack_bytes * (hb_rate + nack_rate) * readers
+
+    # 손실된 샘플이 NACK 도착 전까지 Writer history 에 남아 있는 비율
+    repair_s = hb_s / 2 + rtt_ms / 1000
+    hist = q.get("history", "").strip().upper()
+    depth_txt = q.get("history_depth", "").strip()
+    if hist == "KEEP_LAST" and depth_txt.isdigit() and repair_s > 0:
+        retained_s = int(depth_txt) * publish_period_ms / 1000
+        recoverable = min(1.0, retained_s / repair_s)
+    else:
+        recoverable = 1.0                                   # KEEP_ALL: ACK 까지 유지
+    out["recoverable"] = recoverable
+    # 기하분포: 샘플당 기대 재전송 = p / (1 - p) (fragment 단위 재전송)
+    out["retransmit"] = data_bps * loss_rate / (1 - loss_rate) * recoverable
+    return out
+
+
+def total_bps(est: dict) -> float:
+    return 8 * (est["data"] + est["heartbeat"] + est["acknack"] + est["retransmit"])
+
+
+def estimate_manifest(manifest: dict) -> tuple[list[dict], dict]:
+    """토픽별 추정치와 (host, interface) 별 tx/rx 합계(bits/s)."""
+    rows = []
+    links = defaultdict(lambda: {"tx": 0.0, "rx": 0.0})
+    for t in manifest["topics"]:
+        w = t["writer"]
+        if t["publish_period_ms"] is None or t["sample_size"] is None:
+            rows.append({"topic": t["name"], "skipped": "publish_period / sample_size missing"})
+            continue
+        n_readers = sum(r["count"] for r in t["readers"]) or 1
+        udp = udp_path(participant_transports(w["xml"]), 0)     # profile 의 maxMessageSize
+        est = estimate_writer_bandwidth(w["xml"], w["q"], t["publish_period_ms"],
+                                        t["rtt_ms"] or 0.0, t["loss_rate"],
+                                        t["sample_size"], n_readers,
+                                        udp["max_message_size"] if udp
+                                        else DEFAULT_MAX_MESSAGE_SIZE)
+        rows.append({"topic": t["name"], "host": w["host"], "interface": w["interface"],
+                     "readers": n_readers, "est": est})
+
+        # Writer 쪽: DATA/HB/재전송 송신, ACKNACK 수신
+        w_link = links[(w["host"], w["interface"])]
+        w_link["tx"] += 8 * (est["data"] + est["heartbeat"] + est["retransmit"])
+        w_link["rx"] += 8 * est["acknack"]
+        # Reader 쪽: 자기 몫의 DATA/HB/재전송 수신, ACKNACK 송신
+        for r in t["readers"]:
+            share = r["count"] / n_readers
+            r_link = links[(r["host"], r["interface"])]
+            r_link["rx"] += 8 * share * (est["data"] + est["heartbeat"] + est["retransmit"])
+            r_link["tx"] += 8 * share * est["acknack"]
+    return rows, dict(links)
+
+
+def main(argv: list[str]) -> None:
+    if not argv:
+        sys.exit(USAGE)
+    overrides = {}
+    for arg in argv[1:]:
+        key, _, val = arg.partition("=")
+        if key == "rtt":
+            parse_duration_ms(val, "rtt")
+            overrides["rtt"] = val
+        elif key == "loss_rate":
+            overrides["loss_rate"] = parse_loss_rate(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+
+    manifest = load_manifest(pathlib.Path(argv[0]), overrides)
+    rows, links = estimate_manifest(manifest)
+
+    # ── 토픽별 ─────────────────────────────────────────
+    for row in rows:
+        if "skipped" in row:
+            print(f"{color('[SKIP]', BLUE)} {row['topic']}: {row['skipped']}")
+            continue
+        est = row["est"]
+        tag = color(f"[{row['topic']}]", BLUE)
+        print(f"{tag} "
+              f"{'RELIABLE' if est['reliable'] else 'BEST_EFFORT'} → {row['readers']} reader(s), "
+              f"{est['rate_hz']:.1f} Hz × {est['fragments']} datagram(s)/sample\n"
+              f"  data {fmt_bps(8*est['data'])}, heartbeat {fmt_bps(8*est['heartbeat'])}, "
+              f"acknack {fmt_bps(8*est['acknack'])}, retransmit {fmt_bps(8*est['retransmit'])}"
+              f" → total {fmt_bps(total_bps(est))}")
+        if est["reliable"] and est["recoverable"] < 1.0:
+            print(f"  {color('[CONDITIONAL]', SEVERITY_COLOR['Conditional'])} only "
+                  f"{est['recoverable']*100:.0f}% of lost samples are still in history when "
+                  "the NACK arrives; increase history depth.")
+        if not est["reliable"] and est["delivered_ratio"] < 1.0:
+            print(f"  expected delivery ratio {est['delivered_ratio']*100:.2f}%")
+
+    # ── host / interface 합계 ───────────────────────────
+    print()
+    for (host, iface), load in sorted(links.items()):
+        total = load["tx"] + load["rx"]
+        cap = link_capacity_bps(manifest, host, iface)
+        line = (f"{host or '?'}/{iface or '?'}: tx {fmt_bps(load['tx'])}, "
+                f"rx {fmt_bps(load['rx'])}, total {fmt_bps(total)}")
+        if cap:
+            util = total / cap
+            line += f" / {fmt_bps(cap)} ({util*100:.1f}%)"
+            if util >= UTIL_CRITICAL:
+                line = f"{color('[CRITICAL]', SEVERITY_COLOR['Critical'])} {line} — link saturated"
+            elif util >= UTIL_CONDITIONAL:
+                line = (f"{color('[CONDITIONAL]', SEVERITY_COLOR['Conditional'])} {line} — "
+                        "little headroom for retransmission bursts")
+        print(line)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""대량 XML corpus 로더: 파일 전체를 str 로 decode 하지 않고 bytes 에서 profile 을 분리.
+
+작은 파일은 하나의 arena(bytearray)에 이어서 os.readv 로 읽어 (파일당 open / read / close
+만, Python file 객체와 파일별 bytes 할당 없음) arena 가 차면 한꺼번에 처리하고, 큰 파일은
+mmap 한다. endpoint profile 경계와 profile_name / is_default_profile 은 버퍼 위에서 bytes
+정규식으로 찾고, decode 하는 것은 규칙이 읽는 endpoint block 과 default profile block 뿐이다.
+
+분리 규칙은 qos_checker._profile_blocks 와 같고, '<' / '>' 는 UTF-8 문자 경계이므로
+block 단위 decode 결과는 load_text → iter_profiles 의 결과와 같다.
+"""
+import mmap
+import os
+import re
+import sys
+
+from . import qos_checker as qc
+from .qos_checker import ENDPOINT_SIDE
+
+SMALL_FILE = 64 * 1024               # 이하면 arena 로, 넘으면 mmap
+ARENA_SIZE = 4 * 1024 * 1024
+
+
+def _bytes_re(pattern: re.Pattern) -> re.Pattern:
+    """qos_checker 의 str 정규식을 같은 패턴 / flag 의 bytes 정규식으로."""
+    return re.compile(pattern.pattern.encode(), pattern.flags & ~re.UNICODE)
+
+
+ENDPOINT_PROFILE_RE = _bytes_re(qc.ENDPOINT_PROFILE_RE)
+ANY_PROFILE_RE = _bytes_re(qc.ANY_PROFILE_RE)
+PROFILE_NAME_RE = _bytes_re(qc.PROFILE_NAME_RE)
+IS_DEFAULT_RE = _bytes_re(qc.IS_DEFAULT_RE)
+_CLOSE_RE = {tag.encode(): _bytes_re(qc._tag_res(tag)[1])
+             for tag in ("participant", *ENDPOINT_SIDE)}
+_SIDE = {tag.encode(): side for tag, side in ENDPOINT_SIDE.items()}
+
+
+def _decode(buf) -> str:
+    return str(buf, "utf-8", "ignore")
+
+
+# ────────── 파일 읽기 ──────────
+def _open(path) -> int:
+    try:
+        return os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        sys.exit(f"[ERROR] File not found: {path}")
+
+
+def iter_buffers(paths, small: int = SMALL_FILE, arena_size: int = ARENA_SIZE):
+    """
+    (path, buffer) 를 입력 순서대로. buffer 는 bytes-like 이며 다음 항목을 요청하기 전까지만
+    유효하다 (arena 재사용 / munmap). 필요한 부분은 그 전에 decode 할 것.
+    """
+    arena = bytearray(max(arena_size, small + 1))
+    view = memoryview(arena)
+    pending, used = [], 0
+
+    def flush():
+        nonlocal used
+        yield from pending
+        pending.clear()
+        used = 0
+
+    for path in paths:
+        if used + small + 1 > len(arena):
+            yield from flush()
+        fd = _open(path)
+        try:
+            n = os.readv(fd, [view[used:used + small + 1]])
+            if n <= small:                      # 파일 전체가 arena 에 들어옴
+                pending.append((path, view[used:used + n]))
+                used += n
+                continue
+            size = os.fstat(fd).st_size
+            yield from flush()                  # 입력 순서 유지
+            with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mm:
+                yield path, mm
+        finally:
+            os.close(fd)
+    yield from flush()
+
+
+# ────────── profile 분리 ──────────
+def _blocks(buf, pattern: re.Pattern) -> list[tuple[bytes, bytes, int, int]]:
+    """qos_checker._profile_blocks 의 bytes 판: [(소문자 태그, 속성, 시작, 끝)]."""
+    out, pos, size = [], 0, len(buf)
+    search = pattern.search
+    while True:
+        m = search(buf, pos)
+        if not m:
+            return out
+        tag, attrs = bytes(m.group(1)).lower(), m.group(2)
+        if attrs.rstrip().endswith(b"/"):        # <publisher profile_name="x"/>
+            pos = m.end()
+        else:
+            e = _CLOSE_RE[tag].search(buf, m.end())
+            pos = e.end() if e else size
+        out.append((tag, attrs, m.start(), pos))
+
+
+def split_profiles(buf) -> tuple[list[tuple[str, str, str]], str]:
+    """
+    buffer → ([(side, profile_name, block)], defaults 문서).
+    defaults 문서는 is_default_profile block 만 이어 붙인 것으로, resolve_qos 의 doc 으로
+    넘기면 원래 파일 전체를 넘긴 것과 같은 상속 결과가 나온다.
+    """
+    blocks = _blocks(buf, ANY_PROFILE_RE)
+    defaults = [_decode(buf[start:end]) for _, attrs, start, end in blocks
+                if IS_DEFAULT_RE.search(attrs)]
+    # endpoint 는 participant 와 형제 요소이므로 보통 같은 scan 으로 충분하다.
+    # participant 안에 endpoint 태그가 있을 때만 iter_profiles 처럼 따로 scan.
+    if any(tag == b"participant" and ENDPOINT_PROFILE_RE.search(buf, start, end)
+           for tag, _, start, end in blocks):
+        blocks = _blocks(buf, ENDPOINT_PROFILE_RE)
+    profiles = []
+    for tag, attrs, start, end in blocks:
+        if tag in _SIDE:
+            m = PROFILE_NAME_RE.search(attrs)
+            profiles.append((_SIDE[tag], _decode(m.group(1)) if m else "",
+                             _decode(buf[start:end])))
+    return profiles, "\n".join(defaults)
+
+
+def iter_profile_blocks(paths):
+    """
+    (path, side, profile_name, block, doc) 를 파일 / 문서 순서대로. doc 은 resolve_qos 에 넘길
+    default profile 문서. profile 태그 없는 단일 QoS 조각은 ("", "", 전체, 전체).
+    """
+    for path, buf in iter_buffers(paths):
+        profiles, doc = split_profiles(buf)
+        if not profiles:
+            text = _decode(buf)
+            yield path, "", "", text, text
+        for side, name, block in profiles:
+            yield path, side, name, block, doc
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""Fleet audit 용 column store.
+
+수천~수십만 개의 profile 을 NumPy structured array 한 개에 담는다.
+policy kind 는 작은 정수 코드, duration 은 int64 ns 로 저장하고
+단일-프로파일 RULES 를 column 전체에 대한 boolean mask 로 평가한다.
+
+    ros2 run check_qos check_qos_cli query "<rule_name | expression>" \\
+        [publish_period=<Nms>] [rtt=<Nms>] [save=<store.npz>] <xml|dir|store.npz>...
+
+예) query "reliability == RELIABLE and history == KEEP_LAST and history_depth < required" \\
+        publish_period=40ms rtt=80ms profiles/
+
+식에는 비교, and / or / not (또는 괄호로 감싼 & | ~), column 이름, 상수, 숫자만 쓸 수 있다.
+"""
+import ast
+import math
+import sys
+import time
+
+import numpy as np
+
+from . import qos_checker as qc
+from .bulkload import iter_profile_blocks
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli query \"<rule_name | expression>\" "
+         "[publish_period=<Nms>] [rtt=<Nms>] [save=<store.npz>] <xml|dir|store.npz>...")
+
+# ────────── 코드 테이블 ──────────
+UNSET = -1          # 태그 없음
+OTHER = -2          # 알 수 없는 값
+
+# 코드 = RELIABILITY_LEVEL / DURABILITY_LEVEL / LIVELINESS_PRIORITY 와 동일한 순서
+KIND_CODES = {
+    "reliability": ("BEST_EFFORT", "RELIABLE"),
+    "durability":  ("VOLATILE", "TRANSIENT_LOCAL", "TRANSIENT", "PERSISTENT"),
+    "history":     ("KEEP_LAST", "KEEP_ALL"),
+    "ownership":   ("SHARED", "EXCLUSIVE"),
+    "dest_order":  ("BY_RECEPTION_TIMESTAMP", "BY_SOURCE_TIMESTAMP"),
+    "liveliness":  ("AUTOMATIC", "MANUAL_BY_PARTICIPANT", "MANUAL_BY_TOPIC"),
+}
+BOOL_FIELDS = ("autodispose", "autoenable")
+COUNT_FIELDS = ("history_depth", "max_samples", "max_instances",
+                "max_samples_per_instance", "autopurge_disposed_samples_delay")
+SIDE_CODES = {"PUB": 0, "SUB": 1}
+
+INF_TEXT = "4294967295"
+
+PROFILE_DTYPE = np.dtype(
+    [("side", "i1")]
+    + [(f, "i1") for f in KIND_CODES]
+    + [(f, "i1") for f in BOOL_FIELDS]
+    + [(f, "i8") for f in COUNT_FIELDS]
+    + [("partition_set", "?"),
+       ("has_deadline", "?"), ("deadline_ns", "i8"), ("deadline_inf", "?"),
+       ("has_lease", "?"), ("lease_ns", "i8"), ("lease_inf", "?"),
+       ("lifespan_ns", "i8"),                      # UNSET = lifespan 없음
+       ("nowriter_purge_ns", "i8")])
+
+
+def kind_code(field: str, value: str) -> int:
+    if not value:
+        return UNSET
+    kinds = KIND_CODES[field]
+    return kinds.index(value) if value in kinds else OTHER
+
+
+def _duration(regex, block: str) -> tuple[bool, int, bool]:
+    """(태그 존재, sec×1e9+nsec, 무한 여부) — qos_checker 의 DEADLINE_RE / LEASE_RE 해석과 동일."""
+    m = regex.search(block)
+    if not m:
+        return False, 0, False
+    sec, nsec = m.group(1) or "0", m.group(2) or "0"
+    return True, int(sec) * 1_000_000_000 + int(nsec), INF_TEXT in (sec, nsec)
+
+
+def _lifespan_ns(block: str) -> int:
+    ls = qc.lifespan_parts(block)
+    return UNSET if ls is None else ls[0] * 1_000_000_000 + ls[1]
+
+
+def _purge_ns(q: dict) -> int:
+    # rule_nowriter_delay_vs_infinite_lease 와 동일: 비어 있거나 숫자가 아니면 0 (= 검사 생략)
+    sec, nsec = q.get("nowriter_sec_r", "").strip(), q.get("nowriter_nsec_r", "").strip()
+    try:
+        return (int(sec) if sec else 0) * 1_000_000_000 + (int(nsec) if nsec else 0)
+    except ValueError:
+        return 0
+
+
+def profile_row(side: str, block: str, q: dict | None = None, doc: str | None = None) -> tuple:
+    if q is None:
+        block, q = qc.resolve_qos(block, side, doc)
+    row = [SIDE_CODES.get(side, UNSET)]
+    row += [kind_code(f, q.get(f, "").strip().upper()) for f in KIND_CODES]
+    for f in BOOL_FIELDS:
+        v = q.get(f, "").strip().upper()
+        row.append({"": UNSET, "FALSE": 0, "TRUE": 1}.get(v, OTHER))
+    for f in COUNT_FIELDS:
+        v = q.get(f, "").strip()
+        row.append(int(v) if v.isdigit() else UNSET)
+    row.append(any(p.strip() for p in q.get("partition_list", [])))
+    row += _duration(qc.DEADLINE_RE, block)
+    row += _duration(qc.LEASE_RE, block)
+    row.append(_lifespan_ns(block))
+    row.append(_purge_ns(q))
+    return tuple(row)
+
+
+# ────────── 벡터화 규칙 ──────────
+def _req(pp_ns, rtt_ns):
+    """⌈RTT / PP⌉ + 2 — 스칼라 규칙과 같은 float 연산 순서."""
+    if pp_ns is None or rtt_ns is None:
+        return None
+    return math.ceil((rtt_ns / 1_000_000_000) / (pp_ns / 1_000_000_000)) + 2
+
+
+def _vector_rules() -> dict:
+    R, BE = 1, 0
+    NV = 1                               # durability ≥ TRANSIENT_LOCAL
+    KL, KA = 0, 1
+    EXCL = 1
+    BY_SRC = 1
+    MBT = 2
+
+    def nv(c):
+        return c["durability"] >= NV
+
+    def dl_enabled(c):
+        return c["has_deadline"] & (c["deadline_ns"] != 0)
+
+    def has_ls(c):
+        return c["lifespan_ns"] != UNSET
+
+    def depth_set(c):
+        return c["history_depth"] != UNSET
+
+    def mpi_set(c):
+        return c["max_samples_per_instance"] != UNSET
+
+    def never(c):
+        return np.zeros(len(c), dtype=bool)
+
+    def needs_req(fn):
+        def wrapped(c, pp_ns, rtt_ns):
+            req = _req(pp_ns, rtt_ns)
+            return never(c) if req is None else fn(c, req)
+        return wrapped
+
+    def needs_pp(fn):
+        def wrapped(c, pp_ns, rtt_ns):
+            return never(c) if pp_ns is None else fn(c, pp_ns)
+        return wrapped
+
+    def rtt_or_default(rtt_ns):
+        return 50_000_000 if rtt_ns is None else rtt_ns
+
+    def m_history_vs_mpi(c, *_):
+        depth = np.where(c["history_depth"] < 0, 0, c["history_depth"])
+        mpi = np.where(c["max_samples_per_instance"] < 0, 0, c["max_samples_per_instance"])
+        return (((c["history"] == KL) & (depth > mpi))
+                | ((c["history"] == KA) & (mpi == 0)))
+
+    return {
+        qc.rule_durability_needs_rel:
+            lambda c, *_: nv(c) & (c["reliability"] != R),
+        qc.rule_deadline_vs_durability:
+            lambda c, *_: dl_enabled(c) & nv(c),
+        qc.rule_lease_vs_deadline:
+            lambda c, *_: c["has_deadline"] & c["has_lease"] & (c["lease_ns"] < c["deadline_ns"]),
+        qc.rule_exclusive_best_effort_deadline:
+            lambda c, *_: dl_enabled(c) & (c["reliability"] == BE) & (c["ownership"] == EXCL),
+        qc.rule_autodispose_with_best_effort:
+            lambda c, *_: (c["reliability"] == BE) & (c["autodispose"] == 1),
+        qc.rule_lifespan_vs_deadline:
+            lambda c, *_: c["has_deadline"] & has_ls(c) & (c["lifespan_ns"] < c["deadline_ns"]),
+        qc.rule_dest_order_vs_depth:
+            lambda c, *_: (c["dest_order"] == BY_SRC) & depth_set(c) & (c["history_depth"] <= 1),
+        qc.rule_history_vs_max_per_instance: m_history_vs_mpi,
+        qc.rule_autoenable_vs_volatile_reader:
+            lambda c, *_: (c["autoenable"] == 0) & (c["durability"] == 0),
+        qc.rule_max_samples_vs_per_instance:
+            lambda c, *_: ((c["max_samples"] != UNSET) & mpi_set(c)
+                           & (c["max_samples"] < c["max_samples_per_instance"])),
+        qc.rule_destorder_keepall_mpi:
+            lambda c, *_: ((c["dest_order"] == BY_SRC) & (c["history"] == KA)
+                           & (c["max_samples_per_instance"] == 1)),
+        qc.rule_rdlife_autopurge_vs_durability:
+            lambda c, *_: nv(c) & (c["autopurge_disposed_samples_delay"] == 0),
+        qc.rule_liveliness_manual_partition:
+            lambda c, *_: (c["liveliness"] == MBT) & c["partition_set"],
+        qc.rule_autodispose_with_exclusive:
+            lambda c, *_: (c["autodispose"] == 1) & (c["ownership"] == EXCL),
+        qc.rule_lifespan_too_short_for_durability:
+            lambda c, pp, rtt: nv(c) & has_ls(c) & (c["lifespan_ns"] < rtt_or_default(rtt)),
+        qc.rule_exclusive_lease_infinite:
+            lambda c, *_: (c["ownership"] == EXCL) & c["has_lease"] & c["lease_inf"],
+        qc.rule_nowriter_delay_vs_infinite_lease:
+            lambda c, *_: (c["nowriter_purge_ns"] != 0) & c["has_lease"] & c["lease_inf"],
+        qc.rule_reliable_keep_last_depth_too_small: needs_req(
+            lambda c, req: ((c["reliability"] == R) & (c["history"] == KL) & depth_set(c)
+                            & (c["history_depth"] < req))),
+        qc.rule_keepall_max_samples_per_instance: needs_req(
+            lambda c, req: ((c["reliability"] == R) & (c["history"] == KA) & mpi_set(c)
+                            & (c["max_samples_per_instance"] < req))),
+        qc.rule_lifespan_too_short_for_reliability:
+            lambda c, pp, rtt: ((c["reliability"] == R) & has_ls(c)
+                                & (c["lifespan_ns"] < rtt_or_default(rtt))),
+        qc.rule_best_effort_with_manual_liveliness:
+            lambda c, *_: (c["liveliness"] == MBT) & (c["reliability"] == BE),
+        qc.rule_deadline_too_short_for_exclusive: needs_pp(
+            lambda c, pp: ((c["ownership"] == EXCL) & dl_enabled(c)
+                           & (c["deadline_ns"] < 2 * pp))),
+        qc.rule_lease_too_short_for_exclusive: needs_pp(
+            lambda c, pp: ((c["ownership"] == EXCL) & (c["liveliness"] != UNSET)
+                           & c["has_lease"] & (c["lease_ns"] < 2 * pp))),
+        qc.rule_keepall_durable_instance_budget: needs_req(
+            lambda c, req: nv(c) & (c["history"] == KA) & mpi_set(c)
+                           & (c["max_samples_per_instance"] < req)),
+        qc.rule_durable_keep_last_depth_1: needs_req(
+            lambda c, req: nv(c) & (c["history"] == KL) & depth_set(c)
+                           & (c["history_depth"] < req)),
+        qc.rule_keepall_durable_instance_budget_1: needs_req(
+            lambda c, req: nv(c) & (c["history"] == KA) & mpi_set(c)
+                           & (c["max_samples_per_instance"] > req)),
+        qc.rule_durable_keep_last_depth_2: needs_req(
+            lambda c, req: nv(c) & (c["history"] == KL) & depth_set(c)
+                           & (c["history_depth"] > req)),
+        qc.rule_exclusive_deadline_infinite:
+            lambda c, *_: (c["ownership"] == EXCL) & c["has_deadline"] & c["deadline_inf"],
+        qc.rule_lifespan_exceeds_per_instance: needs_pp(
+            lambda c, pp: ((c["history"] == KA) & mpi_set(c) & has_ls(c)
+                           & (c["lifespan_ns"] > c["max_samples_per_instance"] * pp))),
+        qc.rule_keep_last_lifespan_overflow: needs_pp(
+            lambda c, pp: ((c["history"] == KL) & depth_set(c) & has_ls(c)
+                           & (c["lifespan_ns"] > c["history_depth"] * pp))),
+    }
+
+
+VECTOR_RULES = _vector_rules()
+
+
+# ────────── query 식 ──────────
+# eval 대신 ast 를 직접 평가: 비교 / 논리 연산 / 이름 / 숫자 literal 외의 노드는 거부한다.
+_COMPARE = {ast.Eq: np.equal, ast.NotEq: np.not_equal, ast.Lt: np.less,
+            ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal}
+_LOGIC = {ast.And: np.logical_and, ast.Or: np.logical_or}
+_BITWISE = {ast.BitAnd: np.bitwise_and, ast.BitOr: np.bitwise_or}    # numpy 의 & | 그대로
+
+
+def _eval_query(node: ast.AST, env: dict):
+    if isinstance(node, ast.Expression):
+        return _eval_query(node.body, env)
+    if isinstance(node, ast.Name):
+        if node.id not in env:
+            sys.exit(f"[ERROR] unknown name in query: {node.id!r}")
+        return env[node.id]
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float, bool):
+        return node.value
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+        left, out = _eval_query(node.left, env), True
+        for op, comp in zip(node.ops, node.comparators):
+            right = _eval_query(comp, env)
+            out = np.logical_and(out, _COMPARE[type(op)](left, right))
+            left = right
+        return out
+    if isinstance(node, ast.BoolOp) and type(node.op) in _LOGIC:
+        return _LOGIC[type(node.op)].reduce([_eval_query(v, env) for v in node.values])
+    if isinstance(node, ast.BinOp) and type(node.op) in _BITWISE:
+        return _BITWISE[type(node.op)](_eval_query(node.left, env), _eval_query(node.right, env))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Invert):
+        return np.invert(_eval_query(node.operand, env))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return np.logical_not(_eval_query(node.operand, env))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) \
+            and isinstance(node.operand, ast.Constant):
+        return -_eval_query(node.operand, env)
+    sys.exit(f"[ERROR] unsupported query syntax: {ast.unparse(node)!r} "
+             "(use comparisons, & | ~ and / or / not, column names and numbers)")
+
+
+# ────────── store ──────────
+class ProfileStore:
+    """profile 들의 column store. data 는 PROFILE_DTYPE structured array."""
+
+    def __init__(self, data: np.ndarray, names: list[str], files: list[str]):
+        self.data = data
+        self.names = names
+        self.files = files
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.data[field]
+
+    # ── 생성 / 저장 ─────────────────────────────────
+    @classmethod
+    def from_profiles(cls, items) -> "ProfileStore":
+        """items: (file, profile_name, side, block, doc) iterable. doc 은 default profile 을 찾을 문서."""
+        rows, names, files = [], [], []
+        for file, name, side, block, doc in items:
+            rows.append(profile_row(side, block, doc=doc))
+            names.append(name)
+            files.append(file)
+        return cls(np.array(rows, dtype=PROFILE_DTYPE), names, files)
+
+    @classmethod
+    def from_xml_files(cls, paths) -> "ProfileStore":
+        return cls.from_profiles((str(p), name, side, block, doc)
+                                 for p, side, name, block, doc in iter_profile_blocks(paths))
+
+    def save(self, path) -> None:
+        """names / files 는 고정폭 유니코드 배열로 둔다 (pickle 없이 읽을 수 있게)."""
+        np.savez_compressed(path, data=self.data,
+                            names=np.array(self.names, dtype=str),
+                            files=np.array(self.files, dtype=str))
+
+    @classmethod
+    def load(cls, path) -> "ProfileStore":
+        with np.load(path, allow_pickle=False) as z:
+            return cls(z["data"], z["names"].tolist(), z["files"].tolist())
+
+    # ── 평가 ──────────────────────────────────────
+    def rule_mask(self, rule_fn, publish_period_ms=None, rtt_ms=None) -> np.ndarray:
+        pp_ns = None if publish_period_ms is None else int(publish_period_ms * 1_000_000)
+        rtt_ns = None if rtt_ms is None else int(rtt_ms * 1_000_000)
+        return VECTOR_RULES[rule_fn](self.data, pp_ns, rtt_ns)
+
+    def evaluate(self, publish_period_ms=None, rtt_ms=None, fail_fast: bool = False) -> dict:
+        """
+        RULES 전체 → {rule_fn: (mask, severity)} (stage 순서). fail_fast 면 행마다 Critical 이 나온
+        stage 이후 규칙의 mask 를 끈다 (check_pair 의 fail_fast 와 같은 결과).
+        """
+        out, stopped = {}, np.zeros(len(self.data), dtype=bool)
+        stage_now, critical = None, stopped.copy()
+        for fn, severity, stage in sorted(qc.RULES, key=lambda r: r[2]):
+            if stage != stage_now:
+                stopped |= critical
+                stage_now = stage
+            mask = self.rule_mask(fn, publish_period_ms, rtt_ms)
+            if fail_fast:
+                mask = mask & ~stopped
+                if severity == "Critical":
+                    critical |= mask
+            out[fn] = (mask, severity)
+        return out
+
+    def query(self, expr: str, publish_period_ms=None, rtt_ms=None) -> np.ndarray:
+        """column 이름과 kind 상수를 쓰는 비교 / 논리 식을 평가 (_eval_query)."""
+        env = {f: self.data[f] for f in self.data.dtype.names}
+        for kinds in KIND_CODES.values():
+            env.update({k: i for i, k in enumerate(kinds)})
+        env.update({"UNSET": UNSET, "PUB": 0, "SUB": 1})
+        if publish_period_ms is not None:
+            env["pp_ns"] = int(publish_period_ms * 1_000_000)
+        if rtt_ms is not None:
+            env["rtt_ns"] = int(rtt_ms * 1_000_000)
+        req = _req(env.get("pp_ns"), env.get("rtt_ns"))
+        if req is not None:
+            env["required"] = req
+        try:
+            tree = ast.parse(expr, "<query>", "eval")
+        except SyntaxError as e:
+            sys.exit(f"[ERROR] invalid query expression {expr!r}: {e.msg}")
+        mask = _eval_query(tree, env)
+        return np.broadcast_to(np.asarray(mask, dtype=bool), (len(self),))
+
+    def select(self, mask: np.ndarray) -> list[tuple[str, str]]:
+        return [(self.files[i], self.names[i]) for i in np.flatnonzero(mask)]
+
+
+# ────────── CLI ──────────
+def main(argv: list[str]) -> None:
+    if len(argv) < 2:
+        sys.exit(USAGE)
+    what, pp_ms, rtt_ms, save, inputs = argv[0], None, None, None, []
+    for arg in argv[1:]:
+        if arg.startswith("publish_period="):
+            pp_ms = qc.parse_period(arg)
+        elif arg.startswith("rtt="):
+            rtt_ms = qc.parse_rtt(arg)
+        elif arg.startswith("save="):
+            save = arg.split("=", 1)[1]
+        else:
+            inputs.append(arg)
+
+    t0 = time.perf_counter()
+    if len(inputs) == 1 and inputs[0].endswith(".npz"):
+        store = ProfileStore.load(inputs[0])
+    else:
+        store = ProfileStore.from_xml_files(qc.collect_xml(inputs))
+    if save:
+        store.save(save)
+    t1 = time.perf_counter()
+
+    rules = {fn.__name__: fn for fn, *_ in qc.RULES}
+    if what in rules:
+        mask = store.rule_mask(rules[what], pp_ms, rtt_ms)
+    else:
+        mask = store.query(what, pp_ms, rtt_ms)
+    t2 = time.perf_counter()
+
+    for file, name in store.select(mask):
+        print(f"{file}:{name}" if name else file)
+    print(f"{int(mask.sum())}/{len(store)} profile(s) matched "
+          f"(load {1e3*(t1-t0):.1f} ms, query {1e3*(t2-t1):.2f} ms)")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+""""이 Reader 와 매칭될 수 있는 Writer" 질의를 위한 역색인.
+
+CROSS_RULES 의 매칭 조건(reliability / durability / liveliness / ownership /
+destination order 레벨, deadline period, lease duration, partition)을 그대로 따른다.
+
+  kind 레벨 tuple → partition 이름 → deadline / lease 정렬 배열
+
+Reader 가 주어지면 호환 가능한 kind bucket(최대 96개)과 Reader partition 만 방문하고,
+정렬 배열에서 bisect 로 잘라낸 구간만 확인하므로 전체 Writer 를 훑지 않는다.
+
+    ros2 run check_qos check_qos_cli match <reader.xml> <writer.xml|dir>...
+"""
+import bisect
+import itertools
+import pathlib
+import sys
+import time
+from array import array
+
+from .bulkload import iter_profile_blocks
+from .qos_checker import (DURABILITY_LEVEL, LIVELINESS_PRIORITY, RELIABILITY_LEVEL,
+                          collect_xml, deadline_period_ns, iter_profiles, lease_duration_ns,
+                          load_text, partition_list, resolve_qos,
+                          rule_deadline_period_compat, rule_dest_order_compat,
+                          rule_durability_compat, rule_liveliness_incompatibility,
+                          rule_ownership_compat, rule_partition_overlap,
+                          rule_reliability_compat)
+
+USAGE = "Usage: ros2 run check_qos check_qos_cli match <reader.xml> <writer.xml|dir>..."
+
+# 매칭 자체를 막는 교차 규칙 (인덱스 결과 = 이 규칙들이 모두 통과하는 Writer)
+MATCH_RULES = (rule_dest_order_compat, rule_ownership_compat, rule_reliability_compat,
+               rule_durability_compat, rule_deadline_period_compat,
+               rule_partition_overlap, rule_liveliness_incompatibility)
+
+NO_DEADLINE = (1 << 63) - 1      # Writer DEADLINE 미설정 → 기간이 있는 Reader 와 불일치
+NO_LEASE = -1                    # lease 미설정 → 비교 생략 (rule_liveliness_incompatibility)
+
+
+def endpoint_levels(q: dict) -> tuple[int, int, int, bool, bool]:
+    """(reliability, durability, liveliness, EXCLUSIVE 여부, BY_SOURCE_TIMESTAMP 여부)"""
+    return (RELIABILITY_LEVEL.get(q["reliability"], 0),
+            DURABILITY_LEVEL.get(q["durability"], 0),
+            LIVELINESS_PRIORITY.get(q["liveliness"], 0),
+            q["ownership"] == "EXCLUSIVE",
+            q["dest_order"] == "BY_SOURCE_TIMESTAMP")
+
+
+class _Bucket:
+    """
+    같은 kind 레벨 + partition 을 가진 Writer 들의 정렬 배열. add 는 목록에 붙이기만 하고,
+    첫 query 때 (그 뒤 add 가 있었으면 다시) 한 번 정렬한다: 빌드 O(n log n), query 는 bisect.
+    """
+
+    def __init__(self):
+        self.items = []                  # (wid, deadline, lease)
+        self.dl_keys = self.dl_ids = self.ls_keys = self.ls_ids = None
+
+    def add(self, wid: int, deadline: int, lease: int) -> None:
+        self.items.append((wid, deadline, lease))
+        self.dl_keys = None
+
+    def _freeze(self) -> None:
+        by_dl = sorted(self.items, key=lambda w: w[1])
+        by_ls = sorted(self.items, key=lambda w: w[2])
+        self.dl_keys, self.dl_ids = array("q", (w[1] for w in by_dl)), [w[0] for w in by_dl]
+        self.ls_keys, self.ls_ids = array("q", (w[2] for w in by_ls)), [w[0] for w in by_ls]
+
+    def query(self, max_deadline: int | None, max_lease: int | None,
+              deadline_of, lease_of) -> list[int]:
+        if self.dl_keys is None:
+            self._freeze()
+        n_dl = len(self.dl_ids) if max_deadline is None else \
+            bisect.bisect_right(self.dl_keys, max_deadline)
+        n_ls = len(self.ls_ids) if max_lease is None else \
+            bisect.bisect_right(self.ls_keys, max_lease)
+        # 더 짧은 prefix 를 훑고 나머지 조건만 writer 별로 확인
+        if n_ls < n_dl:
+            if max_deadline is None:
+                return self.ls_ids[:n_ls]
+            return [w for w in self.ls_ids[:n_ls] if deadline_of[w] <= max_deadline]
+        if max_lease is None:
+            return self.dl_ids[:n_dl]
+        return [w for w in self.dl_ids[:n_dl] if lease_of[w] <= max_lease]
+
+
+class WriterIndex:
+    def __init__(self):
+        self.keys = []                 # wid → 사용자 key (예: (file, profile_name))
+        self.deadline = []             # wid → deadline ns (NO_DEADLINE = 미설정)
+        self.lease = []                # wid → lease ns (NO_LEASE = 미설정)
+        self.buckets = {}              # levels → {partition → _Bucket}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key, xml: str, q: dict | None = None) -> None:
+        """q 가 없으면 xml 을 Writer 실효 QoS 로 해석 (resolve_qos)."""
+        if q is None:
+            xml, q = resolve_qos(xml, "PUB")
+        wid = len(self.keys)
+        dl = deadline_period_ns(xml)
+        ls = lease_duration_ns(xml)
+        self.keys.append(key)
+        self.deadline.append(NO_DEADLINE if dl is None else dl)
+        self.lease.append(NO_LEASE if ls is None else ls)
+        parts = self.buckets.setdefault(endpoint_levels(q), {})
+        for name in set(partition_list(xml)):
+            parts.setdefault(name, _Bucket()).add(wid, self.deadline[wid], self.lease[wid])
+
+    def compatible(self, xml: str, q: dict | None = None) -> list:
+        """Reader profile 과 매칭 가능한 Writer key 목록."""
+        if q is None:
+            xml, q = resolve_qos(xml, "SUB")
+        r_rel, r_dur, r_live, r_excl, r_src = endpoint_levels(q)
+
+        r_dl = deadline_period_ns(xml)
+        if r_dl is None:
+            max_dl = None                      # Reader DEADLINE 없음 → 모두 허용
+        elif r_dl == 0:
+            max_dl = NO_DEADLINE - 1           # 기간 0 → Writer 에 DEADLINE 만 있으면 됨
+        else:
+            max_dl = r_dl
+        r_ls = lease_duration_ns(xml)
+
+        found = set()
+        for levels in itertools.product(range(r_rel, 2), range(r_dur, 4), range(r_live, 3),
+                                        (True,) if r_excl else (False, True),
+                                        (True,) if r_src else (False, True)):
+            parts = self.buckets.get(levels)
+            if not parts:
+                continue
+            for name in set(partition_list(xml)):
+                bucket = parts.get(name)
+                if bucket is not None:
+                    found.update(bucket.query(max_dl, r_ls, self.deadline, self.lease))
+        return [self.keys[w] for w in sorted(found)]
+
+
+def brute_force_compatible(writers, xml: str, q: dict) -> list:
+    """검증용: MATCH_RULES 를 모든 쌍에 직접 적용. writers: (key, xml, q) 목록."""
+    out = []
+    for key, w_xml, w_q in writers:
+        msgs = (rule_deadline_period_compat(w_xml, xml), rule_partition_overlap(w_xml, xml),
+                rule_liveliness_incompatibility(w_xml, xml, w_q, q),
+                rule_dest_order_compat(w_q, q), rule_ownership_compat(w_q, q),
+                rule_reliability_compat(w_q, q), rule_durability_compat(w_q, q))
+        if not any(msgs):
+            out.append(key)
+    return out
+
+
+# ────────── CLI ──────────
+def main(argv: list[str]) -> None:
+    if len(argv) < 2:
+        sys.exit(USAGE)
+    t0 = time.perf_counter()
+    index = WriterIndex()
+    for path, side, name, block, doc in iter_profile_blocks(collect_xml(argv[1:])):
+        if side == "PUB":
+            index.add((str(path), name), *resolve_qos(block, side, doc))
+    t1 = time.perf_counter()
+
+    doc = load_text(pathlib.Path(argv[0]))
+    for side, name, block in iter_profiles(doc):
+        if side != "SUB":
+            continue
+        t2 = time.perf_counter()
+        hits = index.compatible(*resolve_qos(block, side, doc))
+        t3 = time.perf_counter()
+        print(f"[{name}] {len(hits)}/{len(index)} compatible writer(s) "
+              f"(index {1e3*(t1-t0):.1f} ms, query {1e3*(t3-t2):.2f} ms)")
+        for path, w_name in hits:
+            print(f"  {path}:{w_name}")
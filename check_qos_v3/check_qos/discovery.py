@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Discovery / liveliness 정상상태 트래픽 추정기 (fleet 크기에 따른 링크 점유율).
+
+    ros2 run check_qos check_qos_cli discovery <manifest.yaml> [fleet=<N>]
+
+participant 는 manifest endpoint 의 `participant:` 이름으로 묶는다 (같은 host 의 같은 이름 =
+participant 하나). 이름이 없으면 endpoint 인스턴스 (count) 마다 participant 하나로 본다.
+fleet=N 은 manifest 전체 (robot 한 대분) 를 같은 domain 에 N 벌 띄운 경우로, participant
+수준 트래픽 (SPDP / SEDP heartbeat / WLP) 은 모든 participant 쌍에 걸리고, topic 수준의
+MANUAL_BY_TOPIC assertion 은 namespace 로 나뉜 자기 복제본 안에서만 오간다고 가정한다.
+
+    SPDP          participant 마다 leaseAnnouncement 주기로 multicast DATA(p) 1개
+    SEDP          원격 participant 마다 builtin reliable writer 3개 (pub / sub / WLP) 의
+                  HEARTBEAT + ACKNACK (builtin heartbeat 주기)
+    WLP           AUTOMATIC / MANUAL_BY_PARTICIPANT writer 가 있는 participant 마다 종류별
+                  최소 announcement_period 로 원격 participant 각각에 DATA 1개
+    MANUAL_BY_TOPIC  writer 마다 announcement_period 로 매칭된 reader 각각에 HEARTBEAT
+"""
+import math
+import pathlib
+import sys
+from collections import defaultdict
+
+from .bandwidth import (ACKNACK_SUBMSG, DATA_SUBMSG, HEARTBEAT_SUBMSG, INFO_DST, INFO_TS,
+                        RTPS_HEADER, UDP_IP_OVERHEAD)
+from .manifest import fmt_bps, link_capacity_bps, load_manifest
+from .qos_checker import (BLUE, DEFAULT_HEARTBEAT_NS, SEVERITY_COLOR, TEXT_VALUE, ScopedDuration,
+                          announcement_period_ns, color, lease_duration_ns,
+                          parse_duration_field)
+
+USAGE = "Usage: ros2 run check_qos check_qos_cli discovery <manifest.yaml> [fleet=<N>]"
+
+# ────────── 메시지 크기 (bytes) ──────────
+SPDP_PAYLOAD = 400            # ParticipantProxyData: locator / property (ROS 2 enclave) 포함
+WLP_PAYLOAD  = 24             # ParticipantMessageData: guidPrefix + kind + 길이
+SPDP_WIRE = UDP_IP_OVERHEAD + RTPS_HEADER + INFO_TS + DATA_SUBMSG + SPDP_PAYLOAD
+WLP_WIRE  = UDP_IP_OVERHEAD + RTPS_HEADER + INFO_DST + DATA_SUBMSG + WLP_PAYLOAD
+HB_WIRE   = UDP_IP_OVERHEAD + RTPS_HEADER + INFO_DST + HEARTBEAT_SUBMSG
+ACK_WIRE  = UDP_IP_OVERHEAD + RTPS_HEADER + INFO_DST + ACKNACK_SUBMSG
+SEDP_STREAMS = 3              # publications / subscriptions / participant message (WLP) writer
+
+# Fast DDS 2.6 discovery_config 기본값
+DEFAULT_SPDP_ANNOUNCE_NS = 3_000_000_000
+DEFAULT_SPDP_LEASE_NS    = 20_000_000_000
+SPDP_ANNOUNCE_RE = ScopedDuration(("discovery_config", "leaseAnnouncement"), TEXT_VALUE)
+SPDP_LEASE_RE    = ScopedDuration(("discovery_config", "leaseDuration"), TEXT_VALUE)
+
+# 링크 용량 대비 discovery / liveliness 점유율 경고 임계값
+SHARE_CONDITIONAL = 0.05
+SHARE_CRITICAL    = 0.20
+MAX_FLEET         = 4096
+
+
+def _duration_ns(pattern: ScopedDuration, xml: str, default: int) -> int | None:
+    """태그가 없으면 default, DURATION_INFINITY 면 None."""
+    m = pattern.search(xml)
+    if not m or (m.group(1) is None and m.group(2) is None):
+        return default
+    sec, nsec = parse_duration_field(m.group(1)), parse_duration_field(m.group(2))
+    return None if sec is None or nsec is None else sec * 1_000_000_000 + nsec
+
+
+# ────────── 모델 ──────────
+def build_model(manifest: dict) -> dict:
+    """manifest → {"participants": {key: p}, "mbt": [(writer key, reader key, bytes/s)], ...}."""
+    participants = {}
+
+    def join(ep: dict, topic: str, i: int, role: str) -> str:
+        key = (f"{ep['host']}/{ep['participant']}" if ep["participant"]
+               else f"{ep['host']}/{topic}/{role}/{pathlib.Path(ep['profile']).stem}#{i}")
+        if key not in participants:
+            participants[key] = {
+                "host": ep["host"], "interface": ep["interface"], "writers": [], "readers": 0,
+                "announce_ns": _duration_ns(SPDP_ANNOUNCE_RE, ep["xml"], DEFAULT_SPDP_ANNOUNCE_NS),
+                "lease_ns": _duration_ns(SPDP_LEASE_RE, ep["xml"], DEFAULT_SPDP_LEASE_NS)}
+        return key
+
+    mbt, endpoint_leases = [], 0
+    for t in manifest["topics"]:
+        w = t["writer"]
+        kind = w["q"]["liveliness"].strip().upper()
+        announce = announcement_period_ns(w["xml"]) or None
+        writers = [join(w, t["name"], i, "writer") for i in range(w["count"])]
+        for key in writers:
+            participants[key]["writers"].append((kind, announce))
+        for r in t["readers"]:
+            lease = lease_duration_ns(r["xml"]) or None          # 0 / 없음 = 무한
+            for i in range(r["count"]):
+                rkey = join(r, t["name"], i, "reader")
+                participants[rkey]["readers"] += 1
+                endpoint_leases += len(writers) if lease else 0
+                if kind == "MANUAL_BY_TOPIC" and announce:
+                    mbt += [(wkey, rkey, HB_WIRE * 1e9 / announce) for wkey in writers]
+    return {"participants": participants, "mbt": mbt, "endpoint_leases": endpoint_leases}
+
+
+def _unicast_rate(p: dict) -> dict[str, float]:
+    """participant 하나가 원격 participant 하나에 보내는 bytes/s (종류별)."""
+    hb_s = DEFAULT_HEARTBEAT_NS / 1e9
+    out = {"sedp": SEDP_STREAMS * (HB_WIRE + ACK_WIRE) / hb_s, "wlp": 0.0}
+    for kind in ("AUTOMATIC", "MANUAL_BY_PARTICIPANT"):
+        periods = [a for k, a in p["writers"] if k == kind and a]
+        if periods:
+            out["wlp"] += WLP_WIRE * 1e9 / min(periods)
+    return out
+
+
+def estimate(model: dict, fleet: int = 1) -> dict:
+    """
+    fleet 벌을 띄운 정상상태. {"rates": 종류별 시스템 전체 bytes/s, "links": {(host, iface):
+    {"tx", "rx"}} (bits/s, 복제본 한 벌 기준), "participants", "timers": {...}}.
+    같은 host 안의 participant 끼리는 SHM / loopback 이므로 링크에 싣지 않는다.
+    """
+    parts = model["participants"]
+    total = fleet * len(parts)
+    spdp = {k: (SPDP_WIRE * 1e9 / p["announce_ns"] if p["announce_ns"] else 0.0)
+            for k, p in parts.items()}
+    uni = {k: _unicast_rate(p) for k, p in parts.items()}
+    u = {k: r["sedp"] + r["wlp"] for k, r in uni.items()}
+
+    by_host = defaultdict(list)
+    for k, p in parts.items():
+        by_host[(p["host"], p["interface"])].append(k)
+    links = {}
+    for link, keys in by_host.items():
+        n_local = len(keys)
+        tx = sum(spdp[k] + u[k] * (total - n_local) for k in keys)
+        rx = (fleet * sum(spdp.values()) - sum(spdp[k] for k in keys)
+              + n_local * (fleet * sum(u.values()) - sum(u[k] for k in keys)))
+        links[link] = {"tx": 8 * tx, "rx": 8 * rx}
+    for wkey, rkey, bps in model["mbt"]:
+        w, r = parts[wkey], parts[rkey]
+        if w["host"] != r["host"]:
+            links[(w["host"], w["interface"])]["tx"] += 8 * bps
+            links[(r["host"], r["interface"])]["rx"] += 8 * bps
+
+    remote = total - 1
+    rates = {"spdp": fleet * sum(spdp.values()),
+             "sedp": fleet * remote * sum(r["sedp"] for r in uni.values()),
+             "wlp": fleet * remote * sum(r["wlp"] for r in uni.values()),
+             "manual_by_topic": fleet * sum(bps for *_, bps in model["mbt"])}
+    finite = sum(1 for p in parts.values() if p["lease_ns"])
+    timers = {"participant": fleet * finite * remote,
+              "endpoint": fleet * model["endpoint_leases"]}
+    return {"participants": total, "rates": rates, "links": links, "timers": timers}
+
+
+def max_share(model: dict, manifest: dict, fleet: int) -> float:
+    shares = [(load["tx"] + load["rx"]) / cap
+              for (host, iface), load in estimate(model, fleet)["links"].items()
+              if (cap := link_capacity_bps(manifest, host, iface))]
+    return max(shares, default=0.0)
+
+
+def fleet_limit(model: dict, manifest: dict, share: float) -> int | None:
+    """어떤 링크든 점유율이 share 이상이 되는 가장 작은 fleet 크기 (MAX_FLEET 까지 없으면 None)."""
+    if max_share(model, manifest, MAX_FLEET) < share:
+        return None
+    lo, hi = 1, MAX_FLEET                     # 점유율은 fleet 에 대해 단조 증가
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if max_share(model, manifest, mid) >= share:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+# ────────── CLI ──────────
+def main(argv: list[str]) -> None:
+    if not argv:
+        sys.exit(USAGE)
+    fleet = 1
+    for arg in argv[1:]:
+        key, _, val = arg.partition("=")
+        if key == "fleet" and val.isdigit() and int(val) > 0:
+            fleet = int(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+
+    manifest = load_manifest(pathlib.Path(argv[0]))
+    model = build_model(manifest)
+    est = estimate(model, fleet)
+    r, timers = est["rates"], est["timers"]
+    print(f"{color('[discovery]', BLUE)} {est['participants']} participant(s) "
+          f"({len(model['participants'])} per copy × fleet {fleet})\n"
+          f"  SPDP announcements {fmt_bps(8*r['spdp'])}, SEDP heartbeat/acknack "
+          f"{fmt_bps(8*r['sedp'])}, WLP assertions {fmt_bps(8*r['wlp'])}, "
+          f"MANUAL_BY_TOPIC assertions {fmt_bps(8*r['manual_by_topic'])}\n"
+          f"  lease timers: {timers['participant']} participant, {timers['endpoint']} "
+          "endpoint liveliness")
+
+    print()
+    for (host, iface), load in sorted(est["links"].items()):
+        total = load["tx"] + load["rx"]
+        cap = link_capacity_bps(manifest, host, iface)
+        line = (f"{host or '?'}/{iface or '?'}: tx {fmt_bps(load['tx'])}, "
+                f"rx {fmt_bps(load['rx'])}")
+        if cap:
+            share = total / cap
+            line += f" = {share*100:.2f}% of {fmt_bps(cap)}"
+            if share >= SHARE_CRITICAL:
+                line = (f"{color('[CRITICAL]', SEVERITY_COLOR['Critical'])} {line} — "
+                        "discovery / liveliness crowd out data traffic")
+            elif share >= SHARE_CONDITIONAL:
+                line = (f"{color('[CONDITIONAL]', SEVERITY_COLOR['Conditional'])} {line} — "
+                        "consider a discovery server or longer announcement periods")
+        print(line)
+
+    for share, sev in ((SHARE_CONDITIONAL, "Conditional"), (SHARE_CRITICAL, "Critical")):
+        limit = fleet_limit(model, manifest, share)
+        if limit is not None and limit > fleet:
+            print(f"{color(f'[{sev.upper()}]', SEVERITY_COLOR[sev])} discovery / liveliness "
+                  f"traffic reaches {share*100:.0f}% of a link at fleet size {limit} "
+                  f"({limit * len(model['participants'])} participants).")
+    if not manifest["hosts"]:
+        print("(no host capacities in the manifest: link shares not computed)")
+    elif math.isclose(max_share(model, manifest, MAX_FLEET), 0.0):
+        print("(no endpoint host/interface matches a host capacity in the manifest)")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""ASYNCHRONOUS publishMode + flow controller 처리량 검사 (writer queue 증가 / 지속 drop 예측).
+
+    ros2 run check_qos check_qos_cli flow <pub.xml> publish_period=<Nms> sample_size=<N>
+                                          [readers=<N>]
+    ros2 run check_qos check_qos_cli flow <manifest.yaml> [publish_period=<Nms>]
+
+writer 의 <publishMode><flow_controller_name> 이 가리키는 participant 의
+<flow_controller_descriptor> (max_bytes_per_period / period_ms) 또는 옛 형식
+<throughputController> (bytesPerPeriod / periodMillisecs) 를 읽어, 발행률 × 샘플 wire 크기 ×
+reader 수와 비교한다. 한도를 넘으면 보내지 못한 샘플이 history 에 쌓이고, history 가 차면
+KEEP_LAST 는 오래된 미전송 샘플을 버리고 KEEP_ALL 은 write() 가 max_blocking_time 만큼
+막힌 뒤 실패한다. 같은 participant 의 여러 writer 가 controller 하나를 나눠 쓰는 경우는
+합산하지 않으므로 실제 여유는 출력보다 작을 수 있다.
+"""
+import math
+import pathlib
+import re
+import sys
+
+from .bandwidth import sample_wire_bytes
+from .manifest import fmt_bps, load_manifest, parse_duration_ms, parse_size_bytes
+from .qos_checker import (BLUE, SEVERITY_COLOR, color, find_block, load_text, resolve_qos,
+                          scoped_text)
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli flow <pub.xml> publish_period=<Nms> "
+         "sample_size=<N> [readers=<N>]\n"
+         "       ros2 run check_qos check_qos_cli flow <manifest.yaml> [publish_period=<Nms>]")
+
+DEFAULT_FC_PERIOD_MS = 100          # FlowControllerDescriptor::period_ms 기본값
+UTIL_CONDITIONAL = 0.8              # 이 이상이면 burst 여유가 거의 없음
+NAME_RE = re.compile(r"<name>\s*([^<]*?)\s*</name>")
+
+
+# ────────── XML 에서 설정 읽기 ──────────
+def _text(xml: str, path: tuple[str, ...], default: str = "") -> str:
+    txt = scoped_text(xml, path)
+    return txt.strip() if txt and txt.strip() else default
+
+
+def _int(txt: str, default: int) -> int:
+    return int(txt) if txt.isdigit() else default
+
+
+def flow_controllers(xml: str) -> dict[str, dict]:
+    """문서의 <flow_controller_descriptor> 들 → name → {max_bytes, period_ms, scheduler}."""
+    out = {}
+    pos = 0
+    while (b := find_block(xml, "flow_controller_descriptor", pos)) is not None:
+        body = xml[b[1]:b[2]]
+        name = NAME_RE.search(body)
+        if name:
+            out.setdefault(name.group(1), {
+                "max_bytes": _int(_text(body, ("max_bytes_per_period",)), 0),
+                "period_ms": _int(_text(body, ("period_ms",)), DEFAULT_FC_PERIOD_MS),
+                "scheduler": _text(body, ("scheduler",), "FIFO").upper()})
+        pos = b[3]
+    return out
+
+
+def queue_limit(q: dict) -> int | None:
+    """보내지 못한 샘플이 쌓일 수 있는 최대 개수 (keyless topic 기준, None = 무제한)."""
+    limits = [int(v) for v in (q.get("max_samples", ""), q.get("max_samples_per_instance", ""))
+              if v.isdigit() and int(v) > 0]
+    if q["history"] == "KEEP_LAST":
+        limits.append(int(q["history_depth"]) if q.get("history_depth", "").isdigit() else 1)
+    return min(limits) if limits else None
+
+
+def flow_settings(xml: str, q: dict) -> dict:
+    """resolve_qos 결과 → {mode, controller_name, controller, unknown, queue_limit, history}."""
+    mode = _text(xml, ("publishMode", "kind"), "SYNCHRONOUS").upper()
+    name = _text(xml, ("publishMode", "flow_controller_name"))
+    controller = None
+    if name:
+        controller = flow_controllers(xml).get(name)
+    elif (legacy := find_block(xml, "throughputController")) is not None:
+        body = xml[legacy[1]:legacy[2]]
+        name = "throughputController"
+        controller = {"max_bytes": _int(_text(body, ("bytesPerPeriod",)), 0),
+                      "period_ms": _int(_text(body, ("periodMillisecs",)), DEFAULT_FC_PERIOD_MS),
+                      "scheduler": "FIFO"}
+    return {"mode": mode, "controller_name": name, "controller": controller,
+            "unknown": bool(name) and controller is None,
+            "queue_limit": queue_limit(q), "history": q["history"]}
+
+
+# ────────── 추정 ──────────
+def estimate_flow(settings: dict, publish_period_ms: float, sample_size: int,
+                  readers: int = 1) -> dict:
+    """
+    writer 1개의 flow controller 부하. reader 마다 unicast 로 보내므로 수요는
+    wire bytes × 발행률 × reader 수. 한도가 없으면 capacity 는 None.
+    """
+    rate = 1000.0 / publish_period_ms
+    _, wire = sample_wire_bytes(sample_size)
+    out = {"rate_hz": rate, "demand": wire * rate * readers, "capacity": None,
+           "utilization": 0.0, "send_ms": 0.0, "growth": 0.0, "fill_s": None,
+           "drop_ratio": 0.0}
+    fc = settings["controller"]
+    if settings["mode"] != "ASYNCHRONOUS" or fc is None or fc["max_bytes"] <= 0:
+        return out
+
+    capacity = fc["max_bytes"] * 1000.0 / fc["period_ms"]
+    out["capacity"] = capacity
+    out["utilization"] = out["demand"] / capacity
+    # 샘플 하나를 모든 reader 에게 보내려고 다음 controller period 를 기다리는 시간
+    out["send_ms"] = (math.ceil(wire * readers / fc["max_bytes"]) - 1) * fc["period_ms"]
+    if out["utilization"] > 1:
+        out["growth"] = rate - capacity / (wire * readers)       # 미전송 샘플 증가 (samples/s)
+        out["drop_ratio"] = 1 - 1 / out["utilization"]
+        if settings["queue_limit"] is not None:
+            out["fill_s"] = settings["queue_limit"] / out["growth"]
+    return out
+
+
+def findings(settings: dict, est: dict, publish_period_ms: float) -> list[tuple[str, str]]:
+    """[(severity, msg)]"""
+    out = []
+    name = settings["controller_name"]
+    if settings["unknown"]:
+        out.append(("Critical", f"flow_controller_name '{name}' has no matching "
+                                "<flow_controller_descriptor>; the writer cannot be created.\n"
+                                "Recommendation: declare it in the participant's "
+                                "flow_controller_descriptor_list."))
+    if name and settings["mode"] != "ASYNCHRONOUS":
+        out.append(("Warn", f"flow controller '{name}' is set but publishMode is "
+                            f"{settings['mode']}; it only applies to ASYNCHRONOUS writers."))
+    if est["capacity"] is None:
+        return out
+
+    if est["utilization"] > 1:
+        limit = settings["queue_limit"]
+        if settings["history"] == "KEEP_LAST":
+            after = (f"history (KEEP_LAST {limit}) is full after {est['fill_s']:.2f} s; then "
+                     f"{est['drop_ratio']*100:.0f}% of samples "
+                     f"({est['growth']:.1f}/s) are dropped before they are sent.")
+        elif limit is not None:
+            after = (f"history (KEEP_ALL, limit {limit}) is full after {est['fill_s']:.2f} s; "
+                     f"then write() blocks for max_blocking_time and fails for "
+                     f"{est['drop_ratio']*100:.0f}% of samples ({est['growth']:.1f}/s).")
+        else:
+            after = "KEEP_ALL with unlimited resource limits lets the queue grow without bound."
+        out.append(("Critical",
+                    f"Demand {fmt_bps(8*est['demand'])} exceeds flow controller '{name}' "
+                    f"({fmt_bps(8*est['capacity'])}); the writer queue grows by "
+                    f"{est['growth']:.1f} samples/s and {after}\n"
+                    "Recommendation: raise max_bytes_per_period, lower the publish rate or "
+                    "sample size, or give this writer its own controller."))
+    elif est["utilization"] >= UTIL_CONDITIONAL:
+        out.append(("Conditional",
+                    f"Flow controller '{name}' is {est['utilization']*100:.0f}% utilized; "
+                    "bursts and retransmissions will queue.\n"
+                    "Recommendation: keep sustained use below "
+                    f"{UTIL_CONDITIONAL*100:.0f}% of max_bytes_per_period."))
+    if est["send_ms"] > publish_period_ms:
+        out.append(("Conditional",
+                    f"One sample to all readers waits {est['send_ms']:.0f} ms for later controller "
+                    f"periods, longer than the publish period ({publish_period_ms:g} ms).\n"
+                    "Recommendation: max_bytes_per_period should hold at least one sample "
+                    "per reader."))
+    return out
+
+
+# ────────── 출력 ──────────
+def _describe(settings: dict, est: dict) -> str:
+    fc, name = settings["controller"], settings["controller_name"]
+    if settings["mode"] != "ASYNCHRONOUS" or fc is None:
+        return f"{settings['mode']}, no flow control"
+    if fc["max_bytes"] <= 0:
+        return f"ASYNCHRONOUS via '{name}' (unlimited)"
+    return (f"ASYNCHRONOUS via '{name}' ({fc['max_bytes']} B / {fc['period_ms']} ms "
+            f"= {fmt_bps(8*est['capacity'])}), demand {fmt_bps(8*est['demand'])} "
+            f"({est['utilization']*100:.0f}%)")
+
+
+def _print(label: str, settings: dict, est: dict, publish_period_ms: float) -> int:
+    print(f"{color(label, BLUE)} {_describe(settings, est)}")
+    found = findings(settings, est, publish_period_ms)
+    for sev, msg in found:
+        tag = color(f"[{sev.upper()}]", SEVERITY_COLOR.get(sev, BLUE))
+        print(f"  {tag} " + msg.replace("\n", "\n    "))
+    return len(found)
+
+
+def main(argv: list[str]) -> None:
+    paths, pp_ms, size, readers = [], None, None, 1
+    for arg in argv:
+        key, sep, val = arg.partition("=")
+        if not sep:
+            paths.append(arg)
+        elif key == "publish_period":
+            pp_ms = parse_duration_ms(val, "publish_period")
+        elif key == "sample_size":
+            size = parse_size_bytes(val)
+        elif key == "readers" and val.isdigit() and int(val) > 0:
+            readers = int(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+    if len(paths) != 1:
+        sys.exit(USAGE)
+
+    path = pathlib.Path(paths[0])
+    if path.suffix.lower() in (".yaml", ".yml", ".json"):
+        manifest = load_manifest(path, {"publish_period": pp_ms} if pp_ms else None)
+        total = 0
+        for t in manifest["topics"]:
+            if t["publish_period_ms"] is None or t["sample_size"] is None:
+                print(f"{color('[SKIP]', BLUE)} {t['name']}: publish_period / sample_size missing")
+                continue
+            w = t["writer"]
+            settings = flow_settings(w["xml"], w["q"])
+            est = estimate_flow(settings, t["publish_period_ms"], t["sample_size"],
+                                sum(r["count"] for r in t["readers"]) or 1)
+            total += _print(f"[{t['name']}]", settings, est, t["publish_period_ms"])
+        print(f"{len(manifest['topics'])} writer(s), {total} finding(s)")
+        return
+
+    if pp_ms is None or size is None:
+        sys.exit(f"[ERROR] publish_period= and sample_size= are required\n{USAGE}")
+    xml, q = resolve_qos(load_text(path), "PUB")
+    settings = flow_settings(xml, q)
+    _print(f"[{path.name}]", settings, estimate_flow(settings, pp_ms, size, readers), pp_ms)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""큰 샘플의 fragmentation 손실 증폭 / socket buffer 넘침 검사.
+
+    ros2 run check_qos check_qos_cli frag <pub.xml> <sub.xml> sample_size=<N>
+                                          [loss_rate=<p>] [socket_buffer=<N>] [readers=<N>]
+    ros2 run check_qos check_qos_cli frag <manifest.yaml> [loss_rate=<p>]
+
+샘플이 UDP transport 의 maxMessageSize 를 넘으면 DATA_FRAG 여러 개로 나뉜다.
+BEST_EFFORT 는 fragment 하나만 잃어도 샘플 전체를 잃으므로 datagram 손실률 p 가
+1 - (1-p)^N 으로 증폭된다. RELIABLE 은 fragment 단위로 복구되지만 history 만큼의 burst
+(depth × wire 크기) 가 writer 의 sendBufferSize / reader 의 listenSocketBufferSize (또는
+receiveBufferSize) 를 넘으면 커널에서 버려지고 재전송이 반복된다.
+
+buffer 는 transport_descriptor → participant (send/listenSocketBufferSize) → OS 기본값 순으로
+정하며, OS 기본값은 socket_buffer= (manifest 의 socket_buffer) 로 바꿀 수 있다.
+"""
+import pathlib
+import sys
+
+from .bandwidth import UDP_IP_OVERHEAD, sample_wire_bytes
+from .flow_control import queue_limit
+from .manifest import load_manifest, parse_loss_rate, parse_size_bytes
+from .qos_checker import BLUE, SEVERITY_COLOR, color, load_text, resolve_qos
+from .replay import DEFAULT_SOCKET_BUFFER
+from .transport import participant_transports, udp_path
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli frag <pub.xml> <sub.xml> sample_size=<N> "
+         "[loss_rate=<p>] [socket_buffer=<N>] [readers=<N>]\n"
+         "       ros2 run check_qos check_qos_cli frag <manifest.yaml> [loss_rate=<p>]")
+
+SAMPLE_LOSS_CRITICAL = 0.1          # BEST_EFFORT 샘플 손실률이 이 이상이면 Critical
+
+
+def analyze_pair(w_xml: str, w_q: dict, r_xml: str, r_q: dict, sample_size: int,
+                 loss_rate: float = 0.0, os_buffer: int = DEFAULT_SOCKET_BUFFER,
+                 readers: int = 1) -> dict:
+    """
+    writer → reader 하나의 fragmentation / buffer 분석.
+    readers 는 같은 writer 가 unicast 로 보내는 reader 수 (writer send buffer 를 나눠 씀).
+    """
+    w_udp = udp_path(participant_transports(w_xml), os_buffer)
+    r_udp = udp_path(participant_transports(r_xml), os_buffer)
+    if w_udp is None or r_udp is None:
+        return {"skipped": "no UDP transport on " + ("writer" if w_udp is None else "reader")}
+
+    frags, wire = sample_wire_bytes(sample_size, w_udp["max_message_size"])
+    datagram = wire - UDP_IP_OVERHEAD if frags == 1 else w_udp["max_message_size"]
+    reliable = w_q["reliability"] == "RELIABLE" and r_q["reliability"] == "RELIABLE"
+    burst = queue_limit(w_q) if reliable else 1            # None = KEEP_ALL 무제한
+    return {"fragments": frags, "wire": wire, "datagram": datagram, "reliable": reliable,
+            "sample_loss": 1 - (1 - loss_rate) ** frags, "loss_rate": loss_rate,
+            "burst_samples": burst, "burst_bytes": burst * wire if burst else None,
+            "readers": readers, "writer": w_udp, "reader": r_udp}
+
+
+def findings(res: dict) -> list[tuple[str, str]]:
+    """[(severity, msg)]"""
+    out = []
+    w, r = res["writer"], res["reader"]
+    if res["datagram"] > r["max_message_size"]:
+        out.append(("Critical",
+                    f"Writer datagrams of {res['datagram']} B exceed the reader transport "
+                    f"maxMessageSize ({r['max_message_size']} B); they are discarded on "
+                    "receive.\n"
+                    "Recommendation: use the same maxMessageSize on both participants."))
+    if res["wire"] > r["receive_buffer"]:
+        out.append(("Critical",
+                    f"One sample ({res['wire']} B on the wire) is larger than the reader "
+                    f"receive buffer ({r['receive_buffer']} B); its fragments overflow the "
+                    "socket before they are read.\n"
+                    "Recommendation: raise listenSocketBufferSize / receiveBufferSize (and "
+                    "net.core.rmem_max) above the sample size."))
+
+    if res["fragments"] > 1 and not res["reliable"]:
+        p, lost = res["loss_rate"], res["sample_loss"]
+        if p > 0:
+            sev = "Critical" if lost >= SAMPLE_LOSS_CRITICAL else "Conditional"
+            what = (f"a {p*100:.2g}% datagram loss becomes {lost*100:.1f}% sample loss "
+                    f"({lost / p:.1f}× amplification)")
+        else:
+            sev, what = "Incidental", "any lost fragment loses the whole sample"
+        out.append((sev,
+                    f"BEST_EFFORT sample of {res['fragments']} fragments (maxMessageSize "
+                    f"{w['max_message_size']} B): {what}.\n"
+                    "Recommendation: use RELIABLE for fragmented samples, or shrink the "
+                    "sample below maxMessageSize."))
+
+    if res["reliable"]:
+        if res["burst_bytes"] is None:
+            out.append(("Conditional",
+                        "RELIABLE KEEP_ALL with unlimited resource limits: a repair / backlog "
+                        "burst has no upper bound and can overrun the socket buffers.\n"
+                        "Recommendation: bound max_samples / max_samples_per_instance."))
+            return out
+        n, burst = res["burst_samples"], res["burst_bytes"]
+        if burst > r["receive_buffer"] and res["wire"] <= r["receive_buffer"]:
+            out.append(("Conditional",
+                        f"A burst of {n} sample(s) ({burst} B) exceeds the reader receive "
+                        f"buffer ({r['receive_buffer']} B); overrun fragments are repaired "
+                        "by NACK_FRAG round trips.\n"
+                        "Recommendation: lower history depth or raise listenSocketBufferSize "
+                        "/ receiveBufferSize."))
+        if burst * res["readers"] > w["send_buffer"]:
+            out.append(("Conditional",
+                        f"A burst of {n} sample(s) to {res['readers']} reader(s) "
+                        f"({burst * res['readers']} B) exceeds the writer send buffer "
+                        f"({w['send_buffer']} B); sends fail and are retransmitted.\n"
+                        "Recommendation: raise sendSocketBufferSize / sendBufferSize (and "
+                        "net.core.wmem_max) or add a flow controller."))
+    return out
+
+
+# ────────── 출력 ──────────
+def _print(label: str, res: dict) -> int:
+    tag = color(label, BLUE)
+    if "skipped" in res:
+        print(f"{tag} {res['skipped']}")
+        return 0
+    print(f"{tag} {'RELIABLE' if res['reliable'] else 'BEST_EFFORT'}, {res['fragments']} "
+          f"datagram(s)/sample ({res['wire']} B), buffers send {res['writer']['send_buffer']} B"
+          f" / receive {res['reader']['receive_buffer']} B")
+    found = findings(res)
+    for sev, msg in found:
+        sev_tag = color(f"[{sev.upper()}]", SEVERITY_COLOR.get(sev, BLUE))
+        print(f"  {sev_tag} " + msg.replace("\n", "\n    "))
+    return len(found)
+
+
+def main(argv: list[str]) -> None:
+    paths, size, loss, os_buffer, readers = [], None, None, None, 1
+    for arg in argv:
+        key, sep, val = arg.partition("=")
+        if not sep:
+            paths.append(arg)
+        elif key == "sample_size":
+            size = parse_size_bytes(val)
+        elif key == "loss_rate":
+            loss = parse_loss_rate(val)
+        elif key == "socket_buffer":
+            os_buffer = parse_size_bytes(val, "socket_buffer")
+        elif key == "readers" and val.isdigit() and int(val) > 0:
+            readers = int(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+
+    if len(paths) == 1 and pathlib.Path(paths[0]).suffix.lower() in (".yaml", ".yml", ".json"):
+        manifest = load_manifest(pathlib.Path(paths[0]),
+                                 {"loss_rate": loss} if loss is not None else None)
+        total = 0
+        for t in manifest["topics"]:
+            if t["sample_size"] is None:
+                print(f"{color('[SKIP]', BLUE)} {t['name']}: sample_size missing")
+                continue
+            w = t["writer"]
+            n = sum(r["count"] for r in t["readers"]) or 1
+            for r in t["readers"]:
+                res = analyze_pair(w["xml"], w["q"], r["xml"], r["q"], t["sample_size"],
+                                   t["loss_rate"], t["socket_buffer"] or DEFAULT_SOCKET_BUFFER,
+                                   n)
+                total += _print(f"[{t['name']}] → {pathlib.Path(r['profile']).name}", res)
+        print(f"{len(manifest['topics'])} topic(s), {total} finding(s)")
+        return
+    if len(paths) != 2 or size is None:
+        sys.exit(USAGE)
+
+    w_xml, w_q = resolve_qos(load_text(pathlib.Path(paths[0])), "PUB")
+    r_xml, r_q = resolve_qos(load_text(pathlib.Path(paths[1])), "SUB")
+    res = analyze_pair(w_xml, w_q, r_xml, r_q, size, loss or 0.0,
+                       os_buffer or DEFAULT_SOCKET_BUFFER, readers)
+    _print(f"[{pathlib.Path(paths[0]).name} → {pathlib.Path(paths[1]).name}]", res)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""실효 QoS signature interning: 이름만 다른 profile 은 규칙을 한 번만 평가한다.
+
+signature 는 kind / bool 코드(columnar.KIND_CODES 순서, 3 bit / 2 bit)를 64-bit 정수 하나에,
+개수 필드를 int64 로 묶은 bytes 에, 그 코드로는 복원되지 않는 원문(알 수 없는 kind,
+0 으로 시작하는 숫자, userData, partition 이름)과 규칙이 XML 에서 직접 읽는 duration 의
+<sec>/<nanosec> 텍스트를 덧붙인 것이다. 규칙은 (실효 xml, q) 중 이 값들만 읽으므로
+signature 가 같으면 메시지까지 같다.
+"""
+import struct
+import time
+
+from . import qos_checker as qc
+from .columnar import BOOL_FIELDS, COUNT_FIELDS, KIND_CODES, UNSET, kind_code
+
+# RULES / CROSS_RULES 가 xml 인자에서 직접 읽는 duration 들
+XML_DURATIONS = (qc.DEADLINE_RE, qc.LEASE_RE, qc.LIFESPAN_RE, qc.ANNOUNCE_RE,
+                 qc.MAX_BLOCKING_RE, qc.HEARTBEAT_RE)
+# 코드로 담지 않는 q 값
+TEXT_FIELDS = ("nowriter_sec_r", "nowriter_nsec_r", "userdata")
+BOOL_CODES = {"FALSE": 0, "TRUE": 1}
+_PACK = struct.Struct(f"<Q{len(COUNT_FIELDS)}q")
+
+
+def signature(xml: str, q: dict) -> bytes:
+    """resolve_qos 결과 (xml, q) 의 hashable 표현. side 는 q 에 이미 반영되어 있으므로 제외."""
+    bits, counts, residue = 0, [], []
+    for field in KIND_CODES:                     # UNSET / OTHER(-1 / -2) → 7 / 6
+        raw = q.get(field, "")
+        code = kind_code(field, raw.strip().upper())
+        bits = bits << 3 | code & 7
+        if code >= 0 and raw != KIND_CODES[field][code] or code < 0 and raw:
+            residue.append((field, raw))
+    for field in BOOL_FIELDS:
+        raw = q.get(field, "")
+        code = BOOL_CODES.get(raw.strip().upper(), 3)
+        bits = bits << 2 | code
+        if raw not in BOOL_CODES:
+            residue.append((field, raw))
+    for field in COUNT_FIELDS:
+        raw = q.get(field, "")
+        n = int(raw) if raw.isdigit() else UNSET
+        if not 0 <= n < 1 << 63:                  # int64 밖 → 원문으로
+            n = UNSET
+        counts.append(n)
+        if raw != (str(n) if n >= 0 else ""):
+            residue.append((field, raw))
+    residue += [q.get(field, "") for field in TEXT_FIELDS]
+    residue.append(tuple(q.get("partition_list", ())))
+    for pattern in XML_DURATIONS:
+        m = pattern.search(xml)
+        residue.append(m and (m.group(1), m.group(2)))
+    return _PACK.pack(bits, *counts) + repr(tuple(residue)).encode()
+
+
+def _timing() -> tuple:
+    g = vars(qc)
+    return g.get("publish_period_ms"), g.get("rtt_ns")
+
+
+class Interner:
+    """signature → 번호. 번호마다 처음 본 (xml, q) 를 대표로 두고 규칙 결과를 memo 한다."""
+
+    def __init__(self, observe=None):
+        self.observe = observe                  # observe(stage, 초) — 실제 평가만 보고
+        self.ids: dict[bytes, int] = {}
+        self.reps: list[tuple[str, dict]] = []
+        self._single: dict[tuple, list] = {}
+        self._cross: dict[tuple, list] = {}
+
+    def __len__(self) -> int:
+        return len(self.reps)
+
+    def intern(self, xml: str, q: dict) -> int:
+        sig = signature(xml, q)
+        sid = self.ids.get(sig)
+        if sid is None:
+            sid = self.ids[sig] = len(self.reps)
+            self.reps.append((xml, q))
+        return sid
+
+    def rule_findings(self, sid: int, fail_fast: bool = False) -> list[tuple]:
+        """
+        RULES 결과 [(rule_fn, severity, msg)] 를 stage 순서로. 현재 PP / RTT 별로 signature 당 한 번
+        평가. fail_fast 면 Critical 이 나온 stage 이후는 평가하지 않는다.
+        """
+        key = (sid, _timing(), fail_fast)
+        if key not in self._single:
+            xml, q = self.reps[sid]
+            t0 = time.perf_counter()
+            self._single[key] = [(fn, sev, msg) for (fn, sev, _), msg in
+                                 qc.iter_staged(qc.RULES, lambda r: r[0](xml, q), fail_fast)]
+            if self.observe:
+                self.observe("rules", time.perf_counter() - t0)
+        return self._single[key]
+
+    def cross_findings(self, pub_sid: int, sub_sid: int, fail_fast: bool = False) -> list[tuple]:
+        """CROSS_RULES 결과 [(rule_fn, severity, msg)] 를 stage 순서로. signature 쌍 / PP / RTT 별로 한 번."""
+        key = (pub_sid, sub_sid, _timing(), fail_fast)
+        if key not in self._cross:
+            (pub_xml, pub_q), (sub_xml, sub_q) = self.reps[pub_sid], self.reps[sub_sid]
+            t0 = time.perf_counter()
+            self._cross[key] = [(fn, sev, msg) for (fn, sev, _), msg in qc.iter_staged(
+                qc.CROSS_RULES,
+                lambda r: qc.call_cross_rule(r[0], pub_xml, sub_xml, pub_q, sub_q), fail_fast)]
+            if self.observe:
+                self.observe("cross_rules", time.perf_counter() - t0)
+        return self._cross[key]
+
+    def evaluations(self) -> tuple[int, int]:
+        """(단일 평가 수, 쌍 평가 수) — 실제로 규칙을 돌린 횟수."""
+        return len(self._single), len(self._cross)
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""Fast DDS profile XML 용 language server (stdio JSON-RPC, LSP 의 문서 동기화 / 진단 부분).
+
+    ros2 run check_qos check_qos_cli lsp [publish_period=<Nms>] [rtt=<Nms>]
+                                         [manifest=<deploy.yaml>]
+
+publish_period / rtt / manifest 는 initializationOptions 나 workspace/didChangeConfiguration
+의 {"check_qos": {...}} 로도 줄 수 있다.
+
+문서마다 endpoint profile block 의 위치와 block 별 규칙 결과 / 의존성 (whatif 와 같은
+TrackedXml / TrackedQos 기록) 을 들고 있다. 증분 편집이 block 하나의 내용 안에서 끝나면 그
+block 만 다시 잘라 해석하고, 실효 QoS 에서 달라진 key / XML 경로를 읽은 규칙만 재실행한다.
+block 밖 (default profile, participant 등) 편집이면 block 목록을 다시 만들되, 내용과 default
+profile 이 같은 block 은 이전 결과를 그대로 쓴다.
+
+짝 reader 파일은 manifest 의 topic writer / reader profile 로, 없으면 같은 디렉터리에서 이름의
+pub / publisher / writer 를 sub / subscriber / reader 로 바꾼 파일로 찾는다. 두 파일의 첫
+PUB / SUB profile 에 CROSS_RULES 를 적용하고 결과를 양쪽 문서에 표시한다 (열려 있지 않은
+파일은 디스크에서 읽는다).
+
+진단 범위는 규칙이 읽은 요소 중 profile block 안에 실제로 있는 첫 요소이고, 값이 상속 /
+기본값이면 profile 시작 태그다. SEVERITY_COLOR 의 네 단계를 audit.SEVERITY_ORDER 순으로
+Error / Warning / Information / Hint 로 옮기고, 메시지 앞에 [CRITICAL] 등을 붙인다.
+"""
+import bisect
+import json
+import pathlib
+import re
+import sys
+import time
+from urllib.parse import unquote, urlparse
+
+from .audit import SEVERITY_ORDER
+from .manifest import load_manifest, parse_duration_ms
+from .qos_checker import (CROSS_RULES, ENDPOINT_PROFILE_RE, ENDPOINT_SIDE, IS_DEFAULT_RE,
+                          PROFILE_NAME_RE, RULES, TAG_PATHS, TrackedQos, TrackedXml,
+                          call_cross_rule, default_profiles, find_block, resolve_qos,
+                          scoped_span, set_timing)
+from .whatif import changed_reads, timing_reads
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli lsp [publish_period=<Nms>] [rtt=<Nms>] "
+         "[manifest=<deploy.yaml>]")
+
+LSP_SEVERITY = {sev: i for i, sev in enumerate(SEVERITY_ORDER, 1)}
+TIMING_CHANGED = {("", "publish_period_ms"), ("", "rtt_ns")}
+PAIR_NAMES = (("publisher", "subscriber"), ("writer", "reader"), ("pub", "sub"))
+SYNC_INCREMENTAL = 2
+METHOD_NOT_FOUND = -32601
+
+
+# ────────── 규칙 결과 + 의존성 ──────────
+class Checks:
+    """
+    규칙 목록 [(side | None, fn, severity)] 의 결과와 의존성. side 가 None 이면 CROSS_RULES.
+    updated() 는 새 객체를 돌려주므로 같은 block 을 가진 profile 끼리 공유해도 된다.
+    """
+
+    def __init__(self, rules: list, eff: dict, run: bool = True):
+        self.rules, self.eff = rules, eff
+        self.deps, self.results = {}, {}
+        if run:
+            for side, fn, _ in rules:
+                self._run(side, fn)
+
+    def _run(self, side, fn) -> None:
+        reads = set()
+        if side is None:
+            (px, pq), (sx, sq) = self.eff["PUB"], self.eff["SUB"]
+            msg = call_cross_rule(fn, TrackedXml(px, "PUB", reads), TrackedXml(sx, "SUB", reads),
+                                  TrackedQos(pq, "PUB", reads), TrackedQos(sq, "SUB", reads))
+        else:
+            xml, q = self.eff[side]
+            msg = fn(TrackedXml(xml, side, reads), TrackedQos(q, side, reads))
+        self.deps[side, fn] = frozenset(reads) | timing_reads(fn)
+        self.results[side, fn] = msg
+
+    def updated(self, eff: dict, extra_changed: set = frozenset()) -> tuple["Checks", int]:
+        """eff 로 바꾼 사본과 재실행한 규칙 수."""
+        changed = set(extra_changed)
+        for side in eff:
+            if eff[side] is not self.eff[side]:
+                changed |= changed_reads(side, self.eff[side], eff[side], self.deps.values())
+        new = Checks(self.rules, eff, run=False)
+        new.deps, new.results = dict(self.deps), dict(self.results)
+        dirty = [(side, fn) for side, fn, _ in self.rules if self.deps[side, fn] & changed]
+        for side, fn in dirty:
+            new._run(side, fn)
+        return new, len(dirty)
+
+    def findings(self):
+        """[(severity, fn, msg, reads)] — 규칙 순서."""
+        return [(sev, fn, self.results[side, fn], self.deps[side, fn])
+                for side, fn, sev in self.rules if self.results[side, fn]]
+
+
+def _staged(entries, side):
+    return [(side, fn, sev) for fn, sev, stage in sorted(entries, key=lambda e: e[2])]
+
+
+SINGLE_RULES = {side: _staged(RULES, side) for side in ("PUB", "SUB")}
+PAIR_RULES = _staged(CROSS_RULES, None)
+
+
+# ────────── 문서 모델 ──────────
+def _element_range(eff_xml: str, limit: int, path: tuple[str, ...]) -> tuple[int, int] | None:
+    """eff_xml 에서 checker 가 읽는 path 요소 전체 (태그 포함) 의 범위. limit 이후면 None."""
+    span = scoped_span(eff_xml, path)
+    if span is None or span[0] >= limit:
+        return None
+    s, e = span
+    start = eff_xml.rfind("<", 0, s)
+    if s == e and eff_xml[:s].endswith("/>"):          # <tag/>
+        return start, s
+    close = eff_xml.find(">", e)
+    return start, (close + 1 if close >= 0 else e)
+
+
+def _read_paths(reads, side: str):
+    for s, key in reads:
+        if s != side:
+            continue
+        if isinstance(key, tuple):
+            yield key
+        elif key == "partition_list":
+            yield ("partition",)
+        elif key in TAG_PATHS:
+            yield TAG_PATHS[key][0]
+
+
+class Profile:
+    __slots__ = ("tag", "side", "name", "default", "start", "cstart", "cend", "end",
+                 "block", "checks", "_diags")
+
+    def __init__(self, text: str, tag: str, attrs: str, b: tuple[int, int, int, int]):
+        self.tag, self.side = tag, ENDPOINT_SIDE[tag]
+        name = PROFILE_NAME_RE.search(attrs)
+        self.name = name.group(1) if name else ""
+        self.default = bool(IS_DEFAULT_RE.search(attrs))
+        self.start, self.cstart, self.cend, self.end = b
+        self.block = text[self.start:self.end]
+        self.checks, self._diags = None, None
+
+    def shift(self, delta: int) -> None:
+        self.start += delta
+        self.cstart += delta
+        self.cend += delta
+        self.end += delta
+
+    def locate(self, reads, side: str) -> tuple[int, int]:
+        """reads 중 block 안에 있는 첫 요소의 (block 기준) 범위, 없으면 시작 태그."""
+        eff_xml = self.checks.eff[side][0] if self.checks else self.block
+        found = [r for p in set(_read_paths(reads, side))
+                 if (r := _element_range(eff_xml, len(self.block), p))]
+        return min(found) if found else (0, self.cstart - self.start)
+
+    def diagnostics(self) -> list[tuple[int, int, str, str, str]]:
+        """[(block 기준 시작, 끝, severity, rule, msg)] — 규칙을 다시 돌렸을 때만 새로 계산."""
+        if self._diags is None:
+            self._diags = [(*self.locate(reads, self.side), sev, fn.__name__, msg)
+                           for sev, fn, msg, reads in self.checks.findings()]
+        return self._diags
+
+
+class Document:
+    """문서 text, 줄 시작 offset, endpoint profile block 목록."""
+
+    def __init__(self, uri: str, text: str):
+        self.uri, self.text = uri, text
+        self.defaults_doc = None
+        self.profiles: list[Profile] = []
+        self.stats = {"reparsed": 0, "rerun": 0}
+        self._index_lines()
+        self._rescan()
+
+    # ── 위치 변환 (LSP 의 character 는 UTF-16 code unit) ──
+    def _index_lines(self) -> None:
+        self.lines = [0] + [m.end() for m in re.finditer("\n", self.text)]
+
+    def offset(self, pos: dict) -> int:
+        line = min(pos["line"], len(self.lines) - 1)
+        start = self.lines[line]
+        end = self.lines[line + 1] if line + 1 < len(self.lines) else len(self.text)
+        seg = self.text[start:end]
+        if seg.isascii():
+            return start + min(pos["character"], len(seg))
+        units = 0
+        for i, ch in enumerate(seg):
+            if units >= pos["character"]:
+                return start + i
+            units += 2 if ord(ch) > 0xFFFF else 1
+        return end
+
+    def position(self, offset: int) -> dict:
+        line = bisect.bisect_right(self.lines, offset) - 1
+        seg = self.text[self.lines[line]:offset]
+        units = len(seg) if seg.isascii() else len(seg.encode("utf-16-le")) // 2
+        return {"line": line, "character": units}
+
+    # ── 해석 ──
+    def _evaluate(self, p: Profile, memo: dict | None = None) -> None:
+        eff = {p.side: resolve_qos(p.block, p.side, self.defaults_doc)}
+        key = (p.side, eff[p.side][0])
+        if memo is not None and key in memo:
+            p.checks = memo[key]
+        elif p.checks is None:
+            p.checks = Checks(SINGLE_RULES[p.side], eff)
+            self.stats["rerun"] += len(SINGLE_RULES[p.side])
+        else:
+            p.checks, n = p.checks.updated(eff)
+            self.stats["rerun"] += n
+        if memo is not None:
+            memo[key] = p.checks
+        p._diags = None
+        self.stats["reparsed"] += 1
+
+    def _rescan(self) -> None:
+        """block 목록을 다시 만든다. 내용과 default profile 이 그대로인 block 은 결과 재사용."""
+        old = {}
+        for p in self.profiles:
+            old.setdefault((p.side, p.block), p)
+        defaults = default_profiles(self.text)
+        defaults_doc = "\n".join(defaults[k] for k in ("PUB", "SUB", "PARTICIPANT")
+                                 if k in defaults)
+        same_defaults = defaults_doc == self.defaults_doc
+        self.defaults_doc = defaults_doc
+
+        profiles, memo, pos = [], {}, 0
+        while (m := ENDPOINT_PROFILE_RE.search(self.text, pos)) is not None:
+            tag = m.group(1).lower()
+            b = find_block(self.text, tag, m.start())
+            p = Profile(self.text, tag, m.group(2), b)
+            prev = old.get((p.side, p.block))
+            if prev is not None:
+                p.checks = prev.checks
+                if same_defaults:
+                    p._diags = prev._diags
+            if prev is None or not same_defaults:
+                self._evaluate(p, memo)
+            profiles.append(p)
+            pos = max(b[3], m.end())
+        self.profiles = profiles
+
+    def apply(self, change: dict) -> None:
+        """textDocument/didChange 의 contentChange 하나."""
+        if "range" not in change:
+            self.text = change["text"]
+            self._index_lines()
+            self._rescan()
+            return
+        s, e = self.offset(change["range"]["start"]), self.offset(change["range"]["end"])
+        new = change["text"]
+        delta = len(new) - (e - s)
+        self.text = self.text[:s] + new + self.text[e:]
+        self._index_lines()
+
+        i = bisect.bisect_right([p.start for p in self.profiles], s) - 1
+        p = self.profiles[i] if i >= 0 else None
+        if p is None or p.default or not (p.cstart <= s and e <= p.cend) \
+                or ENDPOINT_PROFILE_RE.search(new) or "<!--" in new or "-->" in new:
+            self._rescan()
+            return
+        b = find_block(self.text, p.tag, p.start)
+        if b is None or b[3] != p.end + delta:           # 닫는 태그가 바뀜
+            self._rescan()
+            return
+        p.cend += delta
+        p.end += delta
+        p.block = self.text[p.start:p.end]
+        for q in self.profiles[i + 1:]:
+            q.shift(delta)
+        self._evaluate(p)
+
+    def first(self, side: str) -> Profile | None:
+        return next((p for p in self.profiles if p.side == side and not p.default), None) \
+            or next((p for p in self.profiles if p.side == side), None)
+
+
+# ────────── 파일 경로 ──────────
+def uri_to_path(uri: str) -> pathlib.Path:
+    return pathlib.Path(unquote(urlparse(uri).path))
+
+
+def partner_names(name: str) -> list[tuple[str, str]]:
+    """파일 이름 → [(짝 이름, 짝의 side)]. pub_x.xml → sub_x.xml (SUB) 처럼."""
+    out = []
+    for pub, sub in PAIR_NAMES:
+        for a, b, side in ((pub, sub, "SUB"), (sub, pub, "PUB")):
+            swapped = re.sub(rf"(?<![a-z]){a}(?![a-z])", b, name, flags=re.I)
+            if swapped != name:
+                out.append((swapped, side))
+        if out:
+            return out
+    return out
+
+
+# ────────── 서버 ──────────
+class Server:
+    def __init__(self, out, pp_ms=None, rtt_ms=None, manifest=None):
+        self.out = out
+        self.docs: dict[str, Document] = {}        # 열린 문서
+        self.disk: dict[str, tuple[float, Document]] = {}
+        self.pairs: dict[tuple[str, str], Checks] = {}
+        self.manifest_pairs: dict[str, set[tuple[str, str]]] = {}
+        self.timing = {"publish_period": pp_ms, "rtt": rtt_ms}
+        self.manifest = manifest
+        self.shutdown = False
+        set_timing(pp_ms, rtt_ms)
+
+    # ── JSON-RPC ──
+    def send(self, msg: dict) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **msg}, ensure_ascii=False).encode("utf-8")
+        self.out.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        self.out.flush()
+
+    def handle(self, msg: dict) -> bool:
+        """메시지 하나 처리. exit 이면 False."""
+        method, params = msg.get("method"), msg.get("params") or {}
+        handler = getattr(self, "on_" + (method or "").replace("/", "_"), None)
+        if method == "exit":
+            return False
+        if handler is None:
+            if "id" in msg and method:
+                self.send({"id": msg["id"], "error": {"code": METHOD_NOT_FOUND,
+                                                      "message": f"unsupported: {method}"}})
+            return True
+        result = handler(params)
+        if "id" in msg:
+            self.send({"id": msg["id"], "result": result})
+        return True
+
+    # ── 설정 ──
+    def configure(self, opts: dict) -> None:
+        pp = opts.get("publish_period", self.timing["publish_period"])
+        rtt = opts.get("rtt", self.timing["rtt"])
+        pp = parse_duration_ms(pp, "publish_period") if isinstance(pp, str) else pp
+        rtt = parse_duration_ms(rtt, "rtt") if isinstance(rtt, str) else rtt
+        if opts.get("manifest"):
+            self.manifest = opts["manifest"]
+        if (pp, rtt) != (self.timing["publish_period"], self.timing["rtt"]):
+            self.timing = {"publish_period": pp, "rtt": rtt}
+            set_timing(pp, rtt)
+            for doc in self.docs.values():
+                for p in doc.profiles:
+                    p.checks, _ = p.checks.updated(p.checks.eff, TIMING_CHANGED)
+                    p._diags = None
+            self.pairs = {k: c.updated(c.eff, TIMING_CHANGED)[0] for k, c in self.pairs.items()}
+
+    def _load_manifest(self) -> None:
+        self.manifest_pairs = {}
+        if not self.manifest:
+            return
+        m = load_manifest(pathlib.Path(self.manifest))
+        for t in m["topics"]:
+            w = t["writer"]["profile"]
+            for r in t["readers"]:
+                self.manifest_pairs.setdefault(w, set()).add((r["profile"], "SUB"))
+                self.manifest_pairs.setdefault(r["profile"], set()).add((w, "PUB"))
+
+    def on_initialize(self, params: dict) -> dict:
+        self.configure(params.get("initializationOptions") or {})
+        self._load_manifest()
+        return {"capabilities": {"textDocumentSync": {"openClose": True,
+                                                      "change": SYNC_INCREMENTAL}},
+                "serverInfo": {"name": "check_qos"}}
+
+    def on_shutdown(self, _params):
+        self.shutdown = True
+        return None
+
+    def on_workspace_didChangeConfiguration(self, params: dict) -> None:
+        opts = (params.get("settings") or {}).get("check_qos") or {}
+        manifest = self.manifest
+        self.configure(opts)
+        if self.manifest != manifest:
+            self._load_manifest()
+            self.pairs = {}
+        self.publish_all()
+
+    # ── 문서 동기화 ──
+    def on_textDocument_didOpen(self, params: dict) -> None:
+        td = params["textDocument"]
+        self.docs[td["uri"]] = Document(td["uri"], td["text"])
+        self.publish(td["uri"])
+
+    def on_textDocument_didChange(self, params: dict) -> None:
+        doc = self.docs.get(params["textDocument"]["uri"])
+        if doc is None:
+            return
+        for change in params["contentChanges"]:
+            doc.apply(change)
+        self.publish(doc.uri)
+
+    def on_textDocument_didClose(self, params: dict) -> None:
+        uri = params["textDocument"]["uri"]
+        self.docs.pop(uri, None)
+        self.pairs = {k: v for k, v in self.pairs.items() if uri not in k}
+        self.send({"method": "textDocument/publishDiagnostics",
+                   "params": {"uri": uri, "diagnostics": []}})
+        for partner, _ in self.partners(uri):
+            if partner in self.docs:
+                self.publish(partner, with_partners=False)
+
+    # ── 짝 파일 ──
+    def document(self, uri: str) -> Document | None:
+        """열린 문서, 아니면 디스크 (mtime 캐시)."""
+        if uri in self.docs:
+            return self.docs[uri]
+        path = uri_to_path(uri)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+        cached = self.disk.get(uri)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, Document(uri, path.read_text(encoding="utf-8", errors="ignore")))
+            self.disk[uri] = cached
+        return cached[1]
+
+    def partners(self, uri: str) -> list[tuple[str, str]]:
+        """[(짝 uri, 짝의 side)]"""
+        path = uri_to_path(uri)
+        listed = self.manifest_pairs.get(str(path.resolve()))
+        if listed:
+            return sorted((pathlib.Path(p).as_uri(), side) for p, side in listed)
+        out = []
+        for name, side in partner_names(path.name):
+            other = path.with_name(name)
+            if other.as_uri() in self.docs or other.exists():
+                out.append((other.as_uri(), side))
+        return out
+
+    def pair_diagnostics(self, uri: str, doc: Document) -> list:
+        out = []
+        for partner_uri, partner_side in self.partners(uri):
+            other = self.document(partner_uri)
+            if other is None:
+                continue
+            side = "PUB" if partner_side == "SUB" else "SUB"
+            pub_doc, sub_doc = (doc, other) if side == "PUB" else (other, doc)
+            w, r = pub_doc.first("PUB"), sub_doc.first("SUB")
+            if w is None or r is None:
+                continue
+            key = (pub_doc.uri, sub_doc.uri)
+            eff = {"PUB": w.checks.eff["PUB"], "SUB": r.checks.eff["SUB"]}
+            checks = self.pairs.get(key)
+            if checks is None:
+                checks = Checks(PAIR_RULES, eff)
+            elif any(checks.eff[s] is not eff[s] for s in eff):
+                checks, n = checks.updated(eff)
+                doc.stats["rerun"] += n
+            self.pairs[key] = checks
+            mine = w if side == "PUB" else r
+            label = (f"{uri_to_path(pub_doc.uri).name} → {uri_to_path(sub_doc.uri).name}")
+            for sev, fn, msg, reads in checks.findings():
+                s, e = mine.locate(reads, side)
+                out.append((mine.start + s, mine.start + e, sev, fn.__name__,
+                            f"{msg}\n(cross check {label})"))
+        return out
+
+    # ── 진단 발행 ──
+    def publish(self, uri: str, with_partners: bool = True) -> None:
+        doc = self.docs[uri]
+        items = [(p.start + s, p.start + e, sev, rule, msg)
+                 for p in doc.profiles for s, e, sev, rule, msg in p.diagnostics()]
+        items += self.pair_diagnostics(uri, doc)
+        self.send({"method": "textDocument/publishDiagnostics", "params": {
+            "uri": uri,
+            "diagnostics": [{"range": {"start": doc.position(s), "end": doc.position(e)},
+                             "severity": LSP_SEVERITY.get(sev, LSP_SEVERITY["Warn"]),
+                             "code": rule, "source": "check_qos",
+                             "message": f"[{sev.upper()}] {msg}"}
+                            for s, e, sev, rule, msg in items]}})
+        if with_partners:
+            for partner, _ in self.partners(uri):
+                if partner in self.docs:
+                    self.publish(partner, with_partners=False)
+
+    def publish_all(self) -> None:
+        for uri in list(self.docs):
+            self.publish(uri, with_partners=False)
+
+
+# ────────── stdio ──────────
+def read_message(stream) -> dict | None:
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        key, _, value = line.decode("ascii", errors="replace").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    if length is None:
+        return {}
+    return json.loads(stream.read(length).decode("utf-8"))
+
+
+def serve(stdin, stdout, **opts) -> int:
+    server = Server(stdout, **opts)
+    while (msg := read_message(stdin)) is not None:
+        t0 = time.perf_counter()
+        try:
+            if not server.handle(msg):
+                break
+        except SystemExit as e:                   # 잘못된 설정 값 (parse_duration_ms 등)
+            if "id" in msg:
+                server.send({"id": msg["id"], "error": {"code": -32602, "message": str(e)}})
+        if msg.get("method") == "textDocument/didChange":
+            ms = (time.perf_counter() - t0) * 1e3
+            server.send({"method": "window/logMessage", "params": {
+                "type": 4, "message": f"check_qos: re-checked in {ms:.1f} ms"}})
+    return 0 if server.shutdown else 1
+
+
+def main(argv: list[str]) -> None:
+    opts = {}
+    for arg in argv:
+        key, sep, val = arg.partition("=")
+        if key == "publish_period" and sep:
+            opts["pp_ms"] = parse_duration_ms(val, "publish_period")
+        elif key == "rtt" and sep:
+            opts["rtt_ms"] = parse_duration_ms(val, "rtt")
+        elif key == "manifest" and sep:
+            opts["manifest"] = val
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+    sys.exit(serve(sys.stdin.buffer, sys.stdout.buffer, **opts))
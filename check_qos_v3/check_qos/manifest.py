@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Deployment manifest 로더 (YAML / JSON).
+
+예시::
+
+    defaults:
+      rtt: 50ms
+      loss_rate: 0.01
+    hosts:
+      robot1:
+        wlan0: 54Mbps
+      base:
+        eth0: 1Gbps
+    topics:
+      - name: /scan
+        writer: {profile: pub.xml, host: robot1, interface: wlan0, participant: lidar_node}
+        readers:
+          - {profile: sub.xml, host: base, interface: eth0}
+        publish_period: 40ms
+        sample_size: 2KiB
+        instances: 1            # (선택) durable replay 분석용
+        late_joiners: 4         # (선택) 동시에 재시작하는 Reader 수
+        socket_buffer: 208KiB   # (선택) 송수신 socket buffer 크기
+        type_bounds: plain      # (선택) plain | bounded | unbounded (zerocopy 분석용)
+        type: sensor_msgs/msg/LaserScan   # (선택) 없는 sample_size / type_bounds 를 계산
+    msg_paths: [../src]         # (선택) .msg / .srv / .idl 을 찾을 경로 (기본: manifest 디렉터리)
+
+type: 이 있는 topic 은 msg_types.TypeResolver 로 최대 CDR 크기를 구해 type_size 에 두고,
+sample_size 가 없으면 그 값 (unbounded 면 defaults 의 unbounded_length 로 본 추정값) 을,
+type_bounds 가 없으면 타입 분류를 쓴다.
+"""
+import json
+import math
+import pathlib
+import re
+import sys
+
+from .qos_checker import load_text, resolve_qos
+
+# ────────── 단위 변환 ──────────
+_QUANTITY_RE = re.compile(r"^\s*([0-9]*\.?[0-9]+(?:[eE][-+]?\d+)?)\s*([A-Za-z/%]*)\s*$")
+
+DURATION_UNITS_MS = {"": 1.0, "ms": 1.0, "s": 1000.0, "us": 1e-3, "ns": 1e-6}
+SIZE_UNITS_B = {"": 1, "b": 1, "kb": 1000, "kib": 1024,
+                "mb": 1_000_000, "mib": 1 << 20, "gb": 1_000_000_000, "gib": 1 << 30}
+RATE_UNITS_BPS = {"": 1, "bps": 1, "kbps": 1e3, "mbps": 1e6, "gbps": 1e9}
+# 메시지 타입 크기: plain = 고정 크기 필드만, bounded = 상한 있는 string / sequence 포함
+TYPE_BOUNDS = ("plain", "bounded", "unbounded")
+
+
+def parse_quantity(value, units: dict, what: str) -> float:
+    """'40ms', '2KiB', '54Mbps' 같은 값을 기준 단위 float 로 변환 (숫자만 있으면 기준 단위)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = _QUANTITY_RE.match(str(value))
+    if not m or m.group(2).lower() not in units:
+        sys.exit(f"[ERROR] {what} value must look like "
+                 f"'<N>{'|'.join(u for u in units if u)}', got {value!r}")
+    return float(m.group(1)) * units[m.group(2).lower()]
+
+
+def parse_duration_ms(value, what: str = "duration") -> float:
+    return parse_quantity(value, DURATION_UNITS_MS, what)
+
+
+def parse_size_bytes(value, what: str = "sample_size") -> int:
+    return int(parse_quantity(value, SIZE_UNITS_B, what))
+
+
+def parse_rate_bps(value, what: str = "capacity") -> float:
+    return parse_quantity(value, RATE_UNITS_BPS, what)
+
+
+def parse_loss_rate(value) -> float:
+    if isinstance(value, str) and value.strip().endswith("%"):
+        rate = float(value.strip()[:-1]) / 100
+    else:
+        rate = float(value)
+    if not 0 <= rate < 1:
+        sys.exit(f"[ERROR] loss_rate must be in [0, 1), got {value!r}")
+    return rate
+
+
+# ────────── 표시 형식 ──────────
+def _sign(n: float, signed: bool) -> str:
+    return ("+" if n >= 0 else "-") if signed else ("-" if n < 0 else "")
+
+
+def fmt_bytes(n: float, signed: bool = False) -> str:
+    """bytes → '245.8 kB'. signed 면 증감 표시 ('+245.8 kB'), 무한대는 'unbounded'."""
+    if math.isinf(n):
+        return "unbounded"
+    sign, n = _sign(n, signed), abs(n)
+    for unit, scale in (("MB", 1e6), ("kB", 1e3)):
+        if n >= scale:
+            return f"{sign}{n/scale:.1f} {unit}"
+    return f"{sign}{n:.0f} B"
+
+
+def fmt_bps(bps: float, signed: bool = False) -> str:
+    """bits/s → '12.34 Mbps'. signed 면 증감 표시 ('+12.34 Mbps')."""
+    sign, bps = _sign(bps, signed), abs(bps)
+    for unit, scale in (("Gbps", 1e9), ("Mbps", 1e6), ("kbps", 1e3)):
+        if bps >= scale:
+            return f"{sign}{bps/scale:.2f} {unit}"
+    return f"{sign}{bps:.0f} bps"
+
+
+# ────────── manifest 로드 ──────────
+def _read_document(path: pathlib.Path) -> dict:
+    text = load_text(path)
+    if path.suffix.lower() == ".json":
+        return json.loads(text)
+    import yaml                                  # python3-yaml
+    return yaml.safe_load(text) or {}
+
+
+def _endpoint(entry, base: pathlib.Path, topic: str, role: str) -> dict:
+    # 문자열이면 프로파일 경로만 지정된 것으로 간주
+    if isinstance(entry, str):
+        entry = {"profile": entry}
+    if not isinstance(entry, dict) or "profile" not in entry:
+        sys.exit(f"[ERROR] {topic}: {role} entry needs a 'profile' path")
+    path = (base / entry["profile"]).resolve()
+    xml, q = resolve_qos(load_text(path), "PUB" if role == "writer" else "SUB")
+    return {
+        "profile": str(path),
+        "xml": xml,
+        "q": q,
+        "host": str(entry.get("host", "")),
+        "interface": str(entry.get("interface", "")),
+        "count": int(entry.get("count", 1)),
+        # (선택) 같은 host 에서 이름이 같은 endpoint 는 participant 하나를 공유 (discovery 분석용)
+        "participant": str(entry.get("participant", "")),
+    }
+
+
+def load_manifest(path: pathlib.Path, overrides: dict | None = None,
+                  topic_overrides: dict[str, dict] | None = None) -> dict:
+    """
+    manifest 를 읽어 단위가 정규화된 dict 로 반환. overrides 는 defaults 를 덮어쓰고 (CLI 인자),
+    topic_overrides ({topic: {key: 값}}) 는 그 topic 항목의 값까지 덮어쓴다 (bag 측정값 등).
+    """
+    doc = _read_document(path)
+    base = path.parent
+    defaults = {**(doc.get("defaults", {}) or {}), **(overrides or {})}
+
+    hosts = {}
+    for host, ifaces in (doc.get("hosts", {}) or {}).items():
+        hosts[str(host)] = {str(name): parse_rate_bps(cap, f"{host}.{name} capacity")
+                            for name, cap in (ifaces or {}).items()}
+
+    resolver = None
+    topics = []
+    for t in doc.get("topics", []) or []:
+        name = str(t.get("name", ""))
+        if not name or "writer" not in t:
+            sys.exit(f"[ERROR] manifest topic entries need 'name' and 'writer': {t!r}")
+
+        forced = (topic_overrides or {}).get(name, {})
+
+        def pick(key, _t=t):
+            return forced[key] if key in forced else _t.get(key, defaults.get(key))
+
+        pp = pick("publish_period")
+        rtt = pick("rtt")
+        size = pick("sample_size")
+        sock = pick("socket_buffer")
+        bounds = pick("type_bounds")
+        if bounds is not None and bounds not in TYPE_BOUNDS:
+            sys.exit(f"[ERROR] {name} type_bounds must be one of {', '.join(TYPE_BOUNDS)}, "
+                     f"got {bounds!r}")
+        type_size = None
+        if t.get("type"):
+            from .msg_types import DEFAULT_UNBOUNDED_LENGTH, TypeResolver
+            if resolver is None:
+                paths = doc.get("msg_paths") or ["."]
+                resolver = TypeResolver([base / p for p in
+                                         ([paths] if isinstance(paths, str) else paths)])
+            length = pick("unbounded_length")
+            type_size = resolver.size(str(t["type"]), int(length) if length is not None
+                                      else DEFAULT_UNBOUNDED_LENGTH)
+            if "error" not in type_size:
+                size = type_size["estimate"] if size is None else size
+                bounds = type_size["bounds"] if bounds is None else bounds
+        topics.append({
+            "name": name,
+            "writer": _endpoint(t["writer"], base, name, "writer"),
+            "readers": [_endpoint(r, base, name, "reader") for r in t.get("readers", []) or []],
+            "publish_period_ms": parse_duration_ms(pp, f"{name} publish_period") if pp is not None else None,
+            "rtt_ms": parse_duration_ms(rtt, f"{name} rtt") if rtt is not None else None,
+            "sample_size": parse_size_bytes(size, f"{name} sample_size") if size is not None else None,
+            "loss_rate": parse_loss_rate(pick("loss_rate") or 0),
+            "instances": int(pick("instances")) if pick("instances") is not None else None,
+            "late_joiners": int(pick("late_joiners")) if pick("late_joiners") is not None else None,
+            "socket_buffer": parse_size_bytes(sock, f"{name} socket_buffer") if sock is not None else None,
+            "type_bounds": bounds,
+            "msg_type": type_size and type_size["type"],
+            "type_size": type_size,
+        })
+
+    return {"path": str(path), "defaults": defaults, "hosts": hosts, "topics": topics}
+
+
+def link_capacity_bps(manifest: dict, host: str, interface: str) -> float | None:
+    return manifest["hosts"].get(host, {}).get(interface)
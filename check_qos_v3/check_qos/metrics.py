@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""audit 결과 / 검사기 지연시간을 Prometheus textfile 형식으로 내보내기.
+
+node_exporter 의 textfile collector 디렉터리에 쓰면 그대로 수집된다::
+
+    ros2 run check_qos check_qos_cli audit <xml|dir>... manifest=deploy.yaml \\
+        metrics=/var/lib/node_exporter/textfile/qos_audit.prom
+
+수집기가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 rename 한다.
+topic / host label 은 manifest 에서 profile 파일 경로로 찾는다 (없으면 빈 값).
+"""
+import bisect
+import os
+import pathlib
+import time
+from collections import Counter
+
+# 초 단위 상한 (le). profile 하나의 해석 / 규칙 평가는 보통 수십 µs ~ 수 ms
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 5e-2,
+                   0.1, 1.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)      # 마지막 = +Inf
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+
+    def lines(self, name: str, labels: str = "") -> list[str]:
+        out, total = [], 0
+        sep = "," if labels else ""
+        for le, n in zip((*(f"{b:g}" for b in self.buckets), "+Inf"), self.counts):
+            total += n
+            out.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {total}')
+        label_set = f"{{{labels}}}" if labels else ""
+        out += [f"{name}_sum{label_set} {self.sum:.9f}", f"{name}_count{label_set} {total}"]
+        return out
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**kv) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in kv.items())
+
+
+class AuditMetrics:
+    """
+    audit 한 번의 지연시간 histogram 과 finding 개수. observe 는 audit / intern.Interner 가,
+    finding 은 audit 이 finding 마다 호출 (finding 목록을 들고 있지 않아도 되게).
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.latency = {"parse": Histogram(), "rules": Histogram(), "cross_rules": Histogram()}
+        self.found = Counter()                  # (severity, rule, topic, host) → 개수
+        self.by_sev = Counter()
+        self._places = None
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self.latency[stage].observe(seconds)
+
+    # ── 출력 ───────────────────────────────────────
+    @staticmethod
+    def _endpoints(manifest: dict | None) -> dict[str, list[tuple[str, str]]]:
+        """절대 profile 경로 → [(topic, host)]."""
+        out = {}
+        for t in (manifest or {}).get("topics", []):
+            for ep in (t["writer"], *t["readers"]):
+                out.setdefault(ep["profile"], []).append((t["name"], ep["host"]))
+        return out
+
+    def finding(self, f: dict, manifest: dict | None = None) -> None:
+        self.by_sev[f["severity"]] += 1
+        if f["side"] == "PAIR":
+            places = [(f["topic"], f["host"])]
+        else:
+            if self._places is None:
+                self._places = self._endpoints(manifest)
+            places = self._places.get(str(pathlib.Path(f["file"]).resolve()), [("", "")])
+        for topic, host in places:
+            self.found[(f["severity"], f["rule"], topic, host)] += 1
+
+    def render(self, report: dict, manifest: dict | None = None) -> str:
+        shard = f"{report['shard'][0]}/{report['shard'][1]}"
+        lines = ["# HELP qos_audit_findings QoS findings in the last audit run.",
+                 "# TYPE qos_audit_findings gauge"]
+        for (sev, rule, topic, host), n in sorted(self.found.items()):
+            lines.append("qos_audit_findings{" + _labels(shard=shard, severity=sev, rule=rule,
+                                                         topic=topic, host=host) + f"}} {n}")
+        lines += ["# HELP qos_audit_findings_by_severity QoS findings per severity.",
+                  "# TYPE qos_audit_findings_by_severity gauge"]
+        lines += ["qos_audit_findings_by_severity{" + _labels(shard=shard, severity=sev)
+                  + f"}} {n}" for sev, n in sorted(self.by_sev.items())]
+
+        for name, value, help_ in (
+                ("profiles_checked", report["profiles"], "Endpoint profiles checked."),
+                ("pairs_checked", report["pairs"], "Writer/reader pairs checked."),
+                ("unique_signatures", report["signatures"], "Distinct effective QoS signatures."),
+                ("run_seconds", time.time() - self.started, "Wall time of the audit run."),
+                ("last_run_timestamp_seconds", time.time(), "Unix time the audit finished.")):
+            value = f"{value:.3f}" if isinstance(value, float) else value
+            lines += [f"# HELP qos_audit_{name} {help_}", f"# TYPE qos_audit_{name} gauge",
+                      f"qos_audit_{name}{{{_labels(shard=shard)}}} {value}"]
+
+        for stage, help_ in (("parse", "Per-profile load + QoS resolution latency."),
+                             ("rules", "Single-profile rule evaluation latency per signature."),
+                             ("cross_rules", "Cross rule evaluation latency per signature pair.")):
+            name = f"qos_audit_{stage}_seconds"
+            lines += [f"# HELP {name} {help_}", f"# TYPE {name} histogram"]
+            lines += self.latency[stage].lines(name, _labels(shard=shard))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path, report: dict, manifest: dict | None = None) -> None:
+        path = pathlib.Path(path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render(report, manifest), encoding="utf-8")
+        os.replace(tmp, path)
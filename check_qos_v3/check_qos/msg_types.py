@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""ROS 2 .msg / .srv / .action / .idl 정의에서 최대 CDR 직렬화 크기 계산.
+
+    ros2 run check_qos check_qos_cli types <workspace|dir|file>... [type=<pkg/msg/Name>]...
+                                           [unbounded_length=<N>] [--no-cache]
+    ros2 run check_qos check_qos_cli types <manifest.yaml> [unbounded_length=<N>]
+
+주어진 경로와 AMENT_PREFIX_PATH 의 share/ 아래에서 <pkg>/msg|srv|action/<Name>.<ext> 를
+찾아 필요한 타입만 읽는다 (중첩 타입 포함, 같은 이름은 먼저 찾은 경로 우선). 파일마다
+내용 hash 로 파싱 결과를 캐시한다 (source_scan 과 같은 방식).
+
+크기는 XCDR1 (Fast DDS 의 ROS 2 기본) 기준으로 encapsulation 4 B + 필드마다 정렬 padding +
+값이며, Fast DDS 생성 코드의 max serialized size 처럼 모든 string / sequence 가 상한까지 찬
+경우를 계산한다. 상한 없는 string / sequence 가 있으면 max 는 없고 (unbounded), 그 길이를
+unbounded_length (기본 DEFAULT_UNBOUNDED_LENGTH) 로 본 추정값만 보고한다.
+타입 분류는 manifest 의 type_bounds 와 같다: plain (고정 크기 필드만) / bounded / unbounded.
+
+manifest 의 topic 에 type: 을 주면 load_manifest 가 sample_size / type_bounds 가 없는 topic
+에 이 결과를 채운다 (msg_paths: 로 찾을 경로 지정, 기본은 manifest 디렉터리).
+"""
+import hashlib
+import json
+import math
+import os
+import pathlib
+import re
+import sys
+
+from .manifest import fmt_bytes, load_manifest
+from .qos_checker import BLUE, SEVERITY_COLOR, color, scoped_text
+from .repair import history_capacity
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli types <workspace|dir|file>... "
+         "[type=<pkg/msg/Name>]... [unbounded_length=<N>] [--no-cache]\n"
+         "       ros2 run check_qos check_qos_cli types <manifest.yaml> [unbounded_length=<N>]")
+
+CACHE_VERSION = 1
+DEFAULT_UNBOUNDED_LENGTH = 256       # 상한 없는 string / sequence 의 추정 길이 (문자 / 요소)
+ENCAPSULATION = 4
+INTERFACE_DIRS = {".msg": "msg", ".srv": "srv", ".action": "action", ".idl": None}
+SKIP_DIRS = {"build", "log", ".git", "__pycache__", "node_modules"}
+DEFAULT_ALLOCATED_SAMPLES = 100      # ResourceLimitsQosPolicy::allocated_samples 기본값
+DEFAULT_EXTRA_SAMPLES = 1
+
+# 이름 → 바이트 수 (정렬 = min(크기, 8)). .msg 이름과 IDL 이름을 함께 둔다.
+PRIMITIVES = {
+    "bool": 1, "byte": 1, "char": 1, "int8": 1, "uint8": 1, "boolean": 1, "octet": 1,
+    "int16": 2, "uint16": 2, "short": 2, "unsigned short": 2,
+    "int32": 4, "uint32": 4, "float32": 4, "long": 4, "unsigned long": 4, "float": 4,
+    "wchar": 4,                                  # Fast CDR 는 wchar 를 4 B 로 직렬화
+    "int64": 8, "uint64": 8, "float64": 8, "long long": 8, "unsigned long long": 8,
+    "double": 8, "long double": 16,
+}
+
+# AMENT_PREFIX_PATH 에서 못 찾을 때 쓰는 기본 타입 (거의 모든 메시지가 Header 를 쓴다)
+BUILTIN_TYPES = {
+    "builtin_interfaces/msg/Time": [["sec", ["p", "int32"]], ["nanosec", ["p", "uint32"]]],
+    "builtin_interfaces/msg/Duration": [["sec", ["p", "int32"]], ["nanosec", ["p", "uint32"]]],
+    "std_msgs/msg/Header": [["stamp", ["t", "builtin_interfaces/msg/Time"]],
+                            ["frame_id", ["s", None]]],
+}
+
+
+class UnknownType(Exception):
+    pass
+
+
+def type_name(name: str) -> str:
+    """'sensor_msgs/LaserScan', 'sensor_msgs::msg::LaserScan' → 'sensor_msgs/msg/LaserScan'."""
+    parts = [p for p in re.split(r"::|/", name.strip()) if p]
+    if len(parts) == 2:
+        parts.insert(1, "msg")
+    if len(parts) != 3:
+        sys.exit(f"[ERROR] message type must look like 'pkg/msg/Name', got {name!r}")
+    return "/".join(parts)
+
+
+# ────────── .msg / .srv / .action ──────────
+# 타입 이름, string 상한, 배열 ([] / [N] / [<=N]), 필드 이름, 상수면 '='
+MSG_FIELD_RE = re.compile(r"^([A-Za-z_][\w/]*)(?:<=(\d+))?(\[(<=)?(\d*)\])?\s+"
+                          r"([A-Za-z_]\w*)\s*(=)?")
+
+
+def _msg_type(base: str, bound: str | None, pkg: str) -> list:
+    if base in ("string", "wstring"):
+        return ["s" if base == "string" else "w", int(bound) if bound else None]
+    if base in PRIMITIVES:
+        return ["p", base]
+    if base == "Header":                         # ROS 1 시절 약칭
+        return ["t", "std_msgs/msg/Header"]
+    if "/" in base:
+        return ["t", type_name(base)]
+    return ["t", f"{pkg}/msg/{base}"]
+
+
+def parse_msg(text: str, pkg: str) -> list:
+    """.msg 본문 → [[필드 이름, 타입]]. 상수는 크기에 영향이 없으므로 건너뛴다."""
+    fields = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip() if '"' not in line and "'" not in line \
+            else line.strip()
+        m = MSG_FIELD_RE.match(line)
+        if not m or m.group(7):
+            continue
+        base, bound, array, upper, count, name = m.group(1, 2, 3, 4, 5, 6)
+        t = _msg_type(base, bound, pkg)
+        if array and count and not upper:
+            t = ["a", int(count), t]
+        elif array:
+            t = ["q", int(count) if count else None, t]
+        fields.append([name, t])
+    # rosidl 은 빈 구조체에 uint8 structure_needs_at_least_one_member 를 넣는다
+    return fields or [["structure_needs_at_least_one_member", ["p", "uint8"]]]
+
+
+def parse_interface(text: str, pkg: str, kind: str, stem: str) -> dict:
+    """.msg / .srv / .action → {타입 이름: 필드}."""
+    if kind == "msg":
+        return {f"{pkg}/msg/{stem}": parse_msg(text, pkg)}
+    sections = re.split(r"^\s*---\s*$", text, flags=re.M)
+    suffixes = ("Request", "Response") if kind == "srv" else ("Goal", "Result", "Feedback")
+    return {f"{pkg}/{kind}/{stem}_{suffix}": parse_msg(body, pkg)
+            for suffix, body in zip(suffixes, sections)}
+
+
+# ────────── .idl (rosidl 이 만드는 범위) ──────────
+IDL_TOKEN_RE = re.compile(r"::|[A-Za-z_]\w*|\d+|\S")
+IDL_STRIP_RE = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/|^\s*#[^\n]*', re.S | re.M)
+IDL_ANNOTATION_RE = re.compile(r"@[\w:]+(?:\s*\([^()]*\))?")
+
+
+class _IdlParser:
+    def __init__(self, text: str):
+        text = IDL_ANNOTATION_RE.sub(" ", IDL_STRIP_RE.sub(" ", text))
+        self.tok = IDL_TOKEN_RE.findall(text)
+        self.i = 0
+        self.types, self.typedefs = {}, {}
+
+    def peek(self, k: int = 0) -> str:
+        return self.tok[self.i + k] if self.i + k < len(self.tok) else ""
+
+    def take(self, expect: str | None = None) -> str:
+        tok = self.peek()
+        if expect is not None and tok != expect:
+            raise ValueError(f"expected {expect!r}, got {tok!r}")
+        self.i += 1
+        return tok
+
+    def skip_statement(self) -> None:
+        depth = 0
+        while self.i < len(self.tok):
+            tok = self.take()
+            depth += (tok == "{") - (tok == "}")
+            if tok == ";" and depth <= 0:
+                return
+
+    def parse(self, scope: tuple = ()) -> dict:
+        while self.i < len(self.tok) and self.peek() != "}":
+            tok = self.peek()
+            if tok == "module":
+                self.take()
+                name = self.take()
+                self.take("{")
+                self.parse(scope + (name,))
+                self.take("}")
+                if self.peek() == ";":
+                    self.take()
+            elif tok == "struct":
+                self.take()
+                name = self.take()
+                if self.peek() != "{":               # forward declaration
+                    self.skip_statement()
+                    continue
+                self.take("{")
+                fields = []
+                while self.peek() not in ("}", ""):
+                    fields += self.member(scope)
+                self.take("}")
+                self.take(";")
+                self.types["/".join(scope + (name,))] = fields or [
+                    ["structure_needs_at_least_one_member", ["p", "uint8"]]]
+            elif tok == "typedef":
+                self.take()
+                t = self.type_spec(scope)
+                name = self.take()
+                self.typedefs["/".join(scope + (name,))] = self.dims(t)
+                self.take(";")
+            else:                                    # const / enum / 기타
+                self.skip_statement()
+        return self.types
+
+    def member(self, scope: tuple) -> list:
+        t = self.type_spec(scope)
+        out = []
+        while True:
+            name = self.take()
+            out.append([name, self.dims(t)])
+            if self.take() != ",":
+                return out
+
+    def dims(self, t: list) -> list:
+        counts = []
+        while self.peek() == "[":
+            self.take()
+            counts.append(int(self.take()))
+            self.take("]")
+        for n in reversed(counts):
+            t = ["a", n, t]
+        return t
+
+    def bound(self) -> int | None:
+        if self.peek() != "<":
+            return None
+        self.take()
+        n = int(self.take())
+        self.take(">")
+        return n
+
+    def type_spec(self, scope: tuple) -> list:
+        tok = self.take()
+        if tok == "unsigned":
+            tok += " " + self.take()
+            if tok == "unsigned long" and self.peek() == "long":
+                tok += " " + self.take()
+        elif tok == "long" and self.peek() in ("long", "double"):
+            tok += " " + self.take()
+        if tok in PRIMITIVES:
+            return ["p", tok]
+        if tok in ("string", "wstring"):
+            return ["s" if tok == "string" else "w", self.bound()]
+        if tok == "sequence":
+            self.take("<")
+            inner = self.type_spec(scope)
+            n = None
+            if self.peek() == ",":
+                self.take()
+                n = int(self.take())
+            self.take(">")
+            return ["q", n, inner]
+        parts = [tok]
+        while self.peek() == "::":
+            self.take()
+            parts.append(self.take())
+        if len(parts) == 1:                          # 같은 module 안의 이름
+            parts = list(scope) + parts
+        name = "/".join(parts)
+        return self.typedefs.get(name) or ["t", name]
+
+
+def parse_idl(text: str) -> dict:
+    """.idl → {타입 이름: 필드}. rosidl 이 생성하는 module / struct / typedef / sequence 만."""
+    return _IdlParser(text).parse()
+
+
+# ────────── 파일 찾기 / 캐시 ──────────
+def _cache_dir() -> pathlib.Path:
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "check_qos" / "msg"
+
+
+def _package_of(iface_dir: pathlib.Path) -> str:
+    """msg / srv / action 디렉터리의 package 이름 (package.xml 의 <name>, 없으면 디렉터리 이름)."""
+    pkg_dir = iface_dir.parent
+    try:
+        m = re.search(r"<name>\s*([^<\s]+)\s*</name>", (pkg_dir / "package.xml").read_text())
+        if m:
+            return m.group(1)
+    except OSError:
+        pass
+    return pkg_dir.name
+
+
+def parse_file(path: pathlib.Path, use_cache: bool = True) -> dict:
+    """파일 하나의 {타입 이름: 필드}. package 와 내용 hash 로 캐시."""
+    kind = INTERFACE_DIRS[path.suffix]
+    pkg = _package_of(path.parent)
+    data = path.read_bytes()
+    digest = hashlib.blake2b(data + pkg.encode(), digest_size=16,
+                             person=f"qos-msg-v{CACHE_VERSION}".encode()[:16]).hexdigest()
+    cache = _cache_dir() / f"{digest}.json"
+    if use_cache:
+        try:
+            return json.loads(cache.read_text())
+        except (OSError, ValueError):
+            pass
+    text = data.decode("utf-8", errors="ignore")
+    try:
+        types = parse_idl(text) if kind is None else \
+            parse_interface(text, pkg, kind, path.stem)
+    except (ValueError, IndexError) as e:
+        sys.exit(f"[ERROR] {path}: cannot parse IDL: {e}")
+    if use_cache:
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            cache.write_text(json.dumps(types))
+        except OSError:
+            pass                                 # 읽기 전용 환경: 캐시 없이 진행
+    return types
+
+
+def _ament_roots() -> list[pathlib.Path]:
+    return [pathlib.Path(p) / "share"
+            for p in os.environ.get("AMENT_PREFIX_PATH", "").split(os.pathsep) if p]
+
+
+class TypeResolver:
+    """
+    roots 아래 interface 파일을 이름으로 색인하고, 요청된 타입과 그 중첩 타입만 파싱한다.
+    ament=True 면 AMENT_PREFIX_PATH 의 share/ 도 roots 뒤에 찾는다.
+    """
+
+    def __init__(self, roots, ament: bool = True, use_cache: bool = True):
+        self.use_cache = use_cache
+        self.files: dict[str, pathlib.Path] = {}     # 타입 이름 → 파일
+        self.local: list[str] = []                   # roots 에서 찾은 타입 (types 목록용)
+        self.types: dict[str, list] = {}
+        self._kinds, self._sizes = {}, {}
+        for root in roots:
+            self._index(pathlib.Path(root), local=True)
+        if ament:
+            for root in _ament_roots():
+                self._index(root, local=False)
+
+    def _index(self, root: pathlib.Path, local: bool) -> None:
+        if root.is_file():
+            walk = [(str(root.parent), [], [root.name])]
+        elif root.is_dir():
+            walk = os.walk(root)
+        elif local:
+            sys.exit(f"[ERROR] File not found: {root}")
+        else:
+            return
+        for dirpath, dirs, files in walk:
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS
+                             and not (pathlib.Path(dirpath) / d / "COLCON_IGNORE").exists())
+            here = pathlib.Path(dirpath)
+            kind = here.name
+            if kind not in ("msg", "srv", "action"):
+                continue
+            pkg = _package_of(here)
+            for f in sorted(files):
+                suffix = pathlib.Path(f).suffix
+                if suffix not in INTERFACE_DIRS:
+                    continue
+                stem = pathlib.Path(f).stem
+                if suffix == ".idl" or kind == "msg":
+                    names = [f"{pkg}/{kind}/{stem}"]
+                else:
+                    names = [f"{pkg}/{kind}/{stem}_{s}" for s in
+                             (("Request", "Response") if kind == "srv"
+                              else ("Goal", "Result", "Feedback"))]
+                for name in names:
+                    if name not in self.files:
+                        self.files[name] = here / f
+                        if local:
+                            self.local.append(name)
+
+    def fields(self, name: str) -> list:
+        if name not in self.types:
+            path = self.files.get(name)
+            if path is not None:
+                self.types.update(parse_file(path, self.use_cache))
+            if name not in self.types and name in BUILTIN_TYPES:
+                self.types[name] = BUILTIN_TYPES[name]
+            if name not in self.types:
+                raise UnknownType(name)
+        return self.types[name]
+
+    # ── 분류 ──
+    def kind(self, t: list) -> str:
+        """plain / bounded / unbounded"""
+        tag = t[0]
+        if tag == "p":
+            return "plain"
+        if tag in ("s", "w"):
+            return "bounded" if t[1] is not None else "unbounded"
+        if tag == "a":
+            return self.kind(t[2])
+        if tag == "q":
+            inner = self.kind(t[2])
+            return "unbounded" if t[1] is None or inner == "unbounded" else "bounded"
+        if t[1] not in self._kinds:
+            self._kinds[t[1]] = "plain"              # 자기 참조 방지 (정상 IDL 에는 없음)
+            kinds = {self.kind(ft) for _, ft in self.fields(t[1])}
+            self._kinds[t[1]] = "unbounded" if "unbounded" in kinds else \
+                "bounded" if "bounded" in kinds else "plain"
+        return self._kinds[t[1]]
+
+    # ── 크기 ──
+    def _repeat(self, t: list, count: int, off: int, length: int) -> int:
+        """t 를 count 번 직렬화한 뒤의 offset. padding 은 off % 8 에만 의존하므로 주기를 건너뛴다."""
+        if count == 0:
+            return off
+        if t[0] == "p":
+            size = PRIMITIVES[t[1]]
+            return _align(off, min(size, 8)) + size * count
+        seen = {}
+        i = 0
+        while i < count:
+            phase = off % 8
+            if phase in seen:
+                j, start = seen[phase]
+                cycles = (count - i) // (i - j)
+                off += cycles * (off - start)
+                i += cycles * (i - j)
+                seen = {}
+                if i >= count:
+                    break
+            seen[off % 8] = (i, off)
+            off = self._size(t, off, length)
+            i += 1
+        return off
+
+    def _size(self, t: list, off: int, length: int) -> int:
+        tag = t[0]
+        if tag == "p":
+            size = PRIMITIVES[t[1]]
+            return _align(off, min(size, 8)) + size
+        if tag in ("s", "w"):
+            n = t[1] if t[1] is not None else length
+            return _align(off, 4) + 4 + (n + 1 if tag == "s" else 4 * n)
+        if tag == "a":
+            return self._repeat(t[2], t[1], off, length)
+        if tag == "q":
+            return self._repeat(t[2], t[1] if t[1] is not None else length,
+                                _align(off, 4) + 4, length)
+        key = (t[1], off % 8, length)
+        if key not in self._sizes:
+            end = off
+            for _, ft in self.fields(t[1]):
+                end = self._size(ft, end, length)
+            self._sizes[key] = end - off
+        return off + self._sizes[key]
+
+    def size(self, name: str, unbounded_length: int = DEFAULT_UNBOUNDED_LENGTH) -> dict:
+        """
+        {type, bounds, max_bytes (unbounded 면 None), estimate, unbounded_length} 또는
+        {type, error}. estimate 는 bounded 면 max_bytes 와 같다.
+        """
+        name = type_name(name)
+        try:
+            bounds = self.kind(["t", name])
+            estimate = ENCAPSULATION + self._size(["t", name], 0, unbounded_length)
+        except UnknownType as e:
+            return {"type": name, "error": f"unknown type {e.args[0]}"}
+        return {"type": name, "bounds": bounds,
+                "max_bytes": None if bounds == "unbounded" else estimate,
+                "estimate": estimate, "unbounded_length": unbounded_length}
+
+
+def _align(off: int, n: int) -> int:
+    return off + (-off) % n
+
+
+# ────────── resourceLimits → bytes ──────────
+def _count(xml: str, q: dict, key: str, default: int) -> int:
+    txt = (q.get(key) or scoped_text(xml, ("resourceLimitsQos", key)) or "").strip()
+    return int(txt) if txt.isdigit() else default
+
+
+def memory_rows(xml: str, q: dict, sample: int) -> list[tuple[str, float]]:
+    """
+    [(항목, bytes)] — instance 하나의 history, max_instances 개의 history (max_samples 로
+    제한), 생성 시 할당 (allocated_samples + extra_samples). 무제한이면 inf.
+    """
+    instances = _count(xml, q, "max_instances", 0) or math.inf
+    allocated = _count(xml, q, "allocated_samples", DEFAULT_ALLOCATED_SAMPLES) \
+        + _count(xml, q, "extra_samples", DEFAULT_EXTRA_SAMPLES)
+    depth = f"({q.get('history_depth', '1')})" if q["history"] == "KEEP_LAST" else ""
+    return [(f"history {q['history']}{depth}", history_capacity(q) * sample),
+            ("all instances", history_capacity(q, instances) * sample),
+            ("preallocated", allocated * sample)]
+
+
+def describe(info: dict) -> str:
+    if "error" in info:
+        return color(f"[ERROR] {info['error']}", SEVERITY_COLOR["Critical"])
+    if info["bounds"] == "unbounded":
+        return (f"unbounded, estimate {info['estimate']} B "
+                f"(unbounded strings / sequences = {info['unbounded_length']})")
+    return f"{info['bounds']}, max {info['max_bytes']} B"
+
+
+# ────────── CLI ──────────
+def _print_topic(t: dict) -> None:
+    info = t["type_size"]
+    label = f"[{t['name']}]"
+    print(f"{color(label, BLUE)} {info['type']}: {describe(info)}")
+    if "error" in info:
+        return
+    for role, ep in [("writer", t["writer"])] + [("reader", r) for r in t["readers"]]:
+        rows = ", ".join(f"{label} {fmt_bytes(n)}"
+                         for label, n in memory_rows(ep["xml"], ep["q"], info["estimate"]))
+        print(f"    {role} {pathlib.Path(ep['profile']).name}: {rows}")
+        policy = (scoped_text(ep["xml"], ("historyMemoryPolicy",)) or "").strip().upper()
+        if info["bounds"] == "unbounded" and policy.removesuffix("_MEMORY_MODE") == "PREALLOCATED":
+            tag = color("[CONDITIONAL]", SEVERITY_COLOR["Conditional"])
+            print(f"      {tag} PREALLOCATED historyMemoryPolicy with an unbounded type: samples "
+                  "larger than the preallocated payload cannot be stored.\n"
+                  "        Recommendation: use PREALLOCATED_WITH_REALLOC or DYNAMIC.")
+
+
+def main(argv: list[str]) -> None:
+    paths, names, length, use_cache = [], [], None, True
+    for arg in argv:
+        key, sep, val = arg.partition("=")
+        if arg == "--no-cache":
+            use_cache = False
+        elif not sep:
+            paths.append(arg)
+        elif key == "type":
+            names.append(val)
+        elif key == "unbounded_length" and val.isdigit():
+            length = int(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+    if not paths:
+        sys.exit(USAGE)
+
+    if len(paths) == 1 and pathlib.Path(paths[0]).suffix.lower() in (".yaml", ".yml", ".json"):
+        manifest = load_manifest(pathlib.Path(paths[0]),
+                                 {"unbounded_length": length} if length is not None else None)
+        typed = [t for t in manifest["topics"] if t["type_size"] is not None]
+        for t in typed:
+            _print_topic(t)
+        print(f"{len(manifest['topics'])} topic(s), {len(typed)} with a message type")
+        return
+
+    resolver = TypeResolver(paths, use_cache=use_cache)
+    for name in names or resolver.local:
+        info = resolver.size(name, length or DEFAULT_UNBOUNDED_LENGTH)
+        print(f"{color(info['type'], BLUE)}: {describe(info)}")
+    if not names:
+        print(f"{len(resolver.local)} type(s)")
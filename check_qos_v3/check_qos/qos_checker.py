@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-import sys, pathlib, re
+import sys, pathlib, re, importlib, functools
 from typing import Dict, List
 
 # ────────── ANSI 색 코드 ──────────
@@ -12,7 +12,32 @@ def color(txt: str, c: str) -> str:
 
 # ────────── CLI 사용법 ──────────
 USAGE = ("Usage: ros2 run check_qos check_qos_cli "
-         "<pub.xml> <sub.xml> publish_period=<Nms> rtt=<Nms>")
+         "<pub.xml> <sub.xml> publish_period=<Nms> rtt=<Nms> [--fail-fast]\n"
+         "       ros2 run check_qos check_qos_cli <command> ...   "
+         "(commands: bandwidth, replay, query, match, bag, audit, merge, whatif, repair, "
+         "atlas, source, dump, zerocopy, flow, frag, discovery, lsp, types)")
+
+# ────────── 서브커맨드 → 모듈 ──────────
+COMMANDS = {
+    "bandwidth": "check_qos.bandwidth",
+    "replay":    "check_qos.replay",
+    "query":     "check_qos.columnar",
+    "match":     "check_qos.compat_index",
+    "bag":       "check_qos.rosbag",
+    "audit":     "check_qos.audit",
+    "merge":     "check_qos.audit:merge_main",        # module:function (기본 main)
+    "whatif":    "check_qos.whatif",
+    "repair":    "check_qos.repair",
+    "atlas":     "check_qos.atlas",
+    "source":    "check_qos.source_scan",
+    "dump":      "check_qos.topic_dump",
+    "zerocopy":  "check_qos.zerocopy",
+    "flow":      "check_qos.flow_control",
+    "frag":      "check_qos.fragmentation",
+    "discovery": "check_qos.discovery",
+    "lsp":       "check_qos.lsp",
+    "types":     "check_qos.msg_types",
+}
 
 
 # ────────── 유틸 ──────────
@@ -21,6 +46,14 @@ def load_text(p: pathlib.Path) -> str:
         sys.exit(f"[ERROR] File not found: {p}")
     return p.read_text(encoding="utf-8", errors="ignore")
 
+def collect_xml(args) -> list[pathlib.Path]:
+    """파일은 그대로, 디렉터리는 하위의 *.xml 을 정렬해서."""
+    out = []
+    for a in args:
+        p = pathlib.Path(a)
+        out.extend(sorted(p.rglob("*.xml")) if p.is_dir() else [p])
+    return out
+
 def parse_period(arg: str) -> int:
     if not arg.startswith("publish_period="):
         sys.exit("[ERROR] third argument must be publish_period=<Nms>")
@@ -44,90 +77,166 @@ def parse_rtt(arg: str) -> int:
     globals()["rtt_ns"] = rtt_ms * 1_000_000   # ns 단위로 저장
     return rtt_ms
 
-# ────────── 태그 추출 패턴 ──────────
-TAG_PATTERNS = {
-    "reliability": re.compile(
-        r"<\s*reliability\s*>.*?<\s*kind\s*>(\w+)\s*</kind\s*>.*?</\s*reliability\s*>",
-        re.I | re.S),
-        
-    "history": re.compile(
-        r"<\s*historyQos\s*>.*?<\s*kind\s*>(\w+)\s*</kind\s*>.*?</\s*historyQos\s*>",
-        re.I | re.S),
-        
-    "history_depth": re.compile(
-        r"<\s*historyQos\s*>.*?<\s*depth\s*>(\d+)</depth>", re.I | re.S),
-    
-    "durability": re.compile(
-        r"<\s*durability\s*>.*?<\s*kind\s*>(\w+)\s*</kind\s*>.*?</\s*durability\s*>",
-        re.I | re.S),
-        
-    "ownership": re.compile(                               
-        r"<\s*ownership\s*>.*?<\s*kind\s*>(\w+)\s*</kind\s*>.*?</\s*ownership\s*>",
-        re.I | re.S),
-        
-    "dest_order": re.compile(
-        r"<\s*destinationOrder\s*>.*?<\s*kind\s*>(\w+)\s*</kind\s*>.*?</\s*destinationOrder\s*>",
-        re.I | re.S),
-        
-    "max_samples": re.compile(
-        r"<\s*resourceLimitsQos\s*>.*?<\s*max_samples\s*>(\d+)</max_samples>", re.I | re.S),
+# ────────── 범위 제한 태그 스캐너 ──────────
+# 모든 추출은 바깥 요소 → 안쪽 요소 순으로 "<tag>…</tag>" 범위를 좁혀 가며 수행한다.
+# 태그가 블록 안에 없으면 그 블록 밖(다른 profile)으로 넘어가지 않고 None.
+# 각 search 는 endpos 로 제한되고 백트래킹이 없는 패턴만 쓰므로 입력 길이에 선형.
+_TAG_RE_CACHE: dict[str, tuple[re.Pattern, re.Pattern]] = {}
 
-    "max_instances": re.compile(
-        r"<\s*resourceLimitsQos\s*>.*?<\s*max_instances\s*>(\d+)</max_instances>", re.I | re.S),
 
-    "max_samples_per_instance": re.compile(
-        r"<\s*resourceLimitsQos\s*>.*?<\s*max_samples_per_instance\s*>(\d+)"
-        r"</max_samples_per_instance>", re.I | re.S),
-        
-	"autodispose": re.compile(
-	    r"<\s*writerDataLifecycle\s*>.*?"
-	    r"<\s*autodispose_unregistered_instances\s*>\s*(\w+)\s*"
-	    r"</autodispose_unregistered_instances\s*>.*?"
-	    r"</\s*writerDataLifecycle\s*>",
-	    re.I | re.S),
-		    
-	"autoenable": re.compile(
-	    r"<\s*autoenable_created_entities\s*>\s*(\w+)\s*</autoenable_created_entities\s*>",
-	    re.I | re.S),
-
-    "liveliness": re.compile(
-        r"<\s*liveliness\s*>.*?<\s*kind\s*>(.*?)</kind\s*>.*?</\s*liveliness\s*>",
-        re.I | re.S),
-
-    "nowriter_sec_r": re.compile(
-        r"<\s*readerDataLifecycle\s*>.*?"
-        r"<\s*autopurge_nowriter_samples_delay\s*>.*?"
-        r"<\s*sec\s*>([^<]+)</sec\s*>",        
-        re.I | re.S),
-
-    "nowriter_nsec_r": re.compile(
-        r"<\s*readerDataLifecycle\s*>.*?"
-        r"<\s*autopurge_nowriter_samples_delay\s*>.*?"
-        r"<\s*nanosec\s*>([^<]+)</nanosec\s*>",
-        re.I | re.S),
-
-    "userdata": re.compile(
-    r"<\s*userData\s*>.*?<\s*value\s*>([^<]+)</value\s*>", re.I | re.S),
-    
-    
-    
-    "autopurge_disposed_samples_delay": re.compile(
-    r"<\s*readerDataLifecycle\s*>.*?"
-    r"<\s*autopurge_disposed_samples_delay\s*>.*?"
-    r"<\s*sec\s*>(\d+)</sec\s*>", 
-    re.I | re.S),
+def _tag_res(tag: str) -> tuple[re.Pattern, re.Pattern]:
+    pats = _TAG_RE_CACHE.get(tag)
+    if pats is None:
+        # [^<>]* : 닫히지 않은 '<tag' 가 이어져도 다음 '<' 에서 멈춤
+        pats = (re.compile(rf"<\s*{tag}(?=[\s/>])[^<>]*>", re.I),
+                re.compile(rf"<\s*/\s*{tag}\s*>", re.I))
+        _TAG_RE_CACHE[tag] = pats
+    return pats
 
 
+def find_block(xml: str, tag: str, pos: int = 0,
+               endpos: int | None = None) -> tuple[int, int, int, int] | None:
+    """
+    [pos, endpos) 안의 첫 <tag>…</tag> 를 (시작, 내용 시작, 내용 끝, 끝) 으로 반환.
+    self-closing 이면 내용은 빈 범위, 닫는 태그가 없으면 endpos 까지.
+    """
+    endpos = len(xml) if endpos is None else endpos
+    open_re, close_re = _tag_res(tag)
+    m = open_re.search(xml, pos, endpos)
+    if not m:
+        return None
+    if m.group(0).endswith("/>"):
+        return m.start(), m.end(), m.end(), m.end()
+    c = close_re.search(xml, m.end(), endpos)
+    if not c:
+        return m.start(), m.end(), endpos, endpos
+    return m.start(), m.end(), c.start(), c.end()
+
 
-		 
+def scoped_span(xml: str, path: tuple[str, ...], pos: int = 0,
+                endpos: int | None = None,
+                memo: dict | None = None) -> tuple[int, int] | None:
+    """
+    path 의 태그를 바깥부터 차례로 찾아 가장 안쪽 요소의 내용 범위를 반환.
+    memo 를 넘기면 path prefix 별 결과를 재사용 (같은 바깥 요소를 한 번만 찾음).
+    """
+    if type(xml) is TrackedXml:
+        xml.reads.add((xml.side, path))
+    for i, tag in enumerate(path):
+        key = path[:i + 1]
+        if memo is not None and key in memo:
+            span = memo[key]
+        else:
+            b = find_block(xml, tag, pos, endpos)
+            span = None if b is None else (b[1], b[2])
+            if memo is not None:
+                memo[key] = span
+        if span is None:
+            return None
+        pos, endpos = span
+    return pos, endpos
+
+
+def scoped_text(xml: str, path: tuple[str, ...], memo: dict | None = None) -> str | None:
+    span = scoped_span(xml, path, memo=memo)
+    return None if span is None else xml[span[0]:span[1]]
+
+
+# ────────── 규칙 의존성 추적 ──────────
+# 규칙에 아래 객체를 넘기면 읽은 QoS key / XML 요소 경로가 reads 에 (side, key|path) 로 쌓인다.
+# XML 은 모두 scoped_span 을 거쳐 읽히므로 거기서 기록한다.
+class TrackedQos(dict):
+    def __init__(self, q: dict, side: str, reads: set):
+        super().__init__(q)
+        self.side, self.reads = side, reads
+
+    def __getitem__(self, key):
+        self.reads.add((self.side, key))
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.reads.add((self.side, key))
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self.reads.add((self.side, key))
+        return super().__contains__(key)
+
+
+class TrackedXml(str):
+    def __new__(cls, xml: str, side: str, reads: set):
+        obj = super().__new__(cls, xml)
+        obj.side, obj.reads = side, reads
+        return obj
+
+
+# ────────── 태그 추출 경로 ──────────
+KIND_VALUE  = re.compile(r"\w+")
+COUNT_VALUE = re.compile(r"\d+")
+TEXT_VALUE  = re.compile(r"[^<]+")
+
+TAG_PATHS = {
+    "reliability":      (("reliability", "kind"), KIND_VALUE),
+    "history":          (("historyQos", "kind"), KIND_VALUE),
+    "history_depth":    (("historyQos", "depth"), COUNT_VALUE),
+    "durability":       (("durability", "kind"), KIND_VALUE),
+    "ownership":        (("ownership", "kind"), KIND_VALUE),
+    "dest_order":       (("destinationOrder", "kind"), KIND_VALUE),
+    "max_samples":      (("resourceLimitsQos", "max_samples"), COUNT_VALUE),
+    "max_instances":    (("resourceLimitsQos", "max_instances"), COUNT_VALUE),
+    "max_samples_per_instance":
+                        (("resourceLimitsQos", "max_samples_per_instance"), COUNT_VALUE),
+    "autodispose":      (("writerDataLifecycle", "autodispose_unregistered_instances"),
+                         KIND_VALUE),
+    "autoenable":       (("autoenable_created_entities",), KIND_VALUE),
+    "liveliness":       (("liveliness", "kind"), TEXT_VALUE),
+    "nowriter_sec_r":   (("readerDataLifecycle", "autopurge_nowriter_samples_delay", "sec"),
+                         TEXT_VALUE),
+    "nowriter_nsec_r":  (("readerDataLifecycle", "autopurge_nowriter_samples_delay", "nanosec"),
+                         TEXT_VALUE),
+    "userdata":         (("userData", "value"), TEXT_VALUE),
+    "autopurge_disposed_samples_delay":
+                        (("readerDataLifecycle", "autopurge_disposed_samples_delay", "sec"),
+                         COUNT_VALUE),
 }
-    
+
+
+# ────────── Duration 추출 ──────────
+class _DurationMatch:
+    """group(0)=요소 내용, group(1)=<sec>, group(2)=<nanosec> (없으면 None)."""
+
+    def __init__(self, block: str, sec: str | None, nsec: str | None):
+        self._groups = (block, sec, nsec)
+
+    def group(self, i: int = 0) -> str | None:
+        return self._groups[i]
+
+
+class ScopedDuration:
+    """path 요소 안의 <sec>/<nanosec> 를 찾는 패턴. 기존 정규식과 같은 search() 인터페이스."""
+
+    def __init__(self, path: tuple[str, ...], value: re.Pattern = COUNT_VALUE):
+        self.path = path
+        self.value = value
+
+    def _field(self, xml: str, tag: str, pos: int, endpos: int) -> str | None:
+        b = find_block(xml, tag, pos, endpos)
+        if b is None:
+            return None
+        txt = xml[b[1]:b[2]].strip()
+        return txt if self.value.fullmatch(txt) else None
+
+    def search(self, xml: str) -> _DurationMatch | None:
+        span = scoped_span(xml, self.path)
+        if span is None:
+            return None
+        s, e = span
+        return _DurationMatch(xml[s:e], self._field(xml, "sec", s, e),
+                              self._field(xml, "nanosec", s, e))
+
+
 # ────────── DEADLINE 헬퍼 ──────────
-DEADLINE_RE = re.compile(
-    r"<\s*deadline\s*>[^<]*?<\s*period\s*>"
-    r"(?:[^<]*?<\s*sec\s*>(\d+)\s*</sec\s*>)?"          
-    r"(?:[^<]*?<\s*nanosec\s*>(\d+)\s*</nanosec\s*>)?", 
-    re.I | re.S)
+DEADLINE_RE = ScopedDuration(("deadline", "period"))
 
 def deadline_enabled(xml: str) -> bool:
     m = DEADLINE_RE.search(xml)
@@ -150,12 +259,8 @@ def deadline_period_ns(xml: str) -> int | None:
     return sec * 1_000_000_000 + nsec
 
 # ────────── LIVELINESS 헬퍼 ──────────
-LEASE_RE = re.compile(
-    r"<\s*liveliness\s*>.*?<\s*lease_duration\s*>"
-    r"(?:[^<]*?<\s*sec\s*>(\d+)\s*</sec\s*>)?"          # <sec>
-    r"(?:[^<]*?<\s*nanosec\s*>(\d+)\s*</nanosec\s*>)?", # <nanosec>
-    re.I | re.S)
-    
+LEASE_RE = ScopedDuration(("liveliness", "lease_duration"))
+
 
 def lease_duration_ns(xml: str) -> int | None:
     m = LEASE_RE.search(xml)
@@ -165,11 +270,7 @@ def lease_duration_ns(xml: str) -> int | None:
     nsec = int(m.group(2) or 0)
     return sec * 1_000_000_000 + nsec
 
-ANNOUNCE_RE = re.compile(
-    r"<\s*liveliness\s*>.*?<\s*announcement_period\s*>"
-    r"(?:[^<]*?<\s*sec\s*>([^<]+)</sec\s*>)?"
-    r"(?:[^<]*?<\s*nanosec\s*>([^<]+)</nanosec\s*>)?",
-    re.I | re.S)
+ANNOUNCE_RE = ScopedDuration(("liveliness", "announcement_period"), TEXT_VALUE)
 
 INF_SET = {"DURATION_INFINITY", "4294967295"}  
 
@@ -191,33 +292,178 @@ def announcement_period_ns(xml: str) -> int | None:
     if sec is None or nsec is None:          
         return None
     return sec * 1_000_000_000 + nsec 
+
+# ────────── max_blocking_time / heartbeatPeriod 헬퍼 ──────────
+DEFAULT_MAX_BLOCKING_NS   = 100_000_000        # Fast DDS 2.6 기본값 100ms
+DEFAULT_HEARTBEAT_NS      = 3_000_000_000      # Fast DDS 2.6 기본값 3s
+
+MAX_BLOCKING_RE = ScopedDuration(("reliability", "max_blocking_time"), TEXT_VALUE)
+
+HEARTBEAT_RE = ScopedDuration(("heartbeatPeriod",), TEXT_VALUE)
+
+
+def max_blocking_time_ns(xml: str) -> int | None:
+    """max_blocking_time 을 ns 로 반환. 태그가 없으면 Fast DDS 기본값, 무한이면 None."""
+    m = MAX_BLOCKING_RE.search(xml)
+    if not m:
+        return DEFAULT_MAX_BLOCKING_NS
+    sec  = parse_duration_field(m.group(1))
+    nsec = parse_duration_field(m.group(2))
+    if sec is None or nsec is None:
+        return None
+    return sec * 1_000_000_000 + nsec
+
+
+def heartbeat_period_ns(xml: str) -> int:
+    m = HEARTBEAT_RE.search(xml)
+    if not m:
+        return DEFAULT_HEARTBEAT_NS
+    sec  = parse_duration_field(m.group(1))
+    nsec = parse_duration_field(m.group(2))
+    if sec is None or nsec is None:
+        return DEFAULT_HEARTBEAT_NS
+    return sec * 1_000_000_000 + nsec
+
 # ────────── LIFESPAN 헬퍼 ──────────
+LIFESPAN_RE = ScopedDuration(("lifespan",))
 
-LIFESPAN_RE = re.compile(
-    r"<\s*lifespan\s*>.*?</\s*lifespan\s*>",
-    re.I | re.S)
+
+def lifespan_parts(xml: str) -> tuple[int, int] | None:
+    """lifespan 의 (sec, nanosec). lifespan 요소가 없거나 둘 다 비어 있으면 None."""
+    m = LIFESPAN_RE.search(xml)
+    if not m or (m.group(1) is None and m.group(2) is None):
+        return None
+    return int(m.group(1) or 0), int(m.group(2) or 0)
 
 # ────────── partition 헬퍼──────────
-PART_ALL_RE = re.compile(
-    r"<\s*partition\s*>.*?</\s*partition\s*>", re.I | re.S)
 NAME_RE = re.compile(r"<\s*name\s*>([^<]+)</name\s*>", re.I | re.S)
 
 def partition_list(xml: str) -> list[str]:
-    blk = PART_ALL_RE.search(xml)
-    if not blk:
+    span = scoped_span(xml, ("partition",))
+    if span is None:
         return [""]            # default partition
-    names = NAME_RE.findall(blk.group(0))
+    names = NAME_RE.findall(xml, span[0], span[1])
     return [n.strip() for n in names] or [""]
 
+# ────────── profile 블록 분리 ──────────
+ENDPOINT_PROFILE_RE = re.compile(
+    r"<\s*(publisher|subscriber|data_writer|data_reader)\b([^<>]*)>", re.I)
+PROFILE_NAME_RE = re.compile(r"\bprofile_name\s*=\s*\"([^\"]*)\"", re.I)
+ENDPOINT_SIDE = {"publisher": "PUB", "data_writer": "PUB",
+                 "subscriber": "SUB", "data_reader": "SUB"}
+
+def _profile_blocks(xml: str, pattern: re.Pattern):
+    """pattern 에 맞는 profile 요소를 (tag, 속성 문자열, block) 으로 순서대로 반환."""
+    pos = 0
+    while True:
+        m = pattern.search(xml, pos)
+        if not m:
+            return
+        tag = m.group(1).lower()
+        if m.group(2).rstrip().endswith("/"):        # <publisher profile_name="x"/>
+            end = m.end()
+        else:
+            e = _tag_res(tag)[1].search(xml, m.end())
+            end = e.end() if e else len(xml)
+        yield tag, m.group(2), xml[m.start():end]
+        pos = end
+
+def iter_profiles(xml: str):
+    """
+    XML 문서 안의 endpoint profile 을 (side, profile_name, block) 으로 순서대로 반환.
+    side 는 "PUB" / "SUB".
+    """
+    for tag, attrs, block in _profile_blocks(xml, ENDPOINT_PROFILE_RE):
+        name_m = PROFILE_NAME_RE.search(attrs)
+        yield ENDPOINT_SIDE[tag], (name_m.group(1) if name_m else ""), block
+
 def parse_profile(xml: str) -> Dict[str, str]:
-    out = {}
-    for k, pat in TAG_PATTERNS.items():
-        m = pat.search(xml)
-        out[k] = (m.group(1).upper() if m else "")
+    out, memo = {}, {}
+    for k, (path, value) in TAG_PATHS.items():
+        txt = scoped_text(xml, path, memo)
+        txt = txt.strip() if txt else ""
+        out[k] = txt.upper() if value.fullmatch(txt) else ""
 
     # 추가: partition name 리스트
     out["partition_list"] = partition_list(xml)
     return out
+
+# ────────── Fast DDS 2.6 기본 QoS ──────────
+# 태그가 없는 정책은 DataWriterQos / DataReaderQos 기본값으로 채운다. 한쪽에만 있는 정책
+# (writer_data_lifecycle / reader_data_lifecycle) 은 그쪽 profile 에만 채운다.
+_ENDPOINT_DEFAULTS = {
+    "history": "KEEP_LAST",
+    "history_depth": "1",
+    "ownership": "SHARED",
+    "dest_order": "BY_RECEPTION_TIMESTAMP",
+    "max_samples": "5000",
+    "max_instances": "10",
+    "max_samples_per_instance": "400",
+    "autoenable": "TRUE",
+    "liveliness": "AUTOMATIC",
+    "userdata": "",
+}
+_WRITER_DEFAULTS = {
+    "autodispose": "TRUE",
+}
+_READER_DEFAULTS = {
+    "nowriter_sec_r": "DURATION_INFINITY",
+    "nowriter_nsec_r": "DURATION_INFINITY",
+    "autopurge_disposed_samples_delay": "DURATION_INFINITY",
+}
+
+FASTDDS_DEFAULTS = {
+    "PUB": {**_ENDPOINT_DEFAULTS, **_WRITER_DEFAULTS,
+            "reliability": "RELIABLE", "durability": "TRANSIENT_LOCAL"},
+    "SUB": {**_ENDPOINT_DEFAULTS, **_READER_DEFAULTS,
+            "reliability": "BEST_EFFORT", "durability": "VOLATILE"},
+    "":    {**_ENDPOINT_DEFAULTS, "reliability": "", "durability": ""},   # side 를 모를 때
+}
+# 한 duration 의 (sec, nanosec) 필드. 둘 다 없을 때만 기본값, 한쪽만 있으면 나머지는 "0".
+DURATION_PAIRS = (("nowriter_sec_r", "nowriter_nsec_r"),)
+
+# ────────── is_default_profile 상속 ──────────
+ANY_PROFILE_RE = re.compile(
+    r"<\s*(participant|publisher|subscriber|data_writer|data_reader)\b([^<>]*)>", re.I)
+IS_DEFAULT_RE = re.compile(r"\bis_default_profile\s*=\s*\"\s*true\s*\"", re.I)
+
+@functools.lru_cache(maxsize=64)
+def default_profiles(doc: str) -> Dict[str, str]:
+    """is_default_profile="true" 인 첫 block 을 "PUB" / "SUB" / "PARTICIPANT" 별로 반환."""
+    out = {}
+    for tag, attrs, block in _profile_blocks(doc, ANY_PROFILE_RE):
+        if IS_DEFAULT_RE.search(attrs):
+            out.setdefault(ENDPOINT_SIDE.get(tag, "PARTICIPANT"), block)
+    return out
+
+@functools.lru_cache(maxsize=4096)
+def _resolve(xml: str, side: str, doc: str) -> tuple:
+    defaults = default_profiles(doc)
+    # 첫 번째로 나타나는 요소를 쓰므로 이어 붙인 순서가 곧 상속 우선순위
+    chain = [xml] + [defaults[k] for k in (side, "PARTICIPANT")
+                     if k in defaults and defaults[k] not in xml]
+    eff_xml = "\n".join(chain)
+    q = parse_profile(eff_xml)
+    for pair in DURATION_PAIRS:
+        if any(q.get(k) for k in pair):
+            for k in pair:
+                q[k] = q.get(k) or "0"
+    for k, v in FASTDDS_DEFAULTS.get(side, FASTDDS_DEFAULTS[""]).items():
+        if not q.get(k):
+            q[k] = v
+    q["partition_list"] = tuple(q["partition_list"])
+    return eff_xml, tuple(q.items())
+
+def resolve_qos(xml: str, side: str = "", doc: str | None = None) -> tuple[str, Dict]:
+    """
+    profile 의 실효 QoS 를 (상속이 반영된 xml, QoS dict) 로 반환.
+    빈 정책은 자신 → 같은 쪽 default profile → default participant → Fast DDS 기본값 순으로 채운다.
+    doc 은 default profile 을 찾을 문서 (없으면 xml 자신). 같은 입력은 한 번만 해석한다.
+    """
+    eff_xml, items = _resolve(xml, side, xml if doc is None else doc)
+    q = dict(items)
+    q["partition_list"] = list(q["partition_list"])
+    return eff_xml, q
 # ────────── 규칙 1 : durability + RELIABLE ──────────
 def rule_durability_needs_rel(_xml, q):
     non_volatile = {"TRANSIENT_LOCAL", "TRANSIENT", "PERSISTENT"}
@@ -258,9 +504,9 @@ def rule_deadline_vs_durability(xml, q):
 # ────────── 규칙 5 : durability + ResourceLimits ──────────
 def rule_keep_last_sample_budget(_xml, q):
     if q["history"] == "KEEP_LAST":
-        depth  = int(q.get("history_depth")  or 0)
-        max_s  = int(q.get("max_samples")    or 0)
-        inst   = int(q.get("max_instances")  or 0)
+        depth  = int(q["history_depth"])
+        max_s  = int(q["max_samples"])
+        inst   = int(q["max_instances"])
         if max_s < depth * inst:
             return (f"KEEP_LAST({depth}) with {inst} instances exceeds "
                     f"max_samples ({max_s}).\n"
@@ -271,7 +517,7 @@ def rule_keep_last_sample_budget(_xml, q):
 def rule_durable_keep_last_depth(_xml, q):
     non_volatile = {"TRANSIENT_LOCAL", "TRANSIENT", "PERSISTENT"}
     if q["durability"] in non_volatile and q["history"] == "KEEP_LAST":
-        depth = int(q.get("history_depth") or 0)
+        depth = int(q["history_depth"])
         if depth <= 1:
             return ("Invalid QoS: TRANSIENT/PERSISTENT durability with KEEP_LAST(1) "
                     "retains only one sample, negating durable delivery.\n"
@@ -358,21 +604,11 @@ def rule_lifespan_vs_deadline(xml, _q):
     if not dl_m:
         return None
 
-    # lifespan 블록만 추출
-    lifespan_m = LIFESPAN_RE.search(xml)
-    if not lifespan_m:
-        return None
-    lifespan_block = lifespan_m.group(0)
-
-    # lifespan 내부에서 sec/nsec 추출
-    sec_m  = re.search(r"<\s*sec\s*>(\d+)</sec\s*>", lifespan_block, re.I)
-    nsec_m = re.search(r"<\s*nanosec\s*>(\d+)</nanosec\s*>", lifespan_block, re.I)
-
-    if not sec_m and not nsec_m:
+    # lifespan 요소 안의 sec/nsec 만 사용
+    ls = lifespan_parts(xml)
+    if ls is None:
         return None  # 둘 다 없음
-
-    ls_sec  = int(sec_m.group(1)) if sec_m else 0
-    ls_nsec = int(nsec_m.group(1)) if nsec_m else 0
+    ls_sec, ls_nsec = ls
     dl_sec  = int(dl_m.group(1) or 0)
     dl_nsec = int(dl_m.group(2) or 0)
 
@@ -404,14 +640,10 @@ def rule_history_vs_lifespan(xml, q):
     publish_rate = 1000 / publish_period_ms  # Hz
 
     # lifespan sec/nsec 추출
-    lifespan_m_sec  = re.search(r"<\s*lifespan\s*>.*?<\s*sec\s*>(\d+)</sec\s*>", xml, re.I | re.S)
-    lifespan_m_nsec = re.search(r"<\s*lifespan\s*>.*?<\s*nanosec\s*>(\d+)</nanosec\s*>", xml, re.I | re.S)
-
-    if not lifespan_m_sec and not lifespan_m_nsec:
+    ls = lifespan_parts(xml)
+    if ls is None:
         return None  # lifespan이 설정 안 되어 있으면 검사 생략
-
-    ls_sec  = int(lifespan_m_sec.group(1)) if lifespan_m_sec else 0
-    ls_nsec = int(lifespan_m_nsec.group(1)) if lifespan_m_nsec else 0
+    ls_sec, ls_nsec = ls
     lifespan_sec = ls_sec + (ls_nsec / 1_000_000_000)
 
     # 계산
@@ -459,14 +691,10 @@ def rule_buffer_capacity_vs_lifespan(xml, q):
     publish_rate = 1000 / publish_period_ms  # Hz
 
     # lifespan 추출
-    lifespan_m_sec  = re.search(r"<\s*lifespan\s*>.*?<\s*sec\s*>(\d+)</sec\s*>", xml, re.I | re.S)
-    lifespan_m_nsec = re.search(r"<\s*lifespan\s*>.*?<\s*nanosec\s*>(\d+)</nanosec\s*>", xml, re.I | re.S)
-
-    if not lifespan_m_sec and not lifespan_m_nsec:
+    ls = lifespan_parts(xml)
+    if ls is None:
         return None
-
-    ls_sec  = int(lifespan_m_sec.group(1)) if lifespan_m_sec else 0
-    ls_nsec = int(lifespan_m_nsec.group(1)) if lifespan_m_nsec else 0
+    ls_sec, ls_nsec = ls
     lifespan_sec = ls_sec + (ls_nsec / 1_000_000_000)
 
     required_samples = math.ceil(lifespan_sec * publish_rate)
@@ -496,8 +724,8 @@ def rule_dest_order_vs_depth(_xml, q):
 # ────────── 규칙 17 : destination order(pub,sub)──────────
 def rule_dest_order_compat(pub_q: dict, sub_q: dict) -> str | None:
     # 값 정규화 ─ 없으면 기본 BY_RECEPTION_TIMESTAMP 로 간주
-    w_kind = (pub_q.get("dest_order", "") or "BY_RECEPTION_TIMESTAMP").strip().upper()
-    r_kind = (sub_q.get("dest_order", "") or "BY_RECEPTION_TIMESTAMP").strip().upper()
+    w_kind = pub_q["dest_order"]
+    r_kind = sub_q["dest_order"]
 
     # Writer가 BY_RECEPTION, Reader가 BY_SOURCE 인 경우에만 경고
     if w_kind == "BY_RECEPTION_TIMESTAMP" and r_kind == "BY_SOURCE_TIMESTAMP":
@@ -510,8 +738,8 @@ def rule_dest_order_compat(pub_q: dict, sub_q: dict) -> str | None:
 
 # ────────── 규칙 18 : ownership(pub,sub)──────────
 def rule_ownership_compat(pub_q: dict, sub_q: dict) -> str | None:
-    r_kind = (sub_q.get("ownership", "") or "SHARED").strip().upper()
-    w_kind = (pub_q.get("ownership", "") or "SHARED").strip().upper()
+    r_kind = sub_q["ownership"]
+    w_kind = pub_q["ownership"]
 
     if r_kind == "EXCLUSIVE" and w_kind != "EXCLUSIVE":
         return ("Reader requests EXCLUSIVE ownership but Writer is not EXCLUSIVE.\n"
@@ -525,8 +753,8 @@ RELIABILITY_LEVEL = {"BEST_EFFORT": 0, "RELIABLE": 1}   # 숫자가 클수록 
 
 def rule_reliability_compat(pub_q: dict, sub_q: dict) -> str | None:
     """Writer( PUB ) 가 Reader( SUB ) 요구보다 약한 신뢰성을 제공할 때 경고"""
-    w_kind = (pub_q.get("reliability", "") or "BEST_EFFORT").strip().upper()
-    r_kind = (sub_q.get("reliability", "") or "BEST_EFFORT").strip().upper()
+    w_kind = pub_q["reliability"]
+    r_kind = sub_q["reliability"]
 
     w_lvl = RELIABILITY_LEVEL.get(w_kind, 0)
     r_lvl = RELIABILITY_LEVEL.get(r_kind, 0)
@@ -556,7 +784,7 @@ def rule_keep_last_depth_positive(_xml, q):
 def rule_history_vs_max_per_instance(_xml, q):
     hist_kind = q.get("history", "").strip().upper()
     depth_txt = q.get("history_depth", "").strip()
-    mpi_txt   = q.get("max_samples_per_instance", "").strip() or "0"
+    mpi_txt   = q["max_samples_per_instance"]
 
     depth = int(depth_txt) if depth_txt.isdigit() else 0
     mpi   = int(mpi_txt)   if mpi_txt.isdigit()   else 0
@@ -588,8 +816,8 @@ def rule_durability_compat(pub_q: dict, sub_q: dict) -> str | None:
     Writer ↔ Reader durability 호환성 검사
     Writer 레벨 < Reader 레벨 → 경고
     """
-    w_kind = (pub_q.get("durability", "") or "VOLATILE").strip().upper()
-    r_kind = (sub_q.get("durability", "") or "VOLATILE").strip().upper()
+    w_kind = pub_q["durability"]
+    r_kind = sub_q["durability"]
 
     w_lvl = DURABILITY_LEVEL.get(w_kind, 0)
     r_lvl = DURABILITY_LEVEL.get(r_kind, 0)
@@ -636,8 +864,8 @@ LIVELINESS_PRIORITY = {
 def rule_liveliness_compat(pub_xml: str, sub_xml: str,
                            pub_q: dict, sub_q: dict) -> str | None:
     # ── kind 비교 ───────────────────────────────────────────
-    w_kind = (pub_q.get("liveliness", "") or "AUTOMATIC").strip().upper()
-    r_kind = (sub_q.get("liveliness", "") or "AUTOMATIC").strip().upper()
+    w_kind = pub_q["liveliness"]
+    r_kind = sub_q["liveliness"]
 
     w_lvl  = LIVELINESS_PRIORITY.get(w_kind, 0)
     r_lvl  = LIVELINESS_PRIORITY.get(r_kind, 0)
@@ -876,7 +1104,7 @@ def rule_rdlife_autopurge_vs_durability(_xml, q):
     return None
 
 
- # ────────── 규칙 9 : Partition + Liveliness ─────────
+# ────────── 규칙 9 : Partition + Liveliness ─────────
 def rule_liveliness_manual_partition(_xml, q):
     if q.get("liveliness", "").strip().upper() != "MANUAL_BY_TOPIC":
         return None
@@ -889,7 +1117,7 @@ def rule_liveliness_manual_partition(_xml, q):
                 "Recommendation: use AUTOMATIC or MANUAL_BY_PARTICIPANT, or remove partition.")
     return None
 
- # ────────── 규칙 10 : Ownership + WriterDataLifeCycle ─────────
+# ────────── 규칙 10 : Ownership + WriterDataLifeCycle ─────────
 def rule_autodispose_with_exclusive(_xml, q):
     auto = q.get("autodispose", "").strip().upper()
     owner_kind = q.get("ownership", "").strip().upper()
@@ -902,20 +1130,16 @@ def rule_autodispose_with_exclusive(_xml, q):
                 "exclusive Writers to take over without premature instance disposal.")
     return None
 
- # ────────── 규칙 13 : Lifespan + Durability ─────────
+# ────────── 규칙 13 : Lifespan + Durability ─────────
 def rule_lifespan_too_short_for_durability(xml, q):
     dur_kind = q.get("durability", "").strip().upper()
     NON_VOLATILE = {"TRANSIENT_LOCAL", "TRANSIENT", "PERSISTENT"}
 
     # LIFESPAN 파싱
-    lifespan_sec_match  = re.search(r"<\s*lifespan\s*>.*?<\s*sec\s*>(\d+)</sec\s*>", xml, re.I | re.S)
-    lifespan_nsec_match = re.search(r"<\s*lifespan\s*>.*?<\s*nanosec\s*>(\d+)</nanosec\s*>", xml, re.I | re.S)
-
-    if not lifespan_sec_match and not lifespan_nsec_match:
+    ls = lifespan_parts(xml)
+    if ls is None:
         return None
-
-    ls_sec  = int(lifespan_sec_match.group(1)) if lifespan_sec_match else 0
-    ls_nsec = int(lifespan_nsec_match.group(1)) if lifespan_nsec_match else 0
+    ls_sec, ls_nsec = ls
     lifespan_ns = ls_sec * 1_000_000_000 + ls_nsec
 
     # RTT는 전역변수로 받아옴
@@ -929,7 +1153,7 @@ def rule_lifespan_too_short_for_durability(xml, q):
     return None
 
 
- # ────────── 규칙 17 : Liveliness + Ownsership ─────────
+# ────────── 규칙 17 : Liveliness + Ownsership ─────────
 def rule_exclusive_lease_infinite(xml, q):
     # 조건 1: EXCLUSIVE ownership일 때만 검사
     if q.get("ownership", "").strip().upper() != "EXCLUSIVE":
@@ -953,7 +1177,7 @@ def rule_exclusive_lease_infinite(xml, q):
                 "Recommendation: set a finite lease_duration (e.g., 1s) to enable liveliness loss detection.")
     return None
 
- # ────────── 규칙 18 : Liveliness + ReaderDataLifeCycle ─────────
+# ────────── 규칙 18 : Liveliness + ReaderDataLifeCycle ─────────
 def rule_nowriter_delay_vs_infinite_lease(xml, q):
     # Reader 측 purge 조건
     nowriter_sec = q.get("nowriter_sec_r", "").strip()
@@ -988,7 +1212,7 @@ def rule_nowriter_delay_vs_infinite_lease(xml, q):
     return None
 
    
- # ────────── 규칙 28 : Reliability + History ─────────
+# ────────── 규칙 28 : Reliability + History ─────────
 def rule_reliable_keep_last_depth_too_small(xml, q):
     if q.get("reliability", "").strip().upper() != "RELIABLE":
         return None
@@ -1019,7 +1243,7 @@ def rule_reliable_keep_last_depth_too_small(xml, q):
                 "Recommendation: increase history depth to at least this value.")
     return None
 
- # ────────── 규칙 29 : Reliability + Resourcelimits ─────────
+# ────────── 규칙 29 : Reliability + Resourcelimits ─────────
 def rule_keepall_max_samples_per_instance(xml, q):
     if q.get("reliability", "").strip().upper() != "RELIABLE":
         return None
@@ -1048,20 +1272,16 @@ def rule_keepall_max_samples_per_instance(xml, q):
                 "Recommendation: increase max_samples_per_instance to at least this value.")
     return None
     
- # ────────── 규칙 30 : Reliability + Lifespan ─────────
+# ────────── 규칙 30 : Reliability + Lifespan ─────────
 def rule_lifespan_too_short_for_reliability(xml, q):
     if q.get("reliability", "").strip().upper() != "RELIABLE":
         return None
 
     # lifespan 추출
-    lifespan_sec_match  = re.search(r"<\s*lifespan\s*>.*?<\s*sec\s*>(\d+)</sec\s*>", xml, re.I | re.S)
-    lifespan_nsec_match = re.search(r"<\s*lifespan\s*>.*?<\s*nanosec\s*>(\d+)</nanosec\s*>", xml, re.I | re.S)
-
-    if not lifespan_sec_match and not lifespan_nsec_match:
+    ls = lifespan_parts(xml)
+    if ls is None:
         return None
-
-    ls_sec  = int(lifespan_sec_match.group(1)) if lifespan_sec_match else 0
-    ls_nsec = int(lifespan_nsec_match.group(1)) if lifespan_nsec_match else 0
+    ls_sec, ls_nsec = ls
     lifespan_ns = ls_sec * 1_000_000_000 + ls_nsec
 
     RTT_NS = globals().get("rtt_ns", 50_000_000)
@@ -1073,7 +1293,7 @@ def rule_lifespan_too_short_for_reliability(xml, q):
                 "Recommendation: set lifespan ≥ RTT when using RELIABLE.")
     return None
 
- # ────────── 규칙 34 : Reliability + Liveliness─────────
+# ────────── 규칙 34 : Reliability + Liveliness─────────
 def rule_best_effort_with_manual_liveliness(_xml, q):
     live_kind = q.get("liveliness", "").strip().upper()
     reliab = q.get("reliability", "").strip().upper()
@@ -1086,7 +1306,7 @@ def rule_best_effort_with_manual_liveliness(_xml, q):
     return None
 
 
- # ────────── 규칙 35 : OWNERSHIP + DEADLINE ─────────
+# ────────── 규칙 35 : OWNERSHIP + DEADLINE ─────────
 def rule_deadline_too_short_for_exclusive(xml, q):
     if q.get("ownership", "").strip().upper() != "EXCLUSIVE":
         return None
@@ -1112,7 +1332,7 @@ def rule_deadline_too_short_for_exclusive(xml, q):
                 "Recommendation: increase DEADLINE period to ≥ 2×publish_period.")
     return None
     
- # ────────── 규칙 36 : OWNERSHIP + Liveliness ─────────
+# ────────── 규칙 36 : OWNERSHIP + Liveliness ─────────
 def rule_lease_too_short_for_exclusive(xml, q):
     if q.get("ownership", "").strip().upper() != "EXCLUSIVE":
         return None
@@ -1138,7 +1358,7 @@ def rule_lease_too_short_for_exclusive(xml, q):
                 "Recommendation: increase lease_duration to ≥ 2×publish_period.")
     return None
 
- # ────────── 규칙 5-1 : Durability + Resourcelimits + History ─────────
+# ────────── 규칙 5-1 : Durability + Resourcelimits + History ─────────
 def rule_keepall_durable_instance_budget(xml, q):
     # 1. DURABILITY.kind ≥ TRANSIENT_LOCAL
     dur_kind = q.get("durability", "").strip().upper()
@@ -1173,7 +1393,7 @@ def rule_keepall_durable_instance_budget(xml, q):
                 "Recommendation: increase max_samples_per_instance to at least this value.")
     return None
     
- # ────────── 규칙 6-1 : Durability + History ─────────
+# ────────── 규칙 6-1 : Durability + History ─────────
 def rule_durable_keep_last_depth_1(xml, q):
     dur_kind = q.get("durability", "").strip().upper()
     hist_kind = q.get("history", "").strip().upper()
@@ -1205,7 +1425,7 @@ def rule_durable_keep_last_depth_1(xml, q):
                 "Recommendation: increase history depth to at least this value.")
     return None
 
- # ────────── 규칙 14-1 : Ownership + Deadline ─────────
+# ────────── 규칙 14-1 : Ownership + Deadline ─────────
 def rule_exclusive_deadline_infinite(xml, q):
     if q.get("ownership", "").strip().upper() != "EXCLUSIVE":
         return None
@@ -1229,7 +1449,7 @@ def rule_exclusive_deadline_infinite(xml, q):
     return None
 
 
- # ────────── 규칙 15-1 : Resourcelimits + Lifespan ─────────
+# ────────── 규칙 15-1 : Resourcelimits + Lifespan ─────────
 def rule_lifespan_exceeds_per_instance(xml, q):
     # 1. KEEP_ALL 조건
     if q.get("history", "").strip().upper() != "KEEP_ALL":
@@ -1248,25 +1468,23 @@ def rule_lifespan_exceeds_per_instance(xml, q):
     pp_sec = pub_ms / 1000
 
     # 4. lifespan
-    lifespan_m_sec  = re.search(r"<\s*lifespan\s*>.*?<\s*sec\s*>(\d+)</sec\s*>", xml, re.I | re.S)
-    lifespan_m_nsec = re.search(r"<\s*lifespan\s*>.*?<\s*nanosec\s*>(\d+)</nanosec\s*>", xml, re.I | re.S)
-    if not lifespan_m_sec and not lifespan_m_nsec:
+    ls = lifespan_parts(xml)
+    if ls is None:
         return None
+    ls_sec, ls_nsec = ls
+    lifespan_ns = ls_sec * 1_000_000_000 + ls_nsec
+    lifespan_sec = lifespan_ns / 1_000_000_000
 
-    ls_sec  = int(lifespan_m_sec.group(1)) if lifespan_m_sec else 0
-    ls_nsec = int(lifespan_m_nsec.group(1)) if lifespan_m_nsec else 0
-    lifespan_sec = ls_sec + (ls_nsec / 1_000_000_000)
-
-    # 5. 비교
+    # 5. 비교 (정수 ns)
     allowed_sec = mpi * pp_sec
-    if lifespan_sec > allowed_sec:
+    if lifespan_ns > mpi * pub_ms * 1_000_000:
         return (f"Invalid QoS: KEEP_ALL with max_samples_per_instance = {mpi} cannot store samples for lifespan = {lifespan_sec:.3f}s.\n"
                 f"Lifespan > max_samples_per_instance × publish_period = {mpi} × {pp_sec:.3f}s = {allowed_sec:.3f}s.\n"
                 "This causes valid samples to be discarded early.\n"
                 "Recommendation: increase max_samples_per_instance or reduce lifespan.")
     return None
 
- # ────────── 규칙 27-1 : Liveliness ─────────
+# ────────── 규칙 27-1 : Liveliness ─────────
 LIVELINESS_PRIORITY = {
     "AUTOMATIC": 0,
     "MANUAL_BY_PARTICIPANT": 1,
@@ -1276,8 +1494,8 @@ LIVELINESS_PRIORITY = {
 def rule_liveliness_incompatibility(pub_xml: str, sub_xml: str,
                                     pub_q: dict, sub_q: dict) -> str | None:
     # LIVENS.kind 정규화
-    pub_kind = (pub_q.get("liveliness", "") or "AUTOMATIC").strip().upper()
-    sub_kind = (sub_q.get("liveliness", "") or "AUTOMATIC").strip().upper()
+    pub_kind = pub_q["liveliness"]
+    sub_kind = sub_q["liveliness"]
 
     pub_lvl = LIVELINESS_PRIORITY.get(pub_kind, 0)
     sub_lvl = LIVELINESS_PRIORITY.get(sub_kind, 0)
@@ -1309,7 +1527,7 @@ def rule_liveliness_incompatibility(pub_xml: str, sub_xml: str,
     return None
 
 
- # ────────── 규칙 5-2 : Durability + Resourcelimits + History ─────────
+# ────────── 규칙 5-2 : Durability + Resourcelimits + History ─────────
 def rule_keepall_durable_instance_budget_1(xml, q):
     # 1. DURABILITY.kind ≥ TRANSIENT_LOCAL
     dur_kind = q.get("durability", "").strip().upper()
@@ -1343,7 +1561,7 @@ def rule_keepall_durable_instance_budget_1(xml, q):
                 "Recommendation: reduce max_samples_per_instance to save memory.")
     return None
     
- # ────────── 규칙 6-2 : Durability + History ─────────
+# ────────── 규칙 6-2 : Durability + History ─────────
 def rule_durable_keep_last_depth_2(xml, q):
     dur_kind = q.get("durability", "").strip().upper()
     hist_kind = q.get("history", "").strip().upper()
@@ -1373,7 +1591,7 @@ def rule_durable_keep_last_depth_2(xml, q):
                 f"Only ⌈RTT/PP⌉+2 = ⌈{rtt_sec:.3f}/{pp_sec:.3f}⌉+2 = {required_depth} needed.\n"
                 f"Recommendation: reduce history depth to ≤ {required_depth} to save memory.")
     return None
- # ────────── 규칙 14 : Lifespan + History ─────────
+# ────────── 규칙 14 : Lifespan + History ─────────
 def rule_keep_last_lifespan_overflow(xml, q):
     if q.get("history", "").strip().upper() != "KEEP_LAST":
         return None
@@ -1389,85 +1607,160 @@ def rule_keep_last_lifespan_overflow(xml, q):
     pp_sec = pub_ms / 1000
 
     # lifespan 추출
-    lifespan_sec_match = re.search(r"<lifespan>.*?<sec>(\d+)</sec>", xml, re.I | re.S)
-    lifespan_nsec_match = re.search(r"<lifespan>.*?<nanosec>(\d+)</nanosec>", xml, re.I | re.S)
-    if not lifespan_sec_match and not lifespan_nsec_match:
+    ls = lifespan_parts(xml)
+    if ls is None:
         return None
+    ls_sec, ls_nsec = ls
+    lifespan_ns = ls_sec * 1_000_000_000 + ls_nsec
+    lifespan_sec = lifespan_ns / 1e9
 
-    ls_sec = int(lifespan_sec_match.group(1)) if lifespan_sec_match else 0
-    ls_nsec = int(lifespan_nsec_match.group(1)) if lifespan_nsec_match else 0
-    lifespan_sec = ls_sec + ls_nsec / 1e9
-
-    if lifespan_sec > depth * pp_sec:
+    if lifespan_ns > depth * pub_ms * 1_000_000:
         return (f"Invalid QoS: KEEP_LAST(depth={depth}) × publish_period({pp_sec:.3f}s) "
                 f"= {depth * pp_sec:.3f}s < lifespan = {lifespan_sec:.3f}s.\n"
                 "Samples may be overwritten before they expire.\n"
                 "Recommendation: reduce lifespan or increase history depth.")
     return None
 
+# ────────── 규칙 42/43 : Reliability + History(KEEP_ALL) + max_blocking_time ─────────
+def estimate_write_blocking(pub_xml: str, sub_xml: str,
+                            pub_q: dict, sub_q: dict) -> dict | None:
+    """
+    RELIABLE + KEEP_ALL Writer 의 write() 최악 블로킹 시간 / 거절률 추정.
+    가장 느린 Reader 의 ACK 는 heartbeatPeriod + RTT 뒤에 도착한다고 가정한다.
+    """
+    if pub_q["reliability"] != "RELIABLE" or pub_q["history"] != "KEEP_ALL":
+        return None
+    # BEST_EFFORT Reader 는 ACK 를 보내지 않으므로 Writer 를 막지 않음
+    if sub_q["reliability"] != "RELIABLE":
+        return None
+
+    mpi_txt = pub_q["max_samples_per_instance"]
+    if not mpi_txt.isdigit() or int(mpi_txt) <= 0:
+        return None
+    mpi = int(mpi_txt)
+
+    pub_ms = globals().get("publish_period_ms")
+    rtt_ns = globals().get("rtt_ns")
+    if pub_ms is None or rtt_ns is None:
+        return None
+
+    pp_ns     = pub_ms * 1_000_000
+    hb_ns     = heartbeat_period_ns(pub_xml)
+    ack_ns    = rtt_ns + hb_ns                 # 샘플이 버퍼에서 해제되기까지
+    window_ns = mpi * pp_ns                    # 버퍼가 가득 차기까지
+    stall_ns  = max(0, ack_ns - window_ns)
+    mbt_ns    = max_blocking_time_ns(pub_xml)  # None = 무한 대기
+
+    reject = 0.0
+    if mbt_ns is not None and stall_ns > mbt_ns:
+        reject = max(0.0, 1 - (window_ns + mbt_ns) / ack_ns)
+
+    return {"mpi": mpi, "pp_ns": pp_ns, "hb_ns": hb_ns, "ack_ns": ack_ns,
+            "stall_ns": stall_ns, "mbt_ns": mbt_ns, "reject": reject}
+
+
+def rule_keepall_write_stall(pub_xml: str, sub_xml: str,
+                             pub_q: dict, sub_q: dict) -> str | None:
+    est = estimate_write_blocking(pub_xml, sub_xml, pub_q, sub_q)
+    if est is None or est["reject"] > 0:
+        return None                           # 거절은 규칙 43 에서 보고
+
+    if est["stall_ns"] > est["pp_ns"]:
+        return (f"Invalid QoS: RELIABLE + KEEP_ALL writer fills max_samples_per_instance = {est['mpi']} "
+                f"before the slowest Reader acknowledges.\n"
+                f"ACK latency = heartbeatPeriod + RTT = {est['ack_ns']/1e6:.1f} ms, "
+                f"buffer window = {est['mpi']} × {est['pp_ns']/1e6:.1f} ms.\n"
+                f"write() may block ~{est['stall_ns']/1e6:.1f} ms > publish_period "
+                f"({est['pp_ns']/1e6:.1f} ms), delaying the publishing thread.\n"
+                "Recommendation: increase max_samples_per_instance to ≥ "
+                f"{math.ceil(est['ack_ns'] / est['pp_ns'])} or shorten heartbeatPeriod.")
+    return None
+
+
+def rule_keepall_write_rejection(pub_xml: str, sub_xml: str,
+                                 pub_q: dict, sub_q: dict) -> str | None:
+    est = estimate_write_blocking(pub_xml, sub_xml, pub_q, sub_q)
+    if est is None or est["reject"] <= 0:
+        return None
+
+    return (f"Invalid QoS: RELIABLE + KEEP_ALL writer blocks ~{est['stall_ns']/1e6:.1f} ms per write "
+            f"once max_samples_per_instance = {est['mpi']} is full, "
+            f"but max_blocking_time = {est['mbt_ns']/1e6:.1f} ms.\n"
+            f"write() returns TIMEOUT under back-pressure; ~{est['reject']*100:.0f}% of samples "
+            "are rejected at steady state.\n"
+            "Recommendation: increase max_samples_per_instance to ≥ "
+            f"{math.ceil(est['ack_ns'] / est['pp_ns'])}, shorten heartbeatPeriod, "
+            "or raise max_blocking_time above the expected stall.")
+
 # ────────── 규칙 ──────────
+# (규칙, severity, Validation Stage). stage 는 README 규칙 표와 같다:
+#   1 = 단일 profile 구성, 2 = pub/sub 호환 (매칭 여부), 3 = 실행 조건 (RTT / PP / 전달 방식) 의존
+STAGES = (1, 2, 3)
+
 RULES = [
-    (rule_durability_needs_rel, "Critical"),
-    #(rule_durability_exclusive, "Warn"),
-    #(rule_dstorder_requires_rel_dur, "Warn"),
-    (rule_deadline_vs_durability, "Incidental"),
-    #(rule_keep_last_sample_budget, "Warn"),
-    #(rule_durable_keep_last_depth, "Warn"),
-    #(rule_keepall_durable_unlimited, "Warn"),
-    #(rule_autodispose_vs_durability, "Warn"),
-    (rule_lease_vs_deadline, "Conditional"),
-    #(rule_deadline_with_best_effort, "Warn"),
-    (rule_exclusive_best_effort_deadline, "Conditional"),
-    (rule_autodispose_with_best_effort, "Conditional"),
-    (rule_lifespan_vs_deadline, "Critical"),
-    #(rule_history_vs_lifespan, "Warn"),
-    #(rule_exclusive_with_deadline, "Warn"),
-    #(rule_buffer_capacity_vs_lifespan, "Warn"),
-    (rule_dest_order_vs_depth, "Conditional"),
-    #(rule_keep_last_depth_positive, "Warn"),
-    (rule_history_vs_max_per_instance, "Critical"),
-    #(rule_best_effort_exclusive, "Warn"),
-    #(rule_announce_vs_lease, "Warn"),
-    (rule_autoenable_vs_volatile_reader, "Incidental"),
-    (rule_max_samples_vs_per_instance, "Critical"),
-    (rule_destorder_keepall_mpi, "Conditional"),
-    (rule_rdlife_autopurge_vs_durability, "Incidental"),
-    (rule_liveliness_manual_partition, "Incidental"),
-    (rule_autodispose_with_exclusive, "Incidental"),
-    (rule_lifespan_too_short_for_durability, "Conditional"),
-    (rule_exclusive_lease_infinite, "Conditional"),
-    (rule_nowriter_delay_vs_infinite_lease, "Conditional"),
-    (rule_reliable_keep_last_depth_too_small, "Conditional"),
-    (rule_keepall_max_samples_per_instance, "Conditional"),
-    (rule_lifespan_too_short_for_reliability, "Conditional"),
-    (rule_best_effort_with_manual_liveliness, "Conditional"),
-    (rule_deadline_too_short_for_exclusive, "Conditional"),
-    (rule_lease_too_short_for_exclusive, "Conditional"),
-    (rule_keepall_durable_instance_budget, "Conditional"),
-    (rule_durable_keep_last_depth_1, "Conditional"),
-    (rule_keepall_durable_instance_budget_1, "Conditional"),
-    (rule_durable_keep_last_depth_2, "Conditional"),
-    (rule_exclusive_deadline_infinite, "Conditional"),
-    (rule_lifespan_exceeds_per_instance, "Conditional"),
-    (rule_keep_last_lifespan_overflow, "Conditional"),
+    (rule_durability_needs_rel, "Critical", 3),
+    #(rule_durability_exclusive, "Warn", 3),
+    #(rule_dstorder_requires_rel_dur, "Warn", 3),
+    (rule_deadline_vs_durability, "Incidental", 3),
+    #(rule_keep_last_sample_budget, "Warn", 1),
+    #(rule_durable_keep_last_depth, "Warn", 1),
+    #(rule_keepall_durable_unlimited, "Warn", 1),
+    #(rule_autodispose_vs_durability, "Warn", 1),
+    (rule_lease_vs_deadline, "Conditional", 3),
+    #(rule_deadline_with_best_effort, "Warn", 3),
+    (rule_exclusive_best_effort_deadline, "Conditional", 3),
+    (rule_autodispose_with_best_effort, "Conditional", 3),
+    (rule_lifespan_vs_deadline, "Critical", 1),
+    #(rule_history_vs_lifespan, "Warn", 1),
+    #(rule_exclusive_with_deadline, "Warn", 3),
+    #(rule_buffer_capacity_vs_lifespan, "Warn", 1),
+    (rule_dest_order_vs_depth, "Conditional", 1),
+    #(rule_keep_last_depth_positive, "Warn", 1),
+    (rule_history_vs_max_per_instance, "Critical", 1),
+    #(rule_best_effort_exclusive, "Warn", 3),
+    #(rule_announce_vs_lease, "Warn", 3),
+    (rule_autoenable_vs_volatile_reader, "Incidental", 1),
+    (rule_max_samples_vs_per_instance, "Critical", 1),
+    (rule_destorder_keepall_mpi, "Conditional", 1),
+    (rule_rdlife_autopurge_vs_durability, "Incidental", 1),
+    (rule_liveliness_manual_partition, "Incidental", 1),
+    (rule_autodispose_with_exclusive, "Incidental", 1),
+    (rule_lifespan_too_short_for_durability, "Conditional", 1),
+    (rule_exclusive_lease_infinite, "Conditional", 1),
+    (rule_nowriter_delay_vs_infinite_lease, "Conditional", 1),
+    (rule_reliable_keep_last_depth_too_small, "Conditional", 3),
+    (rule_keepall_max_samples_per_instance, "Conditional", 3),
+    (rule_lifespan_too_short_for_reliability, "Conditional", 3),
+    (rule_best_effort_with_manual_liveliness, "Conditional", 3),
+    (rule_deadline_too_short_for_exclusive, "Conditional", 3),
+    (rule_lease_too_short_for_exclusive, "Conditional", 3),
+    (rule_keepall_durable_instance_budget, "Conditional", 1),
+    (rule_durable_keep_last_depth_1, "Conditional", 1),
+    (rule_keepall_durable_instance_budget_1, "Conditional", 3),
+    (rule_durable_keep_last_depth_2, "Conditional", 3),
+    (rule_exclusive_deadline_infinite, "Conditional", 1),
+    (rule_lifespan_exceeds_per_instance, "Conditional", 1),
+    (rule_keep_last_lifespan_overflow, "Conditional", 1),
 
 
 ]
 
 # ────────── 교차규칙 ──────────
 CROSS_RULES = [
-            (rule_dest_order_compat, "Critical"),
-            (rule_ownership_compat, "Critical"),
-            (rule_reliability_compat, "Critical"),
-            (rule_durability_compat, "Critical"),
-            (rule_deadline_period_compat, "Critical"),        # xml 2개
-            #(rule_liveliness_compat, "Warn"),             # xml 2 + dict 2
-            (rule_nowriter_autodispose_cross, "Conditional"),    # dict 2
-            #(rule_partition_userdata_key, "Warn"),        # dict 2
-            (rule_partition_overlap, "Critical"),             # ★ xml 2개
-            (rule_durable_partition_miss, "Incidental"),        # xml 2 + dict 2
-            (rule_deadline_partition_reset, "Incidental"),      # ★ xml 2개
-            (rule_liveliness_incompatibility, "Critical"),
+            (rule_dest_order_compat, "Critical", 2),
+            (rule_ownership_compat, "Critical", 2),
+            (rule_reliability_compat, "Critical", 2),
+            (rule_durability_compat, "Critical", 2),
+            (rule_deadline_period_compat, "Critical", 2),        # xml 2개
+            #(rule_liveliness_compat, "Warn", 2),             # xml 2 + dict 2
+            (rule_nowriter_autodispose_cross, "Conditional", 2),    # dict 2
+            #(rule_partition_userdata_key, "Warn", 2),        # dict 2
+            (rule_partition_overlap, "Critical", 2),             # ★ xml 2개
+            (rule_durable_partition_miss, "Incidental", 1),        # xml 2 + dict 2
+            (rule_deadline_partition_reset, "Incidental", 1),      # ★ xml 2개
+            (rule_liveliness_incompatibility, "Critical", 2),
+            (rule_keepall_write_stall, "Conditional", 3),        # xml 2 + dict 2
+            (rule_keepall_write_rejection, "Critical", 3),       # xml 2 + dict 2
 ]
 
 # ────────── main ──────────
@@ -1478,70 +1771,139 @@ SEVERITY_COLOR = {
     "Warn": "\033[37m",
     }
 
+# ────────── 한 쌍 검사 ──────────
+def set_timing(publish_period_ms: float | None, rtt_ms: float | None) -> None:
+    """PP / RTT 의존 규칙이 읽는 전역 값을 설정 (None 이면 해당 규칙 생략)."""
+    g = globals()
+    for key, val in (("publish_period_ms", publish_period_ms),
+                     ("rtt_ns", None if rtt_ms is None else int(rtt_ms * 1_000_000))):
+        if val is None:
+            g.pop(key, None)
+        else:
+            g[key] = val
+
+
+def call_cross_rule(rule_fn, pub_xml: str, sub_xml: str, pub_q: dict, sub_q: dict):
+    if rule_fn in {
+        rule_deadline_period_compat, 
+        rule_partition_overlap, 
+        rule_deadline_partition_reset, 
+    }:
+        return rule_fn(pub_xml, sub_xml)
+
+    #elif rule_fn is rule_liveliness_compat:
+        #return rule_fn(pub_xml, sub_xml, pub_q, sub_q)
+
+    if rule_fn is rule_liveliness_incompatibility: 
+        return rule_fn(pub_xml, sub_xml, pub_q, sub_q)
+
+    if rule_fn in {
+        rule_durable_partition_miss,
+        rule_keepall_write_stall,
+        rule_keepall_write_rejection,
+    }:
+        return rule_fn(pub_xml, sub_xml, pub_q, sub_q)
+
+    return rule_fn(pub_q, sub_q)                # dest_order / ownership 등
+
+
+def iter_staged(rules, call, fail_fast: bool = False):
+    """
+    (규칙, severity, stage, …) 목록을 stage 순서로 (같은 stage 안에서는 목록 순서) 평가해
+    (항목, message) 를 차례로. fail_fast 면 Critical 이 나온 stage 까지만 평가한다.
+    """
+    stop = None
+    for entry in sorted(rules, key=lambda r: r[2]):
+        if stop is not None and entry[2] > stop:
+            return
+        msg = call(entry)
+        if msg:
+            yield entry, msg
+            if fail_fast and entry[1] == "Critical":
+                stop = entry[2]
+
+
+def check_pair_staged(pub_xml: str, sub_xml: str, pub_q: dict, sub_q: dict,
+                      fail_fast: bool = False) -> tuple[list[tuple], int | None]:
+    """
+    check_pair 의 stage 판: ([(stage, severity, side, message)], 멈춘 stage).
+    멈춘 stage 는 fail_fast 로 이후 stage 를 건너뛴 경우에만 값이 있다.
+    """
+    sides = {"PUB": (pub_xml, pub_q), "SUB": (sub_xml, sub_q)}
+    # stage 안에서의 순서: PUB RULES → SUB RULES → CROSS_RULES
+    rules = [(fn, sev, stage, side) for side in sides for fn, sev, stage in RULES] + \
+            [(fn, sev, stage, None) for fn, sev, stage in CROSS_RULES]
+
+    def call(entry):
+        fn, side = entry[0], entry[3]
+        if side is None:
+            return call_cross_rule(fn, pub_xml, sub_xml, pub_q, sub_q)
+        return fn(*sides[side])                  # RULES : (xml, prof) 형식만!
+
+    findings = [(stage, sev, side, msg)
+                for (_, sev, stage, side), msg in iter_staged(rules, call, fail_fast)]
+    stopped = None
+    if fail_fast:
+        critical = [f[0] for f in findings if f[1] == "Critical"]
+        stopped = min(critical) if critical and min(critical) < STAGES[-1] else None
+    return findings, stopped
+
+
+def check_pair(pub_xml: str, sub_xml: str, pub_q: dict, sub_q: dict,
+               fail_fast: bool = False) -> List[tuple[str, str | None, str]]:
+    """
+    Writer / Reader 실효 QoS 에 RULES 와 CROSS_RULES 를 Validation Stage 순서로 적용.
+    (severity, side, message) 목록 반환, side 는 "PUB" / "SUB" / None(교차 규칙).
+    fail_fast 면 Critical 이 나온 stage 이후는 평가하지 않는다.
+    """
+    findings, _ = check_pair_staged(pub_xml, sub_xml, pub_q, sub_q, fail_fast)
+    return [f[1:] for f in findings]
+
+
+def format_finding(severity: str, side: str | None, msg: str) -> str:
+    color_tag = color(f"[{severity.upper()}]", SEVERITY_COLOR.get(severity, RED))
+    if side is None:
+        return f"{color_tag} {msg}"
+    return f"{color_tag} {color(f'[{side}]', BLUE)} {msg}"
+
+
 def main() -> None:
-    # 인자: pub.xml  sub.xml  publish_period=<Nms>
-    if len(sys.argv) != 5:
+    # 서브커맨드: check_qos_cli <command> ...
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        module, _, func = COMMANDS[sys.argv[1]].partition(":")
+        getattr(importlib.import_module(module), func or "main")(sys.argv[2:])
+        return
+
+    # 인자: pub.xml  sub.xml  publish_period=<Nms>  rtt=<Nms>  [--fail-fast]
+    fail_fast = "--fail-fast" in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a != "--fail-fast"]
+    if len(args) != 4:
         sys.exit(USAGE)
 
     # ① XML 로드
-    pub_xml = load_text(pathlib.Path(sys.argv[1]))
-    sub_xml = load_text(pathlib.Path(sys.argv[2]))
+    pub_xml = load_text(pathlib.Path(args[0]))
+    sub_xml = load_text(pathlib.Path(args[1]))
 
     # ② publish_period=40ms → 전역 변수 publish_period_ms 저장
-    _ = parse_period(sys.argv[3])           # parse_period 내부에서 globals()['publish_period_ms'] 설정
-    _ = parse_rtt(sys.argv[4]) 
-
-    # ③ XML → QoS Dict
-    pub_q = parse_profile(pub_xml)          # writer 프로파일
-    sub_q = parse_profile(sub_xml)          # reader 프로파일
-
-    warnings: List[str] = []
-
-    # ── 1) 단일-프로파일 규칙 루프 ─────────────────────────────
-    for side, (xml, prof) in (("PUB", (pub_xml, pub_q)),
-                              ("SUB", (sub_xml, sub_q))):
-        for rule, severity in RULES:                  # RULES : (xml, prof) 형식만!
-            msg = rule(xml, prof)
-            if msg:
-                tag=f"[{severity.upper()}]"
-                color_tag = color(tag, SEVERITY_COLOR.get(severity, RED))
-                warnings.append(
-                    f"{color_tag} {color(f'[{side}]', BLUE)} {msg}"
-                )
-
-
-# ── 2) 교차-규칙 호출 ─────────────────────────────
-    for rule_fn, severity in CROSS_RULES:
-
-        if rule_fn in {
-            rule_deadline_period_compat, 
-            rule_partition_overlap, 
-            rule_deadline_partition_reset, 
-        }:
-            msg = rule_fn(pub_xml, sub_xml)
-
-        #elif rule_fn is rule_liveliness_compat:
-            #msg = rule_fn(pub_xml, sub_xml, pub_q, sub_q)
-            
-        elif rule_fn is rule_liveliness_incompatibility: 
-            msg = rule_fn(pub_xml, sub_xml, pub_q, sub_q)
-
-        elif rule_fn is rule_durable_partition_miss:
-            msg = rule_fn(pub_xml, sub_xml, pub_q, sub_q)
+    _ = parse_period(args[2])               # parse_period 내부에서 globals()['publish_period_ms'] 설정
+    _ = parse_rtt(args[3])
 
-        else:                                   # dest_order / ownership 등
-            msg = rule_fn(pub_q, sub_q)
-
-        if msg:
-            tag = f"[{severity.upper()}]"
-            color_tag = color(tag, SEVERITY_COLOR.get(severity, RED))
-            warnings.append(f"{color_tag} {msg}")
+    # ③ XML → 실효 QoS Dict (default profile 상속 + Fast DDS 기본값)
+    pub_xml, pub_q = resolve_qos(pub_xml, "PUB")          # writer 프로파일
+    sub_xml, sub_q = resolve_qos(sub_xml, "SUB")          # reader 프로파일
 
+    findings, stopped = check_pair_staged(pub_xml, sub_xml, pub_q, sub_q, fail_fast)
+    warnings = [format_finding(*f[1:]) for f in findings]
 
-    # ── 3) 결과 출력 ─────────────────────────────────────────
+    # ── 결과 출력 ─────────────────────────────────────────
     if warnings:
         for w in warnings:
             print(w)
+        if stopped:
+            rest = STAGES[STAGES.index(stopped) + 1:]
+            skipped = f"stage {rest[0]}" if len(rest) == 1 else f"stages {rest[0]}-{rest[-1]}"
+            print(f"Stopped at Validation Stage {stopped} (Critical finding); "
+                  f"{skipped} skipped (--fail-fast).")
         sys.exit(0)   
     print("✅  All QoS constraints satisfied.")
 
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Writer / Reader 쌍의 Critical finding 을 없애는 최소 QoS 수정 탐색.
+
+    ros2 run check_qos check_qos_cli repair <pub.xml> <sub.xml> [publish_period=<Nms>] [rtt=<Nms>]
+                                            [sample_size=<bytes>] [loss_rate=<p>]
+                                            [max_edits=<N>] [top=<N>] [max_states=<N>]
+
+수정 개수가 적은 후보부터 best-first 로 펼친다. 남은 Critical / 새로 생긴 규칙은 자기가
+실제로 읽은 필드(whatif 의존성 추적) 중 하나가 바뀌어야만 결과가 바뀌므로, 선택지가 가장
+적은 규칙 하나의 필드만 분기하고, 서로 겹치지 않는 규칙 수를 남은 수정 개수의 하한으로
+써서 가지를 친다. 필드당 수정은 한 번, 같은 수정 집합은 한 번만 평가한다.
+최소 개수의 해들을 추가 메모리 + 대역폭 비용으로 정렬한다. 평가한 상태가 max_states 에
+이르면 탐색을 멈추고 truncated 로 표시한다 (같은 개수의 다른 해가 빠졌을 수 있다).
+"""
+import heapq
+import itertools
+import math
+import pathlib
+import sys
+import time
+
+from .bandwidth import estimate_writer_bandwidth, total_bps
+from .manifest import fmt_bps, fmt_bytes, parse_loss_rate, parse_size_bytes
+from .qos_checker import (BLUE, SEVERITY_COLOR, color, format_finding, load_text,
+                          parse_period, parse_rtt, scoped_text)
+from .whatif import FIELDS, WhatIf, field_value, remove_element, set_element
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli repair <pub.xml> <sub.xml> "
+         "[publish_period=<Nms>] [rtt=<Nms>] [sample_size=<bytes>] [loss_rate=<p>] "
+         "[max_edits=<N>] [top=<N>] [max_states=<N>]")
+
+DEFAULT_SAMPLE_SIZE = 1024
+DEFAULT_MAX_EDITS = 3
+MAX_STATES = 20_000
+COST_WINDOW_S = 1.0          # 대역폭 1초 분량 = 메모리 같은 bytes 로 환산해 합산
+
+# ────────── 탐색 공간 ──────────
+KIND_DOMAIN = {
+    "reliability": ("RELIABLE", "BEST_EFFORT"),
+    "durability":  ("VOLATILE", "TRANSIENT_LOCAL", "TRANSIENT", "PERSISTENT"),
+    "history":     ("KEEP_LAST", "KEEP_ALL"),
+    "ownership":   ("SHARED", "EXCLUSIVE"),
+    "dest_order":  ("BY_RECEPTION_TIMESTAMP", "BY_SOURCE_TIMESTAMP"),
+    "liveliness":  ("AUTOMATIC", "MANUAL_BY_PARTICIPANT", "MANUAL_BY_TOPIC"),
+    "autodispose": ("TRUE", "FALSE"),
+}
+COUNT_FIELDS = ("depth", "max_samples", "max_samples_per_instance", "max_instances")
+COUNT_DOMAIN = tuple(1 << i for i in range(13))              # 1 … 4096, 이후 _tighten
+COPY_FIELDS = ("deadline", "lease", "partitions")            # 상대편 값 복사 / 해제
+UNSET_FIELDS = ("lifespan",)
+SEARCH_FIELDS = (*KIND_DOMAIN, *COUNT_FIELDS, *COPY_FIELDS, *UNSET_FIELDS)
+OTHER = {"PUB": "SUB", "SUB": "PUB"}
+
+
+def dep_fields(dep: tuple) -> set[str]:
+    """규칙 의존성 (side, QoS key | XML 경로) → 그 값을 바꾸는 탐색 필드."""
+    _, key = dep
+    if isinstance(key, tuple):
+        return {f for f in SEARCH_FIELDS
+                if FIELDS[f][:len(key)] == key or key[:len(FIELDS[f])] == FIELDS[f]}
+    key = {"history_depth": "depth", "partition_list": "partitions"}.get(key, key)
+    return {key} if key in SEARCH_FIELDS else set()
+
+
+# ────────── 비용 ──────────
+def history_capacity(q: dict, instances: int = 1) -> float:
+    """history 가 붙잡을 수 있는 최대 샘플 수 (resource limit 0 = 무제한 → inf)."""
+    def count(key):
+        txt = q.get(key, "")
+        return int(txt) if txt.isdigit() and int(txt) > 0 else math.inf
+    per = count("max_samples_per_instance") if q["history"] == "KEEP_ALL" \
+        else count("history_depth")
+    return min(per * instances, count("max_samples"))
+
+
+def footprint(eff: dict, pp_ms: float | None, rtt_ms: float | None,
+              sample_size: int, loss_rate: float) -> tuple[float, float]:
+    """(Writer + Reader history 메모리 bytes, Writer 정상상태 트래픽 bits/s)."""
+    memory = sum(history_capacity(eff[side][1]) for side in ("PUB", "SUB")) * sample_size
+    if pp_ms is None:
+        return memory, 0.0
+    (pub_xml, pub_q), (_, sub_q) = eff["PUB"], eff["SUB"]
+    # BEST_EFFORT Reader 에게는 heartbeat / ACKNACK / 재전송이 없음
+    reliable = pub_q["reliability"] == sub_q["reliability"] == "RELIABLE"
+    q = {**pub_q, "reliability": "RELIABLE" if reliable else "BEST_EFFORT"}
+    est = estimate_writer_bandwidth(pub_xml, q, pp_ms, rtt_ms or 0.0, loss_rate, sample_size)
+    return memory, total_bps(est)
+
+
+# ────────── 탐색 ──────────
+class RepairSearch:
+    def __init__(self, pub_doc: str, sub_doc: str, pp_ms: float | None = None,
+                 rtt_ms: float | None = None, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 loss_rate: float = 0.0):
+        self.orig = {"PUB": pub_doc, "SUB": sub_doc}
+        self.s = WhatIf(pub_doc, sub_doc, pp_ms, rtt_ms)
+        self.cost_args = (pp_ms, rtt_ms, sample_size, loss_rate)
+        self.base_keys = self._keys()
+        self.base_cost = footprint(self.s.eff, *self.cost_args)
+        self.before = self.s.findings()
+        self.base_eff = self.s.eff                 # update() 는 eff 를 새 dict 로 바꿈
+        self.evaluated = 0
+        self.truncated = False                     # max_states 에서 멈춤
+
+    def _keys(self) -> dict:
+        return {(side, fn): sev for side, fn, sev in self.s.rules if self.s.results[side, fn]}
+
+    def _apply(self, edits: tuple) -> None:
+        docs = dict(self.orig)
+        for (side, field), _, inner in edits:
+            path = FIELDS[field]
+            docs[side] = remove_element(docs[side], path) if inner is None \
+                else set_element(docs[side], path, inner)
+        self.s.update(docs=docs)
+        self.s.history.clear()
+        self.evaluated += 1
+
+    def _bad(self) -> list:
+        """남은 Critical + 원래 없던 finding 의 규칙 key."""
+        return [k for k, sev in self._keys().items()
+                if sev == "Critical" or k not in self.base_keys]
+
+    def _domain(self, side: str, field: str) -> list[tuple[str, str | None]]:
+        """(표시 label, 요소 내용 | None=해제) 후보. 현재 값과 같은 후보는 제외."""
+        xml, q = self.s.eff[side]
+        other_xml, other_q = self.s.eff[OTHER[side]]
+        current = field_value(xml, q, field)
+        if field in KIND_DOMAIN:
+            return [(v, v) for v in KIND_DOMAIN[field] if v != current]
+        if field in COUNT_FIELDS:
+            values = set(COUNT_DOMAIN)
+            theirs = field_value(other_xml, other_q, field)
+            if theirs.isdigit():
+                values.add(int(theirs))
+            return [(str(v), str(v)) for v in sorted(values) if str(v) != current]
+        out = []
+        if field in COPY_FIELDS:
+            inner = scoped_text(other_xml, FIELDS[field])
+            theirs = field_value(other_xml, other_q, field)
+            if inner is not None and theirs != current:
+                out.append((f"{theirs} (= {OTHER[side]})", inner.strip()))
+            if field == "partitions":
+                names = sorted(set(q["partition_list"]) | set(other_q["partition_list"]) - {""})
+                union = "<names>" + "".join(f"<name>{n}</name>" for n in names) + "</names>"
+                if names and ",".join(names) not in (current, theirs):
+                    out.append((",".join(names), union))
+        if scoped_text(xml, FIELDS[field]) is not None:
+            out.append(("unset", None))
+        return out
+
+    def _options(self, key, touched: set) -> frozenset:
+        """규칙 key 의 결과를 바꿀 수 있는 아직 안 건드린 (side, field)."""
+        out = set()
+        for side, k in self.s.deps[key]:
+            if side:
+                out |= {(side, f) for f in dep_fields((side, k))}
+        return frozenset(out - touched)
+
+    def _cost(self) -> tuple[float, float]:
+        mem, bps = footprint(self.s.eff, *self.cost_args)
+        return mem - self.base_cost[0], bps - self.base_cost[1]
+
+    def _tighten(self, edits: tuple) -> tuple:
+        """해에 포함된 개수 값을 여전히 해가 되는 가장 작은 값으로 줄인다 (이분 탐색)."""
+        edits = list(edits)
+        for i, ((side, field), _, inner) in enumerate(edits):
+            if field not in COUNT_FIELDS or inner is None:
+                continue
+            lo, hi = 1, int(inner)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                trial = edits[:i] + [((side, field), str(mid), str(mid))] + edits[i + 1:]
+                self._apply(tuple(trial))
+                if self._bad():
+                    lo = mid + 1
+                else:
+                    hi = mid
+            edits[i] = ((side, field), str(hi), str(hi))
+        return tuple(edits)
+
+    def search(self, max_edits: int = DEFAULT_MAX_EDITS, top: int = 5,
+               max_states: int = MAX_STATES) -> list[dict]:
+        """
+        최소 개수의 수정 집합들을 비용 순으로. 해가 없으면 빈 목록. max_states 개를 평가하고도
+        후보가 남으면 멈추고 self.truncated 를 켠다.
+        """
+        tie = itertools.count()
+        heap = [(0, 0.0, next(tie), ())]
+        seen, solutions, best_n = {()}, {}, None
+        while heap:
+            if self.evaluated >= max_states:
+                self.truncated = True
+                break
+            n, _, _, edits = heapq.heappop(heap)
+            if best_n is not None and n > best_n:
+                break
+            self._apply(edits)
+            bad = self._bad()
+            if not bad:
+                best_n = n
+                solutions[edits] = None
+                continue
+            # 나쁜 규칙마다 자기가 읽은 필드 중 하나는 바뀌어야 결과가 바뀐다
+            touched = {k for k, _, _ in edits}
+            options = sorted((self._options(k, touched) for k in bad), key=len)
+            if not options[0]:
+                continue                            # 고칠 수 없는 규칙이 남음
+            # 하한: 서로 필드가 겹치지 않는 나쁜 규칙 수만큼은 더 고쳐야 함
+            need, used = 0, set()
+            for opts in options:
+                if not opts & used:
+                    need, used = need + 1, used | opts
+            if n + need > (max_edits if best_n is None else best_n):
+                continue
+            # 선택지가 가장 적은 규칙 하나만 분기 (모든 해는 그 규칙의 필드를 바꾼다)
+            cost = sum(self._cost())
+            for side, field in sorted(options[0]):
+                for label, inner in self._domain(side, field):
+                    child = tuple(sorted(edits + (((side, field), label, inner),),
+                                         key=lambda e: e[0]))
+                    if child not in seen:
+                        seen.add(child)
+                        heapq.heappush(heap, (n + 1, cost, next(tie), child))
+
+        ranked = []
+        for edits in {self._tighten(e) for e in solutions}:
+            self._apply(edits)
+            before = {k: field_value(*self.base_eff[k[0]], k[1]) for k, _, _ in edits}
+            mem, bps = self._cost()
+            ranked.append({"edits": [(side, field, before[side, field], label)
+                                     for (side, field), label, _ in edits],
+                           "memory": mem, "bandwidth": bps,
+                           "cost": mem + bps / 8 * COST_WINDOW_S})
+        ranked.sort(key=lambda r: (r["cost"], r["edits"]))
+        return ranked[:top]
+
+
+# ────────── CLI ──────────
+def main(argv: list[str]) -> None:
+    if len(argv) < 2:
+        sys.exit(USAGE)
+    pp_ms = rtt_ms = None
+    sample_size, loss_rate, max_edits, top = DEFAULT_SAMPLE_SIZE, 0.0, DEFAULT_MAX_EDITS, 5
+    max_states = MAX_STATES
+    for arg in argv[2:]:
+        key, _, val = arg.partition("=")
+        if key == "publish_period":
+            pp_ms = parse_period(arg)
+        elif key == "rtt":
+            rtt_ms = parse_rtt(arg)
+        elif key == "sample_size":
+            sample_size = parse_size_bytes(val)
+        elif key == "loss_rate":
+            loss_rate = parse_loss_rate(val)
+        elif key in ("max_edits", "top") and val.strip().isdigit() and int(val) > 0:
+            max_edits, top = (int(val), top) if key == "max_edits" else (max_edits, int(val))
+        elif key == "max_states" and val.strip().isdigit() and int(val) > 0:
+            max_states = int(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+
+    t0 = time.perf_counter()
+    search = RepairSearch(load_text(pathlib.Path(argv[0])), load_text(pathlib.Path(argv[1])),
+                          pp_ms, rtt_ms, sample_size, loss_rate)
+    critical = [f for f in search.before if f[0] == "Critical"]
+    if not critical:
+        print("✅  No Critical findings to repair.")
+        return
+    for f in critical:
+        print(format_finding(*f).splitlines()[0])
+
+    fixes = search.search(max_edits, top, max_states)
+    elapsed = 1e3 * (time.perf_counter() - t0)
+    print()
+    if search.truncated:
+        print(f"{color('[TRUNCATED]', SEVERITY_COLOR['Conditional'])} search stopped after "
+              f"{max_states} state(s) with candidates left; "
+              + ("a fix may still exist" if not fixes
+                 else "cheaper fixes of the same size may be missing")
+              + "; raise max_states=<N>.")
+    if not fixes and search.truncated:
+        return
+    if not fixes:
+        print(f"{color('[NO FIX]', SEVERITY_COLOR['Critical'])} no set of ≤ {max_edits} edit(s) "
+              "clears every Critical finding without adding new ones "
+              f"({search.evaluated} state(s), {elapsed:.0f} ms); try max_edits=<N>.")
+        return
+    for i, fix in enumerate(fixes, 1):
+        print(f"{color(f'[fix {i}]', BLUE)} {len(fix['edits'])} edit(s), "
+              f"memory {fmt_bytes(fix['memory'], signed=True)}, bandwidth {fmt_bps(fix['bandwidth'], signed=True)}")
+        for side, field, before, after in fix["edits"]:
+            print(f"    {side} {field}: {before} → {after}")
+    print(f"\n{search.evaluated} state(s) evaluated in {elapsed:.0f} ms")
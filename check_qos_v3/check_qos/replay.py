@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Late-joiner durable replay burst 분석기.
+
+TRANSIENT_LOCAL 이상 Writer 는 새로 매칭된 (non-volatile) Reader 마다 history 전체를
+한 번에 재전송한다. 여러 Reader 가 동시에 시작하면 (fleet 재시작) burst 가 곱해진다.
+
+    ros2 run check_qos check_qos_cli replay <manifest.yaml> [rtt=<Nms>] [late_joiners=<N>]
+"""
+import math
+import pathlib
+import sys
+
+from .bandwidth import sample_wire_bytes
+from .manifest import link_capacity_bps, load_manifest, parse_duration_ms
+from .qos_checker import BLUE, NON_VOLATILE, SEVERITY_COLOR, color
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli replay "
+         "<manifest.yaml> [rtt=<Nms>] [late_joiners=<N>]")
+
+DEFAULT_SOCKET_BUFFER = 212_992      # Linux net.core.rmem_default / wmem_default
+
+
+def _int_field(q: dict, key: str) -> int | None:
+    txt = q.get(key, "").strip()
+    return int(txt) if txt.isdigit() and int(txt) > 0 else None
+
+
+def replay_samples(q: dict, instances: int | None = None) -> tuple[int, int] | None:
+    """새 Reader 1개가 받는 (durable 샘플 수, instance 수). VOLATILE / 무제한이면 None."""
+    if q.get("durability", "").strip().upper() not in NON_VOLATILE:
+        return None
+    inst = instances or _int_field(q, "max_instances") or 1
+    max_s = _int_field(q, "max_samples")
+    if q.get("history", "").strip().upper() == "KEEP_ALL":
+        mpi = _int_field(q, "max_samples_per_instance")
+        if mpi is None and max_s is None:
+            return None                                   # 무제한: 추정 불가
+        return int(min(mpi * inst if mpi else math.inf, max_s or math.inf)), inst
+    total = (_int_field(q, "history_depth") or 1) * inst
+    return (min(total, max_s) if max_s else total), inst
+
+
+def analyze_topic(topic: dict, capacity_bps: float | None,
+                  late_joiners: int | None = None) -> dict | None:
+    w = topic["writer"]
+    res = replay_samples(w["q"], topic["instances"])
+    if res is None:
+        return None
+    samples, inst = res
+
+    # VOLATILE Reader 는 과거 샘플을 요청하지 않음
+    durable_readers = sum(r["count"] for r in topic["readers"]
+                          if r["q"].get("durability", "").strip().upper() in NON_VOLATILE)
+    joiners = late_joiners or topic["late_joiners"] or durable_readers
+    if joiners <= 0:
+        return None
+
+    size = topic["sample_size"]
+    _, wire = sample_wire_bytes(size) if size else (1, None)
+    per_reader = samples * wire if wire else None
+    out = {"samples": samples, "joiners": joiners, "per_reader_bytes": per_reader,
+           "burst_bytes": per_reader * joiners if per_reader else None,
+           "burst_s": None, "ttff_s": None, "excess_samples": 0,
+           "socket_buffer": topic["socket_buffer"] or DEFAULT_SOCKET_BUFFER}
+
+    # ⌈RTT/PP⌉+2 보다 깊은 history 는 재생량만 늘림 (규칙 rule_durable_keep_last_depth_2 /
+    # rule_keepall_durable_instance_budget_1 과 동일 기준)
+    pp_ms, rtt_ms = topic["publish_period_ms"], topic["rtt_ms"]
+    if pp_ms and rtt_ms is not None:
+        required = math.ceil(rtt_ms / pp_ms) + 2
+        out["excess_samples"] = max(0, samples - required * inst)
+
+    if out["burst_bytes"] and capacity_bps:
+        out["burst_s"] = out["burst_bytes"] * 8 / capacity_bps
+        # 새 샘플은 재전송 큐 뒤에 붙으므로 burst 가 끝나야 도착
+        out["ttff_s"] = out["burst_s"] + (rtt_ms or 0) / 2000
+    return out
+
+
+def main(argv: list[str]) -> None:
+    if not argv:
+        sys.exit(USAGE)
+    overrides, late_joiners = {}, None
+    for arg in argv[1:]:
+        key, _, val = arg.partition("=")
+        if key == "rtt":
+            parse_duration_ms(val, "rtt")
+            overrides["rtt"] = val
+        elif key == "late_joiners" and val.strip().isdigit():
+            late_joiners = int(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+
+    manifest = load_manifest(pathlib.Path(argv[0]), overrides)
+    for t in manifest["topics"]:
+        w = t["writer"]
+        res = analyze_topic(t, link_capacity_bps(manifest, w["host"], w["interface"]),
+                            late_joiners)
+        tag = color(f"[{t['name']}]", BLUE)
+        if res is None:
+            print(f"{tag} no durable replay (VOLATILE writer/readers or unbounded history)")
+            continue
+
+        line = f"{tag} {res['joiners']} late joiner(s) × {res['samples']} durable sample(s)"
+        if res["burst_bytes"] is None:
+            print(line + " (sample_size missing: volume in bytes not estimated)")
+            continue
+        line += (f" = {res['burst_bytes']/1e6:.2f} MB replay "
+                 f"({res['per_reader_bytes']/1e3:.1f} kB per reader)")
+        if res["burst_s"] is not None:
+            line += (f", burst {res['burst_s']*1e3:.1f} ms on "
+                     f"{w['host'] or '?'}/{w['interface'] or '?'}, "
+                     f"first fresh sample after ~{res['ttff_s']*1e3:.1f} ms")
+        print(line)
+
+        if res["excess_samples"]:
+            print(f"  {color('[INCIDENTAL]', SEVERITY_COLOR['Incidental'])} "
+                  f"{res['excess_samples']} sample(s) per reader exceed ⌈RTT/PP⌉+2; "
+                  "reducing history depth / max_samples_per_instance shrinks the startup burst.")
+        buf = res["socket_buffer"]
+        if res["per_reader_bytes"] > buf:
+            print(f"  {color('[CRITICAL]', SEVERITY_COLOR['Critical'])} per-reader replay "
+                  f"({res['per_reader_bytes']/1e3:.1f} kB) exceeds the receive socket buffer "
+                  f"({buf/1e3:.1f} kB); replayed samples will be dropped and re-requested.")
+        elif res["burst_bytes"] > buf:
+            print(f"  {color('[CONDITIONAL]', SEVERITY_COLOR['Conditional'])} simultaneous "
+                  f"replay to {res['joiners']} readers ({res['burst_bytes']/1e3:.1f} kB) exceeds "
+                  f"the writer send socket buffer ({buf/1e3:.1f} kB); stagger reader startup.")
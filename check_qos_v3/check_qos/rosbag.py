@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""rosbag2 녹화에서 토픽별 실제 publish period / jitter 추출.
+
+metadata.yaml 의 메시지 수 / 녹화 시간과 storage(sqlite3 / MCAP)의 메시지별 timestamp 를
+스트리밍으로 읽는다 (메시지 payload 는 읽지 않음). 간격 통계는 Welford 누적 평균/분산,
+분위수는 고정 크기 reservoir 표본으로 계산하고, 결과는 bag 별로 캐시한다.
+
+    ros2 run check_qos check_qos_cli bag <bag_dir|root>... [topic=<name>] [rtt=<Nms>]
+                                         [pub=<pub.xml> sub=<sub.xml> | manifest=<m.yaml>]
+
+측정한 평균 period 를 publish_period 로 써서 규칙을 검사한다. pub / sub 는 topic= 으로 고른
+토픽 하나에, manifest 는 그 안의 topic 마다 writer × reader profile 에 적용한다 (측정값이
+manifest 의 publish_period 를 덮어씀, load_manifest 의 topic_overrides).
+"""
+import hashlib
+import json
+import math
+import os
+import pathlib
+import random
+import sqlite3
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .manifest import load_manifest, parse_duration_ms
+from .qos_checker import (BLUE, SEVERITY_COLOR, check_pair, color, format_finding,
+                          load_text, resolve_qos, set_timing)
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli bag <bag_dir|root>... [topic=<name>] "
+         "[rtt=<Nms>] [pub=<pub.xml> sub=<sub.xml> | manifest=<m.yaml>]")
+
+RESERVOIR_SIZE = 4096
+CACHE_VERSION = 1
+JITTER_WARN_RATIO = 1.5          # p99 / p50 이 이 값을 넘으면 PP 하나로 대표하기 어려움
+
+
+# ────────── 간격 통계 ──────────
+class PeriodStats:
+    """메시지 간격(ns)의 Welford 평균/분산, min/max, reservoir 표본."""
+
+    __slots__ = ("last", "n", "mean", "m2", "min", "max", "reordered", "sample", "_rng")
+
+    def __init__(self, seed: int = 0):
+        self.last = None
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = 0
+        self.reordered = 0
+        self.sample = []
+        self._rng = random.Random(seed)
+
+    def add(self, ts_ns: int) -> None:
+        last, self.last = self.last, ts_ns if self.last is None else max(self.last, ts_ns)
+        if last is None:
+            return
+        if ts_ns < last:                 # 기록 순서가 뒤바뀐 메시지: 간격에서 제외
+            self.reordered += 1
+            return
+        dt = ts_ns - last
+        self.n += 1
+        delta = dt - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (dt - self.mean)
+        self.min = min(self.min, dt)
+        self.max = max(self.max, dt)
+        # Algorithm R
+        if len(self.sample) < RESERVOIR_SIZE:
+            self.sample.append(dt)
+        else:
+            j = self._rng.randrange(self.n)
+            if j < RESERVOIR_SIZE:
+                self.sample[j] = dt
+
+    def summary(self) -> dict | None:
+        if self.n == 0:
+            return None
+        ordered = sorted(self.sample)
+
+        def pct(p):
+            return ordered[min(len(ordered) - 1, math.ceil(p * len(ordered)) - 1)] / 1e6
+
+        return {"intervals": self.n,
+                "mean_ms": self.mean / 1e6,
+                "std_ms": math.sqrt(self.m2 / self.n) / 1e6,
+                "min_ms": self.min / 1e6,
+                "max_ms": self.max / 1e6,
+                "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99),
+                "reordered": self.reordered}
+
+
+# ────────── metadata.yaml ──────────
+def read_metadata(bag_dir: pathlib.Path) -> dict:
+    import yaml                                  # python3-yaml
+    doc = yaml.safe_load(load_text(bag_dir / "metadata.yaml")) or {}
+    info = doc.get("rosbag2_bagfile_information")
+    if not isinstance(info, dict):
+        sys.exit(f"[ERROR] {bag_dir}/metadata.yaml has no rosbag2_bagfile_information")
+    return info
+
+
+def metadata_periods(info: dict) -> dict:
+    """topic → {type, count, period_ms} (녹화 시간 / (count-1), 메시지 2개 미만이면 None)."""
+    duration_ns = (info.get("duration") or {}).get("nanoseconds", 0)
+    out = {}
+    for t in info.get("topics_with_message_count", []) or []:
+        meta = t.get("topic_metadata", {})
+        count = int(t.get("message_count", 0))
+        out[meta.get("name", "")] = {
+            "type": meta.get("type", ""),
+            "count": count,
+            "period_ms": duration_ns / (count - 1) / 1e6 if count > 1 and duration_ns else None,
+        }
+    return out
+
+
+# ────────── sqlite3 storage ──────────
+def _sqlite_timestamps(path: pathlib.Path):
+    con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        names = dict(con.execute("SELECT id, name FROM topics"))
+        # timestamp_idx 를 타므로 정렬용 임시 테이블 없이 커서가 행을 하나씩 넘겨줌
+        for topic_id, ts in con.execute("SELECT topic_id, timestamp FROM messages "
+                                        "ORDER BY timestamp"):
+            yield names.get(topic_id, ""), ts
+    finally:
+        con.close()
+
+
+# ────────── MCAP storage (레코드 헤더만 읽는 최소 reader) ──────────
+MCAP_MAGIC = b"\x89MCAP0\r\n"
+OP_FOOTER, OP_CHANNEL, OP_MESSAGE, OP_CHUNK, OP_DATA_END = 0x02, 0x04, 0x05, 0x06, 0x0F
+_RECORD = struct.Struct("<BQ")
+_MESSAGE = struct.Struct("<HIQ")                 # channel_id, sequence, log_time
+
+
+def _decompress(kind: str, data: bytes, size: int) -> bytes:
+    if kind == "":
+        return data
+    if kind == "zstd":
+        try:
+            import zstandard                     # python3-zstandard
+        except ImportError:
+            sys.exit("[ERROR] zstd-compressed MCAP chunks need the zstandard module")
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=size)
+    if kind == "lz4":
+        try:
+            import lz4.frame                     # python3-lz4
+        except ImportError:
+            sys.exit("[ERROR] lz4-compressed MCAP chunks need the lz4 module")
+        return lz4.frame.decompress(data)
+    sys.exit(f"[ERROR] unsupported MCAP chunk compression: {kind!r}")
+
+
+def _channel(buf, off: int) -> tuple[int, str]:
+    ch_id, = struct.unpack_from("<H", buf, off)
+    n, = struct.unpack_from("<I", buf, off + 4)
+    return ch_id, bytes(buf[off + 8:off + 8 + n]).decode("utf-8", "replace")
+
+
+def _chunk_records(buf: bytes, channels: dict):
+    off = 0
+    while off + _RECORD.size <= len(buf):
+        op, length = _RECORD.unpack_from(buf, off)
+        off += _RECORD.size
+        if op == OP_CHANNEL:
+            ch_id, topic = _channel(buf, off)
+            channels[ch_id] = topic
+        elif op == OP_MESSAGE:
+            ch_id, _, log_time = _MESSAGE.unpack_from(buf, off)
+            yield channels.get(ch_id, ""), log_time
+        off += length
+
+
+def _mcap_timestamps(path: pathlib.Path):
+    channels = {}
+    with open(path, "rb") as f:
+        if f.read(len(MCAP_MAGIC)) != MCAP_MAGIC:
+            sys.exit(f"[ERROR] {path} is not an MCAP file")
+        while True:
+            head = f.read(_RECORD.size)
+            if len(head) < _RECORD.size:
+                return
+            op, length = _RECORD.unpack(head)
+            if op in (OP_FOOTER, OP_DATA_END):
+                return
+            if op == OP_CHANNEL:
+                body = f.read(length)
+                ch_id, topic = _channel(body, 0)
+                channels[ch_id] = topic
+            elif op == OP_MESSAGE:
+                ch_id, _, log_time = _MESSAGE.unpack(f.read(_MESSAGE.size))
+                f.seek(length - _MESSAGE.size, os.SEEK_CUR)      # payload 건너뜀
+                yield channels.get(ch_id, ""), log_time
+            elif op == OP_CHUNK:
+                # chunk 하나씩만 메모리에 올림 (rosbag2 기본 chunk 크기 ~768 KiB)
+                _start, _end, size, _crc, n = struct.unpack("<QQQII", f.read(32))
+                kind = f.read(n).decode()
+                rec_len, = struct.unpack("<Q", f.read(8))
+                records = _decompress(kind, f.read(rec_len), size)
+                f.seek(length - (32 + n + 8 + rec_len), os.SEEK_CUR)
+                yield from _chunk_records(records, channels)
+            else:
+                f.seek(length, os.SEEK_CUR)
+
+
+def iter_timestamps(bag_dir: pathlib.Path, info: dict):
+    """(topic, receive timestamp ns) 를 storage 파일 순서대로 스트리밍."""
+    storage = info.get("storage_identifier", "sqlite3")
+    if info.get("compression_mode", "") == "FILE":
+        sys.exit(f"[ERROR] {bag_dir}: file-compressed bags are not supported; "
+                 "decompress with 'ros2 bag convert' first")
+    for rel in info.get("relative_file_paths", []) or []:
+        path = bag_dir / rel
+        if storage == "mcap" or path.suffix == ".mcap":
+            yield from _mcap_timestamps(path)
+        elif storage == "sqlite3" or path.suffix == ".db3":
+            yield from _sqlite_timestamps(path)
+        else:
+            sys.exit(f"[ERROR] {bag_dir}: unsupported storage {storage!r}")
+
+
+# ────────── bag 분석 + 캐시 ──────────
+def _cache_dir() -> pathlib.Path:
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "check_qos" / "rosbag"
+
+
+def _cache_key(bag_dir: pathlib.Path, info: dict) -> str:
+    h = hashlib.sha1(f"{CACHE_VERSION}:{bag_dir.resolve()}".encode())
+    for rel in ["metadata.yaml"] + list(info.get("relative_file_paths", []) or []):
+        try:
+            st = (bag_dir / rel).stat()
+            h.update(f"{rel}:{st.st_size}:{st.st_mtime_ns}".encode())
+        except OSError:
+            h.update(f"{rel}:missing".encode())
+    return h.hexdigest()
+
+
+def analyze_bag(bag_dir: pathlib.Path, use_cache: bool = True) -> dict:
+    """topic → {type, count, metadata_period_ms, stats} (stats 는 PeriodStats.summary)."""
+    info = read_metadata(bag_dir)
+    cache = _cache_dir() / f"{_cache_key(bag_dir, info)}.json"
+    if use_cache and cache.exists():
+        try:
+            return json.loads(cache.read_text())
+        except (OSError, ValueError):
+            pass
+
+    stats = {}
+    for topic, ts in iter_timestamps(bag_dir, info):
+        st = stats.get(topic)
+        if st is None:
+            st = stats[topic] = PeriodStats(seed=len(stats))
+        st.add(ts)
+
+    out = {}
+    for topic, meta in metadata_periods(info).items():
+        out[topic] = {"type": meta["type"], "count": meta["count"],
+                      "metadata_period_ms": meta["period_ms"],
+                      "stats": stats[topic].summary() if topic in stats else None}
+    if use_cache:
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            cache.write_text(json.dumps(out))
+        except OSError:
+            pass                                 # 읽기 전용 환경: 캐시 없이 진행
+    return out
+
+
+def find_bags(args) -> list[pathlib.Path]:
+    bags = []
+    for arg in args:
+        p = pathlib.Path(arg)
+        if (p / "metadata.yaml").exists():
+            bags.append(p)
+        elif p.is_dir():
+            bags += sorted(m.parent for m in p.rglob("metadata.yaml"))
+        else:
+            sys.exit(f"[ERROR] not a rosbag2 directory: {p}")
+    return bags
+
+
+def analyze_bags(bags: list[pathlib.Path]) -> dict:
+    """bag 여러 개를 분석 (bag 이 2개 이상이면 process pool 로 병렬)."""
+    if len(bags) < 2:
+        return {str(b): analyze_bag(b) for b in bags}
+    with ProcessPoolExecutor() as pool:
+        return dict(zip(map(str, bags), pool.map(analyze_bag, bags)))
+
+
+def topic_period_ms(entry: dict) -> float | None:
+    """규칙에 넣을 publish period: 측정 평균, 없으면 metadata 추정값."""
+    st = entry.get("stats")
+    return st["mean_ms"] if st else entry.get("metadata_period_ms")
+
+
+# ────────── CLI ──────────
+def manifest_pairs(path: pathlib.Path, topics: dict, rtt_ms: float | None) -> dict:
+    """
+    topic → [(label, (pub_xml, sub_xml, pub_q, sub_q), PP, RTT)]. bag 에서 period 를 얻은 topic 은
+    그 값이 manifest 의 publish_period 를 덮어쓴다.
+    """
+    periods = {name: {"publish_period": pp} for name, entry in topics.items()
+               if (pp := topic_period_ms(entry)) is not None}
+    manifest = load_manifest(path, {"rtt": rtt_ms} if rtt_ms is not None else None, periods)
+    out = {}
+    for t in manifest["topics"]:
+        w = t["writer"]
+        out[t["name"]] = [(f"{pathlib.Path(w['profile']).name} → "
+                           f"{pathlib.Path(r['profile']).name}",
+                           (w["xml"], r["xml"], w["q"], r["q"]),
+                           t["publish_period_ms"], t["rtt_ms"])
+                          for r in t["readers"]]
+    return out
+
+
+def _print_findings(findings: list, indent: str) -> None:
+    for finding in findings:
+        print(indent + format_finding(*finding).replace("\n", "\n" + indent))
+    if not findings:
+        print(indent + "✅  All QoS constraints satisfied.")
+
+
+def main(argv: list[str]) -> None:
+    paths, topic_filter, rtt_ms, pub, sub, manifest = [], None, None, None, None, None
+    for arg in argv:
+        key, sep, val = arg.partition("=")
+        if not sep:
+            paths.append(arg)
+        elif key == "topic":
+            topic_filter = val
+        elif key == "rtt":
+            rtt_ms = parse_duration_ms(val, "rtt")
+        elif key == "pub":
+            pub = val
+        elif key == "sub":
+            sub = val
+        elif key == "manifest":
+            manifest = pathlib.Path(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+    if not paths or (pub is None) != (sub is None) or (pub and manifest):
+        sys.exit(USAGE)
+    if pub and topic_filter is None:
+        sys.exit("[ERROR] pub= / sub= describe one topic: add topic=<name>, "
+                 "or use manifest=<m.yaml> to map topics to profiles")
+
+    pair = None
+    if pub:
+        pub_xml, pub_q = resolve_qos(load_text(pathlib.Path(pub)), "PUB")
+        sub_xml, sub_q = resolve_qos(load_text(pathlib.Path(sub)), "SUB")
+        pair = (pub_xml, sub_xml, pub_q, sub_q)
+
+    for bag, topics in analyze_bags(find_bags(paths)).items():
+        print(color(f"[{bag}]", BLUE))
+        pairs = manifest_pairs(manifest, topics, rtt_ms) if manifest else {}
+        for name, entry in sorted(topics.items()):
+            if topic_filter and name != topic_filter:
+                continue
+            st = entry["stats"]
+            pp = topic_period_ms(entry)
+            if pp is None:
+                print(f"  {name}: {entry['count']} message(s), period unknown")
+                continue
+            if st is None:
+                print(f"  {name}: {entry['count']} msgs, period ≈ {pp:.2f} ms (metadata only)")
+            else:
+                print(f"  {name}: {entry['count']} msgs, period {st['mean_ms']:.2f} ms "
+                      f"± {st['std_ms']:.2f} (p50 {st['p50_ms']:.2f} / p95 {st['p95_ms']:.2f} / "
+                      f"p99 {st['p99_ms']:.2f}, min {st['min_ms']:.2f}, max {st['max_ms']:.2f})")
+                if st["p50_ms"] > 0 and st["p99_ms"] / st["p50_ms"] > JITTER_WARN_RATIO:
+                    print(f"    {color('[INCIDENTAL]', SEVERITY_COLOR['Incidental'])} "
+                          f"p99/p50 = {st['p99_ms'] / st['p50_ms']:.1f}: bursty publisher; "
+                          "PP-dependent rules use the mean period.")
+            if pair:
+                set_timing(pp, rtt_ms)
+                _print_findings(check_pair(*pair), "    ")
+            for label, qos, topic_pp, topic_rtt in pairs.get(name, []):
+                print(f"    [{label}]")
+                set_timing(topic_pp, topic_rtt)
+                _print_findings(check_pair(*qos), "      ")
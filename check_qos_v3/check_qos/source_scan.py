@@ -0,0 +1,892 @@
+#!/usr/bin/env python3
+"""rclpy / rclcpp 소스에서 endpoint QoS 와 timer period 를 추출해 규칙으로 검사.
+
+    ros2 run check_qos check_qos_cli source <workspace|src|file>... [rtt=<Nms>]
+                                            [publish_period=<Nms>] [jobs=<N>] [--no-cache]
+                                            [--fail-fast]
+
+XML 없이 코드에서 QoS 를 만드는 endpoint 용. Python 은 ast 로, C++ 은 가벼운 tokenizer 로
+create_publisher / create_subscription 의 topic, QoS 인자(정수 depth, QoSProfile(...) /
+rclcpp::QoS(...).reliable() 같은 식, sensor_data 등 preset, 같은 파일 안의 변수)와
+create_timer / create_wall_timer 의 period 를 읽는다. timer 는 callback 이 publish 하는
+publisher 에 연결하고 (callback 을 해석하지 못한 timer 가 class / 파일에 하나뿐이면 그것),
+그 period 가 writer 의 publish_period 가 된다.
+
+파일은 process pool 로 나눠 읽고 결과는 파일 내용 hash 로 캐시한다. 추출한 endpoint 는
+Fast DDS XML profile 로 바꿔 같은 topic 의 writer × reader 쌍마다 RULES / CROSS_RULES 를
+적용한다 (intern.Interner). namespace / remap 은 적용하지 않으며 상대 topic 은 '/' 를 붙인다.
+"""
+import ast
+import bisect
+import hashlib
+import json
+import os
+import pathlib
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .intern import Interner
+from .manifest import parse_duration_ms
+from .qos_checker import BLUE, SEVERITY_COLOR, color, resolve_qos, set_timing
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli source <workspace|src|file>... [rtt=<Nms>] "
+         "[publish_period=<Nms>] [jobs=<N>] [--no-cache] [--fail-fast]")
+
+CACHE_VERSION = 1
+PY_SUFFIXES = {".py"}
+CPP_SUFFIXES = {".cpp", ".cc", ".cxx", ".hpp", ".hh", ".hxx", ".h"}
+SKIP_DIRS = {"build", "install", "log", ".git", "__pycache__", "node_modules"}
+ENDPOINT_CALLS = {"create_publisher": "writer", "create_subscription": "reader"}
+TIMER_CALLS = {"create_timer", "create_wall_timer"}
+
+# ────────── ROS QoS preset ──────────
+# rmw_qos_profile_* 값. 빠진 정책은 SYSTEM_DEFAULT → Fast DDS 기본값 (resolve_qos).
+_DEFAULT = {"history": "KEEP_LAST", "depth": 10, "reliability": "RELIABLE",
+            "durability": "VOLATILE"}
+PRESETS = {
+    "default":               _DEFAULT,
+    "sensor_data":           {**_DEFAULT, "depth": 5, "reliability": "BEST_EFFORT"},
+    "services_default":      _DEFAULT,
+    "parameters":            {**_DEFAULT, "depth": 1000},
+    "parameter_events":      {**_DEFAULT, "depth": 1000},
+    "action_status_default": {**_DEFAULT, "depth": 1, "durability": "TRANSIENT_LOCAL"},
+    "rosout":                {**_DEFAULT, "depth": 1000, "durability": "TRANSIENT_LOCAL",
+                              "lifespan_ns": 10_000_000_000},
+    "clock":                 {**_DEFAULT, "depth": 1, "reliability": "BEST_EFFORT"},
+    "system_default":        {},
+}
+CPP_PRESET_CLASSES = {"SensorDataQoS": "sensor_data", "SystemDefaultsQoS": "system_default",
+                      "ServicesQoS": "services_default", "ParametersQoS": "parameters",
+                      "ParameterEventsQoS": "parameter_events", "RosoutQoS": "rosout",
+                      "ClockQoS": "clock"}
+
+# 정책 이름 (ReliabilityPolicy.BEST_EFFORT, RMW_QOS_POLICY_RELIABILITY_BEST_EFFORT,
+# rclcpp::ReliabilityPolicy::BestEffort …) → (field, 값). SYSTEM_DEFAULT 는 값 None.
+_POLICY_WORDS = (("BESTEFFORT", "reliability", "BEST_EFFORT"),
+                 ("RELIABLE", "reliability", "RELIABLE"),
+                 ("TRANSIENTLOCAL", "durability", "TRANSIENT_LOCAL"),
+                 ("VOLATILE", "durability", "VOLATILE"),
+                 ("KEEPLAST", "history", "KEEP_LAST"),
+                 ("KEEPALL", "history", "KEEP_ALL"),
+                 ("MANUALBYTOPIC", "liveliness", "MANUAL_BY_TOPIC"),
+                 ("AUTOMATIC", "liveliness", "AUTOMATIC"),
+                 ("SYSTEMDEFAULT", None, None))
+QOS_KWARGS = {"history", "depth", "reliability", "durability", "liveliness"}
+DURATION_KWARGS = {"deadline": "deadline_ns", "lifespan": "lifespan_ns",
+                   "liveliness_lease_duration": "lease_ns"}
+
+
+class Policy(str):
+    """enum 값 (문자열 상수와 구분). field 가 None 이면 SYSTEM_DEFAULT."""
+
+    def __new__(cls, field, value):
+        obj = super().__new__(cls, value or "SYSTEM_DEFAULT")
+        obj.field, obj.value = field, value
+        return obj
+
+
+class Dur(int):
+    """ns 단위 duration."""
+
+
+class Qos(dict):
+    """ROS QoS 정책 (history, depth, reliability, durability, liveliness, *_ns)."""
+
+    def with_(self, field: str, value) -> "Qos":
+        out = Qos(self)
+        if value is None:
+            out.pop(field, None)
+        else:
+            out[field] = value
+        return out
+
+
+def policy(name: str) -> Policy | None:
+    n = name.upper().replace("_", "")
+    for word, field, value in _POLICY_WORDS:
+        if n.endswith(word):
+            return Policy(field, value)
+    return None
+
+
+def preset(key: str) -> Qos | None:
+    key = key.lower()
+    for prefix in ("rmw_qos_profile_", "qos_profile_"):
+        key = key[len(prefix):] if key.startswith(prefix) else key
+    return Qos(PRESETS[key]) if key in PRESETS else None
+
+
+def as_qos(value) -> Qos | None:
+    """create_* 의 QoS 인자 값 → Qos (정수면 기본 profile 의 depth)."""
+    if isinstance(value, Qos):
+        return value
+    if type(value) is int and value >= 0:
+        return Qos(_DEFAULT, depth=value)
+    return None
+
+
+def _apply_policy(q: Qos, field: str, value) -> Qos:
+    if isinstance(value, Policy):
+        return q.with_(field, value.value)
+    return q
+
+
+# ────────── Python (ast) ──────────
+class _Scope:
+    """class 하나 (모듈은 이름 ""): self.<attr> 값과 method 정의."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.attrs: dict = {}
+        self.methods: dict[str, ast.AST] = {}
+
+
+class PyScanner:
+    def __init__(self, source: str, path: str = "<src>"):
+        self.tree = ast.parse(source, path)
+        self.endpoints: list[dict] = []
+        self.timers: list[dict] = []
+
+    def scan(self) -> list[dict]:
+        module = _Scope("")
+        self._body(self.tree.body, {}, module)
+        self._link_timers(module)
+        return self.endpoints
+
+    # ── 값 평가 ──────────────────────────────────
+    def _eval(self, node, env: dict, scope: _Scope):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id in env:
+                return env[node.id]
+            return preset(node.id) if node.id.startswith("qos_profile_") else None
+        if isinstance(node, ast.Attribute):
+            if isinstance(node.value, ast.Name) and node.value.id == "self":
+                return scope.attrs.get(node.attr)
+            if node.attr == "value" and isinstance(node.value, ast.Attribute):
+                return preset(node.value.attr)           # QoSPresetProfiles.SENSOR_DATA.value
+            if node.attr.startswith("qos_profile_"):
+                return preset(node.attr)                 # rclpy.qos.qos_profile_sensor_data
+            return policy(node.attr)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            v = self._eval(node.operand, env, scope)
+            return -v if isinstance(v, (int, float)) and not isinstance(v, bool) else None
+        if isinstance(node, ast.BinOp):
+            a, b = self._eval(node.left, env, scope), self._eval(node.right, env, scope)
+            if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (a, b)):
+                return None
+            ops = {ast.Add: lambda: a + b, ast.Sub: lambda: a - b, ast.Mult: lambda: a * b,
+                   ast.Div: lambda: a / b if b else None}
+            return ops[type(node.op)]() if type(node.op) in ops else None
+        if isinstance(node, ast.Call):
+            return self._eval_call(node, env, scope)
+        return None
+
+    def _eval_call(self, node: ast.Call, env: dict, scope: _Scope):
+        name = _call_name(node.func)
+        kw = {k.arg: k.value for k in node.keywords if k.arg}
+        if name == "QoSProfile":
+            q = Qos(_DEFAULT)
+            for key, expr in kw.items():
+                v = self._eval(expr, env, scope)
+                if key in DURATION_KWARGS and isinstance(v, Dur):
+                    q = q.with_(DURATION_KWARGS[key], v or None)
+                elif key == "depth" and type(v) is int:
+                    q = q.with_("depth", v)
+                elif key in QOS_KWARGS:
+                    q = _apply_policy(q, key, v)
+            return q
+        if name == "Duration":
+            sec = self._eval(kw["seconds"], env, scope) if "seconds" in kw else 0
+            nsec = self._eval(kw["nanoseconds"], env, scope) if "nanoseconds" in kw else 0
+            if isinstance(sec, (int, float)) and isinstance(nsec, (int, float)):
+                return Dur(round(sec * 1e9 + nsec))
+            return None
+        if name == "get_from_short_key" and node.args:
+            v = self._eval(node.args[0], env, scope)
+            return preset(v) if isinstance(v, str) else None
+        if name in ("copy", "deepcopy") and node.args:
+            v = self._eval(node.args[0], env, scope)
+            return Qos(v) if isinstance(v, Qos) else v
+        return None
+
+    # ── 문장 순회 ──────────────────────────────────
+    def _body(self, stmts, env: dict, scope: _Scope) -> None:
+        for st in stmts:
+            if isinstance(st, ast.ClassDef):
+                cls = _Scope(st.name)
+                cls.methods = {f.name: f for f in st.body
+                               if isinstance(f, (ast.FunctionDef, ast.AsyncFunctionDef))}
+                self._body(st.body, dict(env), cls)
+                self._link_timers(cls)
+            elif isinstance(st, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._body(st.body, dict(env), scope)
+            elif isinstance(st, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+                self._calls(st.value, env, scope, st)
+                if st.value is not None and not isinstance(st, ast.AugAssign):
+                    value = self._eval(st.value, env, scope)
+                    for target in (st.targets if isinstance(st, ast.Assign) else [st.target]):
+                        self._assign(target, value, env, scope)
+            else:
+                # 복합문은 조건 / 반복 식만 보고 본문은 순서대로 재귀
+                for _, child in ast.iter_fields(st):
+                    if isinstance(child, list) and child and isinstance(child[0], ast.stmt):
+                        self._body(child, env, scope)
+                    elif isinstance(child, list) and child and isinstance(child[0],
+                                                                         ast.excepthandler):
+                        for h in child:
+                            self._body(h.body, env, scope)
+                    elif isinstance(child, ast.AST):
+                        self._calls(child, env, scope, st)
+                    elif isinstance(child, list):
+                        for c in child:
+                            if isinstance(c, ast.AST):
+                                self._calls(c, env, scope, st)
+
+    def _assign(self, target, value, env: dict, scope: _Scope) -> None:
+        if isinstance(target, ast.Name):
+            env[target.id] = value
+        elif isinstance(target, ast.Attribute):
+            owner = target.value
+            if isinstance(owner, ast.Name) and owner.id == "self":
+                scope.attrs[target.attr] = value
+                return
+            # qos.reliability = ReliabilityPolicy.BEST_EFFORT 처럼 이미 만든 profile 수정
+            holder = env if isinstance(owner, ast.Name) else None
+            key = owner.id if isinstance(owner, ast.Name) else None
+            if (isinstance(owner, ast.Attribute) and isinstance(owner.value, ast.Name)
+                    and owner.value.id == "self"):
+                holder, key = scope.attrs, owner.attr
+            q = holder.get(key) if holder is not None else None
+            if isinstance(q, Qos):
+                if target.attr in DURATION_KWARGS and isinstance(value, Dur):
+                    holder[key] = q.with_(DURATION_KWARGS[target.attr], value or None)
+                elif target.attr == "depth" and type(value) is int:
+                    holder[key] = q.with_("depth", value)
+                elif target.attr in QOS_KWARGS:
+                    holder[key] = _apply_policy(q, target.attr, value)
+
+    def _calls(self, expr, env: dict, scope: _Scope, stmt) -> None:
+        """expr 안의 create_publisher / create_subscription / create_timer 호출 기록."""
+        target = None
+        if isinstance(stmt, (ast.Assign, ast.AnnAssign)) and expr is stmt.value:
+            targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+            target = ast.unparse(targets[0])
+        for node in ast.walk(expr):
+            if not isinstance(node, ast.Call):
+                continue
+            name = _call_name(node.func)
+            if name in ENDPOINT_CALLS:
+                self._endpoint(node, ENDPOINT_CALLS[name], env, scope,
+                               target if node is expr else None)
+            elif name in TIMER_CALLS:
+                self._timer(node, env, scope)
+
+    def _endpoint(self, node: ast.Call, kind: str, env: dict, scope: _Scope, var) -> None:
+        kw = {k.arg: k.value for k in node.keywords if k.arg}
+        args = list(node.args)
+        topic_node = args[1] if len(args) > 1 else kw.get("topic")
+        qos_pos = 2 if kind == "writer" else 3
+        qos_node = args[qos_pos] if len(args) > qos_pos else kw.get("qos_profile")
+        topic = self._eval(topic_node, env, scope) if topic_node is not None else None
+        qos = as_qos(self._eval(qos_node, env, scope)) if qos_node is not None else None
+        self.endpoints.append({
+            "kind": kind, "line": node.lineno, "scope": scope.name, "var": var,
+            "topic": topic if isinstance(topic, str) else None,
+            "topic_expr": ast.unparse(topic_node) if topic_node is not None else "",
+            "qos": dict(qos) if qos is not None else None,
+            "qos_expr": ast.unparse(qos_node) if qos_node is not None else "",
+            "period_ms": None, "period_from": None})
+
+    def _timer(self, node: ast.Call, env: dict, scope: _Scope) -> None:
+        kw = {k.arg: k.value for k in node.keywords if k.arg}
+        period = node.args[0] if node.args else kw.get("timer_period_sec")
+        callback = node.args[1] if len(node.args) > 1 else kw.get("callback")
+        sec = self._eval(period, env, scope) if period is not None else None
+        if isinstance(sec, Dur):
+            sec = sec / 1e9
+        self.timers.append({"scope": scope, "line": node.lineno,
+                            "period_ms": sec * 1000 if isinstance(sec, (int, float))
+                            and not isinstance(sec, bool) and sec > 0 else None,
+                            "targets": self._publish_targets(callback, scope)})
+
+    def _publish_targets(self, callback, scope: _Scope) -> set[str]:
+        """callback (self.method / lambda / 함수) 이 publish 하는 대상. self.<m>() 호출은 따라감."""
+        if callback is None:
+            return set()
+        todo, seen, out = [callback], set(), set()
+        if isinstance(callback, ast.Attribute) and isinstance(callback.value, ast.Name) \
+                and callback.value.id == "self":
+            todo = [scope.methods.get(callback.attr)]
+        while todo:
+            node = todo.pop()
+            if node is None or id(node) in seen:
+                continue
+            seen.add(id(node))
+            for call in (n for n in ast.walk(node) if isinstance(n, ast.Call)):
+                f = call.func
+                if isinstance(f, ast.Attribute) and f.attr == "publish":
+                    out.add(ast.unparse(f.value))
+                elif isinstance(f, ast.Attribute) and isinstance(f.value, ast.Name) \
+                        and f.value.id == "self":
+                    todo.append(scope.methods.get(f.attr))
+        return out
+
+    def _link_timers(self, scope: _Scope) -> None:
+        timers = [t for t in self.timers if t["scope"] is scope]
+        writers = [e for e in self.endpoints
+                   if e["scope"] == scope.name and e["kind"] == "writer"]
+        _link(writers, timers)
+        for t in timers:
+            self.timers.remove(t)
+
+
+def _call_name(func) -> str:
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    if isinstance(func, ast.Name):
+        return func.id
+    return ""
+
+
+def _link(writers: list[dict], timers: list[dict]) -> None:
+    """
+    timer period → writer. callback 이 publish 하는 writer 우선. callback 을 해석하지 못한
+    (targets 가 빈) timer 가 하나뿐이면 남은 writer 에 그 주기를 쓴다.
+    """
+    for w in writers:
+        for t in timers:
+            if w["var"] and w["var"] in t["targets"] and t["period_ms"]:
+                w["period_ms"], w["period_from"] = t["period_ms"], f"timer:{t['line']}"
+                break
+    if len(timers) == 1 and timers[0]["period_ms"] and not timers[0]["targets"]:
+        for w in writers:
+            if w["period_ms"] is None:
+                w["period_ms"] = timers[0]["period_ms"]
+                w["period_from"] = f"timer:{timers[0]['line']}"
+
+
+# ────────── C++ (tokenizer) ──────────
+_CPP_TOKEN_RE = re.compile(r"""
+    (?P<skip>\s+|//[^\n]*|/\*.*?\*/|\#[^\n]*)
+  | (?P<str>"(?:\\.|[^"\\\n])*")
+  | (?P<chr>'(?:\\.|[^'\\\n])*')
+  | (?P<num>(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?[A-Za-z_]*)
+  | (?P<id>[A-Za-z_]\w*)
+  | (?P<op>::|->|[^\s\w])
+""", re.S | re.X)
+_CHRONO_NS = {"nanoseconds": 1, "microseconds": 1_000, "milliseconds": 1_000_000,
+              "seconds": 1_000_000_000, "minutes": 60_000_000_000, "hours": 3_600_000_000_000}
+_LITERAL_NS = {"ns": 1, "us": 1_000, "ms": 1_000_000, "s": 1_000_000_000,
+               "min": 60_000_000_000, "h": 3_600_000_000_000}
+_CPP_METHODS = {"reliable": ("reliability", "RELIABLE"),
+                "best_effort": ("reliability", "BEST_EFFORT"),
+                "durability_volatile": ("durability", "VOLATILE"),
+                "transient_local": ("durability", "TRANSIENT_LOCAL"),
+                "keep_all": ("history", "KEEP_ALL")}
+_CLOSE = {"(": ")", "{": "}", "[": "]"}
+
+
+def cpp_tokens(source: str) -> list[tuple[str, str, int]]:
+    """(종류, 텍스트, 줄 번호). 주석 / 전처리기 줄은 버린다."""
+    lines = [m.start() for m in re.finditer("\n", source)]
+    out = []
+    for m in _CPP_TOKEN_RE.finditer(source):
+        if m.lastgroup != "skip":
+            out.append((m.lastgroup, m.group(), bisect.bisect_right(lines, m.start()) + 1))
+    return out
+
+
+class CppScanner:
+    def __init__(self, source: str):
+        self.toks = cpp_tokens(source)
+        self.text = [t[1] for t in self.toks]
+        self.env: dict = {}
+        self.endpoints: list[dict] = []
+        self.timers: list[dict] = []
+
+    # ── 토큰 도우미 ─────────────────────────────────
+    def _match(self, i: int) -> int:
+        """text[i] 가 여는 괄호일 때 짝이 되는 닫는 괄호 위치 (없으면 끝)."""
+        open_, close, depth = self.text[i], _CLOSE[self.text[i]], 0
+        for j in range(i, len(self.text)):
+            if self.text[j] == open_:
+                depth += 1
+            elif self.text[j] == close:
+                depth -= 1
+                if depth == 0:
+                    return j
+        return len(self.text)
+
+    def _args(self, lo: int, hi: int) -> list[tuple[int, int]]:
+        """(lo, hi) 사이의 최상위 ',' 로 나눈 인자 범위."""
+        out, start, i = [], lo, lo
+        while i < hi:
+            t = self.text[i]
+            if t in _CLOSE:
+                i = self._match(i)
+            elif t == ",":
+                out.append((start, i))
+                start = i + 1
+            i += 1
+        if start < hi:
+            out.append((start, hi))
+        return out
+
+    def _skip_template(self, i: int) -> int:
+        """text[i] == '<' 이면 짝이 되는 '>' 다음 위치."""
+        if i >= len(self.text) or self.text[i] != "<":
+            return i
+        depth = 0
+        for j in range(i, len(self.text)):
+            if self.text[j] == "<":
+                depth += 1
+            elif self.text[j] == ">":
+                depth -= 1
+                if depth == 0:
+                    return j + 1
+            elif self.text[j] in (";", "{"):
+                break
+        return i
+
+    # ── 식 평가 ──────────────────────────────────
+    def _eval(self, lo: int, hi: int):
+        value, i = self._primary(lo, hi)
+        while i < hi and self.text[i] in (".", "->") and i + 1 < hi:
+            name = self.text[i + 1]
+            j = i + 2
+            if j < hi and self.text[j] == "(":
+                end = self._match(j)
+                args = [self._eval(a, b) for a, b in self._args(j + 1, end)]
+                value = self._method(value, name, args)
+                i = end + 1
+            else:
+                value, i = None, j
+        return value if i >= hi else None
+
+    def _primary(self, lo: int, hi: int):
+        i = lo
+        while i < hi and self.text[i] in ("this", "->", "*", "&", "const", "auto"):
+            i += 1
+        if i >= hi:
+            return None, hi
+        kind, tok, _ = self.toks[i]
+        if kind == "num":
+            return _cpp_number(tok), i + 1
+        if kind == "str":
+            return tok[1:-1], i + 1
+        if tok == "(":
+            end = self._match(i)
+            return self._eval(i + 1, end), end + 1
+        if kind != "id":
+            return None, hi
+        # 한정 이름 rclcpp::QoS, std::chrono::milliseconds …
+        name = tok
+        while i + 2 < hi and self.text[i + 1] == "::" and self.toks[i + 2][0] == "id":
+            i += 2
+            name = self.text[i]
+        i = self._skip_template(i + 1)
+        if i < hi and self.text[i] in ("(", "{"):
+            end = self._match(i)
+            args = [self._eval(a, b) for a, b in self._args(i + 1, end)]
+            return self._call(name, args), end + 1
+        if name in self.env:
+            return self.env[name], i
+        return preset(name) if name.startswith("rmw_qos_profile_") else policy(name), i
+
+    def _call(self, name: str, args: list):
+        if name == "QoS":
+            q = as_qos(args[0]) if args else None
+            if q is not None and len(args) > 1 and isinstance(args[1], Qos):
+                q = Qos({**args[1], **{k: q[k] for k in ("history", "depth") if k in q}})
+            return q
+        if name == "KeepLast" and args and type(args[0]) is int:
+            return Qos(_DEFAULT, depth=args[0])
+        if name == "KeepAll":
+            return Qos(_DEFAULT, history="KEEP_ALL")
+        if name == "from_rmw" and args and isinstance(args[0], Qos):
+            return Qos(_DEFAULT, **{k: args[0][k] for k in ("history", "depth") if k in args[0]})
+        if name in CPP_PRESET_CLASSES:
+            return preset(CPP_PRESET_CLASSES[name])
+        if name in _CHRONO_NS and args and isinstance(args[0], (int, float)):
+            return Dur(round(args[0] * _CHRONO_NS[name]))
+        if name == "Duration" and args and all(isinstance(a, (int, float)) for a in args):
+            return Dur(args[0] if isinstance(args[0], Dur) else
+                       round(args[0] * 1e9 + (args[1] if len(args) > 1 else 0)))
+        if name == "from_seconds" and args and isinstance(args[0], (int, float)):
+            return Dur(round(args[0] * 1e9))
+        if name == "from_nanoseconds" and args and isinstance(args[0], int):
+            return Dur(args[0])
+        if name == "string" and args and isinstance(args[0], str):
+            return args[0]
+        return None
+
+    def _method(self, q, name: str, args: list):
+        if not isinstance(q, Qos):
+            return None
+        if name in _CPP_METHODS:
+            return q.with_(*_CPP_METHODS[name])
+        if name == "keep_last" and args and type(args[0]) is int:
+            return q.with_("history", "KEEP_LAST").with_("depth", args[0])
+        if name in ("reliability", "durability", "history", "liveliness") and args:
+            return _apply_policy(q, name, args[0])
+        if name in DURATION_KWARGS and args and isinstance(args[0], Dur):
+            return q.with_(DURATION_KWARGS[name], args[0] or None)
+        return q                               # avoid_ros_namespace_conventions 등
+
+    # ── 문장 / 호출 ─────────────────────────────────
+    def _statement_end(self, i: int) -> int:
+        depth = 0
+        for j in range(i, len(self.text)):
+            t = self.text[j]
+            if t in "([{":
+                depth += 1
+            elif t in ")]}":
+                depth -= 1
+                if depth < 0:
+                    return j
+            elif t == ";" and depth == 0:
+                return j
+        return len(self.text)
+
+    def _assignment_target(self, i: int) -> str | None:
+        """create_* 호출 앞의 'name = …' 에서 name."""
+        j = i - 1
+        while j > 0 and self.text[j] not in (";", "{", "}", "="):
+            j -= 1
+        if j > 0 and self.text[j] == "=" and self.toks[j - 1][0] == "id":
+            return self.text[j - 1]
+        return None
+
+    def scan(self) -> list[dict]:
+        text, n = self.text, len(self.text)
+        for i in range(n):
+            kind, tok, line = self.toks[i]
+            if kind != "id":
+                continue
+            nxt = text[i + 1] if i + 1 < n else ""
+            # name = 식;  /  Type name(식);  /  Type name{식};
+            if nxt == "=" and (i + 2 >= n or text[i + 2] != "="):
+                end = self._statement_end(i + 2)
+                value = self._eval(i + 2, end)
+                if value is not None:
+                    self.env[tok] = value
+            elif nxt in ("(", "{") and i > 0 and (self.toks[i - 1][0] == "id"
+                                                   or text[i - 1] in (">", "&", "*")) \
+                    and text[i - 1] not in ("return", "new", "else", "::"):
+                end = self._match(i + 1)
+                if end + 1 < n and text[end + 1] == ";":
+                    if text[i - 1] == "QoS":          # rclcpp::QoS qos(10);
+                        value = self._call("QoS", [self._eval(a, b)
+                                                   for a, b in self._args(i + 2, end)])
+                    else:
+                        value = self._eval(i + 2, end)
+                    if value is not None:
+                        self.env[tok] = value
+            # qos.reliable(); 처럼 변수에 대한 수정 호출
+            elif nxt == "." and isinstance(self.env.get(tok), Qos) and \
+                    (i == 0 or text[i - 1] in (";", "{", "}")):
+                end = self._statement_end(i)
+                value = self._eval(i, end)
+                if isinstance(value, Qos):
+                    self.env[tok] = value
+            if tok in ENDPOINT_CALLS:
+                self._endpoint(i, ENDPOINT_CALLS[tok], line)
+            elif tok in TIMER_CALLS:
+                self._timer(i, line)
+        _link([e for e in self.endpoints if e["kind"] == "writer"], self.timers)
+        return self.endpoints
+
+    def _call_args(self, i: int) -> list[tuple[int, int]] | None:
+        j = self._skip_template(i + 1)
+        if j >= len(self.text) or self.text[j] != "(":
+            return None
+        return self._args(j + 1, self._match(j))
+
+    def _source(self, lo: int, hi: int) -> str:
+        out = []
+        for j in range(lo, hi):                  # 식별자 / 숫자 사이에만 공백
+            if out and self.toks[j][0] in ("id", "num") and self.toks[j - 1][0] in ("id", "num"):
+                out.append(" ")
+            out.append(self.text[j] + (" " if self.text[j] == "," else ""))
+        return "".join(out)
+
+    def _endpoint(self, i: int, kind: str, line: int) -> None:
+        args = self._call_args(i)
+        if not args:
+            return
+        topic = self._eval(*args[0])
+        qos = as_qos(self._eval(*args[1])) if len(args) > 1 else None
+        self.endpoints.append({
+            "kind": kind, "line": line, "scope": "", "var": self._assignment_target(i),
+            "topic": topic if isinstance(topic, str) else None,
+            "topic_expr": self._source(*args[0]),
+            "qos": dict(qos) if qos is not None else None,
+            "qos_expr": self._source(*args[1]) if len(args) > 1 else "",
+            "period_ms": None, "period_from": None})
+
+    def _timer(self, i: int, line: int) -> None:
+        args = self._call_args(i)
+        if not args:
+            return
+        # rclcpp::create_timer(node, clock, period, cb) 와 node->create_wall_timer(period, cb)
+        period = next((v for v in (self._eval(a, b) for a, b in args) if isinstance(v, Dur)),
+                      None)
+        targets = self._publish_targets(args[-1][0], args[-1][1], set())
+        self.timers.append({"line": line, "targets": targets,
+                            "period_ms": period / 1e6 if period else None})
+
+    def _publish_targets(self, lo: int, hi: int, seen: set) -> set[str]:
+        """범위 안의 X->publish( / X.publish( 의 X. 호출하는 method 본문도 따라감."""
+        out = set()
+        for j in range(lo, hi):
+            t = self.text[j]
+            if t == "publish" and j >= 2 and self.text[j - 1] in ("->", ".") \
+                    and self.toks[j - 2][0] == "id":
+                out.add(self.text[j - 2])
+            elif self.toks[j][0] == "id" and t not in seen and j + 1 < hi \
+                    and self.text[j + 1] in ("(", ")", ",") and t != "publish":
+                body = self._method_body(t)
+                if body:
+                    seen.add(t)
+                    out |= self._publish_targets(*body, seen)
+        return out
+
+    def _method_body(self, name: str) -> tuple[int, int] | None:
+        """'name(...) [const|override|noexcept]* {' 정의의 본문 범위."""
+        text = self.text
+        for j in range(len(text) - 1):
+            if text[j] == name and text[j + 1] == "(" and (j == 0 or text[j - 1] != "."):
+                k = self._match(j + 1) + 1
+                while k < len(text) and text[k] in ("const", "override", "noexcept", "final"):
+                    k += 1
+                if k < len(text) and text[k] == "{":
+                    return k + 1, self._match(k)
+        return None
+
+
+def _cpp_number(tok: str):
+    m = re.fullmatch(r"((?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?)([A-Za-z_]*)", tok)
+    num, suffix = m.group(1), m.group(2)
+    value = float(num) if any(c in num for c in ".eE") else int(num)
+    if suffix in _LITERAL_NS:                    # 100ms, 1s (chrono literal)
+        return Dur(round(value * _LITERAL_NS[suffix]))
+    return value                                 # 10u, 5UL, 0.5f …
+
+
+# ────────── 파일 / 캐시 ──────────
+def _cache_dir() -> pathlib.Path:
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "check_qos" / "source"
+
+
+def scan_source(data: bytes, suffix: str) -> list[dict]:
+    source = data.decode("utf-8", errors="ignore")
+    if suffix in PY_SUFFIXES:
+        try:
+            return PyScanner(source).scan()
+        except (SyntaxError, ValueError, RecursionError):
+            return []
+    return CppScanner(source).scan()
+
+
+def scan_file(path: str, use_cache: bool = True) -> list[dict]:
+    """파일 하나의 endpoint 목록. 내용 hash 로 캐시 (경로 / mtime 과 무관)."""
+    p = pathlib.Path(path)
+    try:
+        data = p.read_bytes()
+    except OSError:
+        return []
+    if b"create_publisher" not in data and b"create_subscription" not in data:
+        return []
+    digest = hashlib.blake2b(data, digest_size=16,
+                             person=f"qos-src-v{CACHE_VERSION}".encode()[:16]).hexdigest()
+    cache = _cache_dir() / f"{digest}.json"
+    if use_cache:
+        try:
+            return json.loads(cache.read_text())
+        except (OSError, ValueError):
+            pass
+    endpoints = scan_source(data, p.suffix.lower())
+    if use_cache:
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            cache.write_text(json.dumps(endpoints))
+        except OSError:
+            pass                                 # 읽기 전용 환경: 캐시 없이 진행
+    return endpoints
+
+
+def find_sources(paths) -> list[pathlib.Path]:
+    """colcon workspace 규칙: build / install / log 와 COLCON_IGNORE 가 있는 디렉터리는 제외."""
+    out = []
+    suffixes = PY_SUFFIXES | CPP_SUFFIXES
+    for a in paths:
+        p = pathlib.Path(a)
+        if not p.exists():
+            sys.exit(f"[ERROR] File not found: {p}")
+        if p.is_file():
+            out.append(p)
+            continue
+        for root, dirs, files in os.walk(p):
+            if "COLCON_IGNORE" in files:
+                dirs[:] = []
+                continue
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+            out += [pathlib.Path(root, f) for f in sorted(files)
+                    if pathlib.Path(f).suffix.lower() in suffixes]
+    return out
+
+
+def _scan_cached(path: str) -> list[dict]:
+    return scan_file(path, True)
+
+
+def _scan_uncached(path: str) -> list[dict]:
+    return scan_file(path, False)
+
+
+def scan_workspace(paths, jobs: int | None = None, use_cache: bool = True) -> list[dict]:
+    files = [str(p) for p in find_sources(paths)]
+    fn = _scan_cached if use_cache else _scan_uncached
+    if jobs == 1 or len(files) < 2:
+        results = map(fn, files)
+    else:
+        with ProcessPoolExecutor(jobs) as pool:
+            results = list(pool.map(fn, files, chunksize=max(1, len(files) // 64)))
+    endpoints = []
+    for path, eps in zip(files, results):
+        for ep in eps:
+            endpoints.append({**ep, "file": path})
+    return endpoints
+
+
+# ────────── XML 변환 / 검사 ──────────
+def _duration_xml(ns: int) -> str:
+    return f"<sec>{ns // 1_000_000_000}</sec><nanosec>{ns % 1_000_000_000}</nanosec>"
+
+
+def endpoint_xml(ep: dict) -> str:
+    """ROS QoS → rmw_fastrtps 가 쓰는 것과 같은 Fast DDS profile (빈 정책은 생략)."""
+    q = ep["qos"]
+    tag = "data_writer" if ep["kind"] == "writer" else "data_reader"
+    topic = ""
+    if "history" in q:
+        depth = f"<depth>{q['depth']}</depth>" if "depth" in q else ""
+        topic = f"<topic><historyQos><kind>{q['history']}</kind>{depth}</historyQos></topic>"
+    qos = []
+    for field, xml_tag in (("reliability", "reliability"), ("durability", "durability")):
+        if field in q:
+            qos.append(f"<{xml_tag}><kind>{q[field]}</kind></{xml_tag}>")
+    if "liveliness" in q or "lease_ns" in q:
+        kind = f"<kind>{q['liveliness']}</kind>" if "liveliness" in q else ""
+        lease = (f"<lease_duration>{_duration_xml(q['lease_ns'])}</lease_duration>"
+                 if "lease_ns" in q else "")
+        qos.append(f"<liveliness>{kind}{lease}</liveliness>")
+    if "deadline_ns" in q:
+        qos.append(f"<deadline><period>{_duration_xml(q['deadline_ns'])}</period></deadline>")
+    if "lifespan_ns" in q and ep["kind"] == "writer":
+        qos.append(f"<lifespan><duration>{_duration_xml(q['lifespan_ns'])}</duration></lifespan>")
+    return (f'<{tag} profile_name="{ep["file"]}:{ep["line"]}">{topic}'
+            f"<qos>{''.join(qos)}</qos></{tag}>")
+
+
+def topic_name(ep: dict) -> str | None:
+    t = ep["topic"]
+    if not t:
+        return None
+    return t if t.startswith("/") or t.startswith("~") else "/" + t
+
+
+def describe(ep: dict) -> str:
+    q = ep["qos"]
+    if q is None:
+        return f"QoS unresolved ({ep['qos_expr'] or '?'})"
+    if not q:
+        return "SYSTEM_DEFAULT"
+    hist = q.get("history", "?") + (f" {q['depth']}" if q.get("history") == "KEEP_LAST" else "")
+    return " / ".join([q.get("reliability", "default"), q.get("durability", "default"), hist])
+
+
+def check_topics(endpoints: list[dict], default_pp_ms, rtt_ms, fail_fast: bool = False) -> dict:
+    """topic → {writers, readers, pp_ms, findings[(severity, side, ep, msg)]}."""
+    interner = Interner()
+    topics = {}
+    for ep in endpoints:
+        topics.setdefault(topic_name(ep), {"writers": [], "readers": []})[
+            ep["kind"] + "s"].append(ep)
+
+    for name, t in topics.items():
+        periods = [w["period_ms"] for w in t["writers"] if w["period_ms"]]
+        t["pp_ms"] = min(periods) if periods else default_pp_ms
+        t["findings"] = []
+        sids = {}
+        for ep in t["writers"] + t["readers"]:
+            if ep["qos"] is None:
+                continue
+            side = "PUB" if ep["kind"] == "writer" else "SUB"
+            sids[id(ep)] = interner.intern(*resolve_qos(endpoint_xml(ep), side))
+            set_timing(ep["period_ms"] or t["pp_ms"], rtt_ms)
+            for _, sev, msg in interner.rule_findings(sids[id(ep)], fail_fast):
+                t["findings"].append((sev, side, ep, msg))
+        if name is None:                         # topic 을 모르면 쌍을 만들 수 없음
+            continue
+        for w in t["writers"]:
+            for r in t["readers"]:
+                if id(w) in sids and id(r) in sids:
+                    set_timing(w["period_ms"] or t["pp_ms"], rtt_ms)
+                    for _, sev, msg in interner.cross_findings(sids[id(w)], sids[id(r)],
+                                                                   fail_fast):
+                        t["findings"].append((sev, None, (w, r), msg))
+    return topics
+
+
+# ────────── CLI ──────────
+def main(argv: list[str]) -> None:
+    paths, rtt_ms, pp_ms, jobs, use_cache, fail_fast = [], None, None, None, True, False
+    for arg in argv:
+        key, sep, val = arg.partition("=")
+        if arg == "--no-cache":
+            use_cache = False
+        elif arg == "--fail-fast":
+            fail_fast = True
+        elif not sep:
+            paths.append(arg)
+        elif key == "rtt":
+            rtt_ms = parse_duration_ms(val, "rtt")
+        elif key == "publish_period":
+            pp_ms = parse_duration_ms(val, "publish_period")
+        elif key == "jobs" and val.isdigit() and int(val) > 0:
+            jobs = int(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+    if not paths:
+        sys.exit(USAGE)
+
+    endpoints = scan_workspace(paths, jobs, use_cache)
+    topics = check_topics(endpoints, pp_ms, rtt_ms, fail_fast)
+    total = 0
+    for name in sorted(topics, key=lambda n: (n is None, n or "")):
+        t = topics[name]
+        pp = (f"PP {t['pp_ms']:g} ms" if t["pp_ms"] else "PP unknown")
+        print(color(f"[{name or 'unresolved topic'}]", BLUE) +
+              f" {len(t['writers'])} writer(s), {len(t['readers'])} reader(s), {pp}")
+        for ep in t["writers"] + t["readers"]:
+            where = f"{ep['file']}:{ep['line']}"
+            extra = f", timer {ep['period_ms']:g} ms" if ep["period_ms"] else ""
+            topic = "" if name else f" topic={ep['topic_expr']}"
+            print(f"  {'W' if ep['kind'] == 'writer' else 'R'} {where}{topic}  "
+                  f"{describe(ep)}{extra}")
+        for sev, side, who, msg in t["findings"]:
+            total += 1
+            tag = color(f"[{sev.upper()}]", SEVERITY_COLOR.get(sev, BLUE))
+            if side is None:
+                where = f"{who[0]['file']}:{who[0]['line']} → {who[1]['file']}:{who[1]['line']}"
+            else:
+                where = f"{who['file']}:{who['line']}"
+            print(f"    {tag} {where}\n      " + msg.replace("\n", "\n      "))
+    unresolved = sum(ep["qos"] is None for ep in endpoints)
+    print(f"{len(endpoints)} endpoint(s) on {sum(1 for n in topics if n)} topic(s), "
+          f"{total} finding(s)" + (f", {unresolved} with unresolved QoS" if unresolved else ""))
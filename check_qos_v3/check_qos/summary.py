@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""audit 요약 모드: finding 을 흘려 넣으며 bounded memory 로 집계한다.
+
+    ros2 run check_qos check_qos_cli audit <xml|dir>... --summary [top=<K>]
+                                           [sample_size=<N>] [detail=<findings.jsonl>]
+
+- (규칙, severity) 별 개수는 정확히 센다. 그 안의 파라미터 signature (메시지 — 규칙이 읽은
+  값이 메시지에 들어 있다) 는 Space-Saving 으로 상위 SIGNATURES 개만 둔다.
+- profile (file:profile_name) / topic 별 Critical 개수도 Space-Saving (용량 = top × SLACK).
+  단일 profile finding 은 manifest 에서 그 파일을 쓰는 topic 에도 더하고, writer × reader
+  쌍 finding 은 topic 에만 더한다.
+- 낭비 메모리 추정: "… to save / conserve memory" 권고가 나온 profile 의 (설정 값 − 필요
+  값) × sample_size. profile 당 가장 큰 초과분만 센다. sample_size 는 그 파일을 쓰는 manifest
+  topic 의 값, 없으면 sample_size= (기본 repair.DEFAULT_SAMPLE_SIZE).
+
+Space-Saving (Metwally, Agrawal, El Abbadi 2005) 의 개수는 과대추정이며, 항목마다 오차 상한을
+함께 둔다 (count − error 이상은 확실). 요약끼리는 merge() 로 합친다 (shard 병합).
+"""
+import heapq
+import pathlib
+import re
+
+from .repair import DEFAULT_SAMPLE_SIZE
+
+DEFAULT_TOP = 10
+SLACK = 10                       # Space-Saving 용량 = top × SLACK (상위 K 의 정확도 여유)
+SIGNATURES = 8                   # (규칙, severity) 당 둘 파라미터 signature 수
+SUMMARY_VERSION = 1
+NEEDED_RE = re.compile(r"= (\d+)(?: samples)? needed|reduce history depth to (\d+)")
+
+
+# ────────── Space-Saving ──────────
+class SpaceSaving:
+    """
+    용량 capacity 의 heavy-hitter 집계. +1 증가는 개수별 bucket 으로 O(1).
+    counts[key] 는 실제 개수 이상, counts[key] − errors[key] 는 실제 개수 이하.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: dict = {}
+        self.errors: dict = {}
+        self._buckets: dict[int, dict] = {}       # 개수 → {key: None} (삽입 순서 set)
+        self._min = 0
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def _place(self, key, count: int) -> None:
+        self.counts[key] = count
+        self._buckets.setdefault(count, {})[key] = None
+
+    def _unplace(self, key) -> int:
+        count = self.counts.pop(key)
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+        return count
+
+    def add(self, key) -> None:
+        if key in self.counts:
+            count = self._unplace(key)
+            self._place(key, count + 1)
+            if count == self._min and count not in self._buckets:
+                self._min = count + 1
+            return
+        if len(self.counts) < self.capacity:
+            self.errors[key] = 0
+            self._place(key, 1)
+            self._min = 1
+            return
+        victim = next(iter(self._buckets[self._min]))   # 가장 작은 개수 중 가장 오래된 항목
+        floor = self._unplace(victim)
+        del self.errors[victim]
+        self.errors[key] = floor
+        self._place(key, floor + 1)
+        if floor not in self._buckets:
+            self._min = floor + 1
+
+    def top(self, k: int) -> list[tuple]:
+        """[(key, count, error)] 개수 내림차순."""
+        keys = heapq.nlargest(k, self.counts, key=lambda key: (self.counts[key], -self.errors[key]))
+        return [(key, self.counts[key], self.errors[key]) for key in keys]
+
+    def floor(self) -> int:
+        """목록에 없는 항목의 개수 상한."""
+        return self._min if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other: "SpaceSaving") -> None:
+        """
+        mergeable summary 방식 (Agarwal et al. 2012): 한쪽에만 있는 항목은 다른 쪽의 floor 를
+        개수 / 오차에 더하고, 합친 뒤 상위 capacity 개만 남긴다.
+        """
+        mine, theirs = self.floor(), other.floor()
+        merged = {}
+        for key in self.counts.keys() | other.counts.keys():
+            count = self.counts.get(key, mine) + other.counts.get(key, theirs)
+            error = self.errors.get(key, mine) + other.errors.get(key, theirs)
+            merged[key] = (count, error)
+        self.counts, self.errors, self._buckets = {}, {}, {}
+        for key in heapq.nlargest(self.capacity, merged, key=lambda key: merged[key][0]):
+            self.errors[key] = merged[key][1]
+            self._place(key, merged[key][0])
+        self._min = min(self._buckets, default=0)
+
+    def to_json(self) -> list:
+        return [[key, self.counts[key], self.errors[key]] for key in self.counts]
+
+    @classmethod
+    def from_json(cls, capacity: int, rows: list) -> "SpaceSaving":
+        s = cls(capacity)
+        for key, count, error in rows[:capacity]:
+            key = tuple(key) if isinstance(key, list) else key
+            s.errors[key] = error
+            s._place(key, count)
+        s._min = min(s._buckets, default=0)
+        return s
+
+
+# ────────── 낭비 메모리 ──────────
+def excess_samples(msg: str, q: dict) -> int:
+    """메모리 절약 권고 메시지의 (설정 값 − 필요 값). 해당 없으면 0."""
+    if "memory" not in msg or (m := NEEDED_RE.search(msg)) is None:
+        return 0
+    needed = int(m.group(1) or m.group(2))
+    key = "max_samples_per_instance" if "max_samples_per_instance" in msg else "history_depth"
+    txt = q.get(key, "").strip()
+    return max(int(txt) - needed, 0) if txt.isdigit() else 0
+
+
+def topic_index(manifest: dict | None) -> dict[str, list[tuple[str, int | None]]]:
+    """절대 profile 경로 → [(topic, sample_size)]."""
+    out = {}
+    for t in (manifest or {}).get("topics", []):
+        for ep in (t["writer"], *t["readers"]):
+            entries = out.setdefault(ep["profile"], [])
+            if (t["name"], t["sample_size"]) not in entries:
+                entries.append((t["name"], t["sample_size"]))
+    return out
+
+
+# ────────── 요약 ──────────
+class FleetSummary:
+    def __init__(self, top: int = DEFAULT_TOP, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 manifest: dict | None = None):
+        self.top, self.sample_size = top, sample_size
+        self.topics = topic_index(manifest)
+        self.total = 0
+        self.groups: dict[tuple[str, str], list] = {}     # (rule, sev) → [개수, SpaceSaving]
+        self.profiles = SpaceSaving(top * SLACK)
+        self.topic_critical = SpaceSaving(top * SLACK)
+        self.waste = {"profiles": 0, "samples": 0, "bytes": 0}
+
+    def _topics_of(self, file: str) -> list[tuple[str, int | None]]:
+        if not self.topics:
+            return []
+        return self.topics.get(str(pathlib.Path(file).resolve()), [])
+
+    def add(self, f: dict) -> None:
+        """audit finding 하나."""
+        self.total += 1
+        group = self.groups.get((f["rule"], f["severity"]))
+        if group is None:
+            group = self.groups[f["rule"], f["severity"]] = [0, SpaceSaving(SIGNATURES)]
+        group[0] += 1
+        group[1].add((f["side"], f["message"]))
+        if f["severity"] != "Critical":
+            return
+        if f["side"] == "PAIR":
+            self.topic_critical.add(f["topic"])
+            return
+        self.profiles.add(f"{f['file']}:{f['profile']}")
+        for topic, _ in self._topics_of(f["file"]):
+            self.topic_critical.add(topic)
+
+    def add_profile(self, findings: list[dict], q: dict) -> None:
+        """profile 하나의 finding 들 (같은 file / profile) + 낭비 메모리."""
+        excess = 0
+        for f in findings:
+            self.add(f)
+            excess = max(excess, excess_samples(f["message"], q))
+        if excess:
+            sizes = [s for _, s in self._topics_of(findings[0]["file"]) if s]
+            self.waste["profiles"] += 1
+            self.waste["samples"] += excess
+            self.waste["bytes"] += excess * (max(sizes) if sizes else self.sample_size)
+
+    def merge(self, other: "FleetSummary") -> None:
+        self.total += other.total
+        for key, (count, sigs) in other.groups.items():
+            if key in self.groups:
+                self.groups[key][0] += count
+                self.groups[key][1].merge(sigs)
+            else:
+                self.groups[key] = [count, sigs]
+        self.profiles.merge(other.profiles)
+        self.topic_critical.merge(other.topic_critical)
+        for k in self.waste:
+            self.waste[k] += other.waste[k]
+
+    def by_severity(self) -> dict[str, int]:
+        out = {}
+        for (_, sev), (count, _) in self.groups.items():
+            out[sev] = out.get(sev, 0) + count
+        return out
+
+    def to_json(self) -> dict:
+        return {"version": SUMMARY_VERSION, "top": self.top, "sample_size": self.sample_size,
+                "total": self.total,
+                "groups": [{"rule": rule, "severity": sev, "count": count,
+                            "signatures": sigs.to_json()}
+                           for (rule, sev), (count, sigs) in self.groups.items()],
+                "profiles": self.profiles.to_json(),
+                "topics": self.topic_critical.to_json(), "waste": dict(self.waste)}
+
+    @classmethod
+    def from_json(cls, d: dict) -> "FleetSummary":
+        s = cls(d["top"], d["sample_size"])
+        s.total = d["total"]
+        for g in d["groups"]:
+            s.groups[g["rule"], g["severity"]] = [
+                g["count"], SpaceSaving.from_json(SIGNATURES, g["signatures"])]
+        s.profiles = SpaceSaving.from_json(s.top * SLACK, d["profiles"])
+        s.topic_critical = SpaceSaving.from_json(s.top * SLACK, d["topics"])
+        s.waste = dict(d["waste"])
+        return s
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""`ros2 topic info --verbose` / `ros2 doctor --report` 텍스트 dump 를 읽어 실제 협상된 QoS 검사.
+
+    ros2 run check_qos check_qos_cli dump <dump.txt|dir>... [rtt=<Nms>] [publish_period=<Nms>]
+                                          [jobs=<N>] [--fail-fast]
+
+현장에서 모은 dump 여러 개를 이어 붙인 파일도 줄 단위로 읽는다 (파일 전체를 메모리에 두지
+않음). `Type:` 줄부터 다음 `Type:` 까지가 topic 하나의 snapshot 이고, topic 이름은 바로 앞의
+`ros2 topic info <topic>` 명령 줄 (또는 `Topic: <topic>`) 에서 가져온다. snapshot 마다
+endpoint 의 QoS 를 Fast DDS profile 로 바꿔 writer × reader 쌍에 CROSS_RULES 를 적용한다.
+
+원격 endpoint 는 history 가 전파되지 않아 `UNKNOWN` 으로 나오며, 그때는 Fast DDS 기본값
+(KEEP_LAST 1) 으로 해석되므로 출력에 표시한다. doctor report 의 QOS COMPATIBILITY LIST 항목은
+그대로 옮겨 함께 보여준다. dump 파일은 process pool 로 나눠 처리한다.
+"""
+import functools
+import os
+import pathlib
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .intern import Interner
+from .manifest import parse_duration_ms
+from .qos_checker import BLUE, SEVERITY_COLOR, color, resolve_qos, set_timing
+from .source_scan import endpoint_xml, policy
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli dump <dump.txt|dir>... [rtt=<Nms>] "
+         "[publish_period=<Nms>] [jobs=<N>] [--fail-fast]")
+
+COMMAND_RE = re.compile(r"\bros2\s+topic\s+info\s+(.*)")
+HISTORY_RE = re.compile(r"(\w+)\s*(?:\((\d+)\))?")
+DURATION_RE = re.compile(r"(-?\d+(?:\.\d+)?)\s*(nanoseconds|ns|seconds|s)?$", re.I)
+# rmw 의 "무한" 표현: int64 최대 ns, 또는 Fast DDS c_TimeInfinite (0x7fffffff s) 이상
+INFINITE_NS = 0x7FFFFFFF * 1_000_000_000
+ENDPOINT_KIND = {"PUBLISHER": "writer", "SUBSCRIPTION": "reader"}
+DOCTOR_SEVERITY = {"ERROR": "Critical", "WARNING": "Warn"}
+DURATION_FIELDS = {"deadline": "deadline_ns", "lifespan": "lifespan_ns",
+                   "liveliness lease duration": "lease_ns"}
+
+
+# ────────── 값 변환 ──────────
+def parse_ns(text: str) -> int | None:
+    """'Infinite' / '9223372036854775807 nanoseconds' / '0.5 seconds' → ns (무한·미지정은 None)."""
+    m = DURATION_RE.match(text.strip())
+    if not m:
+        return None
+    scale = 1 if (m.group(2) or "ns").lower() in ("nanoseconds", "ns") else 1_000_000_000
+    ns = round(float(m.group(1)) * scale)
+    return ns if 0 < ns < INFINITE_NS else None
+
+
+@functools.lru_cache(maxsize=4096)
+def qos_field(key: str, value: str) -> tuple:
+    """QoS profile: 아래 한 줄 → source_scan 과 같은 ROS QoS dict 에 넣을 ((field, 값), ...)."""
+    if key.startswith("history"):
+        m = HISTORY_RE.match(value)
+        p = policy(m.group(1)) if m else None
+        if p is None or p.field != "history" or not p.value:
+            return ()
+        if m.group(2) and p.value == "KEEP_LAST":
+            return (("history", p.value), ("depth", int(m.group(2))))
+        return (("history", p.value),)
+    if key in ("reliability", "durability", "liveliness"):
+        p = policy(value)
+        return ((key, p.value),) if p is not None and p.field == key and p.value else ()
+    field = DURATION_FIELDS.get(key)
+    ns = parse_ns(value) if field else None
+    return ((field, ns),) if ns is not None else ()
+
+
+# ────────── 스트림 파서 ──────────
+def _topic_from_command(rest: str) -> str | None:
+    for tok in rest.split():
+        if not tok.startswith("-"):
+            return tok
+    return None
+
+
+def iter_snapshots(lines, source: str = "<dump>"):
+    """
+    줄 iterator → snapshot dict 를 차례로. snapshot 은
+    {"topic", "type", "line", "endpoints": [ep], "reported": [(sev, pub, sub, msg)]}.
+    ep 는 source_scan 의 endpoint 와 같은 모양 (kind, qos, file, line) + node, history_known.
+    """
+    block = ep = doctor = None
+    pending_topic = None
+    in_qos = False
+
+    def finish_endpoint():
+        nonlocal ep
+        if ep is not None and block is not None and ep["kind"]:
+            block["endpoints"].append(ep)
+        ep = None
+
+    for lineno, raw in enumerate(lines, 1):
+        m = COMMAND_RE.search(raw) if "ros2" in raw else None
+        if m:
+            finish_endpoint()
+            if block is not None:
+                yield block
+                block = None
+            pending_topic = _topic_from_command(m.group(1))
+            continue
+        key, sep, value = raw.partition(":")
+        if not sep:
+            in_qos = in_qos and bool(raw.strip())
+            continue
+        lkey, value = key.strip().lower(), value.strip()
+        indented = raw[:1].isspace()
+
+        if in_qos and indented and ep is not None:
+            ep["qos"].update(qos_field(lkey, value))
+            if lkey.startswith("history"):
+                ep["history_known"] = "history" in ep["qos"]
+            continue
+        in_qos = False
+        if lkey == "topic":
+            pending_topic = value
+        elif lkey == "type":
+            finish_endpoint()
+            if block is not None:
+                yield block
+            block = {"topic": pending_topic or f"<unnamed {value}>", "type": value,
+                     "file": source, "line": lineno, "endpoints": [], "reported": []}
+            pending_topic = None
+        elif lkey == "node name":
+            finish_endpoint()
+            ep = {"kind": "", "qos": {}, "file": source, "line": lineno, "node": value,
+                  "namespace": "/", "history_known": False}
+        elif ep is not None and lkey == "node namespace":
+            ep["namespace"] = value
+        elif ep is not None and lkey == "endpoint type":
+            ep["kind"] = ENDPOINT_KIND.get(value.upper(), "")
+        elif ep is not None and lkey == "qos profile":
+            in_qos = True
+        # ── ros2 doctor --report: QOS COMPATIBILITY LIST ──
+        elif lkey == "topic [type]":
+            doctor = {"topic": value.split(" [")[0], "line": lineno}
+        elif doctor is not None and lkey in ("publisher node", "subscriber node"):
+            doctor[lkey.split()[0]] = value
+        elif doctor is not None and lkey == "compatibility status":
+            status, _, msg = value.partition(":")
+            sev = DOCTOR_SEVERITY.get(status.strip().upper())
+            if sev:
+                yield {"topic": doctor["topic"], "type": "", "file": source,
+                       "line": doctor["line"], "endpoints": [],
+                       "reported": [(sev, doctor.get("publisher", "?"),
+                                     doctor.get("subscriber", "?"), msg.strip())]}
+            doctor = None
+    finish_endpoint()
+    if block is not None:
+        yield block
+
+
+def node_label(ep: dict) -> str:
+    ns = ep["namespace"].rstrip("/")
+    return f"{ns}/{ep['node']}"
+
+
+# ────────── 검사 ──────────
+def _intern(interner: Interner, ep: dict, memo: dict) -> int:
+    """같은 (kind, QoS) 는 dump 전체에서 한 번만 XML 로 바꿔 해석한다."""
+    key = (ep["kind"], tuple(sorted(ep["qos"].items())))
+    if key not in memo:
+        side = "PUB" if ep["kind"] == "writer" else "SUB"
+        xml = endpoint_xml({"kind": ep["kind"], "qos": ep["qos"], "file": "dump", "line": 0})
+        memo[key] = interner.intern(*resolve_qos(xml, side))
+    return memo[key]
+
+
+def check_snapshot(block: dict, interner: Interner, pp_ms, rtt_ms, memo=None,
+                   fail_fast: bool = False) -> dict:
+    """snapshot 에 findings [(severity, writer, reader, msg)] 추가 (writer / reader 는 node label)."""
+    set_timing(pp_ms, rtt_ms)
+    memo = {} if memo is None else memo
+    sids = {id(ep): _intern(interner, ep, memo) for ep in block["endpoints"]}
+    findings = list(block["reported"])
+    writers = [e for e in block["endpoints"] if e["kind"] == "writer"]
+    readers = [e for e in block["endpoints"] if e["kind"] == "reader"]
+    for w in writers:
+        for r in readers:
+            for _, sev, msg in interner.cross_findings(sids[id(w)], sids[id(r)], fail_fast):
+                findings.append((sev, node_label(w), node_label(r), msg))
+    block["findings"] = findings
+    block["writers"], block["readers"] = len(writers), len(readers)
+    block["history_unknown"] = sum(not e["history_known"] for e in block["endpoints"])
+    del block["endpoints"]                       # 결과만 부모 프로세스로
+    return block
+
+
+def check_dump(path: str, pp_ms=None, rtt_ms=None,
+               fail_fast: bool = False) -> tuple[int, list[dict]]:
+    """dump 파일 하나 → (snapshot 수, findings 가 있는 snapshot 목록)."""
+    interner, memo = Interner(), {}
+    count, out = 0, []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for block in iter_snapshots(f, path):
+            count += 1
+            block = check_snapshot(block, interner, pp_ms, rtt_ms, memo, fail_fast)
+            if block["findings"]:
+                out.append(block)
+    return count, out
+
+
+def _check_dump_args(args) -> tuple[int, list[dict]]:
+    return check_dump(*args)
+
+
+def find_dumps(paths) -> list[str]:
+    out = []
+    for a in paths:
+        p = pathlib.Path(a)
+        if not p.exists():
+            sys.exit(f"[ERROR] File not found: {p}")
+        if p.is_dir():
+            out += sorted(str(f) for f in p.rglob("*") if f.is_file())
+        else:
+            out.append(str(p))
+    return out
+
+
+def check_dumps(paths, pp_ms=None, rtt_ms=None, jobs: int | None = None,
+                fail_fast: bool = False):
+    """(dump 경로, (snapshot 수, findings 있는 snapshot)) 을 입력 순서대로. 둘 이상이면 process pool."""
+    files = find_dumps(paths)
+    args = [(f, pp_ms, rtt_ms, fail_fast) for f in files]
+    if jobs == 1 or len(files) < 2:
+        yield from zip(files, map(_check_dump_args, args))
+        return
+    with ProcessPoolExecutor(jobs or os.cpu_count()) as pool:
+        yield from zip(files, pool.map(_check_dump_args, args))
+
+
+# ────────── CLI ──────────
+def main(argv: list[str]) -> None:
+    paths, rtt_ms, pp_ms, jobs, fail_fast = [], None, None, None, False
+    for arg in argv:
+        key, sep, val = arg.partition("=")
+        if arg == "--fail-fast":
+            fail_fast = True
+        elif not sep:
+            paths.append(arg)
+        elif key == "rtt":
+            rtt_ms = parse_duration_ms(val, "rtt")
+        elif key == "publish_period":
+            pp_ms = parse_duration_ms(val, "publish_period")
+        elif key == "jobs" and val.isdigit() and int(val) > 0:
+            jobs = int(val)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+    if not paths:
+        sys.exit(USAGE)
+
+    snapshots = total = 0
+    for path, (count, blocks) in check_dumps(paths, pp_ms, rtt_ms, jobs, fail_fast):
+        snapshots += count
+        for b in blocks:
+            if b["reported"] and not b["type"]:
+                what = "reported by ros2 doctor"
+            else:
+                what = f"{b['writers']} writer(s), {b['readers']} reader(s)"
+                if b["history_unknown"]:
+                    what += f", history unknown on {b['history_unknown']} endpoint(s)"
+            print(color(f"[{b['topic']}]", BLUE) + f" {path}:{b['line']}  {what}")
+            for sev, pub, sub, msg in b["findings"]:
+                total += 1
+                tag = color(f"[{sev.upper()}]", SEVERITY_COLOR.get(sev, BLUE))
+                print(f"  {tag} {pub} → {sub}\n    " + msg.replace("\n", "\n    "))
+    print(f"{snapshots} topic snapshot(s), {total} finding(s)")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Fast DDS participant transport 설정 파서 (transport_descriptors / userTransports / socket buffer).
+
+endpoint profile 과 같은 문서 (resolve_qos 가 돌려준 상속 반영 xml) 에서 읽는다.
+<participant> 가 없으면 Fast DDS 2.6 기본값: builtin UDPv4 + SHM, socket buffer 는 OS 기본값.
+"""
+import re
+
+from .qos_checker import find_block, scoped_text
+
+DEFAULT_UDP_MAX_MESSAGE = 65500          # UDPv4TransportDescriptor::maxMessageSize 기본값
+DEFAULT_SHM_SEGMENT = 512 * 1024         # SharedMemTransportDescriptor::segment_size 기본값
+UDP_TYPES = ("UDPV4", "UDPV6")
+TRANSPORT_ID_RE = re.compile(r"<transport_id>\s*([^<]*?)\s*</transport_id>")
+
+
+def _text(xml: str, path: tuple[str, ...], default: str = "") -> str:
+    txt = scoped_text(xml, path)
+    return txt.strip() if txt and txt.strip() else default
+
+
+def _size(xml: str, tag: str) -> int:
+    """0 = 지정 안 됨 (Fast DDS 도 0 을 '기본값 사용' 으로 해석)."""
+    txt = _text(xml, (tag,))
+    return int(txt) if txt.isdigit() else 0
+
+
+def transport_descriptors(xml: str) -> dict[str, dict]:
+    """문서의 <transport_descriptor> 들 → transport_id → 설정."""
+    out = {}
+    pos = 0
+    while (b := find_block(xml, "transport_descriptor", pos)) is not None:
+        body = xml[b[1]:b[2]]
+        kind = _text(body, ("type",)).upper()
+        out.setdefault(_text(body, ("transport_id",)), {
+            "type": kind,
+            "max_message_size": _size(body, "maxMessageSize")
+                                or (DEFAULT_UDP_MAX_MESSAGE if kind in UDP_TYPES else 0),
+            "send_buffer": _size(body, "sendBufferSize"),
+            "receive_buffer": _size(body, "receiveBufferSize"),
+            "segment_size": _size(body, "segment_size") or DEFAULT_SHM_SEGMENT})
+        pos = b[3]
+    return out
+
+
+def participant_transports(xml: str) -> dict:
+    """
+    participant 의 transport 구성.
+    {builtin, user: [id], descriptors: [userTransports 의 설정], shm, segment_size,
+     send_buffer, listen_buffer}. buffer 는 participant 수준 값 (0 = OS 기본값).
+    """
+    descriptors = transport_descriptors(xml)
+    part = find_block(xml, "participant")
+    body = xml[part[1]:part[2]] if part else ""
+    builtin = _text(body, ("useBuiltinTransports",), "true").lower() != "false"
+    user_block = find_block(body, "userTransports")
+    user = TRANSPORT_ID_RE.findall(body[user_block[1]:user_block[2]]) if user_block else []
+    used = [descriptors[t] for t in user if t in descriptors]
+    segments = [d["segment_size"] for d in used if d["type"] == "SHM"]
+    if builtin:
+        segments.append(DEFAULT_SHM_SEGMENT)
+    return {"builtin": builtin, "user": user, "descriptors": used, "shm": bool(segments),
+            "segment_size": min(segments) if segments else None,
+            "send_buffer": _size(body, "sendSocketBufferSize"),
+            "listen_buffer": _size(body, "listenSocketBufferSize")}
+
+
+def udp_path(transports: dict, os_buffer: int) -> dict | None:
+    """
+    host 사이 UDP 경로의 {max_message_size, send_buffer, receive_buffer}. UDP transport 가
+    여럿이면 가장 작은 값 (보수적). buffer 는 descriptor → participant → os_buffer 순.
+    UDP transport 가 없으면 (TCP / SHM 만) None.
+    """
+    udp = [d for d in transports["descriptors"] if d["type"] in UDP_TYPES]
+    if transports["builtin"]:
+        udp.append({"max_message_size": DEFAULT_UDP_MAX_MESSAGE,
+                    "send_buffer": 0, "receive_buffer": 0})
+    if not udp:
+        return None
+    return {
+        "max_message_size": min(d["max_message_size"] for d in udp),
+        "send_buffer": min(d["send_buffer"] or transports["send_buffer"] or os_buffer
+                           for d in udp),
+        "receive_buffer": min(d["receive_buffer"] or transports["listen_buffer"] or os_buffer
+                              for d in udp),
+    }
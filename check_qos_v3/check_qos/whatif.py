@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""pub / sub 한 쌍을 불러와 값을 하나씩 바꿔 보는 대화형 what-if 모드.
+
+    ros2 run check_qos check_qos_cli whatif <pub.xml> <sub.xml> [publish_period=<Nms>] [rtt=<Nms>]
+
+    qos> set pub depth 20          qos> set pp 40ms
+    qos> set sub deadline 150ms    qos> unset rtt
+    qos> set sub partitions a,b    qos> undo
+
+각 규칙이 실제로 읽은 QoS key / XML 요소 / PP·RTT 를 기록해 두고, 값을 바꾸면
+그 값에 의존하는 규칙만 다시 실행한다.
+"""
+import cmd
+import functools
+import pathlib
+import sys
+import time
+
+from . import qos_checker as qc
+from .manifest import parse_duration_ms
+from .qos_checker import (BLUE, CROSS_RULES, ENDPOINT_PROFILE_RE, RULES, TAG_PATHS,
+                          TEXT_VALUE, ScopedDuration, TrackedQos, TrackedXml, call_cross_rule,
+                          color, find_block, format_finding, load_text, parse_period, parse_rtt,
+                          resolve_qos, scoped_span, scoped_text, set_timing)
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli whatif <pub.xml> <sub.xml> "
+         "[publish_period=<Nms>] [rtt=<Nms>]")
+
+# ────────── 편집 가능한 필드 ──────────
+DURATION_FIELDS = {
+    "deadline":     ("deadline", "period"),
+    "lease":        ("liveliness", "lease_duration"),
+    "lifespan":     ("lifespan", "duration"),
+    "announcement": ("liveliness", "announcement_period"),
+    "max_blocking": ("reliability", "max_blocking_time"),
+}
+FIELDS = {
+    "depth": TAG_PATHS["history_depth"][0],
+    "partitions": ("partition",),
+    **DURATION_FIELDS,
+    **{k: path for k, (path, _) in TAG_PATHS.items()},
+}
+# 새로 만들 요소의 부모 (Fast DDS profile 구조). 나머지는 <qos> 아래.
+PARENT = {"historyQos": "topic", "resourceLimitsQos": "topic"}
+
+TIMING_GLOBALS = ("publish_period_ms", "rtt_ns")
+
+
+# ────────── XML 편집 ──────────
+def _wrap(path: tuple[str, ...], inner: str) -> str:
+    for tag in reversed(path):
+        inner = f"<{tag}>{inner}</{tag}>"
+    return inner
+
+
+def _fill(xml: str, span: tuple[int, int], tag: str, inner: str, replace: bool) -> str:
+    """요소 내용 span 을 inner 로 바꾸거나 (replace) 앞에 끼워 넣는다. <tag/> 는 펼친다."""
+    s, e = span
+    if s == e and xml[:s].endswith("/>"):
+        return xml[:xml.rfind("<", 0, s)] + _wrap((tag,), inner) + xml[s:]
+    return xml[:s] + inner + xml[e if replace else s:]
+
+
+def set_element(xml: str, path: tuple[str, ...], inner: str) -> str:
+    """checker 가 읽는 (첫 번째) path 요소의 내용을 inner 로 바꾸고, 없으면 만든다."""
+    span = scoped_span(xml, path)
+    if span is not None:
+        return _fill(xml, span, path[-1], inner, replace=True)
+    for i in range(len(path) - 1, 0, -1):                 # 가장 깊은 기존 조상 안에
+        span = scoped_span(xml, path[:i])
+        if span is not None:
+            return _fill(xml, span, path[i - 1], _wrap(path[i:], inner), replace=False)
+
+    m = ENDPOINT_PROFILE_RE.search(xml)
+    if m is None or m.group(2).rstrip().endswith("/"):
+        return _wrap(path, inner) + xml                    # profile 태그 없는 QoS 조각
+    profile = find_block(xml, m.group(1), m.start())
+    parent = PARENT.get(path[0], "qos")
+    b = find_block(xml, parent, profile[1], profile[2])
+    if b is not None:
+        return xml[:b[1]] + _wrap(path, inner) + xml[b[1]:]
+    return xml[:m.end()] + _wrap((parent,) + path, inner) + xml[m.end():]
+
+
+def remove_element(xml: str, path: tuple[str, ...]) -> str:
+    span = (0, len(xml)) if len(path) == 1 else scoped_span(xml, path[:-1])
+    b = None if span is None else find_block(xml, path[-1], *span)
+    return xml if b is None else xml[:b[0]] + xml[b[3]:]
+
+
+def render_value(field: str, value: str) -> str:
+    """REPL 입력값 → 요소 내용."""
+    if field == "partitions":
+        names = [n.strip() for n in value.split(",") if n.strip()]
+        return "<names>" + "".join(f"<name>{n}</name>" for n in names) + "</names>"
+    if field in DURATION_FIELDS:
+        if value.strip().lower() in ("inf", "infinite", "duration_infinity"):
+            return "<sec>DURATION_INFINITY</sec><nanosec>DURATION_INFINITY</nanosec>"
+        ns = round(parse_duration_ms(value, field) * 1_000_000)
+        return f"<sec>{ns // 1_000_000_000}</sec><nanosec>{ns % 1_000_000_000}</nanosec>"
+    if field in ("depth", "history_depth") or TAG_PATHS.get(field, (None, None))[1] is qc.COUNT_VALUE:
+        if not value.strip().isdigit():
+            sys.exit(f"[ERROR] {field} must be a non-negative integer, got {value!r}")
+        return value.strip()
+    return value.strip().upper() if TAG_PATHS.get(field, (None, None))[1] is qc.KIND_VALUE \
+        else value.strip()
+
+
+def field_value(xml: str, q: dict, field: str) -> str:
+    """실효 QoS 에서 field 의 현재 값 (표시용)."""
+    if field == "partitions":
+        return ",".join(q["partition_list"]) or "(default)"
+    if field in DURATION_FIELDS:
+        m = ScopedDuration(DURATION_FIELDS[field], TEXT_VALUE).search(xml)
+        return "-" if m is None else f"{m.group(1) or 0}s {m.group(2) or 0}ns"
+    return q.get("history_depth" if field == "depth" else field, "") or "-"
+
+
+# ────────── 의존성 ──────────
+@functools.lru_cache(maxsize=None)
+def timing_reads(fn) -> frozenset:
+    """fn (과 fn 이 부르는 qos_checker 함수) 이 globals() 로 읽는 PP / RTT 이름."""
+    found, seen, stack = set(), set(), [fn.__code__]
+    module = vars(qc)
+    while stack:
+        code = stack.pop()
+        if code in seen:
+            continue
+        seen.add(code)
+        for c in code.co_consts:
+            if isinstance(c, str) and c in TIMING_GLOBALS:
+                found.add(c)
+            elif hasattr(c, "co_code"):                       # lambda / comprehension
+                stack.append(c)
+        for name in code.co_names:
+            obj = module.get(name)
+            if callable(obj) and getattr(obj, "__module__", None) == qc.__name__ \
+                    and hasattr(obj, "__code__"):
+                stack.append(obj.__code__)
+    return frozenset(("", name) for name in found)
+
+
+def changed_reads(side: str, old_eff: tuple, new_eff: tuple, deps) -> set:
+    """
+    (xml, q) 가 old → new 로 바뀔 때 달라진 (side, QoS key) 와, deps (규칙별 reads 집합들) 에
+    나오는 XML 경로 중 내용이 달라진 (side, path).
+    """
+    (old_xml, old_q), (new_xml, new_q) = old_eff, new_eff
+    changed = {(side, k) for k in new_q.keys() | old_q.keys() if old_q.get(k) != new_q.get(k)}
+    if old_xml != new_xml:
+        paths = {d[1] for reads in deps for d in reads
+                 if d[0] == side and isinstance(d[1], tuple)}
+        changed |= {(side, p) for p in paths
+                    if scoped_text(old_xml, p) != scoped_text(new_xml, p)}
+    return changed
+
+
+class WhatIf:
+    """pub / sub 문서와 PP / RTT 를 들고, 규칙별 결과와 의존성을 유지하는 세션."""
+
+    def __init__(self, pub_doc: str, sub_doc: str,
+                 pp_ms: float | None = None, rtt_ms: float | None = None):
+        self.docs = {"PUB": pub_doc, "SUB": sub_doc}
+        self.timing = {"publish_period_ms": pp_ms, "rtt_ms": rtt_ms}
+        self.history = []
+        # check_pair 와 같은 순서: stage 별로 PUB RULES → SUB RULES → CROSS_RULES
+        rules = [(side, fn, sev, stage) for side in ("PUB", "SUB") for fn, sev, stage in RULES] + \
+                [(None, fn, sev, stage) for fn, sev, stage in CROSS_RULES]
+        self.rules = [r[:3] for r in sorted(rules, key=lambda r: r[3])]
+        self.deps, self.results = {}, {}
+        self._resolve()
+        for side, fn, _ in self.rules:
+            self._run(side, fn)
+
+    def _resolve(self) -> None:
+        self.eff = {side: resolve_qos(doc, side) for side, doc in self.docs.items()}
+        set_timing(self.timing["publish_period_ms"], self.timing["rtt_ms"])
+
+    def _run(self, side: str | None, fn) -> None:
+        reads = set()
+        if side is None:
+            (px, pq), (sx, sq) = self.eff["PUB"], self.eff["SUB"]
+            msg = call_cross_rule(fn, TrackedXml(px, "PUB", reads), TrackedXml(sx, "SUB", reads),
+                                  TrackedQos(pq, "PUB", reads), TrackedQos(sq, "SUB", reads))
+        else:
+            xml, q = self.eff[side]
+            msg = fn(TrackedXml(xml, side, reads), TrackedQos(q, side, reads))
+        self.deps[side, fn] = frozenset(reads) | timing_reads(fn)
+        self.results[side, fn] = msg
+
+    def findings(self) -> list[tuple[str, str | None, str]]:
+        return [(sev, side, self.results[side, fn]) for side, fn, sev in self.rules
+                if self.results[side, fn]]
+
+    def _changed(self, old_eff: dict, old_timing: dict) -> set:
+        changed = set()
+        for side in ("PUB", "SUB"):
+            changed |= changed_reads(side, old_eff[side], self.eff[side], self.deps.values())
+        if old_timing["publish_period_ms"] != self.timing["publish_period_ms"]:
+            changed.add(("", "publish_period_ms"))
+        if old_timing["rtt_ms"] != self.timing["rtt_ms"]:
+            changed.add(("", "rtt_ns"))
+        return changed
+
+    def update(self, docs: dict | None = None, timing: dict | None = None) -> dict:
+        """값을 바꾸고 의존 규칙만 재실행. {"rerun", "total", "added", "removed", "ms"} 반환."""
+        t0 = time.perf_counter()
+        self.history.append((dict(self.docs), dict(self.timing)))
+        old_eff, old_timing = self.eff, dict(self.timing)
+        before = set(self.findings())
+        self.docs.update(docs or {})
+        self.timing.update(timing or {})
+        self._resolve()
+
+        changed = self._changed(old_eff, old_timing)
+        dirty = [(side, fn) for side, fn, _ in self.rules if self.deps[side, fn] & changed]
+        for side, fn in dirty:
+            self._run(side, fn)
+        after = set(self.findings())
+        return {"rerun": len(dirty), "total": len(self.rules),
+                "added": [f for f in self.findings() if f not in before],
+                "removed": [f for f in before if f not in after],
+                "ms": 1e3 * (time.perf_counter() - t0)}
+
+    def undo(self) -> dict | None:
+        if not self.history:
+            return None
+        docs, timing = self.history.pop()
+        res = self.update(docs, timing)
+        self.history.pop()                            # undo 자체는 기록하지 않음
+        return res
+
+    def set_field(self, side: str, field: str, value: str | None) -> dict:
+        path = FIELDS[field]
+        doc = self.docs[side]
+        doc = remove_element(doc, path) if value is None \
+            else set_element(doc, path, render_value(field, value))
+        return self.update(docs={side: doc})
+
+
+# ────────── REPL ──────────
+SIDES = {"pub": "PUB", "sub": "SUB"}
+
+
+class WhatIfShell(cmd.Cmd):
+    intro = ("QoS what-if mode. Commands: show, set, unset, fields, deps, undo, save, quit "
+             "(help <command> for details).")
+    prompt = "qos> "
+
+    def __init__(self, session: WhatIf, paths: dict):
+        super().__init__()
+        self.s, self.paths = session, paths
+
+    def onecmd(self, line):
+        try:
+            return super().onecmd(line)
+        except SystemExit as e:                          # 잘못된 값: 세션은 유지
+            print(e)
+            return False
+
+    def emptyline(self):
+        return False
+
+    def preloop(self):
+        print(self.intro)
+        self.do_show("")
+
+    def _report(self, res: dict) -> None:
+        print(color(f"re-evaluated {res['rerun']}/{res['total']} rule(s) in {res['ms']:.2f} ms",
+                    BLUE))
+        for f in res["removed"]:
+            print(f"  - {format_finding(*f).splitlines()[0]}")
+        for f in res["added"]:
+            print(f"  + {format_finding(*f)}")
+        if not res["removed"] and not res["added"]:
+            print("  (no change in findings)")
+
+    def _target(self, arg: str, need_value: bool):
+        parts = arg.split(None, 2)
+        if parts and parts[0].lower() in ("pp", "rtt"):
+            if need_value and len(parts) < 2:
+                sys.exit(f"[ERROR] usage: set {parts[0]} <Nms>")
+            return parts[0].lower(), None, parts[1] if len(parts) > 1 else None
+        if len(parts) < 2 or parts[0].lower() not in SIDES or parts[1] not in FIELDS \
+                or (need_value and len(parts) < 3):
+            sys.exit(f"[ERROR] usage: {'set' if need_value else 'unset'} pub|sub <field>"
+                     f"{' <value>' if need_value else ''} | pp|rtt{' <Nms>' if need_value else ''}"
+                     f"\n  fields: {', '.join(FIELDS)}")
+        return SIDES[parts[0].lower()], parts[1], parts[2] if len(parts) > 2 else None
+
+    def do_set(self, arg):
+        """set pub|sub <field> <value>  (e.g. set pub depth 20, set sub deadline 150ms,
+        set sub partitions a,b)   |   set pp|rtt <Nms>"""
+        side, field, value = self._target(arg, True)
+        if field is None:
+            key = "publish_period_ms" if side == "pp" else "rtt_ms"
+            ms = parse_duration_ms(value, side)
+            self._report(self.s.update(timing={key: int(ms) if ms.is_integer() else ms}))
+        else:
+            self._report(self.s.set_field(side, field, value))
+
+    def do_unset(self, arg):
+        """unset pub|sub <field>  (remove the element; the default applies)   |   unset pp|rtt"""
+        side, field, _ = self._target(arg, False)
+        if field is None:
+            key = "publish_period_ms" if side == "pp" else "rtt_ms"
+            self._report(self.s.update(timing={key: None}))
+        else:
+            self._report(self.s.set_field(side, field, None))
+
+    def do_show(self, _arg):
+        """show  — current findings"""
+        findings = self.s.findings()
+        for f in findings:
+            print(format_finding(*f))
+        if not findings:
+            print("✅  All QoS constraints satisfied.")
+
+    def do_fields(self, _arg):
+        """fields  — editable fields with their effective pub / sub values"""
+        for field in FIELDS:
+            if field == "history_depth":                 # depth 와 같은 요소
+                continue
+            key = "history_depth" if field == "depth" else field
+            pub, sub = (field_value(*self.s.eff[side], key) for side in ("PUB", "SUB"))
+            print(f"  {field:<34} pub: {pub:<24} sub: {sub}")
+        pp, rtt = self.s.timing["publish_period_ms"], self.s.timing["rtt_ms"]
+        print(f"  {'pp':<34} {pp if pp is not None else '-'} ms")
+        print(f"  {'rtt':<34} {rtt if rtt is not None else '-'} ms")
+
+    def do_deps(self, arg):
+        """deps <rule_name>  — what the rule read on its last run"""
+        hits = [(side, fn) for side, fn, _ in self.s.rules if fn.__name__ == arg.strip()]
+        if not hits:
+            print(f"[ERROR] unknown rule: {arg.strip()!r}")
+        for side, fn in hits:
+            names = sorted(f"{s or 'global'}:{'/'.join(k) if isinstance(k, tuple) else k}"
+                           for s, k in self.s.deps[side, fn])
+            print(f"  [{side or 'CROSS'}] {', '.join(names) or '(nothing)'}")
+
+    def do_undo(self, _arg):
+        """undo  — revert the last set / unset"""
+        res = self.s.undo()
+        if res is None:
+            print("nothing to undo")
+        else:
+            self._report(res)
+
+    def do_save(self, arg):
+        """save pub|sub [path]  — write the edited XML (default: overwrite the loaded file)"""
+        parts = arg.split(None, 1)
+        if not parts or parts[0].lower() not in SIDES:
+            sys.exit("[ERROR] usage: save pub|sub [path]")
+        side = SIDES[parts[0].lower()]
+        path = pathlib.Path(parts[1]) if len(parts) > 1 else self.paths[side]
+        path.write_text(self.s.docs[side], encoding="utf-8")
+        print(f"saved {side} profile to {path}")
+
+    def do_quit(self, _arg):
+        """quit"""
+        return True
+
+    do_exit = do_quit
+
+    def do_EOF(self, _arg):
+        print()
+        return True
+
+
+def main(argv: list[str]) -> None:
+    if len(argv) < 2:
+        sys.exit(USAGE)
+    pp_ms = rtt_ms = None
+    for arg in argv[2:]:
+        if arg.startswith("publish_period="):
+            pp_ms = parse_period(arg)
+        elif arg.startswith("rtt="):
+            rtt_ms = parse_rtt(arg)
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+    paths = {"PUB": pathlib.Path(argv[0]), "SUB": pathlib.Path(argv[1])}
+    session = WhatIf(load_text(paths["PUB"]), load_text(paths["SUB"]), pp_ms, rtt_ms)
+    WhatIfShell(session, paths).cmdloop(intro="")     # intro 는 preloop 에서
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""같은 host 의 writer × reader 쌍이 data-sharing / 공유 메모리로 전달될 수 있는지 분석.
+
+    ros2 run check_qos check_qos_cli zerocopy <pub.xml> <sub.xml> [same_host=yes|no]
+                                              [type=plain|bounded|unbounded]
+                                              [sample_size=<N>] [publish_period=<Nms>]
+    ros2 run check_qos check_qos_cli zerocopy <manifest.yaml> [type=plain|bounded|unbounded]
+
+Fast DDS 2.6 의 same-host 전달 경로는 네 단계다.
+
+    zero-copy     data-sharing + plain 타입 (loan API 로 직렬화 / 복사 없음)
+    data-sharing  writer 의 공유 payload pool 에 한 번 직렬화, transport 복사 없음
+    shm           직렬화된 샘플을 SHM transport segment 로 복사
+    udp           loopback / 네트워크 UDP
+
+XML 의 <data_sharing>, historyMemoryPolicy, history / resourceLimits, durability, topic kind 와
+participant 의 transport 설정 (userTransports / useBuiltinTransports / transport_descriptors)
+을 읽어 쌍마다 가능한 가장 좋은 경로와, 그보다 좋은 경로를 막는 설정을 보고한다.
+타입이 bounded / plain 인지는 XML 에 없으므로 type= 또는 manifest 의 type_bounds 로 준다.
+manifest 를 주면 host 로 같은 host 여부를 정하고, sample_size × 발행률로 놓친 쌍의 복사량을
+계산해 큰 순서로 출력한다.
+"""
+import pathlib
+import re
+import sys
+
+from .manifest import (TYPE_BOUNDS, fmt_bps, load_manifest, parse_duration_ms,
+                       parse_size_bytes)
+from .qos_checker import BLUE, SEVERITY_COLOR, color, load_text, resolve_qos, scoped_text
+from .transport import participant_transports
+
+USAGE = ("Usage: ros2 run check_qos check_qos_cli zerocopy <pub.xml> <sub.xml> "
+         "[same_host=yes|no] [type=plain|bounded|unbounded] [sample_size=<N>] "
+         "[publish_period=<Nms>]\n"
+         "       ros2 run check_qos check_qos_cli zerocopy <manifest.yaml> "
+         "[type=plain|bounded|unbounded]")
+
+PATHS = ("zero-copy", "data-sharing", "shm", "udp")
+DEFAULT_MEMORY_POLICY = "PREALLOCATED_WITH_REALLOC"      # DataWriterQos / DataReaderQos 기본값
+PREALLOCATED = {"PREALLOCATED", "PREALLOCATED_WITH_REALLOC"}
+DOMAIN_ID_RE = re.compile(r"<domainId>\s*(\d+)\s*</domainId>")
+
+
+# ────────── XML 에서 설정 읽기 ──────────
+def _text(xml: str, path: tuple[str, ...], default: str = "") -> str:
+    txt = scoped_text(xml, path)
+    return txt.strip() if txt and txt.strip() else default
+
+
+def sharing_settings(xml: str, q: dict) -> dict:
+    """resolve_qos 결과 (상속이 반영된 xml, QoS dict) → data-sharing 판단에 쓰는 값."""
+    ids_block = scoped_text(xml, ("data_sharing", "domain_ids")) or ""
+    max_samples = q.get("max_samples", "")
+    memory = _text(xml, ("historyMemoryPolicy",), DEFAULT_MEMORY_POLICY).upper()
+    return {
+        "kind": _text(xml, ("data_sharing", "kind"), "AUTOMATIC").upper(),
+        "shared_dir": _text(xml, ("data_sharing", "shared_dir")),
+        "domain_ids": {int(d) for d in DOMAIN_ID_RE.findall(ids_block)},
+        "memory_policy": memory.removesuffix("_MEMORY_MODE"),
+        "keyed": _text(xml, ("topic", "kind")).upper() == "WITH_KEY",
+        "history": q["history"],
+        "depth": int(q["history_depth"]) if q.get("history_depth", "").isdigit() else 1,
+        "max_samples": int(max_samples) if max_samples.isdigit() else 0,
+        "durability": q["durability"],
+        "transports": participant_transports(xml),
+    }
+
+
+# ────────── 규칙 : endpoint 하나 ──────────
+# (settings, side) → (severity, msg) | None. data_sharing 이 ON 인데 전제가 깨지면 entity
+# 생성이 실패하므로 Critical, AUTOMATIC 이면 조용히 transport 로 내려가므로 Conditional.
+def _blocked(s: dict) -> str:
+    return "Critical" if s["kind"] == "ON" else "Conditional"
+
+
+def zc_kind_off(s, side):
+    if s["kind"] == "OFF":
+        return ("Conditional",
+                f"{side}: <data_sharing><kind>OFF</kind> disables data-sharing delivery.\n"
+                "Recommendation: remove it or use AUTOMATIC for same-host readers.")
+    return None
+
+
+def zc_memory_policy(s, side):
+    if s["kind"] != "OFF" and s["memory_policy"] not in PREALLOCATED:
+        return (_blocked(s),
+                f"{side}: historyMemoryPolicy {s['memory_policy']} cannot back a data-sharing "
+                "payload pool"
+                + (" (entity creation fails with data_sharing ON)." if s["kind"] == "ON"
+                   else ".")
+                + "\nRecommendation: use PREALLOCATED or PREALLOCATED_WITH_REALLOC.")
+    return None
+
+
+def zc_unbounded_history(s, side):
+    if s["kind"] != "OFF" and s["history"] == "KEEP_ALL" and s["max_samples"] <= 0:
+        return (_blocked(s),
+                f"{side}: KEEP_ALL history with unlimited resourceLimitsQos max_samples; the "
+                "data-sharing pool cannot be preallocated.\n"
+                "Recommendation: use KEEP_LAST with a bounded depth, or set max_samples.")
+    return None
+
+
+def zc_durability(s, side):
+    if s["kind"] != "OFF" and s["durability"] in ("TRANSIENT", "PERSISTENT"):
+        return (_blocked(s),
+                f"{side}: durability {s['durability']} is not supported by data-sharing "
+                "delivery.\n"
+                "Recommendation: use VOLATILE or TRANSIENT_LOCAL on same-host endpoints.")
+    return None
+
+
+def zc_keyed_topic(s, side):
+    if s["kind"] != "OFF" and s["keyed"]:
+        return (_blocked(s),
+                f"{side}: keyed topic (<topic><kind>WITH_KEY</kind>) cannot use data-sharing "
+                "delivery.\n"
+                "Recommendation: use a NO_KEY topic for high-rate same-host data.")
+    return None
+
+
+SIDE_RULES = [zc_kind_off, zc_memory_policy, zc_unbounded_history, zc_durability,
+              zc_keyed_topic]
+
+
+# ────────── 규칙 : writer × reader 쌍 ──────────
+# (writer settings, reader settings, pair) → [(severity, msg)]. pair 는 same_host / type_bounds.
+def zc_same_host(w, r, pair):
+    if pair["same_host"] is False:
+        return [("Conditional", "Writer and reader run on different hosts; data-sharing and "
+                                "shared memory only work on the same host.")]
+    return []
+
+
+def zc_domain_ids(w, r, pair):
+    if w["domain_ids"] and r["domain_ids"] and not w["domain_ids"] & r["domain_ids"]:
+        return [(_blocked(w if w["kind"] == "ON" else r),
+                 f"<data_sharing><domain_ids> do not overlap (writer "
+                 f"{sorted(w['domain_ids'])}, reader {sorted(r['domain_ids'])}).\n"
+                 "Recommendation: give both endpoints a common data-sharing domain id.")]
+    return []
+
+
+def zc_shared_dir(w, r, pair):
+    if w["shared_dir"] and r["shared_dir"] and w["shared_dir"] != r["shared_dir"]:
+        return [(_blocked(w if w["kind"] == "ON" else r),
+                 f"<data_sharing><shared_dir> differs (writer {w['shared_dir']}, reader "
+                 f"{r['shared_dir']}); the endpoints cannot open the same pool.\n"
+                 "Recommendation: use the same shared_dir (or leave it empty) on both sides.")]
+    return []
+
+
+def zc_type_bounds(w, r, pair):
+    if pair["type_bounds"] == "unbounded" and "ON" in (w["kind"], r["kind"]):
+        return [("Critical", "data_sharing ON with an unbounded type (string / sequence "
+                             "without bound); entity creation fails.\n"
+                             "Recommendation: bound the type or use AUTOMATIC.")]
+    if pair["type_bounds"] == "unbounded":
+        return [("Conditional", "Unbounded type (string / sequence without bound); "
+                                "data-sharing needs a bounded type.\n"
+                                "Recommendation: bound the message fields of high-rate "
+                                "topics.")]
+    return []
+
+
+PAIR_RULES = [zc_same_host, zc_domain_ids, zc_shared_dir, zc_type_bounds]
+
+
+# ────────── SHM transport ──────────
+def zc_shm_transport(w, r, pair):
+    out = []
+    for side, s in (("Writer", w), ("Reader", r)):
+        if not s["transports"]["shm"]:
+            out.append(("Conditional",
+                        f"{side} participant has no SHM transport (useBuiltinTransports false "
+                        f"and userTransports {s['transports']['user'] or '[]'}); same-host "
+                        "traffic goes over UDP loopback.\n"
+                        "Recommendation: add an SHM transport_descriptor to userTransports."))
+    return out
+
+
+def shm_note(w, r, sample_size):
+    seg = min(w["transports"]["segment_size"] or 0, r["transports"]["segment_size"] or 0)
+    if sample_size and seg and sample_size > seg:
+        return (f"sample_size {sample_size} B exceeds the SHM segment_size {seg} B; "
+                "samples are fragmented through the segment.")
+    return None
+
+
+# ────────── 분석 ──────────
+def analyse_pair(w_xml: str, w_q: dict, r_xml: str, r_q: dict, same_host: bool | None = None,
+                 type_bounds: str | None = None, sample_size: int | None = None) -> dict:
+    """
+    쌍 하나의 판정. {"path", "blockers": [(sev, msg)], "notes": [msg]}.
+    blockers 는 path 보다 좋은 경로를 막는 설정 (same_host 가 None 이면 같은 host 로 가정).
+    """
+    w, r = sharing_settings(w_xml, w_q), sharing_settings(r_xml, r_q)
+    pair = {"same_host": same_host, "type_bounds": type_bounds}
+    blockers = [b for fn in SIDE_RULES for side, s in (("Writer", w), ("Reader", r))
+                if (b := fn(s, side))]
+    blockers += [b for fn in PAIR_RULES for b in fn(w, r, pair)]
+    notes = []
+    if same_host is None:
+        notes.append("host unknown; assuming writer and reader share a host.")
+    if type_bounds is None:
+        notes.append("type bounds unknown; assuming a bounded type (pass type= or "
+                     "type_bounds in the manifest).")
+
+    if same_host is False:
+        path = "udp"
+    elif not blockers:
+        path = "zero-copy" if type_bounds == "plain" else "data-sharing"
+        if type_bounds != "plain":
+            notes.append("loans (true zero-copy) additionally need a plain type "
+                         "(fixed-size fields only).")
+    else:
+        shm = zc_shm_transport(w, r, pair)
+        blockers += shm
+        path = "udp" if shm else "shm"
+        if not shm and (n := shm_note(w, r, sample_size)):
+            notes.append(n)
+    if path in ("zero-copy", "data-sharing") and sample_size:
+        pool = (w["depth"] if w["history"] == "KEEP_LAST" else w["max_samples"]) * sample_size
+        notes.append(f"writer payload pool ≈ {pool} B in {w['shared_dir'] or '/dev/shm'}.")
+    return {"path": path, "blockers": blockers, "notes": notes}
+
+
+def copy_load_bps(path: str, sample_size: int | None, publish_period_ms: float | None) -> float:
+    """zero-copy 가 아닌 경로에서 샘플마다 직렬화 / 복사되는 bytes 의 초당 양 (모르면 0)."""
+    if path == "zero-copy" or not sample_size or not publish_period_ms:
+        return 0.0
+    return sample_size * 1000.0 / publish_period_ms
+
+
+def analyse_manifest(manifest: dict, type_bounds: str | None = None) -> list[dict]:
+    """(topic, writer → reader) 행을 놓친 복사량이 큰 순서로."""
+    rows = []
+    for t in manifest["topics"]:
+        w = t["writer"]
+        bounds = type_bounds or t.get("type_bounds")
+        for r in t["readers"]:
+            same = w["host"] == r["host"] if w["host"] and r["host"] else None
+            res = analyse_pair(w["xml"], w["q"], r["xml"], r["q"], same, bounds,
+                               t["sample_size"])
+            res.update(topic=t["name"], writer=w["profile"], reader=r["profile"],
+                       load=copy_load_bps(res["path"], t["sample_size"],
+                                          t["publish_period_ms"]) * r["count"])
+            rows.append(res)
+    rows.sort(key=lambda x: (-x["load"], PATHS.index(x["path"]), x["topic"]))
+    return rows
+
+
+# ────────── 출력 ──────────
+def _print_result(label: str, res: dict) -> None:
+    best = res["path"] == "zero-copy"
+    verdict = "zero-copy possible" if best else f"best path: {res['path']}"
+    if res.get("load"):
+        what = "serializing" if res["path"] == "data-sharing" else "copying"
+        verdict += f", {what} {fmt_bps(8 * res['load'])}"
+    print(f"{color(label, BLUE)} {verdict}")
+    for sev, msg in res["blockers"]:
+        tag = color(f"[{sev.upper()}]", SEVERITY_COLOR.get(sev, BLUE))
+        print(f"  {tag} " + msg.replace("\n", "\n    "))
+    for note in res["notes"]:
+        print(f"  - {note}")
+
+
+def _parse_bool(val: str, what: str) -> bool:
+    if val.lower() not in ("yes", "no", "true", "false"):
+        sys.exit(f"[ERROR] {what} must be yes or no, got {val!r}")
+    return val.lower() in ("yes", "true")
+
+
+def main(argv: list[str]) -> None:
+    paths, same_host, bounds, size, pp_ms = [], None, None, None, None
+    for arg in argv:
+        key, sep, val = arg.partition("=")
+        if not sep:
+            paths.append(arg)
+        elif key == "same_host":
+            same_host = _parse_bool(val, "same_host")
+        elif key == "type":
+            if val not in TYPE_BOUNDS:
+                sys.exit(f"[ERROR] type must be one of {', '.join(TYPE_BOUNDS)}, got {val!r}")
+            bounds = val
+        elif key == "sample_size":
+            size = parse_size_bytes(val)
+        elif key == "publish_period":
+            pp_ms = parse_duration_ms(val, "publish_period")
+        else:
+            sys.exit(f"[ERROR] unknown argument: {arg}\n{USAGE}")
+
+    if len(paths) == 1 and pathlib.Path(paths[0]).suffix.lower() in (".yaml", ".yml", ".json"):
+        rows = analyse_manifest(load_manifest(pathlib.Path(paths[0])), bounds)
+        for row in rows:
+            _print_result(f"[{row['topic']}] {pathlib.Path(row['writer']).name} → "
+                          f"{pathlib.Path(row['reader']).name}", row)
+        missed = [x for x in rows if x["path"] != "zero-copy"]
+        print(f"{len(rows)} pair(s), {len(rows) - len(missed)} zero-copy, "
+              f"{len(missed)} copying {fmt_bps(8 * sum(x['load'] for x in missed))}")
+        return
+    if len(paths) != 2:
+        sys.exit(USAGE)
+
+    w_xml, w_q = resolve_qos(load_text(pathlib.Path(paths[0])), "PUB")
+    r_xml, r_q = resolve_qos(load_text(pathlib.Path(paths[1])), "SUB")
+    res = analyse_pair(w_xml, w_q, r_xml, r_q, same_host, bounds, size)
+    res["load"] = copy_load_bps(res["path"], size, pp_ms)
+    _print_result(f"[{pathlib.Path(paths[0]).name} → {pathlib.Path(paths[1]).name}]", res)
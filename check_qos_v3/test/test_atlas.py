@@ -0,0 +1,58 @@
+"""atlas lookup 이 writer / reader profile 모두에 대해 스칼라 RULES 와 같은 결과를 내는지 확인."""
+import pathlib
+
+import numpy as np
+import pytest
+
+from check_qos.atlas import Atlas
+from check_qos.columnar import PROFILE_DTYPE, profile_row
+from check_qos.qos_checker import RULES, iter_profiles, load_text, resolve_qos, set_timing
+
+PP_MS, RTT_MS = 40, 50
+TEST_XML = pathlib.Path(__file__).resolve().parent.parent / "test_xml"
+
+READER = """
+<data_reader profile_name="reader">
+  <qos><reliability><kind>RELIABLE</kind></reliability>
+       <durability><kind>TRANSIENT_LOCAL</kind></durability>
+       <readerDataLifecycle><autopurge_nowriter_samples_delay><sec>5</sec>
+       </autopurge_nowriter_samples_delay></readerDataLifecycle></qos>
+  <topic><historyQos><kind>KEEP_LAST</kind><depth>1</depth></historyQos></topic>
+</data_reader>
+"""
+
+
+@pytest.fixture(scope="module")
+def atlas():
+    set_timing(PP_MS, RTT_MS)
+    yield Atlas.build(PP_MS, RTT_MS)
+    set_timing(None, None)
+
+
+def _profiles():
+    docs = [load_text(p) for p in sorted(TEST_XML.glob("*.xml"))] + [READER]
+    return [(side, name, block, doc) for doc in docs for side, name, block in iter_profiles(doc)]
+
+
+PROFILES = _profiles()
+
+
+@pytest.mark.parametrize("side, name, block, doc", PROFILES, ids=[p[1] for p in PROFILES])
+def test_lookup_locates_writers_and_readers(atlas, side, name, block, doc):
+    row = np.array([profile_row(side, block, doc=doc)], dtype=PROFILE_DTYPE)[0]
+    index = atlas.locate(row)
+    assert index is not None, f"{name} ({side}) outside the atlas"
+    assert atlas.side(index) == side
+    # 구간 대표값으로 만든 profile 을 스칼라 RULES 로 평가한 결과와 같아야 한다
+    xml, q = resolve_qos(atlas.profile_xml(index), side)
+    expected = sorted(fn.__name__ for fn, *_ in RULES if fn(xml, q))
+    assert sorted(rule for rule, _ in atlas.rules_fired(index)) == expected
+
+
+def test_reader_lookup_matches_scalar_rules(atlas):
+    (side, _, block), = iter_profiles(READER)
+    index = atlas.locate(np.array([profile_row(side, block)], dtype=PROFILE_DTYPE)[0])
+    xml, q = resolve_qos(block, side)
+    expected = sorted(fn.__name__ for fn, *_ in RULES if fn(xml, q))
+    assert expected                                   # depth 1 < ⌈RTT/PP⌉+2
+    assert sorted(rule for rule, _ in atlas.rules_fired(index)) == expected
@@ -0,0 +1,59 @@
+"""bulkload.iter_profile_blocks 가 load_text → iter_profiles 와 같은 profile 을 내는지 확인."""
+from check_qos.bulkload import SMALL_FILE, iter_profile_blocks
+from check_qos.qos_checker import iter_profiles, load_text, resolve_qos
+
+DEFAULTS = """
+<data_writer profile_name="dw" is_default_profile="true">
+  <qos><reliability><kind>BEST_EFFORT</kind></reliability></qos>
+</data_writer>
+"""
+
+ENDPOINT = """
+<{tag} profile_name="{name}">
+  <qos><durability><kind>VOLATILE</kind></durability>
+       <partition><names><name>파티션</name></names></partition></qos>
+  <topic><historyQos><kind>KEEP_LAST</kind><depth>{depth}</depth></historyQos></topic>
+</{tag} >
+"""
+
+FILES = {
+    "plain.xml": "<profiles>" + "".join(
+        ENDPOINT.format(tag=tag, name=f"e{i}", depth=i)
+        for i, tag in enumerate(("data_writer", "data_reader", "publisher", "subscriber")))
+    + '<data_writer profile_name="empty"/></profiles>',
+    "defaults.xml": "<profiles>" + DEFAULTS + ENDPOINT.format(tag="data_writer", name="w",
+                                                              depth=3) + "</profiles>",
+    "nested.xml": '<profiles><participant profile_name="p">'
+                  + ENDPOINT.format(tag="DATA_WRITER", name="inner", depth=2)
+                  + "</participant>" + ENDPOINT.format(tag="data_reader", name="r", depth=4)
+                  + "</profiles>",
+    "fragment.xml": "<qos><reliability><kind>RELIABLE</kind></reliability></qos>",
+    "unclosed.xml": ENDPOINT.format(tag="data_writer", name="a", depth=1)
+                    + '<data_reader profile_name="b"><qos>',
+}
+FILES["large.xml"] = "<profiles>" + DEFAULTS + "".join(      # mmap 경로
+    ENDPOINT.format(tag="data_reader", name=f"r{i}", depth=i)
+    for i in range(SMALL_FILE // len(ENDPOINT) + 10)) + "</profiles>"
+
+
+def _reference(paths):
+    for p in paths:
+        text = load_text(p)
+        profiles = list(iter_profiles(text))
+        if not profiles:
+            yield p, "", "", text, text
+        for side, name, block in profiles:
+            yield p, side, name, block, text
+
+
+def test_bulk_blocks_match_iter_profiles(tmp_path):
+    paths = []
+    for name, text in FILES.items():
+        paths.append(tmp_path / name)
+        paths[-1].write_text(text, encoding="utf-8")
+    assert (tmp_path / "large.xml").stat().st_size > SMALL_FILE
+
+    bulk, ref = list(iter_profile_blocks(paths)), list(_reference(paths))
+    assert [b[:4] for b in bulk] == [r[:4] for r in ref]
+    for (_, side, _, block, doc), (_, _, _, _, text) in zip(bulk, ref):
+        assert resolve_qos(block, side, doc) == resolve_qos(block, side, text)
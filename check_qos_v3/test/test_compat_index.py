@@ -0,0 +1,55 @@
+"""compat_index.WriterIndex 가 MATCH_RULES 전수 비교와 같은 Writer 를 돌려주는지 확인."""
+import random
+
+from check_qos.compat_index import WriterIndex, brute_force_compatible
+from check_qos.qos_checker import resolve_qos
+
+SEED = 20240521
+WRITERS = 400
+READERS = 150
+
+
+def _duration(tag: str, rnd: random.Random) -> str:
+    sec = rnd.choice((None, 0, 1, 2, 5))
+    if sec is None:
+        return ""
+    return f"<{tag}><sec>{sec}</sec><nanosec>{rnd.choice((0, 500))}</nanosec></{tag}>"
+
+
+def random_profile(rnd: random.Random) -> str:
+    parts = []
+    for tag, kinds in (("reliability", ("RELIABLE", "BEST_EFFORT")),
+                       ("durability", ("VOLATILE", "TRANSIENT_LOCAL", "TRANSIENT", "PERSISTENT")),
+                       ("ownership", ("SHARED", "EXCLUSIVE")),
+                       ("destinationOrder", ("BY_RECEPTION_TIMESTAMP", "BY_SOURCE_TIMESTAMP"))):
+        if rnd.random() < 0.8:
+            parts.append(f"<{tag}><kind>{rnd.choice(kinds)}</kind></{tag}>")
+    deadline = _duration("period", rnd)
+    if deadline:
+        parts.append(f"<deadline>{deadline}</deadline>")
+    if rnd.random() < 0.7:
+        kind = rnd.choice(("AUTOMATIC", "MANUAL_BY_PARTICIPANT", "MANUAL_BY_TOPIC"))
+        parts.append(f"<liveliness><kind>{kind}</kind>"
+                     f"{_duration('lease_duration', rnd)}</liveliness>")
+    if rnd.random() < 0.6:
+        names = rnd.sample(("a", "b", "c", "d"), rnd.randint(1, 2))
+        parts.append("<partition><names>" + "".join(f"<name>{n}</name>" for n in names)
+                     + "</names></partition>")
+    return "<qos>" + "".join(parts) + "</qos>"
+
+
+def test_index_matches_brute_force():
+    rnd = random.Random(SEED)
+    index, writers = WriterIndex(), []
+    for i in range(WRITERS):
+        xml, q = resolve_qos(random_profile(rnd), "PUB")
+        index.add(i, xml, q)
+        writers.append((i, xml, q))
+
+    matched = 0
+    for _ in range(READERS):
+        xml, q = resolve_qos(random_profile(rnd), "SUB")
+        expected = brute_force_compatible(writers, xml, q)
+        assert index.compatible(xml, q) == expected, xml
+        matched += len(expected)
+    assert matched            # 코퍼스가 매칭 경로를 실제로 지나가는지
@@ -0,0 +1,141 @@
+"""같은 RULES 를 다른 경로로 평가한 결과가 profile 마다 그대로 평가한 결과와 같은지 확인.
+
+- audit: signature interning 으로 묶어 평가한 finding
+- columnar: ProfileStore 의 벡터화 mask, 같은 조건을 query 식으로 쓴 mask
+"""
+import random
+
+import pytest
+
+from check_qos.audit import audit
+from check_qos.columnar import ProfileStore
+from check_qos.qos_checker import RULES, iter_profiles, iter_staged, resolve_qos, set_timing
+
+SEED = 7
+BODIES = 80                      # 서로 다른 QoS 본문 수 (profile 은 이를 섞어 이름만 바꿈)
+PROFILES = 400
+TIMINGS = [(None, None), (40, None), (40, 80), (5, 500)]
+
+
+def _duration(tag: str, rnd: random.Random, inner: str = "") -> str:
+    sec = rnd.choice((0, 0, 1, 3, 10, "DURATION_INFINITY"))
+    nsec = rnd.choice((0, 1_000_000, 50_000_000, 500_000_000))
+    body = f"<sec>{sec}</sec><nanosec>{nsec}</nanosec>"
+    return f"<{tag}>" + (f"<{inner}>{body}</{inner}>" if inner else body) + f"</{tag}>"
+
+
+def _maybe(rnd: random.Random, p: float, text: str) -> str:
+    return text if rnd.random() < p else ""
+
+
+def random_body(rnd: random.Random) -> str:
+    """규칙이 읽는 정책들을 무작위로 켜고 끈 profile 본문."""
+    c = rnd.choice
+    qos = "".join((
+        _maybe(rnd, .8, f"<reliability><kind>{c(('RELIABLE', 'BEST_EFFORT'))}</kind>"
+                        + _maybe(rnd, .3, _duration("max_blocking_time", rnd)) + "</reliability>"),
+        _maybe(rnd, .8, "<durability><kind>"
+                        + c(("VOLATILE", "TRANSIENT_LOCAL", "TRANSIENT", "PERSISTENT"))
+                        + "</kind></durability>"),
+        _maybe(rnd, .3, f"<ownership><kind>{c(('SHARED', 'EXCLUSIVE'))}</kind></ownership>"),
+        _maybe(rnd, .4, _duration("deadline", rnd, "period")),
+        _maybe(rnd, .4, _duration("lifespan", rnd, "duration")),
+        _maybe(rnd, .5, "<liveliness><kind>"
+                        + c(("AUTOMATIC", "MANUAL_BY_PARTICIPANT", "MANUAL_BY_TOPIC"))
+                        + "</kind>" + _maybe(rnd, .6, _duration("lease_duration", rnd))
+                        + "</liveliness>"),
+        _maybe(rnd, .3, "<partition><names><name>"
+                        + c(("a", "b", "*")) + "</name></names></partition>"),
+        _maybe(rnd, .3, "<writerDataLifecycle><autodispose_unregistered_instances>"
+                        + c(("TRUE", "FALSE")) + "</autodispose_unregistered_instances>"
+                        "</writerDataLifecycle>"),
+        _maybe(rnd, .3, "<readerDataLifecycle>"
+                        + _maybe(rnd, .7, _duration("autopurge_nowriter_samples_delay", rnd))
+                        + _maybe(rnd, .7, _duration("autopurge_disposed_samples_delay", rnd))
+                        + "</readerDataLifecycle>"),
+        _maybe(rnd, .2, f"<userData><value>{c(('', 'ab'))}</value></userData>"),
+    ))
+    topic = "".join((
+        _maybe(rnd, .8, f"<historyQos><kind>{c(('KEEP_LAST', 'KEEP_ALL'))}</kind>"
+                        + _maybe(rnd, .8, f"<depth>{c((0, 1, 5, 10, 100, 1000))}</depth>")
+                        + "</historyQos>"),
+        _maybe(rnd, .5, "<resourceLimitsQos>"
+                        + "".join(_maybe(rnd, .6, f"<{k}>{c((0, 1, 10, 100, 5000))}</{k}>")
+                                  for k in ("max_samples", "max_instances",
+                                            "max_samples_per_instance"))
+                        + "</resourceLimitsQos>"),
+    ))
+    return f"<qos>{qos}</qos><topic>{topic}</topic>"
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory) -> tuple:
+    """(XML 파일 경로, [(side, profile_name, 실효 xml, q)])"""
+    rnd = random.Random(SEED)
+    bodies = [random_body(rnd) for _ in range(BODIES)]
+    parts = ['<profiles><data_writer profile_name="dw" is_default_profile="true"><qos>'
+             "<durability><kind>VOLATILE</kind></durability></qos></data_writer>"]
+    for i in range(PROFILES):
+        tag = rnd.choice(("data_writer", "data_reader"))
+        parts.append(f'<{tag} profile_name="p{i}">{rnd.choice(bodies)}</{tag}>')
+    doc = "".join(parts) + "</profiles>"
+    path = tmp_path_factory.mktemp("parity") / "corpus.xml"
+    path.write_text(doc, encoding="utf-8")
+    profiles = [(side, name, *resolve_qos(block, side, doc))
+                for side, name, block in iter_profiles(doc)]
+    return path, profiles
+
+
+@pytest.fixture
+def timing():
+    yield set_timing
+    set_timing(None, None)
+
+
+@pytest.mark.parametrize("fail_fast", [False, True])
+@pytest.mark.parametrize("pp, rtt", TIMINGS)
+def test_interned_audit_matches_per_profile(corpus, timing, pp, rtt, fail_fast):
+    path, profiles = corpus
+    timing(pp, rtt)
+    expected = [(name, side, fn.__name__, sev, msg)
+                for side, name, xml, q in profiles
+                for (fn, sev, _), msg in iter_staged(RULES, lambda r: r[0](xml, q), fail_fast)]
+
+    report = audit([path], fail_fast=fail_fast)
+    got = [(f["profile"], f["side"], f["rule"], f["severity"], f["message"])
+           for f in report["findings"]]
+    assert got == expected
+    assert report["signatures"] < len(profiles)          # interning 이 실제로 묶었는지
+
+
+@pytest.mark.parametrize("fail_fast", [False, True])
+@pytest.mark.parametrize("pp, rtt", TIMINGS)
+def test_vector_masks_match_scalar_rules(corpus, timing, pp, rtt, fail_fast):
+    path, profiles = corpus
+    timing(pp, rtt)
+    store = ProfileStore.from_xml_files([path])
+    masks = store.evaluate(pp, rtt, fail_fast)
+    for i, (side, name, xml, q) in enumerate(profiles):
+        fired = {fn for (fn, _, _), _ in iter_staged(RULES, lambda r: r[0](xml, q), fail_fast)}
+        for fn, (mask, _) in masks.items():
+            assert bool(mask[i]) == (fn in fired), f"{name} ({side}): {fn.__name__}"
+    assert len(masks) == len(RULES)
+
+
+def test_query_expression_matches_rule_mask(corpus, timing):
+    path, _ = corpus
+    timing(40, 80)
+    store = ProfileStore.from_xml_files([path])
+    rule = next(fn for fn, *_ in RULES if fn.__name__ == "rule_reliable_keep_last_depth_too_small")
+    got = store.query("reliability == RELIABLE and history == KEEP_LAST "
+                      "and 0 <= history_depth < required", 40, 80)
+    assert (got == store.rule_mask(rule, 40, 80)).all()
+    assert got.any()
+
+
+@pytest.mark.parametrize("expr", ["np.ones(1)", "__import__('os')", "history_depth.sum() > 0",
+                                  "history_depth + 1 > 2", "undefined_column == 1"])
+def test_query_rejects_anything_but_comparisons(corpus, expr):
+    store = ProfileStore.from_xml_files([corpus[0]])
+    with pytest.raises(SystemExit, match=r"\[ERROR\]"):
+        store.query(expr)
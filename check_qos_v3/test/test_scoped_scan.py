@@ -0,0 +1,148 @@
+"""범위 제한 스캐너의 정확성 / 선형 시간 회귀 테스트."""
+import time
+
+import pytest
+
+from check_qos.qos_checker import (RULES, announcement_period_ns, deadline_period_ns,
+                                   iter_profiles, lease_duration_ns, lifespan_parts,
+                                   max_blocking_time_ns, parse_profile, partition_list,
+                                   resolve_qos, rule_nowriter_autodispose_cross,
+                                   rule_nowriter_delay_vs_infinite_lease)
+
+# 아래 입력들은 이전 .*? 패턴으로는 수 분 이상 걸리던 크기
+TIME_BUDGET_S = 2.0
+LINEAR_N = 2500                  # n 과 2n profile 의 시간 비로 선형성 확인
+LINEAR_MAX_RATIO = 3.0
+
+PROFILE = """
+<data_writer profile_name="w{i}">
+  <qos>
+    <reliability><kind>RELIABLE</kind></reliability>
+    <durability><kind>TRANSIENT_LOCAL</kind></durability>
+    <deadline><period><sec>1</sec></period></deadline>
+    <liveliness><kind>AUTOMATIC</kind><lease_duration><sec>3</sec></lease_duration></liveliness>
+    <lifespan><duration><sec>2</sec></duration></lifespan>
+    <partition><names><name>p{i}</name></names></partition>
+  </qos>
+  <topic><historyQos><kind>KEEP_LAST</kind><depth>{i}</depth></historyQos></topic>
+</data_writer>
+"""
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+# ────────── 요소 경계 ──────────
+def test_missing_depth_does_not_leak_into_next_profile():
+    xml = ("<data_writer><topic><historyQos><kind>KEEP_LAST</kind></historyQos></topic>"
+           "</data_writer>" + PROFILE.format(i=7))
+    assert parse_profile(xml)["history_depth"] == ""
+    assert [parse_profile(b)["history_depth"] for _, _, b in iter_profiles(xml)] == ["", "7"]
+
+
+def test_nowriter_delay_does_not_read_disposed_delay():
+    xml = ("<readerDataLifecycle>"
+           "<autopurge_nowriter_samples_delay><nanosec>40</nanosec>"
+           "</autopurge_nowriter_samples_delay>"
+           "<autopurge_disposed_samples_delay><sec>1</sec></autopurge_disposed_samples_delay>"
+           "</readerDataLifecycle>")
+    q = parse_profile(xml)
+    assert (q["nowriter_sec_r"], q["nowriter_nsec_r"]) == ("", "40")
+    assert q["autopurge_disposed_samples_delay"] == "1"
+
+
+def test_nowriter_delay_sec_only_is_not_defaulted_to_infinite():
+    xml = ("<data_reader><qos><readerDataLifecycle><autopurge_nowriter_samples_delay>"
+           "<sec>5</sec></autopurge_nowriter_samples_delay></readerDataLifecycle>"
+           "<liveliness><lease_duration><sec>4294967295</sec></lease_duration></liveliness>"
+           "</qos></data_reader>")
+    eff, q = resolve_qos(xml, "SUB")
+    assert (q["nowriter_sec_r"], q["nowriter_nsec_r"]) == ("5", "0")
+    assert rule_nowriter_delay_vs_infinite_lease(eff, q)
+    assert rule_nowriter_autodispose_cross({"autodispose": "FALSE"}, q) is None
+    _, q = resolve_qos("<data_reader/>", "SUB")               # 둘 다 없으면 기본값 (무한)
+    assert (q["nowriter_sec_r"], q["nowriter_nsec_r"]) == ("DURATION_INFINITY",) * 2
+
+
+def test_durations_stay_inside_their_element():
+    xml = ("<lifespan></lifespan>"
+           "<deadline><period></period></deadline>"
+           "<liveliness><kind>AUTOMATIC</kind></liveliness>"
+           "<reliability><kind>RELIABLE</kind></reliability>"
+           "<other><lease_duration><sec>9</sec></lease_duration>"
+           "<announcement_period><sec>1</sec></announcement_period>"
+           "<max_blocking_time><sec>5</sec></max_blocking_time></other>")
+    assert lifespan_parts(xml) is None
+    assert deadline_period_ns(xml) == 0
+    assert lease_duration_ns(xml) is None
+    assert announcement_period_ns(xml) is None
+    assert max_blocking_time_ns(xml) == 100_000_000          # 기본값
+
+
+def test_partition_ignores_participant_name():
+    xml = "<rtps><name>participant</name></rtps><partition><names><name> a </name></names></partition>"
+    assert partition_list(xml) == ["a"]
+    assert partition_list("<rtps><name>participant</name></rtps>") == [""]
+
+
+def test_attributes_whitespace_and_self_closing():
+    xml = ('<historyQos kind="x" >\n <kind> KEEP_LAST </kind><depth> 7 </depth></historyQos >'
+           '<durability/><lifespan><duration><sec>1</sec><nanosec>5</nanosec></duration></lifespan>')
+    q = parse_profile(xml)
+    assert (q["history"], q["history_depth"], q["durability"]) == ("KEEP_LAST", "7", "")
+    assert lifespan_parts(xml) == (1, 5)
+
+
+# ────────── 대용량 / 악의적 입력 ──────────
+def test_large_document_is_linear():
+    def doc(n):
+        return "<profiles>" + "".join(PROFILE.format(i=i) for i in range(1, n + 1)) + "</profiles>"
+
+    def scan(xml):
+        n = 0
+        for side, _, block in iter_profiles(xml):
+            block, q = resolve_qos(block, side, xml)
+            for fn, *_ in RULES:
+                fn(block, q)
+            n += 1
+        return n
+
+    small, large = doc(LINEAR_N), doc(2 * LINEAR_N)
+    scan(doc(10))                                 # 정규식 컴파일 예열
+    (n1, t1), (n2, t2) = _timed(scan, small), _timed(scan, large)
+    assert (n1, n2) == (LINEAR_N, 2 * LINEAR_N)
+    assert t2 < 5 * TIME_BUDGET_S
+    # 선형이면 ≈ 2, 2차면 ≈ 4
+    assert t2 / t1 < LINEAR_MAX_RATIO, f"{LINEAR_N}: {t1:.2f}s, {2 * LINEAR_N}: {t2:.2f}s"
+
+
+PATHOLOGICAL = {
+    "unclosed history": "<historyQos><kind>KEEP_LAST</kind>" * 50_000,
+    "closed history, no depth": "<historyQos><kind>KEEP_LAST</kind></historyQos>" * 50_000,
+    "unclosed open tags": "<historyQos " * 100_000,
+    "whitespace after '<'": "<" + " " * 500_000,
+    "unclosed lifespan": "<lifespan><duration><sec>" * 50_000,
+    "unclosed liveliness": "<liveliness><lease_duration><sec>1</sec>" * 50_000,
+    "unclosed partition": "<partition><names><name>a</name>" * 50_000,
+    "deep nesting": "<reliability>" * 50_000 + "<kind>RELIABLE</kind>" + "</reliability>" * 50_000,
+    "unclosed endpoint": '<data_writer profile_name="x"' * 50_000,
+    "endpoint without end": "<data_writer>" * 50_000,
+}
+
+
+@pytest.mark.parametrize("name", sorted(PATHOLOGICAL))
+def test_pathological_input_within_budget(name):
+    xml = PATHOLOGICAL[name]
+
+    def scan(doc):
+        eff, q = resolve_qos(doc)
+        for fn, *_ in RULES:
+            fn(eff, q)
+        list(iter_profiles(doc))
+        return q
+
+    _, elapsed = _timed(scan, xml)
+    assert elapsed < TIME_BUDGET_S, f"{name}: {elapsed:.2f}s"